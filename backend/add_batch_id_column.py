@@ -0,0 +1,46 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.passport.app.db.session import engine
+from backend.points.models import points
+from backend.feedback.models import feedback
+from backend.original_image_record.models.original_image_record import GenerationBatch
+from sqlalchemy import text
+
+def add_batch_id_column():
+    try:
+        # 创建批量生图任务表（已存在时跳过）
+        GenerationBatch.__table__.create(bind=engine, checkfirst=True)
+        print("generation_batch table is ready")
+
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'original_image_record'
+                AND COLUMN_NAME = 'batch_id'
+            """))
+            column_exists = result.fetchone()
+
+            if not column_exists:
+                conn.execute(text("""
+                    ALTER TABLE original_image_record
+                    ADD COLUMN batch_id BIGINT NULL COMMENT '所属批量生图任务ID',
+                    ADD INDEX ix_original_image_record_batch_id (batch_id),
+                    ADD CONSTRAINT fk_original_image_record_batch_id
+                        FOREIGN KEY (batch_id) REFERENCES generation_batch (id)
+                """))
+                conn.commit()
+                print("Successfully added batch_id column to original_image_record table")
+            else:
+                print("batch_id column already exists in original_image_record table")
+
+    except Exception as e:
+        print(f"Error adding batch_id column: {e}")
+        raise
+
+if __name__ == "__main__":
+    add_batch_id_column()
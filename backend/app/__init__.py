@@ -24,11 +24,18 @@ def init_tos_uploader():
     try:
         from .config import TOSConfig, tos_config
         from .utils.tos_utils import TOSClient
+        from .utils.object_cache import get_object_cache
         
         # 优先使用CSV配置文件路径（如果配置了）
         if hasattr(tos_config, 'CSV_CONFIG_PATH') and tos_config.CSV_CONFIG_PATH:
             logger.info(f'尝试从CSV文件初始化TOS上传器: {tos_config.CSV_CONFIG_PATH}')
-            _tos_uploader = TOSClient(config_csv_path=tos_config.CSV_CONFIG_PATH)
+            _tos_uploader = TOSClient(
+                config_csv_path=tos_config.CSV_CONFIG_PATH,
+                client_options=tos_config.client_options(),
+                multipart_options=tos_config.multipart_options(),
+                download_options=tos_config.download_options(),
+                cache=get_object_cache()
+            )
         else:
             # 使用直接配置的参数
             logger.info('使用配置文件参数初始化TOS上传器')
@@ -37,7 +44,11 @@ def init_tos_uploader():
                 sk=tos_config.SECRET_KEY,
                 endpoint=tos_config.ENDPOINT,
                 region=tos_config.REGION,
-                bucket_name=tos_config.BUCKET
+                bucket_name=tos_config.BUCKET,
+                client_options=tos_config.client_options(),
+                multipart_options=tos_config.multipart_options(),
+                download_options=tos_config.download_options(),
+                cache=get_object_cache()
             )
         
         logger.info('TOS上传器初始化成功')
@@ -56,6 +67,12 @@ def get_tos_uploader():
         init_tos_uploader()
     return _tos_uploader
 
+# 获取TOS上传器的asyncio接口
+def get_async_tos_uploader():
+    """获取与TOS上传器共享连接池的asyncio接口，TOS不可用时返回None"""
+    tos_uploader = get_tos_uploader()
+    return tos_uploader.aio if tos_uploader else None
+
 # 尝试自动初始化TOS上传器（可选）
 # 如果不希望自动初始化，可以删除以下代码
 if __name__ == "__main__":
@@ -63,4 +80,4 @@ if __name__ == "__main__":
     init_tos_uploader()
 
 # 导出函数供外部使用
-__all__ = ['init_tos_uploader', 'get_tos_uploader']
+__all__ = ['init_tos_uploader', 'get_tos_uploader', 'get_async_tos_uploader']
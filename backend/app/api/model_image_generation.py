@@ -1,29 +1,49 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from decimal import Decimal
+from datetime import datetime, timedelta
 import json
 import asyncio
 import time
-import base64
-import uuid
-import re
 
 from backend.passport.app.api.deps import get_db, get_current_user
+from backend.passport.app.db.session import SessionLocal
 from backend.passport.app.models.user import User
 from backend.original_image_record.models.original_image_record import OriginalImageRecord
 from backend.original_image_record.services.original_image_record_service import OriginalImageRecordService
-from backend.original_image_record.schemas.original_image_record import OriginalImageRecordUpdate
+from backend.original_image_record.schemas.original_image_record import OriginalImageRecordUpdate, to_thumbnail_images
 from backend.notification.schemas.message import MessageCreate
 from backend.notification.services.notification_service import NotificationService
 from backend.points.services.points_service import PointsService
 from backend.app import get_tos_uploader
+from backend.app.config import tos_config, worker_config
+from backend.app.utils.metrics import stage_timer, record_stage_bytes
+from backend.app.utils.image_compressor import ImageCompressor, ImageValidationError
+from backend.app.utils.upload_stream import prepare_image_uploads
+from backend.app.utils.storage import get_generation_storage, storage_for_url
+from backend.app.utils.image_derivatives import DERIVATIVE_SIZES, build_image_entry, derivative_key, make_derivatives
+from backend.app.utils.direct_upload import (
+    UPLOAD_METHODS, UploadNotFoundError, build_upload_key, create_upload_ticket, verify_uploaded_object
+)
+from backend.app.utils.image_params import (
+    IMAGE_FIELDS, PLACEHOLDER_PENDING, decode_base64_image, is_data_url
+)
+from backend.worker import JobQueue, get_job_queue, user_lane, ACTIVE_STATUSES, JOB_MODEL_IMAGE
 from backend.passport.app.db.redis import get_redis
 
 router = APIRouter()
+# 用于multipart上传图片的图片头预检
+image_compressor = ImageCompressor()
+# 指标中使用的流水线名称
+PIPELINE_NAME = 'model-image-generation'
+# 模特图生成模型ID
+MODEL_IMAGE_MODEL_ID = 1
 #模特图生成模型的基础积分，每个图片生成消耗5个积分
 BASE_POINTS = 5
+# 批量生图单次最多提交的条数
+MAX_BATCH_ITEMS = 50
 
 
 async def send_points_update_via_redis(user_id: int, points: float):
@@ -67,170 +87,441 @@ class ModelImageGenerationRequest(BaseModel):
     top_outfit_back_image: Optional[str] = None
     bottom_outfit_image: Optional[str] = None
     bottom_outfit_back_image: Optional[str] = None
+    # 浏览器直传到TOS的图片：图片字段名 -> 上传凭证中的对象键，校验后替换为图片URL
+    image_keys: Optional[Dict[str, str]] = None
 
-async def upload_base64_image_to_tos(base64_data: str, tos_uploader) -> Optional[str]:
+class DirectUploadRequest(BaseModel):
+    """直传上传凭证请求"""
+    content_type: str = Field(..., description="图片MIME类型：image/jpeg、image/png、image/webp")
+    size: Optional[int] = Field(None, gt=0, description="图片字节数，PUT方式必填")
+    method: str = Field("put", description="上传方式：put为预签名PUT URL，post为表单上传策略")
+
+class DirectUploadCompleteRequest(BaseModel):
+    """直传完成确认请求"""
+    object_key: str
+
+def decode_image_fields(request_data: Dict[str, Any]) -> Tuple[List[str], List[Tuple[str, bytes]]]:
     """
-    将base64编码的图片上传到TOS
-    
+    解析请求中所有base64 data URL图片字段
+
     Args:
-        base64_data: base64编码的图片数据
-        tos_uploader: TOS上传器实例
-    
+        request_data: 请求参数
+
     Returns:
-        上传成功返回图片URL，失败返回None
+        (字段列表, 与字段一一对应的(object_key, image_bytes)列表)
+    """
+    fields = []
+    items = []
+    for field in IMAGE_FIELDS:
+        # 已经是图片URL的字段不需要解析
+        if not is_data_url(request_data.get(field)):
+            continue
+        decoded = decode_base64_image(request_data.get(field))
+        if decoded:
+            fields.append(field)
+            items.append(decoded)
+        else:
+            print(f"[WARNING] {field} 解析失败")
+    return fields, items
+
+async def upload_request_images(request_dicts: List[Dict[str, Any]]) -> List[str]:
+    """
+    提交任务前上传请求中的所有base64图片，并把图片字段替换为图片URL
+
+    对象键由图片内容的sha256生成，批量请求中相同的图片只上传一次，存储中已有的图片不再上传。
+    所有请求的图片在同一次put_many中并发上传，任务参数中只保存图片URL，base64数据不会写入任务队列。
+
+    Args:
+        request_dicts: 请求参数列表，图片字段原地替换为URL
+
+    Returns:
+        List[str]: 本次新上传的对象键，创建生图记录失败时传给delete_request_images清理；
+            已存在的对象可能被其他记录引用，不包含在内
+
+    Raises:
+        HTTPException: 图片数据无效（400）、存储服务不可用（503）、上传失败（502）
     """
-    if not base64_data or not tos_uploader:
-        return None
+    if not any(is_data_url(request_dict.get(field)) for request_dict in request_dicts for field in IMAGE_FIELDS):
+        return []
     
+    storage = get_generation_storage()
+    if not storage:
+        raise HTTPException(status_code=503, detail="图片存储服务不可用")
+    
+    loop = asyncio.get_running_loop()
+    with stage_timer(PIPELINE_NAME, 'decode'):
+        decoded = await asyncio.gather(*(
+            loop.run_in_executor(None, decode_image_fields, request_dict) for request_dict in request_dicts
+        ))
+    
+    contents = {}
+    for request_dict, (fields, items) in zip(request_dicts, decoded):
+        invalid = [field for field in IMAGE_FIELDS if is_data_url(request_dict.get(field)) and field not in fields]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"图片数据无效: {', '.join(invalid)}")
+        contents.update(items)
+    record_stage_bytes(PIPELINE_NAME, 'decode', 'out', sum(len(content) for content in contents.values()))
+    
+    keys = list(contents)
     try:
-        data_url_pattern = r'^data:image/(\w+);base64,(.+)$'
-        match = re.match(data_url_pattern, base64_data)
-        
-        if not match:
-            print(f"[ERROR] base64数据格式不正确")
-            return None
-        
-        image_format = match.group(1)
-        base64_string = match.group(2)
-        
-        image_bytes = base64.b64decode(base64_string)
-        
-        unique_id = str(uuid.uuid4())[:8]
-        file_extension = f'.{image_format}' if image_format != 'jpeg' else '.jpg'
-        object_key = f"model_images/{unique_id}{file_extension}"
-        
-        result = tos_uploader.put_object(
-            object_key=object_key,
-            content=image_bytes
-        )
-        
-        if result.get('success'):
-            print(f"[INFO] 图片上传成功: {result.get('object_url')}")
-            return result.get('object_url')
-        else:
-            print(f"[ERROR] 图片上传失败: {result}")
-            return None
-            
+        existing = await asyncio.gather(*(loop.run_in_executor(None, storage.exists, key) for key in keys))
     except Exception as e:
-        print(f"[ERROR] 上传图片到TOS时出错: {str(e)}")
-        return None
+        print(f"[ERROR] 检查图片是否已上传失败: {str(e)}")
+        raise HTTPException(status_code=502, detail="图片上传失败")
+    urls = {key: storage.url(key) for key, exists in zip(keys, existing) if exists}
+    new_items = [(key, contents[key]) for key in keys if key not in urls]
+    
+    print(f"[INFO] 开始批量上传 {len(new_items)} 张图片，已存在 {len(urls)} 张")
+    with stage_timer(PIPELINE_NAME, 'upload'):
+        upload_results = await storage.put_many(new_items)
+    failed = [result for result in upload_results if not result['success']]
+    if failed:
+        for result in failed:
+            print(f"[ERROR] 图片上传失败: {result['object_key']}, {result['error']}")
+        await delete_request_images([result['object_key'] for result in upload_results if result['success']])
+        raise HTTPException(status_code=502, detail="图片上传失败")
+    urls.update((result['object_key'], result['object_url']) for result in upload_results)
+    
+    for request_dict, (fields, items) in zip(request_dicts, decoded):
+        for field, (object_key, _) in zip(fields, items):
+            request_dict[field] = urls[object_key]
+    return [key for key, _ in new_items]
+
+async def delete_request_images(object_keys: List[str]) -> None:
+    """
+    删除upload_request_images新上传的图片，用于积分扣除或生图记录创建失败后清理
 
-async def generate_model_image_task(
+    删除失败只记录日志，不影响接口返回的错误。
+
+    Args:
+        object_keys: upload_request_images返回的对象键
+    """
+    if not object_keys:
+        return
+    storage = get_generation_storage()
+    if not storage:
+        return
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(None, storage.delete, key) for key in object_keys), return_exceptions=True
+    )
+    for key, result in zip(object_keys, results):
+        if isinstance(result, Exception):
+            print(f"[WARNING] 清理已上传图片失败: {key}, {str(result)}")
+    print(f"[INFO] 已清理上传图片 {len(object_keys)} 张")
+
+async def resolve_image_keys_batch(requests: List[ModelImageGenerationRequest], user_id: int) -> List[ModelImageGenerationRequest]:
+    """
+    校验多个请求中浏览器直传的对象键，并把对应图片字段替换为图片URL
+
+    每个对象键通过head_object确认存在、属于当前用户且类型和大小符合要求，图片内容不经过API服务器。
+    所有请求的校验在同一个asyncio.gather中并发执行，同时提交到TOS线程池的请求数
+    不超过TOS_BATCH_UPLOAD_MAX_WORKERS，不会因批量请求占满TOS线程池的排队。
+
+    Args:
+        requests: 生图请求参数列表
+        user_id: 当前用户ID
+
+    Returns:
+        List[ModelImageGenerationRequest]: 图片字段已替换为URL的请求参数
+
+    Raises:
+        HTTPException: 字段名或对象键无效（400）、存储服务不可用（503/502）
+    """
+    checks = [
+        (request, field, object_key)
+        for request in requests if request.image_keys
+        for field, object_key in request.image_keys.items()
+    ]
+    if not checks:
+        return requests
+    
+    unknown = sorted({field for _, field, _ in checks if field not in IMAGE_FIELDS})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的图片字段: {', '.join(unknown)}")
+    
+    tos_uploader = get_tos_uploader()
+    if not tos_uploader:
+        raise HTTPException(status_code=503, detail="图片存储服务不可用")
+    
+    semaphore = asyncio.Semaphore(tos_config.BATCH_UPLOAD_MAX_WORKERS)
+    
+    async def verify(object_key: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await verify_uploaded_object(
+                tos_uploader.aio, object_key, tos_config.DIRECT_UPLOAD_PREFIX, user_id, tos_config.MAX_FILE_SIZE
+            )
+    
+    with stage_timer(PIPELINE_NAME, 'verify_upload'):
+        results = await asyncio.gather(*(verify(object_key) for _, _, object_key in checks), return_exceptions=True)
+    
+    for (request, field, _), result in zip(checks, results):
+        if isinstance(result, ImageValidationError):
+            print(f"[ERROR] {field} 直传图片校验失败: {str(result)}")
+            raise HTTPException(status_code=400, detail=str(result))
+        if isinstance(result, BaseException):
+            print(f"[ERROR] {field} 直传图片校验出错: {str(result)}")
+            raise HTTPException(status_code=502, detail=f"图片校验失败: {field}")
+        setattr(request, field, result['object_url'])
+        record_stage_bytes(PIPELINE_NAME, 'direct_upload', 'in', result['size'])
+        print(f"[INFO] {field} 使用直传图片: {result['object_url']}")
+    for request in requests:
+        request.image_keys = None
+    return requests
+
+async def resolve_image_keys(request: ModelImageGenerationRequest, user_id: int) -> ModelImageGenerationRequest:
+    """
+    校验单个请求中浏览器直传的对象键，参见resolve_image_keys_batch
+
+    Args:
+        request: 生图请求参数
+        user_id: 当前用户ID
+
+    Returns:
+        ModelImageGenerationRequest: 图片字段已替换为URL的请求参数
+    """
+    return (await resolve_image_keys_batch([request], user_id))[0]
+
+def model_image_job_id(record_id: int) -> str:
+    """
+    生成模特图生成任务的任务ID，同一条生图记录只会有一个执行中的任务
+
+    Args:
+        record_id: 生图记录ID
+
+    Returns:
+        str: 任务ID
+    """
+    return f"model-image-{record_id}"
+
+async def generate_model_image(
     db: Session,
     record_id: int,
     request_data: Dict[str, Any]
-):
+) -> List[Dict[str, Any]]:
     """
-    后台异步任务：生成模特图
-    
+    生成模特图：生成图片、更新生图记录并发送完成消息
+
     Args:
         db: 数据库会话
         record_id: 生图记录ID
         request_data: 请求参数
+
+    Returns:
+        List[Dict[str, Any]]: 生成的图片列表
+
+    Raises:
+        ValueError: 任务参数中有base64图片（图片应在提交任务前上传）
+        Exception: 生成失败时抛出，由任务队列决定是否重试
     """
-    try:
-        print(f"[INFO] 开始生成模特图 - 记录ID: {record_id}")
-        
-        tos_uploader = get_tos_uploader()
-        
-        image_fields = [
-            'uploaded_image',
-            'single_outfit_image',
-            'single_outfit_back_image',
-            'top_outfit_image',
-            'top_outfit_back_image',
-            'bottom_outfit_image',
-            'bottom_outfit_back_image'
-        ]
-        
-        for field in image_fields:
-            image_data = request_data.get(field)
-            if image_data:
-                print(f"[INFO] 开始上传 {field} 到TOS")
-                image_url = await upload_base64_image_to_tos(image_data, tos_uploader)
-                if image_url:
-                    request_data[field] = image_url
-                    print(f"[INFO] {field} 上传成功: {image_url}")
-                else:
-                    print(f"[WARNING] {field} 上传失败，保留原数据")
-        
-        print(f"[INFO] 所有图片上传完成，更新数据库记录的 params 字段")
-        update_data = OriginalImageRecordUpdate(params=request_data)
-        updated_record = OriginalImageRecordService.update_record(db, record_id, update_data)
-        if updated_record:
-            print(f"[INFO] 数据库记录 params 字段已更新 - 记录ID: {record_id}")
-        else:
-            print(f"[WARNING] 更新数据库记录 params 字段失败 - 记录ID: {record_id}")
-        
+    print(f"[INFO] 开始生成模特图 - 记录ID: {record_id}")
+    
+    # 图片在提交任务前已上传，任务参数中只有图片URL
+    inline_fields = [field for field in IMAGE_FIELDS if is_data_url(request_data.get(field))]
+    if inline_fields:
+        raise ValueError(f"任务参数中不能包含base64图片: {', '.join(inline_fields)}")
+    
+    with stage_timer(PIPELINE_NAME, 'generate'):
         await asyncio.sleep(3)
+    
+    generated_images = [
+        {"url": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "thumbnail": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "index": 1},
+        {"url": "/api/v1/yilaitumodel/files/d3b38db51f43418c956ae6fc7a7ca0e2.jpeg", "thumbnail": "/api/v1/yilaitumodel/files/d3b38db51f43418c956ae6fc7a7ca0e2.jpeg", "index": 2},
+        {"url": "/api/v1/yilaitumodel/files/3046a8d5a2a049708083bea9e68afcf5.png", "thumbnail": "/api/v1/yilaitumodel/files/3046a8d5a2a049708083bea9e68afcf5.png", "index": 3},
+        {"url": "/api/v1/yilaitumodel/files/5ccaea08b8d94b29abb4af6547555514.jpeg", "thumbnail": "/api/v1/yilaitumodel/files/5ccaea08b8d94b29abb4af6547555514.jpeg", "index": 4},
+        {"url": "/api/v1/yilaitumodel/files/fc11f6b7b462464a956374cd2a1fe7cf.png", "thumbnail": "/api/v1/yilaitumodel/files/fc11f6b7b462464a956374cd2a1fe7cf.png", "index": 5},
+        {"url": "/api/v1/yilaitumodel/files/bebf432ea1244554a712751e6f946da4.png", "thumbnail": "/api/v1/yilaitumodel/files/bebf432ea1244554a712751e6f946da4.png", "index": 6}
+    ]
+    
+    print(f"[INFO] 模特图生成完成 - 记录ID: {record_id}, 生成图片数: {len(generated_images)}")
+    
+    # 历史记录和消息中心使用缩略图，生图记录中保存各尺寸URL
+    with stage_timer(PIPELINE_NAME, 'derive'):
+        loop = asyncio.get_running_loop()
+        generated_images = list(await asyncio.gather(
+            *(loop.run_in_executor(None, add_image_derivatives, image) for image in generated_images)
+        ))
+    
+    update_data = OriginalImageRecordUpdate(
+        status="completed",
+        images=generated_images
+    )
+    
+    updated_record = OriginalImageRecordService.update_record(db, record_id, update_data)
+    
+    if updated_record:
+        print(f"[INFO] 生图记录状态已更新为完成 - 记录ID: {record_id}")
         
-        generated_images = [
-            {"url": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "thumbnail": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "index": 1},
-            {"url": "/api/v1/yilaitumodel/files/d3b38db51f43418c956ae6fc7a7ca0e2.jpeg", "thumbnail": "/api/v1/yilaitumodel/files/d3b38db51f43418c956ae6fc7a7ca0e2.jpeg", "index": 2},
-            {"url": "/api/v1/yilaitumodel/files/3046a8d5a2a049708083bea9e68afcf5.png", "thumbnail": "/api/v1/yilaitumodel/files/3046a8d5a2a049708083bea9e68afcf5.png", "index": 3},
-            {"url": "/api/v1/yilaitumodel/files/5ccaea08b8d94b29abb4af6547555514.jpeg", "thumbnail": "/api/v1/yilaitumodel/files/5ccaea08b8d94b29abb4af6547555514.jpeg", "index": 4},
-            {"url": "/api/v1/yilaitumodel/files/fc11f6b7b462464a956374cd2a1fe7cf.png", "thumbnail": "/api/v1/yilaitumodel/files/fc11f6b7b462464a956374cd2a1fe7cf.png", "index": 5},
-            {"url": "/api/v1/yilaitumodel/files/bebf432ea1244554a712751e6f946da4.png", "thumbnail": "/api/v1/yilaitumodel/files/bebf432ea1244554a712751e6f946da4.png", "index": 6}
-        ]
-        
-        print(f"[INFO] 模特图生成完成 - 记录ID: {record_id}, 生成图片数: {len(generated_images)}")
-        
-        update_data = OriginalImageRecordUpdate(
-            status="completed",
-            images=generated_images
-        )
-        
-        updated_record = OriginalImageRecordService.update_record(db, record_id, update_data)
+        try:
+            message_data = MessageCreate(
+                title=f"生图任务完成：模特图生成任务 #{record_id}",
+                content=f"您的模特图生成任务已完成，共生成 {len(generated_images)} 张图片",
+                type="task",
+                receiver_id=updated_record.user_id,
+                extra_data=json.dumps({
+                    "task_id": record_id,
+                    "model_id": updated_record.model_id
+                })
+            )
+            
+            await NotificationService.send_message(db, message_data)
+            print(f"[INFO] 消息发送成功 - 用户ID: {updated_record.user_id}, 任务ID: {record_id}")
+        except Exception as msg_error:
+            print(f"[WARNING] 发送消息失败: {str(msg_error)}")
+    else:
+        print(f"[ERROR] 更新生图记录失败 - 记录ID: {record_id}")
+    
+    return generated_images
+
+def add_image_derivatives(image: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    为生成的图片生成缩略图和预览图并写入原图所在的存储
+
+    派生图对象键由原图对象键决定，已经存在时不重复生成（如相同的原图被多条记录使用）。
+
+    Args:
+        image: 图片记录项，包含url和index
+
+    Returns:
+        Dict[str, Any]: 包含url、index和各尺寸URL的图片记录项；原图不在存储中或生成失败时原样返回
+    """
+    located = storage_for_url(image.get("url"))
+    if not located:
+        return image
+    storage, object_key = located
+    variant_keys = {name: derivative_key(object_key, name) for name, _ in DERIVATIVE_SIZES}
+    try:
+        if not all(storage.exists(key) for key in variant_keys.values()):
+            derivatives = make_derivatives(storage.get(object_key))
+            for name, content in derivatives.items():
+                storage.put(variant_keys[name], content, content_type='image/webp')
+    except Exception as e:
+        print(f"[WARNING] 生成缩略图失败: {image.get('url')}, {str(e)}")
+        return image
+    return build_image_entry(
+        image.get("index"), image["url"], {name: storage.url(key) for name, key in variant_keys.items()}
+    )
+
+async def model_image_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    任务队列处理函数：生成模特图
+
+    每个任务使用独立的数据库会话，不复用请求的会话（请求结束时会话已关闭）。
+
+    Args:
+        payload: 任务参数，包含record_id和request_data
+
+    Returns:
+        Dict[str, Any]: 任务结果
+    """
+    record_id = payload["record_id"]
+    db = SessionLocal()
+    try:
+        generated_images = await generate_model_image(db, record_id, dict(payload["request_data"]))
+        return {"record_id": record_id, "images": [img["url"] for img in generated_images]}
+    finally:
+        db.close()
+
+async def model_image_job_failed(payload: Dict[str, Any], error: str):
+    """
+    任务队列失败回调：重试次数用尽后把生图记录标记为失败
+
+    Args:
+        payload: 任务参数
+        error: 错误信息
+    """
+    record_id = payload["record_id"]
+    print(f"[ERROR] 模特图生成任务失败 - 记录ID: {record_id}, 错误: {error}")
+    db = SessionLocal()
+    try:
+        update_data = OriginalImageRecordUpdate(status="failed")
+        OriginalImageRecordService.update_record(db, record_id, update_data)
+        print(f"[INFO] 生图记录状态已更新为失败 - 记录ID: {record_id}")
+    except Exception as update_error:
+        print(f"[ERROR] 更新失败状态时出错: {str(update_error)}")
+    finally:
+        db.close()
+
+async def run_model_image_job_inline(payload: Dict[str, Any]):
+    """
+    在当前进程内执行模特图生成任务（任务队列不可用时使用，不重试）
+
+    Args:
+        payload: 任务参数
+    """
+    try:
+        await model_image_job(payload)
+    except Exception as e:
+        await model_image_job_failed(payload, str(e))
+
+async def recover_pending_records(queue: JobQueue):
+    """
+    worker启动时恢复卡在pending状态的模特图生成记录
+
+    只处理创建时间超过RECOVERY_GRACE且队列中没有对应任务的记录：
+    服饰图片已上传（params中是URL）的记录重新提交任务；
+    params中是占位符的记录（图片未能上传）原始图片已丢失，直接标记为失败。
+
+    Args:
+        queue: 任务队列
+    """
+    deadline = datetime.now() - timedelta(seconds=worker_config.RECOVERY_GRACE)
+    db = SessionLocal()
+    try:
+        records = db.query(OriginalImageRecord).filter(
+            OriginalImageRecord.status == "pending",
+            OriginalImageRecord.model_id == MODEL_IMAGE_MODEL_ID,
+            OriginalImageRecord.create_time < deadline
+        ).order_by(OriginalImageRecord.id).all()
         
-        if updated_record:
-            print(f"[INFO] 生图记录状态已更新为完成 - 记录ID: {record_id}")
+        recovered = 0
+        failed = 0
+        for record in records:
+            job_id = model_image_job_id(record.id)
+            job = await queue.get(job_id)
+            if job and job["status"] in ACTIVE_STATUSES:
+                continue
             
-            try:
-                message_data = MessageCreate(
-                    title=f"生图任务完成：模特图生成任务 #{record_id}",
-                    content=f"您的模特图生成任务已完成，共生成 {len(generated_images)} 张图片",
-                    type="task",
-                    receiver_id=updated_record.user_id,
-                    extra_data=json.dumps({
-                        "task_id": record_id,
-                        "model_id": updated_record.model_id
-                    })
-                )
-                
-                await NotificationService.send_message(db, message_data)
-                print(f"[INFO] 消息发送成功 - 用户ID: {updated_record.user_id}, 任务ID: {record_id}")
-            except Exception as msg_error:
-                print(f"[WARNING] 发送消息失败: {str(msg_error)}")
-        else:
-            print(f"[ERROR] 更新生图记录失败 - 记录ID: {record_id}")
+            params = record.params or {}
+            if any(params.get(field) == PLACEHOLDER_PENDING for field in IMAGE_FIELDS):
+                record.status = "failed"
+                db.commit()
+                failed += 1
+                continue
             
-    except Exception as e:
-        print(f"[ERROR] 模特图生成任务失败 - 记录ID: {record_id}, 错误: {str(e)}")
+            await queue.enqueue(
+                JOB_MODEL_IMAGE,
+                {"record_id": record.id, "request_data": params},
+                job_id=job_id,
+                lane=user_lane(record.user_id, batch=record.batch_id is not None)
+            )
+            recovered += 1
         
-        try:
-            update_data = OriginalImageRecordUpdate(status="failed")
-            OriginalImageRecordService.update_record(db, record_id, update_data)
-            print(f"[INFO] 生图记录状态已更新为失败 - 记录ID: {record_id}")
-        except Exception as update_error:
-            print(f"[ERROR] 更新失败状态时出错: {str(update_error)}")
+        print(f"[INFO] pending生图记录恢复完成 - 重新提交: {recovered}, 标记失败: {failed}")
+    finally:
+        db.close()
 
-@router.post("/model-image-generation")
-async def model_image_generation(
+async def submit_model_image_generation(
     background_tasks: BackgroundTasks,
     request: ModelImageGenerationRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session,
+    current_user: User
 ):
     """
-    模特图生成接口
-    
-    功能：
-    1. 创建生图记录，初始状态为 pending
-    2. 扣除用户积分（图片数量 × 基础积分）
-    3. 启动后台异步任务生成模特图
-    4. 任务完成后更新记录状态为 completed
+    创建生图记录、扣除积分并提交生成任务
+
+    Args:
+        background_tasks: 后台任务（任务队列不可用时使用）
+        request: 生图请求参数，图片字段为base64 data URL或已上传的图片URL，
+            直传图片通过image_keys传对象键
+        db: 数据库会话
+        current_user: 当前用户
+
+    Returns:
+        dict: 接口响应
     """
     try:
+        request = await resolve_image_keys(request, current_user.id)
         print(f"[INFO] 模特图生成请求 - 用户ID: {current_user.id}")
         print(f"  版本: {request.version}")
         print(f"  服饰类型: {request.outfit_type}")
@@ -259,37 +550,51 @@ async def model_image_generation(
         cost_integral = Decimal(str(request.quantity * BASE_POINTS))
         print(f"[INFO] 需要扣除积分: {cost_integral} (图片数量: {request.quantity}, 基础积分: {BASE_POINTS})")
         
-        request_dict = request.dict()
+        # 积分不足时在上传图片前拒绝请求
+        try:
+            PointsService.check_balance(db, current_user.id, cost_integral)
+        except ValueError as e:
+            print(f"[ERROR] 积分检查失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # 先上传base64图片，生图记录和任务参数中只保存图片URL
+        request_dict = request.dict(exclude={"image_keys"})
+        uploaded_keys = await upload_request_images([request_dict])
         
         try:
             record = OriginalImageRecordService.create_record(
                 db=db,
                 user_id=current_user.id,
-                model_id=1,#1、表示模特图生成模型
+                model_id=MODEL_IMAGE_MODEL_ID,#1、表示模特图生成模型
                 model_name=f"模特图生成",
                 params=request_dict,
                 cost_integral=cost_integral
             )
-            print(f"[INFO] 生图记录创建成功 - 记录ID: {record.id}")
-            
-            # 发送积分更新通知到前端（通过 Redis Pub/Sub）
-            if cost_integral > 0:
-                account = PointsService.get_user_points(db, current_user.id)
-                if account:
-                    total_points = float(account.balance_permanent) + float(account.balance_limited)
-                    background_tasks.add_task(send_points_update_via_redis, current_user.id, total_points)
-                    print(f"[INFO] 积分更新通知已发送 - 用户ID: {current_user.id}, 积分: {total_points}")
-        except ValueError as e:
+        except Exception as e:
             print(f"[ERROR] 创建生图记录失败: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
+            await delete_request_images(uploaded_keys)
+            if isinstance(e, ValueError):
+                raise HTTPException(status_code=400, detail=str(e))
+            raise
+        print(f"[INFO] 生图记录创建成功 - 记录ID: {record.id}")
         
-        background_tasks.add_task(
-            generate_model_image_task,
-            db=db,
-            record_id=record.id,
-            request_data=request_dict
-        )
-        print(f"[INFO] 后台生成任务已启动 - 记录ID: {record.id}")
+        # 发送积分更新通知到前端（通过 Redis Pub/Sub）
+        if cost_integral > 0:
+            account = PointsService.get_user_points(db, current_user.id)
+            if account:
+                total_points = float(account.balance_permanent) + float(account.balance_limited)
+                background_tasks.add_task(send_points_update_via_redis, current_user.id, total_points)
+                print(f"[INFO] 积分更新通知已发送 - 用户ID: {current_user.id}, 积分: {total_points}")
+        
+        job_payload = {"record_id": record.id, "request_data": request_dict}
+        job_id = model_image_job_id(record.id)
+        try:
+            await get_job_queue().enqueue(JOB_MODEL_IMAGE, job_payload, job_id=job_id, lane=user_lane(current_user.id))
+            print(f"[INFO] 生成任务已提交到任务队列 - 记录ID: {record.id}, 任务ID: {job_id}")
+        except Exception as e:
+            # 任务队列不可用时退回到当前进程内执行
+            print(f"[WARNING] 提交任务队列失败，改为进程内执行: {str(e)}")
+            background_tasks.add_task(run_model_image_job_inline, job_payload)
         
         generated_images = [
             {"url": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "thumbnail": "/api/v1/yilaitumodel/files/9cba4b0e381e4e0abee1174bf7ee7d22.png", "index": 1},
@@ -306,6 +611,7 @@ async def model_image_generation(
             "data": {
                 "record_id": record.id,
                 "task_id": str(record.id),
+                "job_id": job_id,
                 "status": "completed",
                 "images": [img["url"] for img in generated_images],
                 "version": request.version,
@@ -325,3 +631,272 @@ async def model_image_generation(
     except Exception as e:
         print(f"[ERROR] 模特图生成失败: {str(e)}")
         raise HTTPException(status_code=500, detail=f"模特图生成失败: {str(e)}")
+
+@router.post("/model-image-generation")
+async def model_image_generation(
+    background_tasks: BackgroundTasks,
+    request: ModelImageGenerationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    模特图生成接口
+    
+    功能：
+    1. 创建生图记录，初始状态为 pending
+    2. 扣除用户积分（图片数量 × 基础积分）
+    3. 提交生成任务到任务队列，由worker进程生成模特图
+    4. 任务完成后更新记录状态为 completed
+    """
+    return await submit_model_image_generation(background_tasks, request, db, current_user)
+
+class ModelImageBatchRequest(BaseModel):
+    """批量模特图生成请求"""
+    items: List[ModelImageGenerationRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="每个SKU的生图参数")
+
+@router.post("/model-image-generation/batch")
+async def model_image_generation_batch(
+    background_tasks: BackgroundTasks,
+    request: ModelImageBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量模特图生成接口
+    
+    功能：
+    1. 检查整批积分是否足够，积分不足时直接返回，不上传图片
+    2. 上传所有请求中的base64图片（相同图片只上传一次），任务参数中只保存图片URL
+    3. 在同一事务中扣除整批积分、创建批量任务，生图记录批量插入，失败时删除本次上传的图片
+    4. 每条记录提交一个生成任务，使用该用户的批量队列通道，
+       worker在各用户通道间轮转取任务，大批量任务不会阻塞其他用户和单条请求
+    5. 通过 GET /model-image-generation/batch/{batch_id} 查询整批进度
+    """
+    items = await resolve_image_keys_batch(request.items, current_user.id)
+    request_dicts = [item.dict(exclude={"image_keys"}) for item in items]
+    # 每条记录与单条接口一样按图片数量计费
+    costs = [Decimal(str(item.quantity * BASE_POINTS)) for item in items]
+    print(f"[INFO] 批量模特图生成请求 - 用户ID: {current_user.id}, 条数: {len(request_dicts)}")
+    
+    try:
+        PointsService.check_balance(db, current_user.id, sum(costs))
+    except ValueError as e:
+        print(f"[ERROR] 积分检查失败: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    uploaded_keys = await upload_request_images(request_dicts)
+    
+    try:
+        batch, record_ids = OriginalImageRecordService.create_batch(
+            db=db,
+            user_id=current_user.id,
+            params_list=request_dicts,
+            model_id=MODEL_IMAGE_MODEL_ID,
+            model_name=f"模特图生成",
+            costs=costs
+        )
+    except Exception as e:
+        print(f"[ERROR] 创建批量生图任务失败: {str(e)}")
+        await delete_request_images(uploaded_keys)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"批量模特图生成失败: {str(e)}")
+    print(f"[INFO] 批量生图任务创建成功 - 批量ID: {batch.id}, 记录数: {len(record_ids)}, 积分: {batch.cost_integral}")
+    
+    if batch.cost_integral > 0:
+        account = PointsService.get_user_points(db, current_user.id)
+        if account:
+            total_points = float(account.balance_permanent) + float(account.balance_limited)
+            background_tasks.add_task(send_points_update_via_redis, current_user.id, total_points)
+    
+    lane = user_lane(current_user.id, batch=True)
+    queue = get_job_queue()
+    for record_id, request_dict in zip(record_ids, request_dicts):
+        job_payload = {"record_id": record_id, "request_data": request_dict}
+        try:
+            await queue.enqueue(JOB_MODEL_IMAGE, job_payload, job_id=model_image_job_id(record_id), lane=lane)
+        except Exception as e:
+            print(f"[WARNING] 提交任务队列失败，改为进程内执行 - 记录ID: {record_id}, 错误: {str(e)}")
+            background_tasks.add_task(run_model_image_job_inline, job_payload)
+    
+    return {
+        "success": True,
+        "message": "批量模特图生成任务已启动，请稍后查看结果",
+        "data": {
+            "batch_id": batch.id,
+            "record_ids": record_ids,
+            "total": batch.total,
+            "cost_integral": float(batch.cost_integral)
+        }
+    }
+
+@router.post("/model-image-generation/uploads")
+async def create_direct_upload(
+    request: DirectUploadRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    申请浏览器直传TOS的上传凭证
+    
+    对象键由服务端生成，签名中限制Content-Type和大小：
+    - method=put：返回预签名PUT URL，上传时必须携带返回的headers（Content-Type和Content-Length）
+    - method=post：返回表单上传策略，fields放在文件字段之前，大小不超过MAX_FILE_SIZE
+    上传完成后调用 /model-image-generation/uploads/complete 确认，或直接把object_key
+    放入生图请求的image_keys。
+    """
+    tos_uploader = get_tos_uploader()
+    if not tos_uploader:
+        raise HTTPException(status_code=503, detail="图片存储服务不可用")
+    if request.method not in UPLOAD_METHODS:
+        raise HTTPException(status_code=400, detail=f"不支持的上传方式: {request.method}")
+    
+    try:
+        object_key = build_upload_key(tos_config.DIRECT_UPLOAD_PREFIX, current_user.id, request.content_type)
+        ticket = create_upload_ticket(
+            tos_uploader, object_key, request.content_type, request.size,
+            max_size=tos_config.MAX_FILE_SIZE, method=request.method, expires=tos_config.DIRECT_UPLOAD_EXPIRES
+        )
+    except ImageValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"[ERROR] 生成直传凭证失败: {str(e)}")
+        raise HTTPException(status_code=500, detail="生成上传凭证失败")
+    
+    print(f"[INFO] 直传凭证已生成 - 用户ID: {current_user.id}, 对象键: {object_key}, 方式: {request.method}")
+    return {"success": True, "data": ticket}
+
+@router.post("/model-image-generation/uploads/complete")
+async def complete_direct_upload(
+    request: DirectUploadCompleteRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    确认浏览器直传完成
+    
+    通过head_object确认对象存在、属于当前用户且类型和大小符合要求，返回图片URL
+    """
+    tos_uploader = get_tos_uploader()
+    if not tos_uploader:
+        raise HTTPException(status_code=503, detail="图片存储服务不可用")
+    
+    try:
+        info = await verify_uploaded_object(
+            tos_uploader.aio, request.object_key, tos_config.DIRECT_UPLOAD_PREFIX,
+            current_user.id, tos_config.MAX_FILE_SIZE
+        )
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ImageValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"[ERROR] 确认直传对象失败: {str(e)}")
+        raise HTTPException(status_code=502, detail="图片校验失败")
+    
+    print(f"[INFO] 直传完成 - 用户ID: {current_user.id}, 对象键: {info['object_key']}, 大小: {info['size']}")
+    return {"success": True, "data": info}
+
+@router.get("/model-image-generation/batch/{batch_id}")
+async def get_model_image_batch(
+    batch_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    查询批量模特图生成进度
+    
+    返回整批的汇总进度（总数、已完成、失败、处理中）和每条记录的状态及缩略图
+    """
+    batch = OriginalImageRecordService.get_batch(db, batch_id)
+    if not batch or batch.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="批量任务不存在")
+    
+    progress = OriginalImageRecordService.get_batch_progress(db, batch)
+    for item in progress["items"]:
+        item["images"] = to_thumbnail_images(item["images"])
+    return {"success": True, "data": progress}
+
+@router.post("/model-image-generation/multipart")
+async def model_image_generation_multipart(
+    background_tasks: BackgroundTasks,
+    version: str = Form(...),
+    outfit_type: str = Form(...),
+    model_type: str = Form(...),
+    selected_model: int = Form(...),
+    selected_model_url: Optional[str] = Form(None),
+    style_category: str = Form(...),
+    selected_style: int = Form(...),
+    select_style_url: Optional[str] = Form(None),
+    custom_scene_text: Optional[str] = Form(""),
+    ratio: str = Form(...),
+    quantity: int = Form(...),
+    uploaded_image: Optional[UploadFile] = File(None),
+    single_outfit_image: Optional[UploadFile] = File(None),
+    single_outfit_back_image: Optional[UploadFile] = File(None),
+    top_outfit_image: Optional[UploadFile] = File(None),
+    top_outfit_back_image: Optional[UploadFile] = File(None),
+    bottom_outfit_image: Optional[UploadFile] = File(None),
+    bottom_outfit_back_image: Optional[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    模特图生成接口（multipart版本）
+    
+    服饰图片以文件part上传，不再编码为base64：先校验表单参数，再对每个文件分块计算sha256并校验大小，
+    预检图片头后直接从临时文件流式上传到TOS，参数中只保存图片URL。
+    图片全部上传成功后才创建生图记录和扣除积分，其余流程与JSON版本相同。
+    """
+    # 先校验表单参数，参数无效时不上传图片，避免在TOS中留下无人引用的对象
+    try:
+        request = ModelImageGenerationRequest(
+            version=version,
+            outfit_type=outfit_type,
+            model_type=model_type,
+            selected_model=selected_model,
+            selected_model_url=selected_model_url,
+            style_category=style_category,
+            selected_style=selected_style,
+            select_style_url=select_style_url,
+            custom_scene_text=custom_scene_text,
+            ratio=ratio,
+            quantity=quantity
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    files = {
+        'uploaded_image': uploaded_image,
+        'single_outfit_image': single_outfit_image,
+        'single_outfit_back_image': single_outfit_back_image,
+        'top_outfit_image': top_outfit_image,
+        'top_outfit_back_image': top_outfit_back_image,
+        'bottom_outfit_image': bottom_outfit_image,
+        'bottom_outfit_back_image': bottom_outfit_back_image
+    }
+    
+    try:
+        uploads = await prepare_image_uploads(files, image_compressor, tos_config.MAX_FILE_SIZE)
+    except ImageValidationError as e:
+        print(f"[ERROR] 服饰图片校验失败: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    image_urls = {}
+    if uploads:
+        storage = get_generation_storage()
+        if not storage:
+            raise HTTPException(status_code=503, detail="图片存储服务不可用")
+        
+        print(f"[INFO] 开始流式上传 {len(uploads)} 张图片: {[(u.field, u.size) for u in uploads]}")
+        record_stage_bytes(PIPELINE_NAME, 'upload', 'in', sum(u.size for u in uploads))
+        with stage_timer(PIPELINE_NAME, 'upload'):
+            upload_results = await storage.put_many([(u.object_key, u.fileobj) for u in uploads])
+        for upload, result in zip(uploads, upload_results):
+            if not result['success']:
+                print(f"[ERROR] {upload.field} 上传失败: {result['error']}")
+                raise HTTPException(status_code=502, detail=f"图片上传失败: {upload.field}")
+            image_urls[upload.field] = result['object_url']
+            print(f"[INFO] {upload.field} 上传成功: {result['object_url']}")
+    
+    for field, url in image_urls.items():
+        setattr(request, field, url)
+    
+    return await submit_model_image_generation(background_tasks, request, db, current_user)
@@ -4,21 +4,24 @@ import io
 import os
 import uuid
 import base64
-import requests
-from app.utils.aliyun_goods_classifier import AliyunGoodsClassifier
-from app.utils.aliyun_image_segmenter import AliyunImageSegmenter
-from app.utils.excel_utils import ExcelUtils
-from app.utils.image_splitter import ImageSplitter
-from app.utils.image_compressor import ImageCompressor
-
-# 尝试导入TOSClient和ArkImageGenerator
-try:
-    from app.utils.tos_utils import TOSClient
-except ImportError:
-    TOSClient = None
+import hashlib
+from backend.app.utils.aliyun_goods_classifier import AliyunGoodsClassifier
+from backend.app.utils.aliyun_image_segmenter import AliyunImageSegmenter
+from backend.app.utils.excel_utils import ExcelUtils
+from backend.app.utils.image_splitter import ImageSplitter
+from backend.app.utils.image_compressor import ImageCompressor, ImageTooLargeError, ImageValidationError
+from backend.app.utils.image_derivatives import make_derivatives, build_upload_items, build_image_entry
+from backend.app.utils.pipeline import Pipeline
+from backend.app.utils.http_fetcher import get_http_fetcher
+from backend.app.utils.metrics import stage_timer, record_stage_bytes
+from backend.app.utils.image_analysis_cache import ImageAnalysisCache, get_image_analysis_cache
+from backend.app.utils.storage import get_generation_storage
+from backend.common.singleflight import make_singleflight_key
+from backend.worker import get_job_queue, public_job_view, JOB_PROCESS_IMAGE
 
+# 尝试导入ArkImageGenerator
 try:
-    from app.utils.ark_image_generator import ArkImageGenerator
+    from backend.app.utils.ark_image_generator import ArkImageGenerator
 except ImportError:
     ArkImageGenerator = None
 
@@ -27,6 +30,13 @@ router = APIRouter()
 # 初始化工具类实例
 excel_utils = ExcelUtils()
 image_splitter = ImageSplitter()
+image_compressor = ImageCompressor()
+
+# 读取上传文件的分块大小
+UPLOAD_READ_CHUNK_SIZE = 1024 * 1024
+
+# 异步模式下待处理图片在生图存储中的对象键前缀
+PROCESS_IMAGE_PREFIX = 'process_images'
 
 # 初始化阿里云服务
 aliyun_access_key_id = os.environ.get("ALIBABA_CLOUD_ACCESS_KEY_ID", "")
@@ -54,16 +64,315 @@ try:
 except Exception:
     ark_image_generator = None
 
-# 初始化TOS
-tos_uploader = None
-try:
-    if TOSClient:
-        # 尝试查找CSV配置
-        # 注意：这里的路径可能需要调整，假设相对于当前文件或项目根目录
-        # 这里暂时使用环境变量或默认初始化
-        tos_uploader = TOSClient() 
-except Exception:
-    tos_uploader = None
+def compress_stage(image_data, file_ext):
+    """压缩上传的图片，失败时使用原始图片继续处理"""
+    try:
+        original_size = len(image_data)
+        compressed_data, compressed_size = image_compressor.compress_from_bytes(image_data, file_ext)
+
+        if hasattr(compressed_data, 'read'):
+            compressed_data.seek(0)
+            compressed_bytes = compressed_data.read()
+        else:
+            compressed_bytes = compressed_data
+
+        print(f"✓ 图片压缩成功，原始大小: {original_size / 1024:.2f} KB，压缩后大小: {compressed_size / 1024:.2f} KB")
+        return compressed_bytes
+    except Exception as e:
+        print(f"[WARNING] 图片压缩失败: {type(e).__name__} - {e}，将使用原始图片继续处理")
+        return image_data
+
+
+def fingerprint_stage(image_data):
+    """计算压缩后图片内容的SHA-256摘要，作为分析结果缓存的键"""
+    return ImageAnalysisCache.content_key(image_data)
+
+
+async def cache_lookup_stage(digest):
+    """查询分析结果缓存，命中时分类和分割都不再调用阿里云"""
+    entry = await get_image_analysis_cache().get(digest)
+    if entry:
+        print(f"[INFO] 命中商品图分析缓存: {digest[:16]}")
+    return entry
+
+
+async def classify_stage(image_data, cached):
+    """获取图片所属类目，返回(类目ID, 类目名称)元组"""
+    if cached:
+        return cached.get('category_id'), cached.get('category_name')
+    if not classifier:
+        return None
+
+    result = await classifier.classify_commodity_from_bytes_async(image_data)
+    if 'data' in result and hasattr(result['data'], 'categories'):
+        categories = result['data'].categories
+        if categories:
+            first_category = categories[0]
+            return getattr(first_category, 'category_id', None), getattr(first_category, 'category_name', None)
+    return None, None
+
+
+def category_stage(classification):
+    """根据类目ID查询一级类目名称"""
+    category_id = classification[0] if classification else None
+    if not category_id:
+        return None
+    return excel_utils.getClothingCategory(category_id)
+
+
+async def segment_stage(image_data, cached):
+    """商品分割（抠图），返回分割后的图片URL"""
+    if cached:
+        return cached.get('segment_url')
+    if not image_segmenter:
+        return None
+
+    image_url = await image_segmenter.segment_commodity_from_bytes_async(image_data)
+    print(f"[INFO] 商品分割成功，返回图片URL: {image_url}")
+    return image_url
+
+
+async def cache_store_stage(digest, cached, classification, image_url):
+    """分类和分割都成功时写入分析结果缓存"""
+    if cached or classification is None or not isinstance(image_url, str) or not image_url:
+        return False
+    category_id, category_name = classification
+    await get_image_analysis_cache().set(digest, {
+        'segment_url': image_url,
+        'category_id': category_id,
+        'category_name': category_name
+    })
+    return True
+
+
+def prompt_stage(categoryName, num_int, selectedScene, ethnicity, gender, selectedStyle, towards, aspectRatio):
+    """生成提示词，失败时使用简单拼接的提示词"""
+    try:
+        return excel_utils.generateImagePrompt(num_int, selectedScene, ethnicity, gender, categoryName, selectedStyle, towards)
+    except Exception as e:
+        print(f"[ERROR] 生成提示词失败: {e}")
+        return f"{gender}，{ethnicity}，{selectedStyle}，{aspectRatio}，{num_int}"
+
+
+def image_size_stage(aspectRatio, num_int):
+    """计算生成图片分辨率"""
+    return excel_utils.getAspectRatioPixel(aspectRatio, num_int)
+
+
+def coalesce_key_stage(digest, num_int, selectedScene, ethnicity, gender, selectedStyle, towards, aspectRatio, request_id):
+    """
+    由生成提示词之前的输入计算Ark调用的请求合并键
+
+    分镜是随机抽样的，重复请求的提示词各不相同，因此按图片摘要和表单参数判断重复请求。
+    客户端传入request_id时一并参与：前端重试使用同一个request_id会被合并，
+    用户点击“再次生成”时使用新的request_id，得到新的抽样和新的生成结果。
+    """
+    return make_singleflight_key('process-image', digest, num_int, selectedScene, ethnicity, gender,
+                                 selectedStyle, towards, aspectRatio, request_id)
+
+
+async def generate_stage(prompt, image_url, imageSize, coalesce_key=None):
+    """调用Ark图片生成API"""
+    if not ark_image_generator or not image_url:
+        return None
+
+    return await ark_image_generator.generate_images_async(
+        coalesce_key=coalesce_key,
+        prompt=prompt,
+        images=[image_url],
+        size=imageSize,
+        response_format="url"
+    )
+
+
+async def download_stage(generated_images):
+    """下载Ark生成的宫格图"""
+    if not generated_images or 'data' not in generated_images or not generated_images['data']:
+        return None
+
+    first_image = generated_images['data'][0]
+    if first_image.get('url'):
+        return await get_http_fetcher().fetch(first_image['url'])
+    elif first_image.get('b64_json'):
+        return base64.b64decode(first_image['b64_json'])
+    return None
+
+
+def split_stage(image_bytes, num_int):
+    """将宫格图切分为单张图片"""
+    if not image_bytes:
+        return []
+    return image_splitter.split_image(image_bytes, num_int, return_bytes=True)
+
+
+def derive_stage(split_images):
+    """为每张切分结果生成缩略图和预览图"""
+    return [make_derivatives(img_bytes) for img_bytes in split_images]
+
+
+async def upload_stage(split_images, derivatives, filename):
+    """
+    原图和派生图在同一批次并发上传到生图存储（默认TOS，STORAGE_GENERATION_BACKEND=local时写入本地文件）
+
+    返回的图片记录项与切分顺序一致：{"url", "thumbnail", "preview", "index"}，
+    派生图上传失败时使用原图URL，原图上传失败的图片不返回。
+    """
+    if not split_images:
+        return []
+    storage = get_generation_storage()
+    if not storage:
+        return []
+
+    unique_id = str(uuid.uuid4())[:8]
+    file_extension = os.path.splitext(filename)[1] or '.png'
+    groups = []
+    for idx, img_bytes in enumerate(split_images):
+        object_key = f"{unique_id}_{idx}{file_extension}"
+        variants = derivatives[idx] if derivatives and idx < len(derivatives) else {}
+        groups.append((list(variants), build_upload_items(object_key, img_bytes, variants)))
+
+    upload_results = await storage.put_many([item for _, items in groups for item in items])
+
+    images = []
+    offset = 0
+    for names, items in groups:
+        original, *variant_results = upload_results[offset:offset + len(items)]
+        offset += len(items)
+        if not original['success']:
+            print(f"[ERROR] 上传失败: {original['object_key']}, {original['error']}")
+            continue
+        variant_urls = {}
+        for name, result in zip(names, variant_results):
+            if result['success']:
+                variant_urls[name] = result['object_url']
+            else:
+                print(f"[WARNING] 派生图上传失败: {result['object_key']}, {result['error']}")
+        images.append(build_image_entry(len(images) + 1, original['object_url'], variant_urls))
+    return images
+
+
+def build_process_pipeline():
+    """
+    构建图片处理流水线
+
+    依赖关系：
+        compress ── fingerprint ── cache_lookup ─┬─ classify ── category ── prompt ─┐
+                                                 └─ segment ────────────────────────┼─ generate ── download ── split ── derive ── upload
+                                                                         image_size ┘
+    分类和分割只依赖压缩后的图片，因此并发执行；提示词在类目确定后即可生成，与分割重叠。
+    分镜随机抽样，generate阶段的Ark调用按图片摘要、表单参数和request_id合并重复请求。
+    同一张图片再次上传时命中分析结果缓存，分类和分割直接使用缓存结果；cache_store在两者完成后回写缓存。
+    """
+    pipeline = Pipeline(name='process-image')
+    pipeline.add_stage('compress', compress_stage, inputs=['image_data', 'file_ext'])
+    pipeline.add_stage('fingerprint', fingerprint_stage, inputs=['compress'])
+    pipeline.add_stage('cache_lookup', cache_lookup_stage, inputs=['fingerprint'])
+    pipeline.add_stage('classify', classify_stage, inputs=['compress', 'cache_lookup'])
+    pipeline.add_stage('category', category_stage, inputs=['classify'])
+    pipeline.add_stage('segment', segment_stage, inputs=['compress', 'cache_lookup'])
+    pipeline.add_stage('cache_store', cache_store_stage, inputs=['fingerprint', 'cache_lookup', 'classify', 'segment'])
+    pipeline.add_stage('prompt', prompt_stage, inputs=['category', 'num_int', 'selectedScene', 'ethnicity',
+                                                      'gender', 'selectedStyle', 'towards', 'aspectRatio'])
+    pipeline.add_stage('coalesce_key', coalesce_key_stage, inputs=['fingerprint', 'num_int', 'selectedScene', 'ethnicity',
+                                                                  'gender', 'selectedStyle', 'towards', 'aspectRatio',
+                                                                  'request_id'])
+    pipeline.add_stage('image_size', image_size_stage, inputs=['aspectRatio', 'num_int'])
+    pipeline.add_stage('generate', generate_stage, inputs=['prompt', 'segment', 'image_size', 'coalesce_key'])
+    pipeline.add_stage('download', download_stage, inputs=['generate'])
+    pipeline.add_stage('split', split_stage, inputs=['download', 'num_int'], default=[])
+    pipeline.add_stage('derive', derive_stage, inputs=['split'], default=[])
+    pipeline.add_stage('upload', upload_stage, inputs=['split', 'derive', 'filename'], default=[])
+    return pipeline
+
+
+process_pipeline = build_process_pipeline()
+
+
+async def read_upload_limited(file: UploadFile, max_size: int) -> bytes:
+    """
+    分块读取上传文件，超过大小限制时立即停止读取
+
+    Args:
+        file: 上传的文件
+        max_size: 最大允许的字节数
+
+    Returns:
+        bytes: 文件内容
+
+    Raises:
+        ImageTooLargeError: 文件超过大小限制
+    """
+    declared_size = getattr(file, 'size', None)
+    if declared_size and declared_size > max_size:
+        raise ImageTooLargeError(f"图片大小 {declared_size / 1024 / 1024:.2f}MB 超过限制 {max_size / 1024 / 1024:.0f}MB")
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_size:
+            raise ImageTooLargeError(f"图片大小超过限制 {max_size / 1024 / 1024:.0f}MB")
+    return bytes(buffer)
+
+
+async def run_process_pipeline(image_data: bytes, filename: str, num: str, mode_type: str, gender: str,
+                               ethnicity: str, selectedStyle: str, aspectRatio: str, selectedScene: str,
+                               request_id: str = None):
+    """
+    运行图片处理流水线
+
+    Args:
+        request_id: 客户端生成的请求ID，重试时保持不变，参与Ark调用的请求合并判断
+
+    Returns:
+        PipelineResult: 流水线运行结果
+    """
+    return await process_pipeline.run({
+        'image_data': image_data,
+        'file_ext': os.path.splitext(filename)[1].lower()[1:],
+        'filename': filename,
+        'num_int': int(num),
+        'gender': gender,
+        'ethnicity': ethnicity,
+        'selectedStyle': selectedStyle,
+        'aspectRatio': aspectRatio,
+        'selectedScene': selectedScene,
+        'request_id': request_id,
+        # 生成提示词参数
+        'towards': "正面" if mode_type == "通用版" else ""
+    })
+
+
+async def process_image_job(payload):
+    """
+    任务队列处理函数：异步模式的图片处理
+
+    Args:
+        payload: 任务参数，图片在生图存储中的对象键保存在image_key字段
+
+    Returns:
+        dict: 上传后的图片URL和各阶段耗时
+
+    Raises:
+        RuntimeError: 存储不可用，或流水线有阶段失败且没有产出图片，由任务队列重试
+    """
+    params = dict(payload)
+    image_key = params.pop('image_key')
+    storage = get_generation_storage()
+    if not storage:
+        raise RuntimeError("图片存储服务不可用")
+    image_data = await storage.get_async(image_key)
+    result = await run_process_pipeline(image_data, **params)
+
+    timings = result.timing_report()
+    images = result.get('upload') or []
+    print(f"[INFO] 图片处理耗时: {timings}")
+    if not images and result.errors:
+        raise RuntimeError(f"图片处理失败: {result.errors}")
+    return {"image_urls": [image['url'] for image in images], "images": images, "timings": timings}
+
 
 @router.post("/process-image")
 async def process_image(
@@ -74,131 +383,80 @@ async def process_image(
     selectedStyle: str = Form("日常生活风"),
     aspectRatio: str = Form("1:1"),
     selectedScene: str = Form("日常生活场景"),
-    num: str = Form("4")
+    num: str = Form("4"),
+    async_mode: bool = Form(False),
+    request_id: str = Form(None)
 ):
+    # 读取上传的图片，超过大小限制时停止读取；再只读取图片头预检，拒绝像素过多或无法识别的图片
+    # 文件过大返回413，格式不支持或无法识别返回415，其他预检失败返回400
     try:
-        # 读取上传的图片
-        image_data = await file.read()
-        print(f"[INFO] 开始处理图片: {file.filename}")
-        
-        # 压缩图片
-        try:
-            original_size = len(image_data)
-            compressor = ImageCompressor()
-            file_ext = os.path.splitext(file.filename)[1].lower()[1:]
-            compressed_data, compressed_size = compressor.compress_from_bytes(image_data, file_ext)
-            
-            if hasattr(compressed_data, 'read'):
-                compressed_data.seek(0)
-                image_data = compressed_data.read()
-            else:
-                image_data = compressed_data
-                
-            print(f"✓ 图片压缩成功，原始大小: {original_size / 1024:.2f} KB，压缩后大小: {compressed_size / 1024:.2f} KB")
-        except Exception as e:
-            print(f"[WARNING] 图片压缩失败: {type(e).__name__} - {e}，将使用原始图片继续处理")
+        with stage_timer(process_pipeline.name, 'preflight'):
+            image_data = await read_upload_limited(file, image_compressor.max_input_size)
+            image_format, (width, height) = image_compressor.preflight(image_data)
+    except ImageValidationError as e:
+        print(f"[ERROR] 图片预检失败: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    record_stage_bytes(process_pipeline.name, 'preflight', 'in', len(image_data))
+    print(f"[INFO] 开始处理图片: {file.filename}, 格式: {image_format}, 尺寸: {width}x{height}")
+
+    try:
+        params = {
+            'filename': file.filename,
+            'num': num,
+            'mode_type': mode_type,
+            'gender': gender,
+            'ethnicity': ethnicity,
+            'selectedStyle': selectedStyle,
+            'aspectRatio': aspectRatio,
+            'selectedScene': selectedScene,
+            'request_id': request_id
+        }
+
+        # 异步模式：图片先上传到生图存储，任务参数中只保存对象键，提交到任务队列后立即返回任务ID，
+        # 通过 /process-image/jobs/{job_id} 查询结果；对象键由图片内容摘要生成，重复提交不会产生新对象
+        if async_mode:
+            storage = get_generation_storage()
+            if not storage:
+                raise HTTPException(status_code=503, detail="图片存储服务不可用")
+            file_extension = os.path.splitext(file.filename or '')[1].lower() or '.png'
+            image_key = f"{PROCESS_IMAGE_PREFIX}/{hashlib.sha256(image_data).hexdigest()[:32]}{file_extension}"
+            upload_result = (await storage.put_many([(image_key, image_data)]))[0]
+            if not upload_result['success']:
+                print(f"[ERROR] 待处理图片上传失败: {upload_result['error']}")
+                raise HTTPException(status_code=502, detail="图片上传失败")
+            job_id = await get_job_queue().enqueue(JOB_PROCESS_IMAGE, {'image_key': image_key, **params})
+            print(f"[INFO] 图片处理任务已提交: {job_id}")
+            return {
+                "success": True,
+                "message": "Image processing job queued",
+                "data": {
+                    "job_id": job_id,
+                    "status": "queued"
+                }
+            }
+
+        result = await run_process_pipeline(image_data, **params)
+
+        timings = result.timing_report()
+        images = result.get('upload') or []
+        print(f"[INFO] 图片处理耗时: {timings}")
 
-        # 生成提示词参数
-        towards = "正面" if mode_type == "通用版" else ""
-        
-        # 获取图片所属类目
-        category_id = None
-        category_name = None
-        
-        if classifier:
-            try:
-                result = classifier.classify_commodity_from_bytes(image_data)
-                if 'data' in result and hasattr(result['data'], 'categories'):
-                    categories = result['data'].categories
-                    if categories:
-                        first_category = categories[0]
-                        category_id = getattr(first_category, 'category_id', None)
-                        category_name = getattr(first_category, 'category_name', None)
-            except Exception as e:
-                print(f"[ERROR] 分类失败: {e}")
-
-        # 根据类目ID查询一级类目名称
-        categoryName = None
-        if category_id:
-            categoryName = excel_utils.getClothingCategory(category_id)
-
-        # 抠图
-        image_url = None
-        if image_segmenter:
-            try:
-                image_url = image_segmenter.segment_commodity_from_bytes(image_data)
-                print(f"[INFO] 商品分割成功，返回图片URL: {image_url}")
-            except Exception as e:
-                print(f"[WARNING] 商品分割失败: {str(e)}")
-
-        # 生成提示词
-        try:
-            num_int = int(num)
-            prompt = excel_utils.generateImagePrompt(num_int, selectedScene, ethnicity, gender, categoryName, selectedStyle, towards)
-        except Exception as e:
-            print(f"[ERROR] 生成提示词失败: {e}")
-            prompt = f"{gender}，{ethnicity}，{selectedStyle}，{aspectRatio}，{num}"
-
-        # 计算生成图片分辨率
-        imageSize = excel_utils.getAspectRatioPixel(aspectRatio, num_int)
-
-        # 调用Ark图片生成API
-        generated_images = None
-        if ark_image_generator and image_url:
-            try:
-                generated_images = ark_image_generator.generate_images(
-                    prompt=prompt,
-                    images=[image_url],
-                    size=imageSize,
-                    response_format="url"
-                )
-            except Exception as gen_error:
-                print(f"[ERROR] Ark图片生成失败: {gen_error}")
-
-        # 切分图片
-        split_images = []
-        if generated_images and 'data' in generated_images and generated_images['data']:
-            image_bytes = None
-            if 'url' in generated_images['data'][0]:
-                response = requests.get(generated_images['data'][0]['url'])
-                image_bytes = response.content
-            elif 'b64_json' in generated_images['data'][0]:
-                image_bytes = base64.b64decode(generated_images['data'][0]['b64_json'])
-            
-            if image_bytes:
-                try:
-                    split_count = int(num)
-                    split_images = image_splitter.split_image(image_bytes, split_count, return_bytes=True)
-                except Exception as e:
-                    print(f"[ERROR] 切分失败: {e}")
-
-        # 上传结果到TOS
-        image_urls = []
-        if split_images and tos_uploader:
-            for idx, img_bytes in enumerate(split_images):
-                unique_id = str(uuid.uuid4())[:8]
-                file_extension = os.path.splitext(file.filename)[1] or '.png'
-                object_key = f"{unique_id}_{idx}{file_extension}"
-                try:
-                    upload_result = tos_uploader.put_object(
-                        object_key=object_key,
-                        content=img_bytes
-                    )
-                    image_urls.append(upload_result['object_url'])
-                except Exception as e:
-                    print(f"[ERROR] 上传失败: {e}")
-        
         # 如果TOS上传失败或者没有TOS，返回空列表或者错误信息
         # 这里为了保持接口兼容，即使失败也返回结构体
-        
+
         return {
             "success": True,
             "message": "Image processed successfully",
             "data": {
-                "image_urls": image_urls
+                "image_urls": [image['url'] for image in images],
+                # 各图片的原图、256px缩略图和768px预览图URL
+                "images": images,
+                "timings": timings
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[ERROR] 图片处理失败: {str(e)}")
         return {
@@ -206,3 +464,18 @@ async def process_image(
             "message": str(e),
             "data": None
         }
+
+
+@router.get("/process-image/jobs/{job_id}")
+async def get_process_image_job(job_id: str):
+    """
+    查询异步图片处理任务的状态和结果
+    """
+    job = await get_job_queue().get(job_id)
+    if not job or job.get('type') != JOB_PROCESS_IMAGE:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return {
+        "success": True,
+        "message": "ok",
+        "data": public_job_view(job)
+    }
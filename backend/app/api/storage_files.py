@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException
+
+from backend.app.utils.storage import STORAGE_NAMESPACES, get_storage
+
+router = APIRouter()
+
+
+def make_file_endpoint(namespace: str):
+    """
+    生成存储空间的文件下载接口
+
+    Args:
+        namespace: 存储空间名称
+
+    Returns:
+        下载接口函数
+    """
+    def get_file(key: str):
+        """
+        获取存储空间中的文件
+
+        本地存储由服务器用sendfile发送文件，配置了STORAGE_LOCAL_ACCEL_REDIRECT_PREFIX时由nginx发送；
+        对象存储重定向到对象URL
+        """
+        try:
+            return get_storage(namespace).response(key)
+        except (FileNotFoundError, ValueError):
+            raise HTTPException(status_code=404, detail="File not found")
+    return get_file
+
+
+# 所有存储空间的文件URL（STORAGE_NAMESPACES中的URL前缀）由同一个接口处理
+for _namespace, _url_prefix in STORAGE_NAMESPACES.items():
+    router.add_api_route(
+        f"{_url_prefix}/{{key:path}}",
+        make_file_endpoint(_namespace),
+        methods=["GET", "HEAD"],
+        name=f"{_namespace}-files",
+        include_in_schema=False
+    )
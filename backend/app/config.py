@@ -35,6 +35,99 @@ class TOSConfig:
     # 允许的图片格式
     ALLOWED_IMAGE_FORMATS = ["jpg", "jpeg", "png", "gif", "webp"]
 
+    # 单次批量上传最多同时提交到TOS线程池的对象数
+    BATCH_UPLOAD_MAX_WORKERS = int(os.getenv("TOS_BATCH_UPLOAD_MAX_WORKERS", "8"))
+
+    # SDK连接池大小，不小于TOS线程池并发数（批量上传的每个对象也占用TOS线程池的一个槽位），避免高并发时连接被反复新建
+    MAX_CONNECTIONS = int(os.getenv("TOS_MAX_CONNECTIONS", "128"))
+
+    # 建立连接超时时间（秒）
+    CONNECT_TIMEOUT = int(os.getenv("TOS_CONNECT_TIMEOUT", "10"))
+
+    # 读写socket超时时间（秒）
+    SOCKET_TIMEOUT = int(os.getenv("TOS_SOCKET_TIMEOUT", "30"))
+
+    # SDK内部重试次数
+    MAX_RETRY_COUNT = int(os.getenv("TOS_MAX_RETRY_COUNT", "3"))
+
+    # asyncio接口单次调用的整体超时时间（秒）
+    ASYNC_TIMEOUT = float(os.getenv("TOS_ASYNC_TIMEOUT", "120"))
+
+    # 超过该大小（字节）的对象使用分片上传
+    MULTIPART_THRESHOLD = int(os.getenv("TOS_MULTIPART_THRESHOLD", str(64 * 1024 * 1024)))
+
+    # 分片大小（字节），最小5MB
+    MULTIPART_PART_SIZE = int(os.getenv("TOS_MULTIPART_PART_SIZE", str(16 * 1024 * 1024)))
+
+    # 单个对象的分片并发上传数
+    MULTIPART_MAX_WORKERS = int(os.getenv("TOS_MULTIPART_MAX_WORKERS", "4"))
+
+    # 单个分片失败后的重试次数
+    MULTIPART_PART_RETRIES = int(os.getenv("TOS_MULTIPART_PART_RETRIES", "3"))
+
+    # 断点续传记录目录，为空时使用系统临时目录
+    MULTIPART_CHECKPOINT_DIR = os.getenv("TOS_MULTIPART_CHECKPOINT_DIR", "")
+
+    # 流式下载每次读取的字节数
+    DOWNLOAD_CHUNK_SIZE = int(os.getenv("TOS_DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+
+    # 并发分段下载的分段大小（字节）
+    DOWNLOAD_PART_SIZE = int(os.getenv("TOS_DOWNLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+
+    # 单个对象的分段并发下载数，1表示单连接下载
+    DOWNLOAD_MAX_WORKERS = int(os.getenv("TOS_DOWNLOAD_MAX_WORKERS", "4"))
+
+    # 浏览器直传的对象键前缀，完整对象键为 前缀/用户ID/日期/随机ID.扩展名
+    DIRECT_UPLOAD_PREFIX = os.getenv("TOS_DIRECT_UPLOAD_PREFIX", "uploads")
+
+    # 直传预签名URL和表单策略的有效期（秒）
+    DIRECT_UPLOAD_EXPIRES = int(os.getenv("TOS_DIRECT_UPLOAD_EXPIRES", "600"))
+
+    def client_options(self):
+        """
+        获取创建SDK客户端时的连接池和超时参数
+
+        Returns:
+            dict: 传给tos.TosClientV2的参数
+        """
+        return {
+            "max_connections": self.MAX_CONNECTIONS,
+            "connection_time": self.CONNECT_TIMEOUT,
+            "socket_timeout": self.SOCKET_TIMEOUT,
+            "request_timeout": self.SOCKET_TIMEOUT,
+            "max_retry_count": self.MAX_RETRY_COUNT
+        }
+
+    def multipart_options(self):
+        """
+        获取分片上传参数
+
+        Returns:
+            dict: 传给TOSClient的multipart_options
+        """
+        options = {
+            "threshold": self.MULTIPART_THRESHOLD,
+            "part_size": self.MULTIPART_PART_SIZE,
+            "max_workers": self.MULTIPART_MAX_WORKERS,
+            "part_retries": self.MULTIPART_PART_RETRIES
+        }
+        if self.MULTIPART_CHECKPOINT_DIR:
+            options["checkpoint_dir"] = self.MULTIPART_CHECKPOINT_DIR
+        return options
+
+    def download_options(self):
+        """
+        获取下载参数
+
+        Returns:
+            dict: 传给TOSClient的download_options
+        """
+        return {
+            "chunk_size": self.DOWNLOAD_CHUNK_SIZE,
+            "part_size": self.DOWNLOAD_PART_SIZE,
+            "max_workers": self.DOWNLOAD_MAX_WORKERS
+        }
+
 # 应用配置类
 class AppConfig:
     """应用程序通用配置类"""
@@ -53,9 +146,143 @@ class AppConfig:
     # 兼容性配置，保持原有API_KEY设置
     API_KEY = os.getenv("API_KEY", ARK_API_KEY)
 
+# 外部服务线程池配置类
+class ExecutorConfig:
+    """外部服务调用线程池（隔舱）配置类"""
+    # 各外部服务默认的(最大并发数, 最大排队数)
+    # 可通过环境变量 EXECUTOR_<服务名大写>_MAX_WORKERS 和 EXECUTOR_<服务名大写>_MAX_QUEUE 覆盖
+    # 例如：EXECUTOR_ARK_MAX_WORKERS=8
+    DEFAULT_LIMITS = {
+        "aliyun_imageseg": (8, 32),
+        "aliyun_goodstech": (8, 32),
+        "ark": (4, 16),
+        "tos": (16, 64),
+        "http": (16, 64),
+    }
+
+    # 未配置的服务使用的默认值
+    FALLBACK_LIMITS = (4, 16)
+
+    def get_limits(self, provider: str):
+        """
+        获取外部服务的线程池大小配置
+
+        Args:
+            provider: 外部服务名称
+
+        Returns:
+            (max_workers, max_queue)元组
+        """
+        max_workers, max_queue = self.DEFAULT_LIMITS.get(provider, self.FALLBACK_LIMITS)
+        prefix = f"EXECUTOR_{provider.upper()}"
+        max_workers = int(os.getenv(f"{prefix}_MAX_WORKERS", max_workers))
+        max_queue = int(os.getenv(f"{prefix}_MAX_QUEUE", max_queue))
+        return max(1, max_workers), max(0, max_queue)
+
+# 缓存配置类
+class CacheConfig:
+    """缓存配置类"""
+    # 商品图分析结果（分割URL和类目）进程内缓存的最大条目数
+    IMAGE_ANALYSIS_MAX_ENTRIES = int(os.getenv("IMAGE_ANALYSIS_MAX_ENTRIES", "1024"))
+
+    # 商品图分析结果缓存有效期（秒）
+    # 阿里云视觉智能平台返回的结果URL有效期为30分钟，缓存必须在URL失效前过期
+    IMAGE_ANALYSIS_TTL = int(os.getenv("IMAGE_ANALYSIS_TTL", "1500"))
+
+    # 是否启用TOS对象本地磁盘缓存
+    OBJECT_CACHE_ENABLED = os.getenv("OBJECT_CACHE_ENABLED", "true").lower() == "true"
+
+    # TOS对象缓存目录，为空时使用系统临时目录，同一台机器上的多个worker共享
+    OBJECT_CACHE_DIR = os.getenv("OBJECT_CACHE_DIR", "")
+
+    # TOS对象缓存的总字节数上限
+    OBJECT_CACHE_MAX_BYTES = int(os.getenv("OBJECT_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+    # 单个对象的最大缓存字节数，0表示使用总上限的1/4
+    OBJECT_CACHE_MAX_OBJECT_BYTES = int(os.getenv("OBJECT_CACHE_MAX_OBJECT_BYTES", str(64 * 1024 * 1024)))
+
+    # 缓存条目经过多少秒后需要用head_object重新比对ETag
+    OBJECT_CACHE_REVALIDATE_AFTER = float(os.getenv("OBJECT_CACHE_REVALIDATE_AFTER", "300"))
+
+# HTTP下载配置类
+class HttpConfig:
+    """外部图片下载（HTTP客户端）配置类"""
+    # 建立连接超时（秒）
+    CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+    # 读取超时（秒），两次收到数据之间的最长间隔
+    READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+    # 单次下载的最大字节数
+    MAX_BYTES = int(os.getenv("HTTP_MAX_BYTES", str(50 * 1024 * 1024)))
+
+    # 连接池最大连接数和最大保持连接数
+    MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+    MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "16"))
+
+# 后台任务配置类
+class WorkerConfig:
+    """后台任务队列和worker进程配置类"""
+    # 每个worker进程并发执行的任务数
+    CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+
+    # 队列为空时的轮询间隔（秒）
+    POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
+
+    # 任务租约时长（秒），worker崩溃后超过该时长任务重新入队
+    VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+
+    # 任务最大执行次数（含首次）
+    MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+    # 重试等待时间（秒），每次失败后翻倍，不超过上限
+    RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+    RETRY_BACKOFF_MAX = float(os.getenv("JOB_RETRY_BACKOFF_MAX", "300"))
+
+    # 未结束任务记录的保留时间（秒），任务参数中只有图片URL或对象键
+    JOB_TTL = int(os.getenv("JOB_TTL", "86400"))
+
+    # 已结束任务记录（含结果）的保留时间（秒）
+    RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+    # worker启动时恢复创建超过该时长（秒）仍处于pending的生图记录
+    RECOVERY_GRACE = int(os.getenv("JOB_RECOVERY_GRACE", "600"))
+
+    # start_server.py启动API服务时同时启动的worker进程数，单独部署worker时设置为0
+    START_WITH_SERVER = int(os.getenv("WORKER_START_WITH_SERVER", "1"))
+
+# 对象存储配置类
+class StorageConfig:
+    """后台图片（系统图片、模特图、参考图）存储配置类"""
+    # 存储后端：local（本地文件系统）、tos（火山引擎TOS）、oss（阿里云OSS）
+    BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+
+    # 生图流程（服饰图、切分结果）的存储后端，默认tos；设置为local时生图流程不需要存储桶，可离线运行
+    GENERATION_BACKEND = os.getenv("STORAGE_GENERATION_BACKEND", "tos").lower()
+
+    # 本地存储根目录，默认为backend/data
+    LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+    # 本地存储新文件的分片目录层数，每层两个十六进制字符（256个子目录）
+    LOCAL_SHARD_DEPTH = int(os.getenv("STORAGE_LOCAL_SHARD_DEPTH", "2"))
+
+    # 本地文件由nginx发送时的内部location前缀（X-Accel-Redirect），为空时由应用进程发送
+    LOCAL_ACCEL_REDIRECT_PREFIX = os.getenv("STORAGE_LOCAL_ACCEL_REDIRECT_PREFIX", "")
+
+    # 阿里云OSS存储桶和区域
+    OSS_BUCKET = os.getenv("STORAGE_OSS_BUCKET", "yilaitu-user-image")
+    OSS_REGION = os.getenv("STORAGE_OSS_REGION", "cn-shanghai")
+
 # 创建配置实例，方便导入使用
 tos_config = TOSConfig()
 app_config = AppConfig()
+executor_config = ExecutorConfig()
+cache_config = CacheConfig()
+http_config = HttpConfig()
+storage_config = StorageConfig()
+worker_config = WorkerConfig()
 
 # 导出配置类和实例
-__all__ = ["TOSConfig", "AppConfig", "tos_config", "app_config"]
+__all__ = ["TOSConfig", "AppConfig", "ExecutorConfig", "CacheConfig", "HttpConfig", "WorkerConfig", "StorageConfig",
+           "tos_config", "app_config", "executor_config", "cache_config", "http_config", "worker_config",
+           "storage_config"]
@@ -14,12 +14,14 @@
 
 import os
 import io
-from urllib.request import urlopen
 from alibabacloud_goodstech20191230.client import Client
 from alibabacloud_goodstech20191230.models import ClassifyCommodityAdvanceRequest
 from alibabacloud_tea_openapi.models import Config
 from alibabacloud_tea_util.models import RuntimeOptions
 
+from .http_fetcher import get_http_fetcher
+from .provider_executor import get_provider_executor, PROVIDER_ALIYUN_GOODSTECH
+
 class AliyunGoodsClassifier:
     """
     阿里云商品分类工具类
@@ -68,9 +70,9 @@ class AliyunGoodsClassifier:
             io.BytesIO: 图片字节流
             
         Raises:
-            Exception: 网络请求失败
+            HttpFetchError: 网络请求失败或图片超过大小限制
         """
-        return io.BytesIO(urlopen(url).read())
+        return get_http_fetcher().fetch_sync_stream(url)
     
     def _load_image_from_file(self, file_path):
         """
@@ -153,4 +155,38 @@ class AliyunGoodsClassifier:
         response = self.client.classify_commodity_advance(classify_commodity_request, self.runtime)
         
         # 返回结果
-        return response.body.__dict__
\ No newline at end of file
+        return response.body.__dict__
+    
+    async def classify_commodity_async(self, image_input):
+        """
+        商品分类（异步版本）
+        
+        在阿里云商品理解专用线程池中执行阻塞的SDK调用，不阻塞事件循环
+        
+        Args:
+            image_input: 图片输入，可以是本地文件路径或URL
+            
+        Returns:
+            dict: 商品分类结果
+            
+        Raises:
+            ProviderBusyError: 阿里云商品理解线程池排队已满
+        """
+        return await get_provider_executor(PROVIDER_ALIYUN_GOODSTECH).run(self.classify_commodity, image_input)
+    
+    async def classify_commodity_from_bytes_async(self, image_bytes):
+        """
+        从字节流进行商品分类（异步版本）
+        
+        在阿里云商品理解专用线程池中执行阻塞的SDK调用，不阻塞事件循环
+        
+        Args:
+            image_bytes: 图片字节流
+            
+        Returns:
+            dict: 商品分类结果
+            
+        Raises:
+            ProviderBusyError: 阿里云商品理解线程池排队已满
+        """
+        return await get_provider_executor(PROVIDER_ALIYUN_GOODSTECH).run(self.classify_commodity_from_bytes, image_bytes)
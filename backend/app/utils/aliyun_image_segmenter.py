@@ -14,12 +14,14 @@
 
 import os
 import io
-from urllib.request import urlopen
 from alibabacloud_imageseg20191230.client import Client
 from alibabacloud_imageseg20191230.models import SegmentCommodityAdvanceRequest
 from alibabacloud_tea_openapi.models import Config
 from alibabacloud_tea_util.models import RuntimeOptions
 
+from .http_fetcher import get_http_fetcher
+from .provider_executor import get_provider_executor, PROVIDER_ALIYUN_IMAGESEG
+
 class AliyunImageSegmenter:
     """
     阿里云图像分割工具类
@@ -68,9 +70,9 @@ class AliyunImageSegmenter:
             io.BytesIO: 图片字节流
             
         Raises:
-            Exception: 网络请求失败
+            HttpFetchError: 网络请求失败或图片超过大小限制
         """
-        return io.BytesIO(urlopen(url).read())
+        return get_http_fetcher().fetch_sync_stream(url)
     
     def _load_image_from_file(self, file_path):
         """
@@ -257,4 +259,38 @@ class AliyunImageSegmenter:
                 else:
                     return response.body.__dict__
             except:
-                return str(response.body)
\ No newline at end of file
+                return str(response.body)
+    
+    async def segment_commodity_async(self, image_input):
+        """
+        商品分割（异步版本）
+        
+        在阿里云图像分割专用线程池中执行阻塞的SDK调用，不阻塞事件循环
+        
+        Args:
+            image_input: 图片输入，可以是本地文件路径或URL
+            
+        Returns:
+            dict: 商品分割结果
+            
+        Raises:
+            ProviderBusyError: 阿里云图像分割线程池排队已满
+        """
+        return await get_provider_executor(PROVIDER_ALIYUN_IMAGESEG).run(self.segment_commodity, image_input)
+    
+    async def segment_commodity_from_bytes_async(self, image_bytes):
+        """
+        从字节流进行商品分割（异步版本）
+        
+        在阿里云图像分割专用线程池中执行阻塞的SDK调用，不阻塞事件循环
+        
+        Args:
+            image_bytes: 图片字节流
+            
+        Returns:
+            dict: 商品分割结果
+            
+        Raises:
+            ProviderBusyError: 阿里云图像分割线程池排队已满
+        """
+        return await get_provider_executor(PROVIDER_ALIYUN_IMAGESEG).run(self.segment_commodity_from_bytes, image_bytes)
@@ -13,7 +13,7 @@
 import os
 import alibabacloud_oss_v2 as oss
 from alibabacloud_oss_v2.models import PutObjectRequest
-from typing import Optional, Union, BinaryIO
+from typing import Optional, Union, BinaryIO, IO
 
 class AliyunOSSUploader:
     """
@@ -87,7 +87,7 @@ class AliyunOSSUploader:
             file_path
         )
         
-        return self._get_file_url(object_name)
+        return self.get_file_url(object_name)
 
     def upload_bytes(self, data: bytes, object_name: str) -> str:
         """
@@ -109,9 +109,75 @@ class AliyunOSSUploader:
             )
         )
         
-        return self._get_file_url(object_name)
+        return self.get_file_url(object_name)
 
-    def _get_file_url(self, object_name: str) -> str:
+    def upload_fileobj(self, fileobj: IO, object_name: str) -> str:
+        """
+        上传文件对象，SDK按块读取，不把整个文件读入内存
+        
+        Args:
+            fileobj: 已定位到开头的文件对象
+            object_name: OSS中的对象名称
+            
+        Returns:
+            str: 文件的访问URL
+        """
+        self.client.put_object(
+            oss.PutObjectRequest(
+                bucket=self.bucket_name,
+                key=object_name,
+                body=fileobj
+            )
+        )
+        
+        return self.get_file_url(object_name)
+
+    def get_bytes(self, object_name: str) -> bytes:
+        """
+        下载对象内容
+        
+        Args:
+            object_name: OSS中的对象名称
+            
+        Returns:
+            bytes: 对象内容
+        """
+        result = self.client.get_object(
+            oss.GetObjectRequest(
+                bucket=self.bucket_name,
+                key=object_name
+            )
+        )
+        with result.body as body:
+            return body.read()
+
+    def delete_object(self, object_name: str) -> None:
+        """
+        删除对象（对象不存在时不报错）
+        
+        Args:
+            object_name: OSS中的对象名称
+        """
+        self.client.delete_object(
+            oss.DeleteObjectRequest(
+                bucket=self.bucket_name,
+                key=object_name
+            )
+        )
+
+    def object_exists(self, object_name: str) -> bool:
+        """
+        判断对象是否存在
+        
+        Args:
+            object_name: OSS中的对象名称
+            
+        Returns:
+            bool: 对象是否存在
+        """
+        return self.client.is_object_exist(bucket=self.bucket_name, key=object_name)
+
+    def get_file_url(self, object_name: str) -> str:
         """
         构造文件访问URL
         """
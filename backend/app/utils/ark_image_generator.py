@@ -1,7 +1,10 @@
 import os
+import inspect
 from volcenginesdkarkruntime import Ark
 from volcenginesdkarkruntime.types.images.images import SequentialImageGenerationOptions
 
+from .provider_executor import get_provider_executor, PROVIDER_ARK
+
 class ArkImageGenerator:
     """
     火山引擎Ark图片生成工具类
@@ -84,4 +87,50 @@ class ArkImageGenerator:
             }
             result["data"].append(image_info)
         
-        return result
\ No newline at end of file
+        return result
+    
+    async def generate_images_async(self, coalesce_key=None, **kwargs):
+        """
+        生成图片（异步版本）
+        
+        在Ark专用线程池中执行阻塞的SDK调用，不阻塞事件循环。
+        参数完全相同的并发请求（如重复点击、前端超时重试）会被合并：只调用一次Ark，
+        其他请求（包括其他worker上的请求）等待并共享同一结果；完成后的短时间内
+        迟到的重复请求也直接返回该结果。
+        
+        提示词中含有随机抽样的内容时，重复请求的提示词不同，调用方可以传入coalesce_key，
+        按生成提示词之前的输入判断重复请求，此时提示词和参考图不参与合并判断。
+        
+        Args:
+            coalesce_key: 调用方指定的合并键，为None时按全部生成参数合并
+            **kwargs: 与generate_images相同的参数
+            
+        Returns:
+            与generate_images相同的结果
+            
+        Raises:
+            ProviderBusyError: Ark线程池排队已满
+        """
+        from backend.common.singleflight import get_singleflight, make_singleflight_key
+        
+        # 补全默认参数，保证显式传入默认值和省略参数得到相同的合并键
+        bound = inspect.signature(ArkImageGenerator.generate_images).bind(self, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        params.pop('self')
+        key = make_singleflight_key(
+            self.base_url,
+            params['model'],
+            coalesce_key if coalesce_key is not None else params['prompt'],
+            [] if coalesce_key is not None else params['images'] or [],
+            params['size'],
+            params['response_format'],
+            params['sequential_image_generation'],
+            params['max_images'],
+            params['watermark']
+        )
+        
+        return await get_singleflight().do(
+            key,
+            lambda: get_provider_executor(PROVIDER_ARK).run(self.generate_images, **params)
+        )
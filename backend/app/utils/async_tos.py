@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+TOSClient的asyncio接口
+
+TOS SDK只提供同步阻塞调用，AsyncTOSClient把每次调用提交到TOS专用的有界线程池
+（provider_executor中的PROVIDER_TOS）执行，await期间不阻塞事件循环：
+1. 与同步TOSClient共享同一个底层SDK客户端，进程内只有一个按配置调优的连接池
+2. 每次调用有整体超时（默认TOS_ASYNC_TIMEOUT），超时后抛出asyncio.TimeoutError
+3. 调用被取消或超时时，还在排队的请求不会再执行；已经在执行的请求由SDK的
+   连接超时和读超时兜底，不会无限占用线程
+4. 每次调用只占用一个线程池槽位和一个连接：上传始终单次上传（不自动分片），
+   下载文件始终单连接下载。分片上传、分段并发下载会在槽位内再开线程池，
+   连接数不受TOS线程池约束，超时后也无法取消，大文件传输请在线程中使用同步TOSClient
+
+使用示例:
+
+    from backend.app import get_tos_uploader
+
+    tos = get_tos_uploader().aio
+    result = await tos.put_object('a.png', content)
+    result = await tos.head_object('a.png', timeout=5)
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+from ..config import tos_config
+from .provider_executor import ProviderExecutor, get_provider_executor, PROVIDER_TOS
+
+
+class AsyncTOSClient:
+    """
+    TOSClient的asyncio版本，方法与TOSClient同名同参数，另外支持timeout参数
+    """
+
+    def __init__(self, client, executor: Optional[ProviderExecutor] = None, timeout: Optional[float] = None):
+        """
+        初始化asyncio接口
+
+        Args:
+            client: 同步TOSClient实例
+            executor: 执行阻塞调用的线程池，默认使用TOS专用线程池
+            timeout: 默认的单次调用超时时间（秒），默认使用TOS_ASYNC_TIMEOUT
+        """
+        self.client = client
+        self.executor = executor or get_provider_executor(PROVIDER_TOS)
+        self.timeout = tos_config.ASYNC_TIMEOUT if timeout is None else timeout
+
+    @property
+    def bucket_name(self) -> Optional[str]:
+        """默认存储桶名称"""
+        return self.client.bucket_name
+
+    def get_object_url(self, object_key: str, bucket_name: Optional[str] = None) -> str:
+        """获取对象的访问URL，参见TOSClient.get_object_url（本地计算，无需await）"""
+        return self.client.get_object_url(object_key, bucket_name=bucket_name)
+
+    async def _call(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在TOS线程池中执行同步方法
+
+        Args:
+            func: TOSClient的同步方法
+            timeout: 超时时间（秒），默认使用初始化时的超时时间
+            *args, **kwargs: 方法参数
+
+        Returns:
+            方法返回值
+
+        Raises:
+            asyncio.TimeoutError: 调用超时
+            ProviderBusyError: TOS线程池排队已满
+        """
+        return await asyncio.wait_for(
+            self.executor.run(func, *args, **kwargs),
+            timeout=self.timeout if timeout is None else timeout
+        )
+
+    async def put_object(self,
+                         object_key: str,
+                         content: Union[bytes, str, IO],
+                         bucket_name: Optional[str] = None,
+                         acl: Optional[str] = None,
+                         storage_class: Optional[str] = None,
+                         meta: Optional[Dict[str, str]] = None,
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        """上传对象，参见TOSClient.put_object，始终单次上传"""
+        return await self._call(
+            self.client.put_object, object_key, content,
+            bucket_name=bucket_name, acl=acl, storage_class=storage_class, meta=meta, multipart=False,
+            timeout=timeout
+        )
+
+    async def put_object_from_file(self,
+                                   file_path: str,
+                                   object_key: str,
+                                   bucket_name: Optional[str] = None,
+                                   headers: Optional[Dict[str, str]] = None,
+                                   acl: Optional[str] = None,
+                                   storage_class: Optional[str] = None,
+                                   meta: Optional[Dict[str, str]] = None,
+                                   timeout: Optional[float] = None) -> Dict[str, Any]:
+        """从本地文件上传对象，参见TOSClient.put_object_from_file，始终单次上传"""
+        return await self._call(
+            self.client.put_object_from_file, file_path, object_key,
+            bucket_name=bucket_name, headers=headers, acl=acl, storage_class=storage_class, meta=meta,
+            multipart=False, timeout=timeout
+        )
+
+    async def put_objects(self,
+                          items: List[Tuple[str, Union[bytes, str, IO]]],
+                          bucket_name: Optional[str] = None,
+                          max_workers: int = tos_config.BATCH_UPLOAD_MAX_WORKERS,
+                          acl: Optional[str] = None,
+                          storage_class: Optional[str] = None,
+                          meta: Optional[Dict[str, str]] = None,
+                          timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        批量并发上传，结果格式与TOSClient.put_objects相同
+
+        每个对象单独提交到TOS线程池，整批的实际并发受TOS线程池的上限约束，
+        不会在一个线程池槽位中再开内部线程池；max_workers限制单批最多同时提交的对象数，
+        timeout对每个对象单独生效。
+
+        Raises:
+            ValueError: items为空或max_workers小于1
+        """
+        if not items:
+            raise ValueError("上传列表不能为空")
+        if max_workers < 1:
+            raise ValueError("max_workers必须大于0")
+
+        bucket = bucket_name or self.client.bucket_name
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def upload(object_key: str, content: Union[bytes, str, IO]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self.put_object(
+                        object_key, content,
+                        bucket_name=bucket_name, acl=acl, storage_class=storage_class, meta=meta,
+                        timeout=timeout
+                    )
+                except Exception as e:
+                    return {
+                        'success': False,
+                        'object_key': object_key,
+                        'bucket': bucket,
+                        'error': str(e) or type(e).__name__
+                    }
+
+        return list(await asyncio.gather(*(upload(object_key, content) for object_key, content in items)))
+
+    async def get_object(self,
+                         object_key: str,
+                         bucket_name: Optional[str] = None,
+                         byte_range: Optional[Tuple[int, int]] = None,
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        """获取对象内容，参见TOSClient.get_object"""
+        return await self._call(
+            self.client.get_object, object_key,
+            bucket_name=bucket_name, byte_range=byte_range,
+            timeout=timeout
+        )
+
+    async def get_object_stream(self,
+                                object_key: str,
+                                bucket_name: Optional[str] = None,
+                                byte_range: Optional[Tuple[int, int]] = None,
+                                chunk_size: Optional[int] = None,
+                                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        流式获取对象内容，参见TOSClient.get_object_stream
+
+        返回值中的body是异步迭代器，每次读取在TOS线程池中执行（timeout对每次读取单独生效），
+        可以直接交给StreamingResponse；消费方停止读取时关闭连接。
+        """
+        result = await self._call(
+            self.client.get_object_stream, object_key,
+            bucket_name=bucket_name, byte_range=byte_range, chunk_size=chunk_size,
+            timeout=timeout
+        )
+        result['body'] = self._iterate(result['body'], timeout)
+        return result
+
+    async def _iterate(self, iterator: Iterator[bytes], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        在TOS线程池中逐块读取同步迭代器
+
+        Args:
+            iterator: 同步的分块迭代器
+            timeout: 单次读取的超时时间（秒）
+        """
+        try:
+            while True:
+                chunk = await self._call(next, iterator, None, timeout=timeout)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                try:
+                    await self.executor.run(close)
+                except ValueError:
+                    # 超时的读取仍在线程中执行，迭代器读完后会自行关闭连接
+                    pass
+
+    async def get_object_to_file(self,
+                                 object_key: str,
+                                 file_path: str,
+                                 bucket_name: Optional[str] = None,
+                                 byte_range: Optional[Tuple[int, int]] = None,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """下载对象到文件，参见TOSClient.get_object_to_file，始终单连接下载"""
+        return await self._call(
+            self.client.get_object_to_file, object_key, file_path,
+            bucket_name=bucket_name, byte_range=byte_range, max_workers=1,
+            timeout=timeout
+        )
+
+    async def head_object(self,
+                          object_key: str,
+                          bucket_name: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """获取对象元信息，参见TOSClient.head_object"""
+        return await self._call(self.client.head_object, object_key, bucket_name=bucket_name, timeout=timeout)
+
+    async def list_objects(self,
+                           prefix: Optional[str] = None,
+                           marker: Optional[str] = None,
+                           max_keys: int = 1000,
+                           delimiter: Optional[str] = None,
+                           bucket_name: Optional[str] = None,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """列举对象，参见TOSClient.list_objects"""
+        return await self._call(
+            self.client.list_objects,
+            prefix=prefix, marker=marker, max_keys=max_keys, delimiter=delimiter, bucket_name=bucket_name,
+            timeout=timeout
+        )
+
+    async def copy_object(self,
+                          source_object_key: str,
+                          dest_object_key: str,
+                          source_bucket_name: Optional[str] = None,
+                          dest_bucket_name: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """复制对象，参见TOSClient.copy_object"""
+        return await self._call(
+            self.client.copy_object, source_object_key, dest_object_key,
+            source_bucket_name=source_bucket_name, dest_bucket_name=dest_bucket_name,
+            timeout=timeout
+        )
+
+    async def delete_object(self,
+                            object_key: str,
+                            bucket_name: Optional[str] = None,
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """删除单个对象，参见TOSClient.delete_object"""
+        return await self._call(self.client.delete_object, object_key, bucket_name=bucket_name, timeout=timeout)
+
+    async def delete_objects(self,
+                             object_keys: List[str],
+                             bucket_name: Optional[str] = None,
+                             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """批量删除对象，参见TOSClient.delete_objects"""
+        return await self._call(self.client.delete_objects, object_keys, bucket_name=bucket_name, timeout=timeout)
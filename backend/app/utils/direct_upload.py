@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器直传TOS
+
+服饰图片不经过API服务器：前端先申请上传凭证（预签名PUT URL或表单上传策略），直接把图片上传到TOS，
+再把对象键交给生图接口。服务端只负责：
+1. 决定对象键（前缀/用户ID/日期/随机ID.扩展名），前端不能指定或覆盖其他对象
+2. 在签名中限制Content-Type和大小，不符合的上传由TOS直接拒绝
+3. 使用对象键前用head_object确认对象存在、属于当前用户且类型和大小符合要求，
+   再用Range请求读取文件头做图片预检，确认内容确实是声明类型的图片
+
+使用示例:
+
+    from app.utils.direct_upload import build_upload_key, create_upload_ticket, verify_uploaded_object
+
+    object_key = build_upload_key(tos_config.DIRECT_UPLOAD_PREFIX, user_id, 'image/png')
+    ticket = create_upload_ticket(tos_client, object_key, 'image/png', size=123456, max_size=10 * 1024 * 1024)
+    # 前端上传完成后
+    info = await verify_uploaded_object(tos_client.aio, object_key, tos_config.DIRECT_UPLOAD_PREFIX, user_id, max_size)
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .image_compressor import ImageCompressor, ImageValidationError, UnsupportedImageError
+
+# 允许直传的图片类型及对应扩展名
+UPLOAD_CONTENT_TYPES = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp'
+}
+
+# 允许直传的图片类型对应的实际图片格式（ImageCompressor.preflight返回值）
+UPLOAD_IMAGE_FORMATS = {
+    'image/jpeg': 'JPEG',
+    'image/png': 'PNG',
+    'image/webp': 'WEBP'
+}
+
+# 确认上传时读取的文件头字节数，文件头在此范围内无法识别时（如JPEG带大段EXIF）再读取整个对象
+PREFLIGHT_HEAD_BYTES = 64 * 1024
+
+# 直传图片的文件头预检
+image_compressor = ImageCompressor()
+
+# 支持的上传方式：预签名PUT URL和表单上传策略
+UPLOAD_METHODS = ('put', 'post')
+
+
+class UploadNotFoundError(ImageValidationError):
+    """
+    直传的对象不存在（未上传或凭证已过期）
+    """
+    pass
+
+
+def build_upload_key(prefix: str, user_id: int, content_type: str) -> str:
+    """
+    生成直传对象键
+
+    Args:
+        prefix: 对象键前缀
+        user_id: 上传用户ID
+        content_type: 图片MIME类型
+
+    Returns:
+        str: 对象键，如 uploads/12/20250101/3f2a...c1.png
+
+    Raises:
+        ImageValidationError: 图片类型不支持
+    """
+    extension = UPLOAD_CONTENT_TYPES.get(content_type)
+    if extension is None:
+        raise ImageValidationError(f"不支持的图片类型: {content_type}")
+    return f"{prefix}/{user_id}/{datetime.now().strftime('%Y%m%d')}/{uuid.uuid4().hex}{extension}"
+
+
+def is_user_upload_key(object_key: str, prefix: str, user_id: int) -> bool:
+    """
+    判断对象键是否为指定用户的直传对象键
+
+    Args:
+        object_key: 对象键
+        prefix: 对象键前缀
+        user_id: 用户ID
+
+    Returns:
+        bool: 对象键由build_upload_key为该用户生成时返回True
+    """
+    user_prefix = f"{prefix}/{user_id}/"
+    if not isinstance(object_key, str) or '..' in object_key or not object_key.startswith(user_prefix):
+        return False
+    # 前缀本身可以包含"/"，前缀之后是 日期/随机ID.扩展名
+    parts = object_key[len(user_prefix):].split('/')
+    return (
+        len(parts) == 2
+        and all(parts)
+        and any(parts[1].endswith(extension) for extension in UPLOAD_CONTENT_TYPES.values())
+    )
+
+
+def create_upload_ticket(tos_client,
+                         object_key: str,
+                         content_type: str,
+                         size: Optional[int],
+                         max_size: int,
+                         method: str = 'put',
+                         expires: int = 600) -> Dict[str, Any]:
+    """
+    生成直传凭证
+
+    Args:
+        tos_client: TOSClient实例
+        object_key: build_upload_key生成的对象键
+        content_type: 图片MIME类型
+        size: 图片字节数，PUT方式必填并加入签名，POST方式可不填
+        max_size: 允许的最大字节数
+        method: 上传方式，put为预签名PUT URL，post为表单上传策略
+        expires: 凭证有效期（秒）
+
+    Returns:
+        Dict[str, Any]: 包含method、url、headers（PUT）或fields（POST）、object_key、expires
+
+    Raises:
+        ImageValidationError: 上传方式、类型或大小不符合要求
+    """
+    if method not in UPLOAD_METHODS:
+        raise ImageValidationError(f"不支持的上传方式: {method}")
+    if content_type not in UPLOAD_CONTENT_TYPES:
+        raise ImageValidationError(f"不支持的图片类型: {content_type}")
+    if size is not None and (size <= 0 or size > max_size):
+        raise ImageValidationError(f"图片大小必须在 1 到 {max_size} 字节之间")
+
+    if method == 'put':
+        if size is None:
+            raise ImageValidationError("PUT上传必须提供图片大小")
+        ticket = tos_client.presign_put_object(object_key, expires=expires, content_type=content_type, content_length=size)
+    else:
+        ticket = tos_client.presign_post_object(object_key, expires=expires, content_type=content_type, max_size=max_size)
+    ticket.pop('success', None)
+    ticket.pop('bucket', None)
+    return ticket
+
+
+async def verify_uploaded_object(aio_tos_client,
+                                 object_key: str,
+                                 prefix: str,
+                                 user_id: int,
+                                 max_size: int) -> Dict[str, Any]:
+    """
+    确认直传对象已上传且符合要求
+
+    head_object检查Content-Type和大小后，用Range请求读取前PREFLIGHT_HEAD_BYTES字节做图片预检，
+    Content-Type由前端声明，只有预检通过才能确认内容是声明类型的图片且像素数在限制内。
+
+    Args:
+        aio_tos_client: AsyncTOSClient实例
+        object_key: 对象键
+        prefix: 直传对象键前缀
+        user_id: 当前用户ID
+        max_size: 允许的最大字节数
+
+    Returns:
+        Dict[str, Any]: 包含object_key、object_url、size、content_type、etag
+
+    Raises:
+        ImageValidationError: 对象键不属于当前用户，或对象类型、大小、图片内容不符合要求
+        UploadNotFoundError: 对象不存在
+    """
+    if not is_user_upload_key(object_key, prefix, user_id):
+        raise ImageValidationError(f"无效的对象键: {object_key}")
+
+    try:
+        head = await aio_tos_client.head_object(object_key)
+    except Exception as e:
+        if getattr(e, 'status_code', None) == 404:
+            raise UploadNotFoundError(f"对象不存在，请重新上传: {object_key}")
+        raise
+
+    size = head['content_length']
+    content_type = (head['content_type'] or '').split(';')[0].strip().lower()
+    if content_type not in UPLOAD_CONTENT_TYPES:
+        raise ImageValidationError(f"对象 {object_key} 的类型 {content_type or '未知'} 不支持")
+    if size <= 0 or size > max_size:
+        raise ImageValidationError(f"对象 {object_key} 的大小 {size} 字节超出限制")
+
+    head_bytes = (await aio_tos_client.get_object(object_key, byte_range=(0, min(size, PREFLIGHT_HEAD_BYTES) - 1)))['content']
+    try:
+        image_format, _ = image_compressor.preflight(head_bytes)
+    except UnsupportedImageError:
+        if size <= PREFLIGHT_HEAD_BYTES:
+            raise
+        image_format, _ = image_compressor.preflight((await aio_tos_client.get_object(object_key))['content'])
+    if image_format != UPLOAD_IMAGE_FORMATS[content_type]:
+        raise ImageValidationError(f"对象 {object_key} 的内容是{image_format}图片，与类型 {content_type} 不符")
+
+    return {
+        'object_key': object_key,
+        'object_url': aio_tos_client.get_object_url(object_key),
+        'size': size,
+        'content_type': content_type,
+        'etag': head['etag']
+    }
@@ -1,12 +1,107 @@
 import pandas as pd
 import os
 import random
+import threading
+
+# 姿势库中姿势描述列的列名
+POSE_DESCRIPTION_COLUMN = '姿势简短描述（肢体动作 + 表情 / 眼神）'
+
+
+class _LookupTable:
+    """
+    Excel索引表
+
+    Excel文件只解析一次并构建为字典索引，之后的查询都是字典查找。
+    每次访问时检查文件的修改时间，文件被更新后重新加载，并以原子替换的方式切换到新索引，
+    并发的查询要么看到旧索引，要么看到新索引，不会看到加载到一半的数据。
+    """
+
+    def __init__(self, file_path, builder):
+        """
+        初始化索引表
+
+        Args:
+            file_path: Excel文件路径
+            builder: 索引构建函数，接收DataFrame，返回索引字典
+        """
+        self.file_path = file_path
+        self.builder = builder
+        # (文件修改时间, 索引)，作为一个整体替换
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _current_mtime(self):
+        """获取文件修改时间，文件不存在时返回None"""
+        try:
+            return os.stat(self.file_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self):
+        """
+        获取索引，文件修改时间变化时重新加载
+
+        Returns:
+            dict: 索引字典
+        """
+        mtime = self._current_mtime()
+        state = self._state
+        if state is not None and state[0] == mtime:
+            return state[1]
+
+        with self._lock:
+            state = self._state
+            if state is None or state[0] != mtime:
+                df = pd.read_excel(self.file_path)
+                state = (mtime, self.builder(df))
+                self._state = state
+        return state[1]
+
+
+def _normalize_count(value):
+    """将图片数量统一为int，无法转换时保留原值"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _build_pose_index(df):
+    """构建 (性别, 风格, 服装类型, 朝向) -> 姿势描述元组 的索引"""
+    index = {}
+    for sex, style, clothing_type, towards, desc in zip(df['性别'], df['风格'], df['服装类型'], df['朝向'], df[POSE_DESCRIPTION_COLUMN]):
+        index.setdefault((sex, style, clothing_type, towards), []).append(desc)
+    return {key: tuple(values) for key, values in index.items()}
+
+
+def _build_category_index(df):
+    """构建 类目ID -> 一级分类 的索引，同一类目ID以第一行为准"""
+    index = {}
+    for category_id, category_name in zip(df['类目 ID'], df['一级分类']):
+        try:
+            index.setdefault(int(category_id), category_name)
+        except (TypeError, ValueError):
+            continue
+    return index
+
+
+def _build_pixel_index(df):
+    """构建 (图片比例, 图片数量) -> 图片像素 的索引，同一组合以第一行为准"""
+    index = {}
+    for ratio, count, pixel in zip(df['图片比例'], df['图片数量'], df['图片像素']):
+        index.setdefault((ratio, _normalize_count(count)), pixel)
+    return index
+
 
 class ExcelUtils:
     """
     Excel工具类，处理Excel文件数据
     """
     
+    # 所有实例共享的索引表，按文件路径缓存
+    _tables = {}
+    _tables_lock = threading.Lock()
+    
     def __init__(self):
         """
         初始化Excel工具类
@@ -14,6 +109,48 @@ class ExcelUtils:
         # 数据文件路径
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
     
+    def _get_index(self, file_name, builder):
+        """
+        获取Excel文件对应的索引
+        
+        Args:
+            file_name: data目录下的Excel文件名
+            builder: 索引构建函数
+            
+        Returns:
+            dict: 索引字典
+        """
+        file_path = os.path.join(self.data_dir, file_name)
+        table = ExcelUtils._tables.get(file_path)
+        if table is None:
+            with ExcelUtils._tables_lock:
+                table = ExcelUtils._tables.setdefault(file_path, _LookupTable(file_path, builder))
+        return table.get()
+    
+    @classmethod
+    def clear_cache(cls):
+        """
+        清空所有索引，下次查询时重新读取Excel文件
+        """
+        with cls._tables_lock:
+            cls._tables.clear()
+    
+    def getPoseDescriptions(self, sex, styleType, clothingType, towards):
+        """
+        获取符合条件的全部姿势描述
+        
+        Args:
+            sex: 性别
+            styleType: 风格
+            clothingType: 服装类型
+            towards: 朝向
+            
+        Returns:
+            tuple: 姿势简短描述元组，没有匹配时为空元组
+        """
+        pose_index = self._get_index('姿势库.xlsx', _build_pose_index)
+        return pose_index.get((sex, styleType, clothingType, towards), ())
+    
     def randomStoryboard(self, sex, styleType, clothingType, towards):
         """
         随机获取姿势描述
@@ -27,20 +164,8 @@ class ExcelUtils:
         Returns:
             str: 随机选择的姿势简短描述
         """
-        # 构建文件路径
-        file_path = os.path.join(self.data_dir, '姿势库.xlsx')
-        
-        # 读取Excel文件
-        df = pd.read_excel(file_path)
-        
-        # 根据条件筛选数据
-        filtered_df = df[(df['性别'] == sex) & 
-                       (df['风格'] == styleType) & 
-                       (df['服装类型'] == clothingType) & 
-                       (df['朝向'] == towards)]
-        
-        # 提取姿势简短描述列，组装成数组
-        pose_descriptions = filtered_df['姿势简短描述（肢体动作 + 表情 / 眼神）'].tolist()
+        # 从索引中获取符合条件的姿势描述
+        pose_descriptions = self.getPoseDescriptions(sex, styleType, clothingType, towards)
         
         # 如果没有匹配的数据，返回空字符串
         if not pose_descriptions:
@@ -53,6 +178,56 @@ class ExcelUtils:
         selectedScene = pose_descriptions[random_index]
         return selectedScene
     
+    @staticmethod
+    def getClothingType(categoryName):
+        """
+        根据服装类目确定姿势库中的服装类型
+        
+        Args:
+            categoryName: 服装类目
+            
+        Returns:
+            str: 服装类型（裙装、下装或上装）
+        """
+        # 如果服装类目包含'裙'、'连衣裙'等关键字，则使用'裙装'作为服装类型
+        # 否则使用默认的'上装'或其他合适的类型
+        categoryName = categoryName or ""
+        if '裙' in categoryName or '连衣裙' in categoryName:
+            return '裙装'
+        elif '裤' in categoryName or '裤装' in categoryName:
+            return '下装'
+        return '上装'
+    
+    def sampleStoryboard(self, sex, styleType, clothingType, towards, count, rng=None):
+        """
+        一次性无放回地抽取多个不重复的姿势描述
+        
+        Args:
+            sex: 性别
+            styleType: 风格
+            clothingType: 服装类型
+            towards: 朝向
+            count: 需要的姿势数量
+            rng: random.Random实例，用于复现结果；为None时使用全局随机数
+            
+        Returns:
+            list: 姿势描述列表，长度为count。姿势库中匹配的姿势少于count时，
+                  先用完所有不同的姿势，再按抽取顺序循环补齐；没有匹配时全部为空字符串
+        """
+        pose_descriptions = self.getPoseDescriptions(sex, styleType, clothingType, towards)
+        if count <= 0:
+            return []
+        if not pose_descriptions:
+            return [""] * count
+        
+        rng = rng or random
+        if count <= len(pose_descriptions):
+            return rng.sample(pose_descriptions, count)
+        
+        # 姿势数量不足时按抽取顺序循环补齐
+        drawn = rng.sample(pose_descriptions, len(pose_descriptions))
+        return [drawn[i % len(drawn)] for i in range(count)]
+    
     def getClothingCategory(self, categoryId):
         """
         根据类目ID获取服装一级分类
@@ -71,22 +246,11 @@ class ExcelUtils:
             # 将categoryId转换为整数类型，因为Excel中的'类目 ID'列是int64类型
             category_id_int = int(categoryId)
             
-            # 构建文件路径
-            file_path = os.path.join(self.data_dir, '阿里商品理解-类目对照表.xlsx')
-            
-            # 读取Excel文件
-            df = pd.read_excel(file_path)
-            
-            # 根据条件筛选数据 - 注意列名包含空格
-            filtered_df = df[df['类目 ID'] == category_id_int]
+            # 从索引中查找一级分类 - 注意Excel列名包含空格
+            category_index = self._get_index('阿里商品理解-类目对照表.xlsx', _build_category_index)
             
             # 如果没有匹配的数据，返回空字符串
-            if filtered_df.empty:
-                return ""
-            
-            # 返回一级分类
-            categoryName = filtered_df.iloc[0]['一级分类']
-            return categoryName
+            return category_index.get(category_id_int, "")
         except ValueError:
             print(f"[ERROR] 获取服装分类失败: 无效的类目ID格式 - {categoryId}")
             return ""
@@ -105,26 +269,17 @@ class ExcelUtils:
         Returns:
             str: 图片像素大小
         """
-        # 构建文件路径
-        file_path = os.path.join(self.data_dir, '图片像素大小.xlsx')
-        
-        # 读取Excel文件
-        df = pd.read_excel(file_path)
-        
-        # 根据条件筛选数据
-        filtered_df = df[(df['图片比例'] == aspectRatio) & 
-                       (df['图片数量'] == num)]
+        # 从索引中查找图片像素
+        pixel_index = self._get_index('图片像素大小.xlsx', _build_pixel_index)
+        imageSize = pixel_index.get((aspectRatio, _normalize_count(num)))
         
         # 如果没有匹配的数据，返回空字符串
-        if filtered_df.empty:
+        if imageSize is None:
             return ""
         
-        # 返回图片像素
-        imageSize = filtered_df.iloc[0]['图片像素']
-        print("getAspectRatioPixel函数返回结果="+imageSize)
         return imageSize
     
-    def generateImagePrompt(self, num, selectedScene, race, sex, categoryName, styleType, towards):
+    def generateImagePrompt(self, num, selectedScene, race, sex, categoryName, styleType, towards, seed=None, rng=None):
         """
         根据输入参数生成图像提示词
         
@@ -136,6 +291,8 @@ class ExcelUtils:
             categoryName: 服装类目
             styleType: 拍照风格
             towards: 朝向
+            seed: 随机种子，指定后生成的分镜描述可复现
+            rng: random.Random实例，优先于seed使用
             
         Returns:
             str: 生成的图像提示词
@@ -188,39 +345,12 @@ class ExcelUtils:
         if num == 1:
             scene_desc = ""
         else:
-            # 生成分镜描述
-            scene_desc_parts = []
-            used_poses = set()  # 用于存储已使用的姿势描述，实现去重
-            max_attempts = 10  # 最大尝试次数，避免无限循环
-
-            for i in range(1, num + 1):
-                pose_desc = None
-                attempts = 0
-                
-                # 尝试获取不重复的姿势描述
-                while pose_desc is None or pose_desc in used_poses:
-                    # 根据服装类目确定服装类型
-                    # 如果服装类目包含'裙'、'连衣裙'等关键字，则使用'裙装'作为服装类型
-                    # 否则使用默认的'上装'或其他合适的类型
-                    if '裙' in clothing_category or '连衣裙' in clothing_category:
-                        current_clothing_type = '裙装'
-                    elif '裤' in clothing_category or '裤装' in clothing_category:
-                        current_clothing_type = '下装'
-                    else:
-                        current_clothing_type = '上装'
-                    
-                    pose_desc = self.randomStoryboard(sex, styleType, current_clothing_type, towards)
-                    attempts += 1
-                    
-                    # 如果尝试次数过多，就不再去重，避免无限循环
-                    if attempts > max_attempts:
-                        break
-                
-                # 将获取的姿势描述添加到结果中
-                scene_desc_parts.append(f"分镜{i}:{pose_desc}")
-                used_poses.add(pose_desc)
-
-            scene_desc = "，".join(scene_desc_parts)
+            # 生成分镜描述：一次性从姿势库中抽取num个不重复的姿势
+            if rng is None and seed is not None:
+                rng = random.Random(seed)
+            clothing_type = self.getClothingType(clothing_category)
+            poses = self.sampleStoryboard(sex, styleType, clothing_type, towards, num, rng)
+            scene_desc = "，".join(f"分镜{i}:{pose_desc}" for i, pose_desc in enumerate(poses, 1))
         
         # 替换所有变量
         prompt = image_prompt_template.replace("{{行数*列数}}", grid_layout)
@@ -232,4 +362,31 @@ class ExcelUtils:
         prompt = prompt.replace("{{拍照风格描述}}", photo_style_desc)
         prompt = prompt.replace("{{分镜描述}}", scene_desc)
         
-        return prompt
\ No newline at end of file
+        return prompt
+    
+    def generateImagePrompts(self, prompt_requests, seed=None):
+        """
+        批量生成图像提示词，供批量上新任务使用
+        
+        Args:
+            prompt_requests: 参数字典列表，每个字典包含generateImagePrompt的参数：
+                num、selectedScene、race、sex、categoryName、styleType、towards
+            seed: 随机种子，指定后整批结果可复现
+            
+        Returns:
+            list: 与输入顺序一致的提示词列表
+        """
+        rng = random.Random(seed) if seed is not None else None
+        return [
+            self.generateImagePrompt(
+                request['num'],
+                request['selectedScene'],
+                request['race'],
+                request['sex'],
+                request['categoryName'],
+                request['styleType'],
+                request['towards'],
+                rng=rng
+            )
+            for request in prompt_requests
+        ]
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+外部图片下载工具
+
+Ark生成结果、阿里云分割结果等图片都需要通过HTTP下载。本模块提供一个进程内共享的
+下载器，所有下载复用同一个长连接池：
+1. 基于httpx，保持连接复用；安装了h2时启用HTTP/2
+2. 可配置的连接超时和读取超时
+3. 流式读取到bytearray（或同步接口的io.BytesIO），超过最大字节数时立即中断，不会把超大响应整个读入内存
+4. 同时提供async接口（用于接口和流水线）和同步接口（用于在线程池中执行的SDK封装）
+
+使用示例:
+
+    from app.utils.http_fetcher import get_http_fetcher
+
+    fetcher = get_http_fetcher()
+    # 在async函数中
+    data = await fetcher.fetch(url)
+    # 在同步代码中
+    data = fetcher.fetch_sync(url)
+    # 需要文件对象时直接写入io.BytesIO，不需要再从bytearray复制一份
+    image = Image.open(fetcher.fetch_sync_stream(url))
+"""
+
+import asyncio
+import importlib.util
+import io
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from ..config import http_config
+
+
+class HttpFetchError(Exception):
+    """下载失败"""
+
+    def __init__(self, url: str, message: str):
+        self.url = url
+        super().__init__(f"下载失败: {url}, {message}")
+
+
+class ResponseTooLargeError(HttpFetchError):
+    """响应超过最大字节数"""
+
+    def __init__(self, url: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(url, f"响应大小超过限制 {max_bytes} 字节")
+
+
+class HttpFetcher:
+    """
+    基于共享连接池的HTTP下载器
+    """
+
+    def __init__(self,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 max_bytes: int = 50 * 1024 * 1024,
+                 max_connections: int = 32,
+                 max_keepalive_connections: int = 16):
+        """
+        初始化下载器
+
+        Args:
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取超时（秒）
+            max_bytes: 单次下载的默认最大字节数
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池最大保持连接数
+        """
+        self.max_bytes = max_bytes
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        # 安装了h2时启用HTTP/2
+        self.http2 = importlib.util.find_spec('h2') is not None
+
+        self._client: Optional[httpx.Client] = None
+        # AsyncClient的连接绑定在创建它的事件循环上，每个事件循环使用自己的客户端
+        self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> httpx.Client:
+        """获取同步客户端，首次使用时创建"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=self.limits,
+                        http2=self.http2,
+                        follow_redirects=True
+                    )
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        获取当前事件循环的async客户端，首次使用时创建
+
+        其他事件循环的客户端保留到aclose()时在各自的事件循环上关闭；
+        事件循环已经关闭时（如前一次asyncio.run结束），它的客户端无法再执行I/O，直接丢弃
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            with self._lock:
+                for stale_loop in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[stale_loop]
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    follow_redirects=True
+                )
+        return client
+
+    @staticmethod
+    def _check_response(url: str, response: httpx.Response, max_bytes: int) -> None:
+        """
+        检查响应状态码和Content-Length，在读取响应体之前拒绝过大的响应
+
+        Raises:
+            HttpFetchError: 响应状态码不是2xx
+            ResponseTooLargeError: Content-Length超过最大字节数
+        """
+        if not response.is_success:
+            raise HttpFetchError(url, f"HTTP状态码 {response.status_code}")
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ResponseTooLargeError(url, max_bytes)
+
+    @staticmethod
+    def _append(url: str, buffer: bytearray, chunk: bytes, max_bytes: int) -> None:
+        """追加数据块，超过最大字节数时中断下载"""
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise ResponseTooLargeError(url, max_bytes)
+
+    async def fetch(self, url: str, max_bytes: Optional[int] = None) -> bytearray:
+        """
+        异步下载，流式读取到bytearray
+
+        Args:
+            url: 下载地址
+            max_bytes: 最大字节数，默认使用初始化时的配置
+
+        Returns:
+            bytearray: 响应内容，可直接用io.BytesIO包装后交给PIL
+
+        Raises:
+            HttpFetchError: 网络错误或响应状态码不是2xx
+            ResponseTooLargeError: 响应超过最大字节数
+        """
+        max_bytes = max_bytes or self.max_bytes
+        try:
+            async with self._get_async_client().stream('GET', url) as response:
+                self._check_response(url, response, max_bytes)
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes():
+                    self._append(url, buffer, chunk, max_bytes)
+                return buffer
+        except httpx.HTTPError as e:
+            raise HttpFetchError(url, f"{type(e).__name__} - {e}") from e
+
+    def fetch_sync(self, url: str, max_bytes: Optional[int] = None) -> bytearray:
+        """
+        同步下载，流式读取到bytearray
+
+        Args:
+            url: 下载地址
+            max_bytes: 最大字节数，默认使用初始化时的配置
+
+        Returns:
+            bytearray: 响应内容
+
+        Raises:
+            HttpFetchError: 网络错误或响应状态码不是2xx
+            ResponseTooLargeError: 响应超过最大字节数
+        """
+        buffer = bytearray()
+        self._read_sync(url, max_bytes, buffer.extend)
+        return buffer
+
+    def fetch_sync_stream(self, url: str, max_bytes: Optional[int] = None) -> io.BytesIO:
+        """
+        同步下载，流式写入io.BytesIO
+
+        用于需要文件对象的场景（如PIL、SDK上传）：io.BytesIO(bytearray)会把内容再复制一份，
+        直接写入io.BytesIO则只有一份。
+
+        Args:
+            url: 下载地址
+            max_bytes: 最大字节数，默认使用初始化时的配置
+
+        Returns:
+            io.BytesIO: 定位到开头的响应内容
+
+        Raises:
+            HttpFetchError: 网络错误或响应状态码不是2xx
+            ResponseTooLargeError: 响应超过最大字节数
+        """
+        stream = io.BytesIO()
+        self._read_sync(url, max_bytes, stream.write)
+        stream.seek(0)
+        return stream
+
+    def _read_sync(self, url: str, max_bytes: Optional[int], write: Callable[[bytes], Any]) -> None:
+        """
+        同步下载，逐块交给write，超过最大字节数时中断下载
+
+        Args:
+            url: 下载地址
+            max_bytes: 最大字节数，默认使用初始化时的配置
+            write: 接收数据块的函数
+        """
+        max_bytes = max_bytes or self.max_bytes
+        try:
+            with self._get_client().stream('GET', url) as response:
+                self._check_response(url, response, max_bytes)
+                size = 0
+                for chunk in response.iter_bytes():
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ResponseTooLargeError(url, max_bytes)
+                    write(chunk)
+        except httpx.HTTPError as e:
+            raise HttpFetchError(url, f"{type(e).__name__} - {e}") from e
+
+    async def aclose(self) -> None:
+        """
+        关闭所有连接池
+
+        当前事件循环的客户端直接关闭；其他仍在运行的事件循环（如其他线程中的事件循环）
+        的客户端提交到各自的事件循环上关闭
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            async_clients, self._async_clients = self._async_clients, {}
+            client, self._client = self._client, None
+
+        for client_loop, async_client in async_clients.items():
+            if client_loop is loop:
+                await async_client.aclose()
+            elif client_loop.is_running() and not client_loop.is_closed():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(async_client.aclose(), client_loop))
+        if client is not None:
+            client.close()
+
+
+_http_fetcher: Optional[HttpFetcher] = None
+_http_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """获取共享的HTTP下载器实例"""
+    global _http_fetcher
+    if _http_fetcher is None:
+        with _http_fetcher_lock:
+            if _http_fetcher is None:
+                _http_fetcher = HttpFetcher(
+                    connect_timeout=http_config.CONNECT_TIMEOUT,
+                    read_timeout=http_config.READ_TIMEOUT,
+                    max_bytes=http_config.MAX_BYTES,
+                    max_connections=http_config.MAX_CONNECTIONS,
+                    max_keepalive_connections=http_config.MAX_KEEPALIVE_CONNECTIONS
+                )
+    return _http_fetcher
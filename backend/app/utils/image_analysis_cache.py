@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+商品图分析结果缓存
+
+用户经常用同一张服饰图配合不同的风格/场景/比例重复生成，每次都会重新调用阿里云的
+商品分割和商品分类。本模块按压缩后图片字节的SHA-256做内容寻址，缓存分割结果URL和类目信息：
+1. 进程内LRU缓存，按条目数限制大小
+2. Redis缓存，多个worker共享；TTL短于阿里云结果URL的有效期，避免返回已失效的URL
+
+命中缓存时可以同时跳过两次远程调用。
+
+使用示例:
+
+    cache = get_image_analysis_cache()
+    digest = ImageAnalysisCache.content_key(image_bytes)
+    entry = await cache.get(digest)
+    if entry is None:
+        entry = {'segment_url': url, 'category_id': category_id, 'category_name': category_name}
+        await cache.set(digest, entry)
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import cache_config
+
+logger = logging.getLogger(__name__)
+
+
+class ImageAnalysisCache:
+    """
+    两级（进程内LRU + Redis）商品图分析结果缓存
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 1500, prefix: str = "image_analysis", redis_client=None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 进程内LRU缓存的最大条目数
+            ttl: 缓存有效期（秒），应短于阿里云分割结果URL的有效期
+            prefix: Redis键前缀
+            redis_client: Redis客户端实例，为None时使用项目共享的Redis连接
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = redis_client
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 指标
+        self._memory_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._stores = 0
+
+    @staticmethod
+    def content_key(image_bytes: bytes) -> str:
+        """
+        计算图片内容的SHA-256摘要
+
+        Args:
+            image_bytes: 压缩后的图片字节
+
+        Returns:
+            str: 十六进制摘要
+        """
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def _get_key(self, digest: str) -> str:
+        """生成Redis键"""
+        return f"{self.prefix}:{digest}"
+
+    async def _get_redis(self):
+        """获取Redis客户端，复用项目中已有的Redis连接"""
+        if self._redis is None:
+            from backend.passport.app.db.redis import get_redis
+            self._redis = await get_redis()
+        return self._redis
+
+    def _get_memory(self, digest: str) -> Optional[Dict[str, Any]]:
+        """从进程内LRU缓存读取，过期条目直接丢弃"""
+        with self._lock:
+            item = self._entries.get(digest)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return dict(entry)
+
+    def _set_memory(self, digest: str, entry: Dict[str, Any], expires_at: float) -> None:
+        """写入进程内LRU缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[digest] = (expires_at, dict(entry))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存，依次查询进程内缓存和Redis
+
+        Args:
+            digest: 图片内容摘要
+
+        Returns:
+            dict or None: 缓存的分析结果，包含segment_url、category_id、category_name
+        """
+        entry = self._get_memory(digest)
+        if entry is not None:
+            with self._lock:
+                self._memory_hits += 1
+            return entry
+
+        key = self._get_key(digest)
+        try:
+            redis = await self._get_redis()
+            value = await redis.get(key)
+            if value:
+                entry = json.loads(value)
+                ttl = await redis.ttl(key)
+                expires_at = time.time() + (ttl if ttl and ttl > 0 else self.ttl)
+                self._set_memory(digest, entry, expires_at)
+                with self._lock:
+                    self._redis_hits += 1
+                return entry
+        except Exception as e:
+            logger.error(f"[ImageAnalysisCache] 读取Redis缓存异常: {key}, error: {e}")
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    async def set(self, digest: str, entry: Dict[str, Any]) -> None:
+        """
+        写入缓存（进程内缓存和Redis）
+
+        Args:
+            digest: 图片内容摘要
+            entry: 分析结果
+        """
+        self._set_memory(digest, entry, time.time() + self.ttl)
+        with self._lock:
+            self._stores += 1
+
+        key = self._get_key(digest)
+        try:
+            redis = await self._get_redis()
+            await redis.set(key, json.dumps(entry, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.error(f"[ImageAnalysisCache] 写入Redis缓存异常: {key}, error: {e}")
+
+    def clear(self) -> None:
+        """清空进程内缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存指标
+
+        Returns:
+            Dict[str, Any]: 包含命中、未命中次数和命中率的字典
+        """
+        with self._lock:
+            hits = self._memory_hits + self._redis_hits
+            lookups = hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'memory_hits': self._memory_hits,
+                'redis_hits': self._redis_hits,
+                'misses': self._misses,
+                'stores': self._stores,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_image_analysis_cache: Optional[ImageAnalysisCache] = None
+
+
+def get_image_analysis_cache() -> ImageAnalysisCache:
+    """获取共享的商品图分析结果缓存实例"""
+    global _image_analysis_cache
+    if _image_analysis_cache is None:
+        _image_analysis_cache = ImageAnalysisCache(
+            max_entries=cache_config.IMAGE_ANALYSIS_MAX_ENTRIES,
+            ttl=cache_config.IMAGE_ANALYSIS_TTL
+        )
+    return _image_analysis_cache
@@ -3,15 +3,46 @@
 图片压缩工具类
 
 用于压缩图片，确保图片满足以下要求：
-1. 支持格式：PNG、JPEG、JPG、BMP
+1. 支持格式：PNG、JPEG、JPG、BMP、WEBP
 2. 压缩后大小：不超过3MB
 3. 分辨率：500×500像素到2000×2000像素之间
+
+有损格式（JPEG/WEBP）按目标大小查找压缩质量：先用首次编码的每像素字节数估算
+满足大小的质量，再在已知的上下界之间插值缩小区间，通常3-4次编码即可收敛。
+无损格式（PNG/BMP）超出大小时先尝试调色板量化（仅PNG），仍然超出则按比例缩小分辨率。
+
+解码前先只读取图片头做预检，拒绝过大、像素过多或无法识别的图片；JPEG缩小时用draft
+直接按接近目标的比例解码，其他格式先用reduce整数倍缩小，再用LANCZOS缩放到目标尺寸。
 """
 
 import os
 import io
-from PIL import Image
-from typing import Tuple, Union
+import math
+from PIL import Image, UnidentifiedImageError
+from typing import IO, Tuple, Union
+
+
+class ImageValidationError(ValueError):
+    """
+    图片预检失败：文件过大、像素过多、格式不支持或无法识别
+    """
+    # 接口返回的HTTP状态码
+    status_code = 400
+
+
+class ImageTooLargeError(ImageValidationError):
+    """
+    图片文件超过大小限制
+    """
+    status_code = 413
+
+
+class UnsupportedImageError(ImageValidationError):
+    """
+    图片格式不支持或无法识别
+    """
+    status_code = 415
+
 
 class ImageCompressor:
     """
@@ -27,7 +58,8 @@ class ImageCompressor:
             'PNG': 'PNG',
             'JPEG': 'JPEG',
             'JPG': 'JPEG',  # JPG和JPEG是同一种格式
-            'BMP': 'BMP'
+            'BMP': 'BMP',
+            'WEBP': 'WEBP'
         }
         
         # 压缩参数
@@ -37,6 +69,20 @@ class ImageCompressor:
         
         # JPEG/JPG默认质量
         self.default_quality = 85
+        
+        # 有损格式按目标大小查找质量的参数
+        self.min_quality = 10  # 最低质量
+        self.size_tolerance = 0.1  # 结果达到目标大小的90%以上即停止查找
+        
+        # 无损格式超出大小时最多缩小分辨率的次数
+        self.max_downscale_attempts = 3
+        
+        # 输入图片限制，超出时在解码前拒绝
+        self.max_input_size = 20 * 1024 * 1024  # 20MB
+        self.max_input_pixels = 50_000_000  # 约5000万像素，覆盖48MP手机照片
+        
+        # 缩小时先用reduce整数倍缩小，剩余不超过该倍数的部分再用LANCZOS
+        self.reducing_gap = 2.0
     
     def _get_image_format(self, file_path: str) -> str:
         """
@@ -56,10 +102,58 @@ class ImageCompressor:
             raise ValueError(f"不支持的图片格式：{file_ext}。支持的格式：{', '.join(self.supported_formats.keys())}")
         return self.supported_formats[file_ext]
     
+    def preflight(self, image_bytes: Union[bytes, IO]) -> Tuple[str, Tuple[int, int]]:
+        """
+        只读取图片头进行预检，不解码像素数据
+        
+        Args:
+            image_bytes: 图片字节流，或已定位到开头的文件对象（文件大小由调用方校验）
+            
+        Returns:
+            Tuple[str, Tuple[int, int]]: 图片实际格式和尺寸(宽, 高)
+            
+        Raises:
+            ImageValidationError: 文件过大、像素过多、格式不支持或无法识别
+        """
+        if isinstance(image_bytes, (bytes, bytearray)):
+            if len(image_bytes) > self.max_input_size:
+                raise ImageTooLargeError(
+                    f"图片大小 {len(image_bytes) / 1024 / 1024:.2f}MB 超过限制 {self.max_input_size / 1024 / 1024:.0f}MB"
+                )
+            source = io.BytesIO(image_bytes)
+        else:
+            source = image_bytes
+        
+        try:
+            # Image.open只解析文件头，像素数据在load()时才解码
+            with Image.open(source) as image:
+                image_format = image.format
+                width, height = image.size
+        except Image.DecompressionBombError as e:
+            raise ImageValidationError(f"图片像素过多: {e}")
+        except (UnidentifiedImageError, OSError, SyntaxError) as e:
+            raise UnsupportedImageError(f"无法识别的图片文件: {e}")
+        
+        if image_format not in self.supported_formats.values():
+            raise UnsupportedImageError(
+                f"不支持的图片格式：{image_format}。支持的格式：{', '.join(self.supported_formats.keys())}"
+            )
+        
+        if width * height > self.max_input_pixels:
+            raise ImageValidationError(
+                f"图片像素 {width}×{height} 超过限制 {self.max_input_pixels} 像素"
+            )
+        
+        return image_format, (width, height)
+    
     def _resize_image(self, image: Image.Image) -> Image.Image:
         """
         调整图片分辨率到指定范围内
         
+        缩小时如果图片尚未解码，JPEG通过draft直接按1/2、1/4、1/8中最接近且不小于
+        目标尺寸的比例解码，避免先解码全尺寸像素；之后通过reducing_gap先用reduce
+        整数倍缩小，再用LANCZOS缩放到目标尺寸。
+        
         Args:
             image: PIL Image对象
             
@@ -80,10 +174,127 @@ class ImageCompressor:
             ratio = min(self.max_resolution[0] / width, self.max_resolution[1] / height)
             new_width = int(width * ratio)
             new_height = int(height * ratio)
-            image = image.resize((new_width, new_height), Image.LANCZOS)
+            if image.format == 'JPEG':
+                # 仅对未解码的JPEG生效，已解码的图片draft不做任何处理
+                image.draft(image.mode, (new_width, new_height))
+            image = image.resize((new_width, new_height), Image.LANCZOS, reducing_gap=self.reducing_gap)
         
         return image
     
+    def _encode(self, image: Image.Image, format: str, quality: int = None) -> bytes:
+        """
+        按指定格式和质量编码一次图片
+        
+        Args:
+            image: PIL Image对象
+            format: 图片格式
+            quality: 压缩质量（仅JPEG/WEBP有效）
+            
+        Returns:
+            bytes: 编码后的图片字节
+        """
+        buffer = io.BytesIO()
+        if format in ['JPEG', 'WEBP']:
+            image.save(buffer, format=format, quality=quality, optimize=True)
+        else:
+            image.save(buffer, format=format, optimize=True)
+        return buffer.getvalue()
+    
+    def _interpolate_quality(self, low: Tuple[int, int], high: Tuple[int, int]) -> int:
+        """
+        在两个已知的(质量, 大小)点之间按大小线性插值，估算刚好满足目标大小的质量
+        
+        Args:
+            low: 满足大小的最高质量及其大小；尚未找到时为(0, 0)
+            high: 超出大小的最低质量及其大小
+            
+        Returns:
+            int: 估算的质量，位于两点之间（不含端点）
+        """
+        (low_quality, low_size), (high_quality, high_size) = low, high
+        # 瞄准容差区间的中点，避免估算结果刚好落在目标大小之上
+        target = self.max_file_size * (1 - self.size_tolerance / 2)
+        if high_size > low_size:
+            estimate = low_quality + (target - low_size) * (high_quality - low_quality) / (high_size - low_size)
+        else:
+            estimate = (low_quality + high_quality) / 2
+        lower_bound = max(self.min_quality, low_quality + 1)
+        upper_bound = high_quality - 1
+        if low_quality:
+            # 上下界都是实际编码结果时，把估算限制在区间中间一半，保证每次至少缩小四分之一
+            quarter = (upper_bound - lower_bound) / 4
+            lower_bound, upper_bound = lower_bound + quarter, upper_bound - quarter
+        return int(round(max(lower_bound, min(upper_bound, estimate))))
+    
+    def _search_quality(self, image: Image.Image, format: str, quality: int) -> bytes:
+        """
+        查找满足目标大小的最高压缩质量（JPEG/WEBP）
+        
+        首次按起始质量编码；超出大小时，用首次编码的每像素字节数（即与原点之间的线性插值）
+        估算质量，之后在已知满足和超出大小的两个质量之间插值缩小区间。结果达到目标大小的
+        (1 - size_tolerance)以上即停止，通常3-4次编码即可收敛。
+        
+        Args:
+            image: PIL Image对象
+            format: 图片格式
+            quality: 起始（最高）质量
+            
+        Returns:
+            bytes: 满足大小的最高质量编码结果；最低质量仍超出时返回最低质量的编码结果
+        """
+        data = self._encode(image, format, quality)
+        if len(data) <= self.max_file_size or quality <= self.min_quality:
+            return data
+        
+        best = None
+        low, high = (0, 0), (quality, len(data))
+        while high[0] - max(low[0], self.min_quality - 1) > 1:
+            probe = self._interpolate_quality(low, high)
+            data = self._encode(image, format, probe)
+            if len(data) <= self.max_file_size:
+                best, low = data, (probe, len(data))
+                if len(data) >= self.max_file_size * (1 - self.size_tolerance):
+                    break
+            else:
+                high = (probe, len(data))
+        
+        # best为None说明最低质量仍超出大小，返回最低质量的结果
+        return best if best is not None else data
+    
+    def _fit_lossless(self, image: Image.Image, format: str) -> bytes:
+        """
+        无损格式（PNG/BMP）超出大小时的处理
+        
+        PNG先量化为256色调色板，仍超出则和BMP一样按大小比例缩小分辨率后重新编码。
+        
+        Args:
+            image: PIL Image对象
+            format: 图片格式
+            
+        Returns:
+            bytes: 编码后的图片字节
+        """
+        data = self._encode(image, format)
+        if len(data) <= self.max_file_size:
+            return data
+        
+        if format == 'PNG' and image.mode in ['RGB', 'RGBA']:
+            method = Image.FASTOCTREE if image.mode == 'RGBA' else Image.MEDIANCUT
+            image = image.quantize(colors=256, method=method)
+            data = self._encode(image, format)
+        
+        for _ in range(self.max_downscale_attempts):
+            if len(data) <= self.max_file_size:
+                break
+            # 编码大小与像素数近似成正比，按面积比例缩小，并留出5%余量
+            ratio = math.sqrt(self.max_file_size / len(data)) * 0.95
+            new_size = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
+            resample = Image.NEAREST if image.mode == 'P' else Image.LANCZOS
+            image = image.resize(new_size, resample)
+            data = self._encode(image, format)
+        
+        return data
+    
     def _compress_image(self, image: Image.Image, format: str, quality: int = None) -> Tuple[io.BytesIO, int]:
         """
         压缩图片到指定大小
@@ -91,7 +302,7 @@ class ImageCompressor:
         Args:
             image: PIL Image对象
             format: 图片格式
-            quality: 压缩质量（1-100，仅JPEG/JPG有效）
+            quality: 压缩质量（1-100，仅JPEG/JPG/WEBP有效），作为查找的最高质量
             
         Returns:
             Tuple[BytesIO, int]: 压缩后的图片字节流和大小（字节）
@@ -99,34 +310,16 @@ class ImageCompressor:
         if quality is None:
             quality = self.default_quality
         
-        # 创建字节流
-        img_byte_arr = io.BytesIO()
-        
-        # 对于PNG和BMP，使用无损压缩
-        if format in ['PNG', 'BMP']:
-            image.save(img_byte_arr, format=format, optimize=True)
-        else:  # JPEG/JPG
-            # 逐步调整质量直到大小合适
-            current_quality = quality
-            while True:
-                img_byte_arr.seek(0)
-                img_byte_arr.truncate()
-                image.save(img_byte_arr, format=format, quality=current_quality, optimize=True)
-                file_size = img_byte_arr.tell()
-                
-                # 检查大小是否符合要求
-                if file_size <= self.max_file_size or current_quality <= 10:
-                    break
-                    
-                # 降低质量继续压缩
-                current_quality -= 5
+        if format in ['JPEG', 'WEBP']:
+            # JPEG不支持透明通道和调色板模式
+            if format == 'JPEG' and image.mode not in ['RGB', 'L', 'CMYK']:
+                image = image.convert('RGB')
+            data = self._search_quality(image, format, quality)
+        else:  # PNG/BMP
+            data = self._fit_lossless(image, format)
         
-        # 获取文件大小并重置指针
-        img_byte_arr.seek(0, io.SEEK_END)  # 移动到文件末尾
-        file_size = img_byte_arr.tell()     # 获取大小
-        img_byte_arr.seek(0)               # 重置指针到开头
-        
-        return img_byte_arr, file_size
+        img_byte_arr = io.BytesIO(data)
+        return img_byte_arr, len(data)
     
     def compress_from_file(self, file_path: str, output_path: str = None, quality: int = None) -> Tuple[str, int]:
         """
@@ -135,7 +328,7 @@ class ImageCompressor:
         Args:
             file_path: 输入图片文件路径
             output_path: 输出图片文件路径（可选，默认在原文件路径后添加'_compressed'）
-            quality: 压缩质量（1-100，仅JPEG/JPG有效）
+            quality: 压缩质量（1-100，仅JPEG/JPG/WEBP有效）
             
         Returns:
             Tuple[str, int]: 压缩后的图片文件路径和大小（字节）
@@ -198,21 +391,25 @@ class ImageCompressor:
         
         Args:
             image_bytes: 图片字节流
-            format: 图片格式（PNG/JPEG/JPG/BMP）
+            format: 图片格式（PNG/JPEG/JPG/BMP/WEBP）
             output_path: 输出图片文件路径（可选，不提供则返回字节流）
-            quality: 压缩质量（1-100，仅JPEG/JPG有效）
+            quality: 压缩质量（1-100，仅JPEG/JPG/WEBP有效）
             
         Returns:
             Tuple[Union[BytesIO, str], int]: 压缩后的图片字节流或文件路径，以及大小（字节）
             
         Raises:
             ValueError: 不支持的图片格式
+            ImageValidationError: 图片预检失败
         """
         # 验证格式
         format_upper = format.upper()
         if format_upper not in self.supported_formats:
             raise ValueError(f"不支持的图片格式：{format}。支持的格式：{', '.join(self.supported_formats.keys())}")
         
+        # 只读取图片头预检，拒绝过大、像素过多或无法识别的图片
+        self.preflight(image_bytes)
+        
         # 获取图片大小
         file_size = len(image_bytes)
         
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+生成图片的缩略图和多分辨率派生图
+
+生成的原图通常为2K分辨率、数MB，历史记录和消息中心的小卡片只需要几百像素。
+生成完成后为每张图片生成256px缩略图和768px预览图（WebP），与原图在同一批次上传，
+图片记录中同时保存各尺寸的URL：
+
+    {"url": 原图URL, "thumbnail": 256px URL, "preview": 768px URL, "index": 1}
+
+派生图按尺寸从大到小依次缩放：768px由原图缩放，256px由768px缩放，原图只解码一次。
+"""
+
+import io
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+# 派生图名称和最长边像素
+DERIVATIVE_SIZES = (
+    ('preview', 768),
+    ('thumbnail', 256),
+)
+
+# 派生图的格式和压缩质量
+DERIVATIVE_FORMAT = 'WEBP'
+DERIVATIVE_QUALITY = 80
+
+# 缩小时先用reduce整数倍缩小，再用LANCZOS缩放到目标尺寸
+REDUCING_GAP = 2.0
+
+
+def make_derivatives(
+    image_bytes: Union[bytes, bytearray, memoryview],
+    sizes: Sequence[Tuple[str, int]] = DERIVATIVE_SIZES,
+    quality: int = DERIVATIVE_QUALITY
+) -> Dict[str, bytes]:
+    """
+    为一张图片生成多个尺寸的WebP派生图
+
+    Args:
+        image_bytes: 原图字节流
+        sizes: (名称, 最长边像素)列表
+        quality: WebP压缩质量
+
+    Returns:
+        Dict[str, bytes]: 名称到派生图字节的映射；原图不大于目标尺寸时直接按原尺寸转码
+    """
+    largest = max(size for _, size in sizes)
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if image.format == 'JPEG':
+            # 未解码的JPEG按接近目标的比例直接缩小解码
+            image.draft('RGB', (largest, largest))
+        current = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    derivatives = {}
+    for name, size in sorted(sizes, key=lambda item: item[1], reverse=True):
+        # 依次由上一个尺寸继续缩小，只对原图做一次全尺寸缩放
+        current = current.copy() if max(current.size) <= size else _shrink(current, size)
+        buffer = io.BytesIO()
+        current.save(buffer, format=DERIVATIVE_FORMAT, quality=quality, method=4)
+        derivatives[name] = buffer.getvalue()
+    return derivatives
+
+
+def _shrink(image: Image.Image, size: int) -> Image.Image:
+    """按比例缩小到最长边为size"""
+    ratio = size / max(image.size)
+    new_size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+    return image.resize(new_size, Image.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def derivative_key(object_key: str, name: str) -> str:
+    """
+    生成派生图的对象键，与原图放在同一目录
+
+    Args:
+        object_key: 原图对象键，如 abc_0.png
+        name: 派生图名称，如 thumbnail
+
+    Returns:
+        str: 派生图对象键，如 abc_0_thumbnail.webp
+    """
+    base, _ = os.path.splitext(object_key)
+    return f"{base}_{name}.{DERIVATIVE_FORMAT.lower()}"
+
+
+def build_upload_items(
+    object_key: str,
+    image_bytes: bytes,
+    derivatives: Dict[str, bytes]
+) -> List[Tuple[str, bytes]]:
+    """
+    生成原图和派生图的上传列表
+
+    Args:
+        object_key: 原图对象键
+        image_bytes: 原图字节流
+        derivatives: make_derivatives返回的派生图
+
+    Returns:
+        List[Tuple[str, bytes]]: (对象键, 内容)列表，原图在前
+    """
+    items = [(object_key, image_bytes)]
+    items.extend((derivative_key(object_key, name), content) for name, content in derivatives.items())
+    return items
+
+
+def build_image_entry(index: int, url: str, variant_urls: Optional[Dict[str, str]] = None) -> Dict[str, object]:
+    """
+    生成图片记录项
+
+    Args:
+        index: 图片序号（从1开始）
+        url: 原图URL
+        variant_urls: 派生图名称到URL的映射，缺失的派生图使用原图URL
+
+    Returns:
+        Dict[str, object]: 图片记录项
+    """
+    variant_urls = variant_urls or {}
+    entry = {"url": url, "index": index}
+    for name, _ in DERIVATIVE_SIZES:
+        entry[name] = variant_urls.get(name) or url
+    return entry
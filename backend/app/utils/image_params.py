@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+生图参数中的图片字段处理
+
+模特图生成请求中的服饰图片以base64 data URL形式提交，单个字段就可能有数MB。
+这些数据不能写入original_image_record.params，也不能写入任务队列：提交任务前图片先上传到对象存储，
+params和任务参数中只保存URL；上传失败也只写占位符，绝不保存base64原文。
+"""
+
+import base64
+import hashlib
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# 模特图生成请求中的图片字段
+IMAGE_FIELDS = [
+    'uploaded_image',
+    'single_outfit_image',
+    'single_outfit_back_image',
+    'top_outfit_image',
+    'top_outfit_back_image',
+    'bottom_outfit_image',
+    'bottom_outfit_back_image'
+]
+
+# 图片上传完成前的占位符
+PLACEHOLDER_PENDING = 'pending_upload'
+
+# 图片上传失败时的占位符
+PLACEHOLDER_FAILED = 'upload_failed'
+
+DATA_URL_PATTERN = re.compile(r'^data:image/(\w+);base64,(.+)$', re.DOTALL)
+
+
+def is_data_url(value: Any) -> bool:
+    """判断是否为base64 data URL"""
+    return isinstance(value, str) and value.startswith('data:')
+
+
+def decode_base64_image(base64_data: str, prefix: str = 'model_images') -> Optional[Tuple[str, bytes]]:
+    """
+    解析base64编码的图片，由图片内容的sha256生成对象键
+
+    相同的图片总是得到相同的对象键，重复提交或任务重试不会在存储中产生新对象。
+
+    Args:
+        base64_data: base64编码的图片数据（data URL格式）
+        prefix: 对象键前缀
+
+    Returns:
+        解析成功返回(object_key, image_bytes)，失败返回None
+    """
+    if not base64_data:
+        return None
+
+    try:
+        match = DATA_URL_PATTERN.match(base64_data)
+
+        if not match:
+            print(f"[ERROR] base64数据格式不正确")
+            return None
+
+        image_format = match.group(1)
+        base64_string = match.group(2)
+
+        image_bytes = base64.b64decode(base64_string)
+
+        file_extension = f'.{image_format}' if image_format != 'jpeg' else '.jpg'
+        object_key = f"{prefix}/{hashlib.sha256(image_bytes).hexdigest()[:32]}{file_extension}"
+        return object_key, image_bytes
+
+    except Exception as e:
+        print(f"[ERROR] 解析base64图片时出错: {str(e)}")
+        return None
+
+
+def strip_image_payloads(params: Dict[str, Any], placeholder: str = PLACEHOLDER_PENDING) -> Dict[str, Any]:
+    """
+    返回去掉base64图片数据的参数副本，所有data URL替换为占位符
+
+    Args:
+        params: 生图参数
+        placeholder: 替换data URL的占位符
+
+    Returns:
+        Dict[str, Any]: 可以写入数据库的参数副本
+    """
+    return {
+        key: placeholder if is_data_url(value) else value
+        for key, value in params.items()
+    }
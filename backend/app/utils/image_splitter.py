@@ -1,27 +1,48 @@
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import io
+import threading
 
 class ImageSplitter:
     """
     图片分割工具类，支持将图片平均分割成2、4、6、9张
     """
     
-    def __init__(self, default_output_format='PNG'):
+    def __init__(self, default_output_format='PNG', max_workers=None):
         """
         初始化图片分割工具
         
         Args:
             default_output_format: 默认输出图片格式，如'PNG'、'JPEG'等
+            max_workers: 并行编码子图片的最大线程数，默认取CPU核数（最多4个）
         """
         self.default_output_format = default_output_format
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self):
+        """
+        获取编码线程池，首次使用时创建
+        
+        PIL在编码时会释放GIL，因此多个子图片可以在线程池中真正并行编码
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="image-splitter"
+                    )
+        return self._executor
     
     def _load_image(self, image_input):
         """
         加载图片，支持多种输入类型
         
         Args:
-            image_input: 输入图片（文件路径、字节流或PIL Image对象）
+            image_input: 输入图片（文件路径、字节流（bytes/bytearray/memoryview）或PIL Image对象）
             
         Returns:
             PIL Image对象
@@ -36,7 +57,7 @@ class ImageSplitter:
             if not os.path.exists(image_input):
                 raise IOError(f"图片文件不存在: {image_input}")
             return Image.open(image_input)
-        elif isinstance(image_input, bytes):
+        elif isinstance(image_input, (bytes, bytearray, memoryview)):
             return Image.open(io.BytesIO(image_input))
         else:
             raise TypeError(f"不支持的输入类型: {type(image_input).__name__}")
@@ -67,43 +88,54 @@ class ImageSplitter:
         
         return saved_paths
     
+    @staticmethod
+    def _encode(image, output_format):
+        """
+        将单个PIL Image对象编码为字节流
+        
+        Args:
+            image: PIL Image对象
+            output_format: 输出图片格式
+            
+        Returns:
+            字节流
+        """
+        buffer = io.BytesIO()
+        image.save(buffer, format=output_format)
+        return buffer.getvalue()
+    
     def _to_bytes(self, images, output_format=None):
         """
-        将PIL Image对象转换为字节流
+        将PIL Image对象转换为字节流，多张图片在线程池中并行编码
         
         Args:
             images: PIL Image对象列表
             output_format: 输出图片格式
             
         Returns:
-            字节流列表
-        """
-        bytes_list = []
-        for img in images:
-            buffer = io.BytesIO()
-            img.save(buffer, format=output_format)
-            buffer.seek(0)
-            bytes_list.append(buffer.getvalue())
-        return bytes_list
+            字节流列表，顺序与images一致
+        """
+        if len(images) <= 1 or self.max_workers <= 1:
+            return [self._encode(img, output_format) for img in images]
+        executor = self._get_executor()
+        return list(executor.map(lambda img: self._encode(img, output_format), images))
     
-    def split_image(self, image_input, split_count, split_mode=None, output_dir=None, output_format=None, return_bytes=False):
+    def _prepare(self, image_input, split_count, split_mode=None, output_format=None):
         """
-        分割图片
+        校验参数、加载图片并计算分割区域
         
         Args:
             image_input: 输入图片（文件路径、字节流或PIL Image对象）
             split_count: 分割数量（2、4、6、9）
-            split_mode: 分割模式（可选，根据split_count自动选择默认模式）
-            output_dir: 输出目录（可选，指定则保存到文件）
-            output_format: 输出图片格式（可选，默认使用输入图片格式）
-            return_bytes: 是否返回字节流（可选，默认返回PIL Image对象）
+            split_mode: 分割模式
+            output_format: 输出图片格式
             
         Returns:
-            分割后的子图片列表（PIL Image对象、文件路径或字节流，取决于参数设置）
+            (已加载的PIL Image对象, 分割区域列表, 输出图片格式)
         
         Raises:
             ValueError: 参数无效
-            IOError: 图片读取或保存失败
+            IOError: 图片读取失败
             TypeError: 输入类型不支持
         """
         # 验证分割数量
@@ -111,8 +143,9 @@ class ImageSplitter:
         if split_count not in supported_counts:
             raise ValueError(f"不支持的分割数量: {split_count}，仅支持{supported_counts}")
         
-        # 加载图片
+        # 加载图片，只解码一次，后续所有裁剪共用同一份像素数据
         original_image = self._load_image(image_input)
+        original_image.load()
         img_width, img_height = original_image.size
         
         # 确定输出格式
@@ -200,6 +233,30 @@ class ImageSplitter:
                 (split_width * 2, split_height * 2, img_width, img_height)
             ]
         
+        return original_image, boxes, output_format
+    
+    def split_image(self, image_input, split_count, split_mode=None, output_dir=None, output_format=None, return_bytes=False):
+        """
+        分割图片
+        
+        Args:
+            image_input: 输入图片（文件路径、字节流或PIL Image对象）
+            split_count: 分割数量（2、4、6、9）
+            split_mode: 分割模式（可选，根据split_count自动选择默认模式）
+            output_dir: 输出目录（可选，指定则保存到文件）
+            output_format: 输出图片格式（可选，默认使用输入图片格式）
+            return_bytes: 是否返回字节流（可选，默认返回PIL Image对象）
+            
+        Returns:
+            分割后的子图片列表（PIL Image对象、文件路径或字节流，取决于参数设置）
+        
+        Raises:
+            ValueError: 参数无效
+            IOError: 图片读取或保存失败
+            TypeError: 输入类型不支持
+        """
+        original_image, boxes, output_format = self._prepare(image_input, split_count, split_mode, output_format)
+        
         # 执行分割
         split_images = []
         for box in boxes:
@@ -213,3 +270,37 @@ class ImageSplitter:
             return self._to_bytes(split_images, output_format)
         else:
             return split_images
+    
+    def iter_split_bytes(self, image_input, split_count, split_mode=None, output_format=None):
+        """
+        分割图片并以生成器方式返回子图片字节流，每张子图片编码完成后立即返回
+        
+        所有子图片在线程池中并行编码，按完成先后顺序返回，调用方可以在其余子图片
+        仍在编码时就开始上传已完成的子图片。
+        
+        Args:
+            image_input: 输入图片（文件路径、字节流或PIL Image对象）
+            split_count: 分割数量（2、4、6、9）
+            split_mode: 分割模式（可选，根据split_count自动选择默认模式）
+            output_format: 输出图片格式（可选，默认使用输入图片格式）
+            
+        Yields:
+            (index, bytes): 子图片序号（与split_image返回顺序一致）和字节流
+        
+        Raises:
+            ValueError: 参数无效
+            IOError: 图片读取失败
+            TypeError: 输入类型不支持
+        """
+        original_image, boxes, output_format = self._prepare(image_input, split_count, split_mode, output_format)
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._encode, original_image.crop(box), output_format): index
+            for index, box in enumerate(boxes)
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
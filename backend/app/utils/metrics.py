@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+进程内指标（Prometheus文本格式）
+
+为图片处理链路提供计数器(Counter)、仪表(Gauge)和直方图(Histogram)，通过/metrics接口
+以Prometheus文本格式导出。所有指标都只是在锁内做几次加法，记录开销可以忽略。
+
+已定义的指标：
+- pipeline_stage_duration_seconds: 各阶段耗时直方图（pipeline, stage）
+- pipeline_stage_bytes: 各阶段输入/输出字节数直方图（pipeline, stage, direction）
+- pipeline_stage_errors_total: 各阶段失败次数（pipeline, stage）
+- pipeline_duration_seconds / pipeline_inflight: 整条流水线耗时和在途数量（pipeline）
+- provider_call_duration_seconds / provider_inflight: 外部服务调用耗时和在途数量（provider）
+- provider_calls_total: 外部服务调用次数（provider, outcome=success|error|rejected|cancelled）
+- provider_errors_total: 外部服务调用失败次数（provider, error）
+- tos_object_cache_*: TOS对象本地磁盘缓存的查询次数（outcome=hit|miss|stale）、节省和淘汰的字节数、
+  当前占用字节数，在object_cache中定义
+
+使用示例:
+
+    from app.utils.metrics import stage_timer, record_stage_bytes, render_metrics
+
+    with stage_timer('model-image-generation', 'decode'):
+        image_bytes = base64.b64decode(data)
+    record_stage_bytes('model-image-generation', 'decode', 'out', len(image_bytes))
+
+    text = render_metrics()
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 耗时直方图的默认分桶（秒），覆盖从毫秒级的本地处理到分钟级的Ark生图
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 字节数直方图的默认分桶：1KB到64MB，每档4倍
+DEFAULT_BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    """格式化标签，如 {stage="split",le="0.5"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """格式化数值"""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """
+    指标基类，按标签值保存子指标
+    """
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: 'MetricsRegistry' = None):
+        """
+        初始化指标
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名称列表
+            registry: 注册到的指标集合，默认使用全局REGISTRY
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """创建一组标签值对应的子指标"""
+
+    def labels(self, *values) -> Any:
+        """
+        获取指定标签值的子指标
+
+        Args:
+            *values: 与labelnames顺序一致的标签值
+
+        Returns:
+            子指标对象
+
+        Raises:
+            ValueError: 标签值数量与标签名称数量不一致
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际传入 {values}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """输出所有子指标的样本行"""
+
+    def render(self) -> str:
+        """以Prometheus文本格式输出"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class _Value:
+    """可加减的数值"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def get(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    """
+    只增不减的计数器
+    """
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        """增加无标签计数器的值"""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """
+    可增可减的仪表，用于在途数量等
+    """
+
+    type_name = 'gauge'
+
+    def dec(self, amount: float = 1) -> None:
+        """减少无标签仪表的值"""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """设置无标签仪表的值"""
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    """直方图的一组分桶计数"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+
+class Histogram(_Metric):
+    """
+    分桶直方图
+    """
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, registry: 'MetricsRegistry' = None):
+        """
+        初始化直方图
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名称列表
+            buckets: 分桶上界（升序），自动追加+Inf
+            registry: 注册到的指标集合
+        """
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """记录无标签直方图的一个观测值"""
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标集合
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        """
+        注册指标
+
+        Raises:
+            ValueError: 指标名称重复
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标名称重复: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """以Prometheus文本格式输出所有指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_DURATION = Histogram(
+    'pipeline_stage_duration_seconds', '流水线各阶段耗时（秒）', ['pipeline', 'stage'])
+STAGE_BYTES = Histogram(
+    'pipeline_stage_bytes', '流水线各阶段输入/输出的字节数', ['pipeline', 'stage', 'direction'],
+    buckets=DEFAULT_BYTES_BUCKETS)
+STAGE_ERRORS = Counter(
+    'pipeline_stage_errors_total', '流水线各阶段失败次数', ['pipeline', 'stage'])
+PIPELINE_DURATION = Histogram(
+    'pipeline_duration_seconds', '整条流水线耗时（秒）', ['pipeline'])
+PIPELINE_INFLIGHT = Gauge(
+    'pipeline_inflight', '正在运行的流水线数量', ['pipeline'])
+PROVIDER_DURATION = Histogram(
+    'provider_call_duration_seconds', '外部服务调用耗时（秒，不含排队）', ['provider'])
+PROVIDER_INFLIGHT = Gauge(
+    'provider_inflight', '外部服务在途调用数量（执行中+排队中）', ['provider'])
+PROVIDER_CALLS = Counter(
+    'provider_calls_total', '外部服务调用次数', ['provider', 'outcome'])
+PROVIDER_ERRORS = Counter(
+    'provider_errors_total', '外部服务调用失败次数', ['provider', 'error'])
+
+
+def payload_size(value: Any) -> Optional[int]:
+    """
+    计算阶段输入/输出的字节数
+
+    Args:
+        value: 阶段的输入或输出值
+
+    Returns:
+        int or None: bytes/bytearray/memoryview或其列表的总字节数，其他类型返回None
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, (bytes, bytearray)) for item in value):
+        return sum(len(item) for item in value)
+    return None
+
+
+def record_stage_bytes(pipeline: str, stage: str, direction: str, size: Optional[int]) -> None:
+    """
+    记录阶段输入/输出的字节数
+
+    Args:
+        pipeline: 流水线名称
+        stage: 阶段名称
+        direction: 'in'或'out'
+        size: 字节数，为None时不记录
+    """
+    if size is not None:
+        STAGE_BYTES.labels(pipeline, stage, direction).observe(size)
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str):
+    """
+    记录一段代码的耗时和失败次数，用于不在Pipeline中执行的阶段
+
+    Args:
+        pipeline: 流水线名称
+        stage: 阶段名称
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(pipeline, stage).inc()
+        raise
+    finally:
+        STAGE_DURATION.labels(pipeline, stage).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> str:
+    """以Prometheus文本格式输出所有指标"""
+    return REGISTRY.render()
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""
+TOS对象本地磁盘缓存
+
+生成时反复使用的参考图（模特图、场景图、姿势骨架图）和后台预览图会被多次从TOS下载，
+DiskObjectCache把这些对象缓存在本机磁盘上，TOSClient.get_object/get_object_to_file命中时
+直接读本地文件：
+1. 文件按内容的SHA-256命名（blobs/ab/cd/<digest>），内容相同的对象只存一份
+2. 写入先落到同目录的临时文件，完成后os.replace原子改名，读者不会看到写了一半的文件
+3. 索引保存在缓存目录下的SQLite数据库（WAL模式），同一台机器上的多个uvicorn worker
+   共享同一份缓存和容量统计
+4. 总字节数超过上限时按最久未访问的顺序淘汰文件，直到回到上限以内
+5. 命中、未命中和节省的下载字节数通过/metrics导出（tos_object_cache_*）
+
+缓存只按对象键索引，不感知其他机器上的写入：条目超过revalidate_after秒后，下一次读取会先
+用head_object比对ETag，不一致时丢弃缓存重新下载；经由TOSClient的写入和删除会直接失效对应条目。
+
+使用示例:
+
+    from app.utils.object_cache import get_object_cache
+
+    cache = get_object_cache()
+    entry = cache.get('bucket', 'models/1.png')
+    if entry is None:
+        content = download()
+        cache.put_bytes('bucket', 'models/1.png', content, etag=etag)
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, IO, Optional
+
+from ..config import cache_config
+from .metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+OBJECT_CACHE_REQUESTS = Counter(
+    'tos_object_cache_requests_total', 'TOS对象磁盘缓存查询次数', ['outcome'])
+OBJECT_CACHE_BYTES_SAVED = Counter(
+    'tos_object_cache_bytes_saved_total', 'TOS对象磁盘缓存命中节省的下载字节数')
+OBJECT_CACHE_EVICTED_BYTES = Counter(
+    'tos_object_cache_evicted_bytes_total', 'TOS对象磁盘缓存淘汰的字节数')
+OBJECT_CACHE_SIZE = Gauge(
+    'tos_object_cache_size_bytes', 'TOS对象磁盘缓存当前占用的字节数')
+
+# 复制文件时每次读取的字节数
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        last_access REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access)",
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        bucket TEXT NOT NULL,
+        object_key TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        etag TEXT,
+        content_type TEXT,
+        validated_at REAL NOT NULL,
+        PRIMARY KEY (bucket, object_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries (digest)",
+)
+
+
+class DiskObjectCache:
+    """
+    按字节数限制容量的TOS对象LRU磁盘缓存，多进程共享
+    """
+
+    def __init__(self,
+                 directory: str,
+                 max_bytes: int,
+                 max_object_bytes: Optional[int] = None,
+                 revalidate_after: float = 300):
+        """
+        初始化缓存
+
+        Args:
+            directory: 缓存目录，不存在时自动创建
+            max_bytes: 缓存文件总字节数上限
+            max_object_bytes: 单个对象的最大字节数，超过的对象不缓存，默认为max_bytes的1/4
+            revalidate_after: 条目写入或上次校验后经过多少秒需要重新比对ETag
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes or max_bytes // 4
+        self.revalidate_after = revalidate_after
+        self._blob_dir = os.path.join(directory, 'blobs')
+        self._index_path = os.path.join(directory, 'index.db')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._stores = 0
+        self._bytes_saved = 0
+        self._evicted_bytes = 0
+        os.makedirs(self._blob_dir, exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取索引数据库连接，fork后的子进程重新建立连接（调用方持有self._lock）"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self._index_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def blob_path(self, digest: str) -> str:
+        """
+        获取内容摘要对应的缓存文件路径
+
+        Args:
+            digest: 内容的SHA-256十六进制摘要
+
+        Returns:
+            str: 缓存文件路径，按摘要前4位分两级子目录
+        """
+        return os.path.join(self._blob_dir, digest[:2], digest[2:4], digest)
+
+    def get(self, bucket: str, object_key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存条目，命中时更新最近访问时间
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+
+        Returns:
+            dict or None: 缓存条目，包含path、size、etag、content_type、digest、
+                needs_revalidation；未命中或缓存文件已被淘汰时返回None
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT e.digest, e.etag, e.content_type, e.validated_at, b.size '
+                'FROM entries e JOIN blobs b ON b.digest = e.digest '
+                'WHERE e.bucket = ? AND e.object_key = ?',
+                (bucket, object_key)
+            ).fetchone()
+            if row is not None:
+                conn.execute('UPDATE blobs SET last_access = ? WHERE digest = ?', (now, row[0]))
+
+        if row is None:
+            return None
+        digest, etag, content_type, validated_at, size = row
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            # 文件被手工清理过，丢弃索引
+            self.invalidate(bucket, object_key)
+            return None
+        return {
+            'path': path,
+            'size': size,
+            'etag': etag,
+            'content_type': content_type,
+            'digest': digest,
+            'needs_revalidation': now - validated_at >= self.revalidate_after
+        }
+
+    def mark_validated(self, bucket: str, object_key: str) -> None:
+        """
+        记录条目已通过ETag校验
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+        """
+        with self._lock:
+            self._connection().execute(
+                'UPDATE entries SET validated_at = ? WHERE bucket = ? AND object_key = ?',
+                (time.time(), bucket, object_key)
+            )
+
+    def record_hit(self, size: int) -> None:
+        """
+        记录一次命中
+
+        Args:
+            size: 命中对象的字节数，计入节省的下载字节数
+        """
+        with self._lock:
+            self._hits += 1
+            self._bytes_saved += size
+        OBJECT_CACHE_REQUESTS.labels('hit').inc()
+        OBJECT_CACHE_BYTES_SAVED.inc(size)
+
+    def record_miss(self, stale: bool = False) -> None:
+        """
+        记录一次未命中
+
+        Args:
+            stale: 是否因为ETag不一致而未命中
+        """
+        with self._lock:
+            if stale:
+                self._stale += 1
+            else:
+                self._misses += 1
+        OBJECT_CACHE_REQUESTS.labels('stale' if stale else 'miss').inc()
+
+    def put_bytes(self,
+                  bucket: str,
+                  object_key: str,
+                  content: bytes,
+                  etag: Optional[str] = None,
+                  content_type: Optional[str] = None) -> bool:
+        """
+        缓存对象内容
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            content: 对象内容
+            etag: 对象ETag
+            content_type: 对象MIME类型
+
+        Returns:
+            bool: 是否写入缓存（对象超过单对象上限时不缓存）
+        """
+        if len(content) > self.max_object_bytes:
+            return False
+        digest = hashlib.sha256(content).hexdigest()
+        return self._store(bucket, object_key, digest, len(content), etag, content_type,
+                           lambda f: f.write(content))
+
+    def put_file(self,
+                 bucket: str,
+                 object_key: str,
+                 file_path: str,
+                 etag: Optional[str] = None,
+                 content_type: Optional[str] = None) -> bool:
+        """
+        缓存本地文件的内容
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            file_path: 已下载完成的本地文件
+            etag: 对象ETag
+            content_type: 对象MIME类型
+
+        Returns:
+            bool: 是否写入缓存（对象超过单对象上限时不缓存）
+        """
+        size = os.path.getsize(file_path)
+        if size > self.max_object_bytes:
+            return False
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_COPY_CHUNK_SIZE), b''):
+                sha.update(chunk)
+
+        def write(target: IO) -> None:
+            with open(file_path, 'rb') as source:
+                shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+
+        return self._store(bucket, object_key, sha.hexdigest(), size, etag, content_type, write)
+
+    def _store(self, bucket: str, object_key: str, digest: str, size: int,
+               etag: Optional[str], content_type: Optional[str], write) -> bool:
+        """
+        写入缓存文件并登记索引
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            digest: 内容摘要
+            size: 内容字节数
+            etag: 对象ETag
+            content_type: 对象MIME类型
+            write: 把内容写入已打开文件的函数
+
+        Returns:
+            bool: 是否写入成功
+        """
+        path = self.blob_path(digest)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.fill-')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        write(f)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+
+            now = time.time()
+            with self._lock:
+                conn = self._connection()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.execute(
+                        'INSERT INTO blobs (digest, size, last_access) VALUES (?, ?, ?) '
+                        'ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access',
+                        (digest, size, now)
+                    )
+                    conn.execute(
+                        'INSERT OR REPLACE INTO entries '
+                        '(bucket, object_key, digest, etag, content_type, validated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                        (bucket, object_key, digest, etag, content_type, now)
+                    )
+                    evicted = self._evict_locked(conn)
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                self._stores += 1
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"[ObjectCache] 写入缓存失败: {bucket}/{object_key}, error: {e}")
+            return False
+
+        self._remove_blobs(evicted)
+        return True
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """
+        淘汰最久未访问的文件直到总字节数不超过上限（在写事务内调用）
+
+        Args:
+            conn: 已开启写事务的数据库连接
+
+        Returns:
+            Dict[str, int]: 被淘汰的摘要和字节数，文件在事务提交后删除
+        """
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+        evicted: Dict[str, int] = {}
+        if total > self.max_bytes:
+            for digest, size in conn.execute('SELECT digest, size FROM blobs ORDER BY last_access').fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted[digest] = size
+                total -= size
+            for digest in evicted:
+                conn.execute('DELETE FROM entries WHERE digest = ?', (digest,))
+                conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+        OBJECT_CACHE_SIZE.set(total)
+        return evicted
+
+    def _remove_blobs(self, evicted: Dict[str, int]) -> None:
+        """
+        删除已从索引中移除的缓存文件
+
+        其他进程可能正在读取这些文件，POSIX下删除后已打开的文件仍可读完。
+
+        Args:
+            evicted: 摘要和字节数
+        """
+        if not evicted:
+            return
+        for digest in evicted:
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"[ObjectCache] 删除缓存文件失败: {digest}, error: {e}")
+        evicted_bytes = sum(evicted.values())
+        with self._lock:
+            self._evicted_bytes += evicted_bytes
+        OBJECT_CACHE_EVICTED_BYTES.inc(evicted_bytes)
+        logger.info(f"[ObjectCache] 淘汰 {len(evicted)} 个缓存文件, 共 {evicted_bytes} bytes")
+
+    def invalidate(self, bucket: str, object_key: str) -> None:
+        """
+        删除对象键对应的缓存条目，没有其他条目引用的文件一并删除
+
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+        """
+        orphans: Dict[str, int] = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = conn.execute(
+                        'SELECT digest FROM entries WHERE bucket = ? AND object_key = ?', (bucket, object_key)
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute('DELETE FROM entries WHERE bucket = ? AND object_key = ?', (bucket, object_key))
+                        digest = row[0]
+                        if conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone() is None:
+                            size = conn.execute('SELECT size FROM blobs WHERE digest = ?', (digest,)).fetchone()
+                            conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                            orphans[digest] = size[0] if size else 0
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+        except sqlite3.Error as e:
+            logger.error(f"[ObjectCache] 删除缓存条目失败: {bucket}/{object_key}, error: {e}")
+            return
+        for digest in orphans:
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存指标
+
+        Returns:
+            Dict[str, Any]: 当前进程的命中、未命中次数、命中率和节省的字节数，
+                以及所有进程共享的条目数和占用字节数
+        """
+        with self._lock:
+            conn = self._connection()
+            files, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+            entries = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            lookups = self._hits + self._misses + self._stale
+            return {
+                'directory': self.directory,
+                'entries': entries,
+                'files': files,
+                'size_bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'stale': self._stale,
+                'stores': self._stores,
+                'bytes_saved': self._bytes_saved,
+                'evicted_bytes': self._evicted_bytes,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_object_cache: Optional[DiskObjectCache] = None
+
+
+def get_object_cache() -> Optional[DiskObjectCache]:
+    """获取共享的TOS对象磁盘缓存实例，未启用时返回None"""
+    global _object_cache
+    if _object_cache is None and cache_config.OBJECT_CACHE_ENABLED:
+        _object_cache = DiskObjectCache(
+            directory=cache_config.OBJECT_CACHE_DIR or os.path.join(tempfile.gettempdir(), 'tos_object_cache'),
+            max_bytes=cache_config.OBJECT_CACHE_MAX_BYTES,
+            max_object_bytes=cache_config.OBJECT_CACHE_MAX_OBJECT_BYTES or None,
+            revalidate_after=cache_config.OBJECT_CACHE_REVALIDATE_AFTER
+        )
+    return _object_cache
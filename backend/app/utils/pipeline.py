@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+分阶段DAG流水线执行器
+
+每个阶段(Stage)声明自己依赖的输入名称，执行器按依赖关系调度：
+所有输入都已就绪的阶段会被立即并发执行，互不依赖的阶段（例如商品分类与商品分割）
+因此可以重叠执行。每次运行都会记录各阶段的耗时，便于定位慢阶段；
+耗时、输入/输出字节数、失败次数和在途数量同时记录到metrics中，通过/metrics接口导出。
+
+使用示例:
+
+    pipeline = Pipeline()
+    pipeline.add_stage('classify', classify_func, inputs=['image_data'])
+    pipeline.add_stage('segment', segment_func, inputs=['image_data'])
+    pipeline.add_stage('generate', generate_func, inputs=['classify', 'segment'])
+
+    result = await pipeline.run({'image_data': image_bytes})
+    print(result.values['generate'], result.timings)
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .metrics import (
+    PIPELINE_DURATION, PIPELINE_INFLIGHT, STAGE_DURATION, STAGE_ERRORS,
+    payload_size, record_stage_bytes
+)
+
+
+class Stage:
+    """
+    流水线阶段定义
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Optional[Iterable[str]] = None, default: Any = None):
+        """
+        初始化流水线阶段
+
+        Args:
+            name: 阶段名称，同时也是该阶段输出值的名称
+            func: 阶段函数，按inputs的顺序接收参数；可以是协程函数或普通函数
+                  （普通函数会被放到线程池中执行，避免阻塞事件循环）
+            inputs: 依赖的输入名称列表，可以是初始参数名或其他阶段名
+            default: 阶段执行失败时使用的输出值
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs or [])
+        self.default = default
+
+    async def execute(self, values: Dict[str, Any]) -> Any:
+        """
+        使用已就绪的输入执行阶段函数
+
+        Args:
+            values: 当前所有已就绪的值
+
+        Returns:
+            阶段函数的返回值
+        """
+        args = [values[name] for name in self.inputs]
+        if inspect.iscoroutinefunction(self.func):
+            return await self.func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.func(*args))
+
+
+class PipelineResult:
+    """
+    流水线运行结果
+    """
+
+    def __init__(self):
+        # 所有初始参数和各阶段的输出值
+        self.values: Dict[str, Any] = {}
+        # 各阶段耗时（毫秒）
+        self.timings: Dict[str, float] = {}
+        # 执行失败的阶段及其错误信息
+        self.errors: Dict[str, str] = {}
+        # 整体耗时（毫秒）
+        self.total_ms: float = 0.0
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """获取某个阶段的输出值"""
+        return self.values.get(name, default)
+
+    def timing_report(self) -> Dict[str, Any]:
+        """
+        生成耗时报告
+
+        Returns:
+            Dict[str, Any]: 包含各阶段耗时、总耗时和失败阶段的字典
+        """
+        return {
+            'stages': {name: round(ms, 2) for name, ms in self.timings.items()},
+            'total_ms': round(self.total_ms, 2),
+            'errors': dict(self.errors)
+        }
+
+
+class Pipeline:
+    """
+    基于依赖声明的异步DAG流水线
+    """
+
+    def __init__(self, name: str = 'pipeline'):
+        """
+        初始化流水线
+
+        Args:
+            name: 流水线名称，用于日志输出
+        """
+        self.name = name
+        self._stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name: str, func: Callable, inputs: Optional[Iterable[str]] = None, default: Any = None) -> 'Pipeline':
+        """
+        添加阶段
+
+        Args:
+            name: 阶段名称
+            func: 阶段函数
+            inputs: 依赖的输入名称列表
+            default: 阶段执行失败时使用的输出值
+
+        Returns:
+            Pipeline: 当前流水线，支持链式调用
+
+        Raises:
+            ValueError: 阶段名称重复
+        """
+        if name in self._stages:
+            raise ValueError(f"阶段名称重复: {name}")
+        self._stages[name] = Stage(name, func, inputs, default)
+        return self
+
+    @property
+    def stages(self) -> List[Stage]:
+        """按添加顺序返回所有阶段"""
+        return list(self._stages.values())
+
+    def _validate(self, initial: Dict[str, Any]) -> None:
+        """
+        校验依赖关系，确保所有输入都能被满足且不存在环
+
+        Raises:
+            ValueError: 存在未知输入或循环依赖
+        """
+        available = set(initial)
+        for stage in self._stages.values():
+            for name in stage.inputs:
+                if name not in available and name not in self._stages:
+                    raise ValueError(f"阶段 {stage.name} 依赖未知输入: {name}")
+
+        # 模拟调度一遍，检查循环依赖
+        resolved = set(initial)
+        pending = dict(self._stages)
+        while pending:
+            ready = [name for name, stage in pending.items() if all(i in resolved for i in stage.inputs)]
+            if not ready:
+                raise ValueError(f"流水线存在循环依赖: {', '.join(pending)}")
+            for name in ready:
+                resolved.add(name)
+                del pending[name]
+
+    async def run(self, initial: Optional[Dict[str, Any]] = None) -> PipelineResult:
+        """
+        运行流水线
+
+        Args:
+            initial: 初始参数字典
+
+        Returns:
+            PipelineResult: 运行结果，包含各阶段输出、耗时和错误信息
+        """
+        initial = dict(initial or {})
+        self._validate(initial)
+
+        result = PipelineResult()
+        result.values.update(initial)
+
+        pending = dict(self._stages)
+        running: Dict[asyncio.Task, str] = {}
+        started_at: Dict[str, float] = {}
+        run_start = time.perf_counter()
+        inflight = PIPELINE_INFLIGHT.labels(self.name)
+        inflight.inc()
+
+        try:
+            while pending or running:
+                # 启动所有输入已就绪的阶段
+                for name in [n for n, s in pending.items() if all(i in result.values for i in s.inputs)]:
+                    stage = pending.pop(name)
+                    started_at[name] = time.perf_counter()
+                    input_sizes = [payload_size(result.values[i]) for i in stage.inputs]
+                    if any(size is not None for size in input_sizes):
+                        record_stage_bytes(self.name, name, 'in', sum(size or 0 for size in input_sizes))
+                    running[asyncio.ensure_future(stage.execute(result.values))] = name
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    elapsed = time.perf_counter() - started_at[name]
+                    result.timings[name] = elapsed * 1000
+                    STAGE_DURATION.labels(self.name, name).observe(elapsed)
+                    try:
+                        result.values[name] = task.result()
+                        record_stage_bytes(self.name, name, 'out', payload_size(result.values[name]))
+                    except Exception as e:
+                        print(f"[WARNING] {self.name} 阶段 {name} 执行失败: {type(e).__name__} - {e}")
+                        STAGE_ERRORS.labels(self.name, name).inc()
+                        result.errors[name] = str(e)
+                        result.values[name] = self._stages[name].default
+        finally:
+            inflight.dec()
+            for task in running:
+                task.cancel()
+
+        result.total_ms = (time.perf_counter() - run_start) * 1000
+        PIPELINE_DURATION.labels(self.name).observe(result.total_ms / 1000)
+        return result
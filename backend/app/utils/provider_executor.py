@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+外部服务调用隔舱（Bulkhead）
+
+阿里云SDK、火山引擎Ark、TOS以及requests都是同步阻塞调用，直接在async接口中调用会冻结
+uvicorn事件循环。本模块为每个外部服务提供一个独立的有界线程池：
+1. 每个服务有自己的最大并发数(max_workers)和最大排队数(max_queue)，
+   某个服务变慢只会占满它自己的线程池，不会拖垮事件循环和其他服务
+2. 排队已满时立即拒绝（抛出ProviderBusyError），而不是无限堆积
+3. 记录排队等待时间、执行时间、在途数量、拒绝次数等指标，并同步到/metrics接口
+
+使用示例:
+
+    from app.utils.provider_executor import get_provider_executor, PROVIDER_ARK
+
+    executor = get_provider_executor(PROVIDER_ARK)
+    # 在async函数中
+    result = await executor.run(client.images.generate, prompt=prompt)
+    # 在同步代码中
+    result = executor.call(client.images.generate, prompt=prompt)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from ..config import executor_config
+from .metrics import PROVIDER_CALLS, PROVIDER_DURATION, PROVIDER_ERRORS, PROVIDER_INFLIGHT
+
+# 外部服务名称
+PROVIDER_ALIYUN_IMAGESEG = 'aliyun_imageseg'
+PROVIDER_ALIYUN_GOODSTECH = 'aliyun_goodstech'
+PROVIDER_ARK = 'ark'
+PROVIDER_TOS = 'tos'
+PROVIDER_HTTP = 'http'
+
+
+class ProviderBusyError(RuntimeError):
+    """外部服务线程池排队已满"""
+
+    def __init__(self, provider: str, limit: int):
+        self.provider = provider
+        self.limit = limit
+        super().__init__(f"外部服务 {provider} 繁忙，在途请求已达上限 {limit}")
+
+
+class ProviderExecutor:
+    """
+    单个外部服务的有界线程池
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        初始化外部服务线程池
+
+        Args:
+            name: 外部服务名称
+            max_workers: 最大并发执行数
+            max_queue: 最大排队数（不含正在执行的任务）
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"provider-{name}")
+        self._lock = threading.Lock()
+
+        # 指标
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        提交任务到线程池
+
+        Args:
+            func: 要执行的阻塞函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            Future: concurrent.futures.Future对象
+
+        Raises:
+            ProviderBusyError: 在途任务数（执行中+排队中）已达上限
+        """
+        limit = self.max_workers + self.max_queue
+        with self._lock:
+            if self._queued + self._running >= limit:
+                self._rejected += 1
+                PROVIDER_CALLS.labels(self.name, 'rejected').inc()
+                raise ProviderBusyError(self.name, limit)
+            self._queued += 1
+            self._submitted += 1
+
+        enqueued_at = time.perf_counter()
+        inflight = PROVIDER_INFLIGHT.labels(self.name)
+        inflight.inc()
+
+        def task():
+            started_at = time.perf_counter()
+            wait = started_at - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                failed = True
+                PROVIDER_ERRORS.labels(self.name, type(e).__name__).inc()
+                raise
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._run_total += elapsed
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+                inflight.dec()
+                PROVIDER_DURATION.labels(self.name).observe(elapsed)
+                PROVIDER_CALLS.labels(self.name, 'error' if failed else 'success').inc()
+
+        def on_done(future: Future):
+            # 排队中被取消（例如await超时）的任务不会执行，需要在这里归还排队计数
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+                    self._cancelled += 1
+                inflight.dec()
+                PROVIDER_CALLS.labels(self.name, 'cancelled').inc()
+
+        try:
+            future = self._pool.submit(task)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            inflight.dec()
+            raise
+        future.add_done_callback(on_done)
+        return future
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在async函数中执行阻塞调用，等待期间不阻塞事件循环
+
+        await被取消时，尚未开始执行的任务会从线程池中移除
+
+        Args:
+            func: 要执行的阻塞函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在同步代码中通过线程池执行阻塞调用，共享同一并发限制
+
+        Args:
+            func: 要执行的阻塞函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            函数返回值
+        """
+        return self.submit(func, *args, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取线程池指标
+
+        Returns:
+            Dict[str, Any]: 包含在途数量、排队数量、饱和度、等待时间等指标的字典
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            started = finished + self._running
+            return {
+                'provider': self.name,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queued': self._queued,
+                'saturation': round((self._running + self._queued) / (self.max_workers + self.max_queue), 4),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'cancelled': self._cancelled,
+                'queue_wait_avg_ms': round(self._wait_total / started * 1000, 2) if started else 0.0,
+                'queue_wait_max_ms': round(self._wait_max * 1000, 2),
+                'run_avg_ms': round(self._run_total / finished * 1000, 2) if finished else 0.0
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        self._pool.shutdown(wait=wait)
+
+
+_executors: Dict[str, ProviderExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_provider_executor(provider: str) -> ProviderExecutor:
+    """
+    获取外部服务对应的线程池，首次获取时按配置创建
+
+    Args:
+        provider: 外部服务名称
+
+    Returns:
+        ProviderExecutor: 该服务的线程池
+    """
+    executor = _executors.get(provider)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(provider)
+            if executor is None:
+                max_workers, max_queue = executor_config.get_limits(provider)
+                executor = ProviderExecutor(provider, max_workers, max_queue)
+                _executors[provider] = executor
+    return executor
+
+
+def get_executor_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有外部服务线程池的指标
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 服务名称到指标的映射
+    """
+    return {name: executor.stats() for name, executor in list(_executors.items())}
+
+
+def shutdown_provider_executors(wait: bool = True) -> None:
+    """关闭所有外部服务线程池"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,668 @@
+# -*- coding: utf-8 -*-
+"""
+统一的对象存储接口
+
+后台上传的系统图片、模特图和参考图通过StorageBackend读写，具体存储由STORAGE_BACKEND决定：
+- local: 本地文件系统（默认），无需任何云服务，可离线运行和压测
+- tos: 火山引擎TOS，复用TOSClient（连接池、分片上传、本地磁盘缓存）
+- oss: 阿里云OSS，复用AliyunOSSUploader
+
+生图流程上传的服饰图和切分结果使用generation存储空间，存储后端由STORAGE_GENERATION_BACKEND
+单独决定（默认tos，对象键与原来直接使用TOSClient时相同）；设置为local后生图流程不需要存储桶，可离线运行。
+
+每个存储空间（STORAGE_NAMESPACES）对应本地存储下的一个子目录，或对象存储中的一个对象键前缀
+（STORAGE_OBJECT_PREFIXES中配置的存储空间除外）。
+本地存储的实现要点：
+1. 新文件的对象键带两级十六进制分片目录（如 backgrounds/3f/a2/3fa2...c1.jpg），
+   单个目录下的文件数保持在几千以内，几十万个文件时目录查找和列举仍然很快；
+   分片目录是对象键的一部分，历史上没有分片的对象键和URL照常可用
+2. 上传内容按块从文件对象写入同目录的临时文件，完成后os.replace原子改名，
+   内存中最多只有一个分块，读者也不会看到写了一半的文件
+3. 所有存储空间的文件URL由同一个文件接口调用response()返回，下载由FileResponse发送：服务器支持http.response.pathsend扩展时由服务器用sendfile零拷贝发送；
+   配置了STORAGE_LOCAL_ACCEL_REDIRECT_PREFIX时返回X-Accel-Redirect，由nginx用sendfile发送
+
+切换到tos/oss后，本地存储目录仍存在的存储空间用LocalFallbackStorage包装：数据库中已有的
+本地URL（/api/v1/.../files/<对象键>）继续从本地目录读取和删除，新文件写入对象存储。
+
+使用示例:
+
+    from app.utils.storage import get_storage, save_upload
+
+    storage = get_storage('sys-images')
+    image_url = save_upload(storage, file, 'backgrounds')
+    storage.delete_url(image_url)
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from starlette.responses import FileResponse, RedirectResponse, Response
+
+from ..config import storage_config, tos_config
+
+logger = logging.getLogger(__name__)
+
+# 存储空间名称 -> 本地存储时文件的URL前缀（由app/api/storage_files.py中的文件接口处理）
+STORAGE_NAMESPACES = {
+    'sys-images': '/api/v1/sys-images/files',
+    'yilaitumodel': '/api/v1/yilaitumodel/files',
+    'cankaotu': '/api/v1/yilaitumodel/cankaotu',
+    'generation': '/api/v1/generation/files'
+}
+
+# 生图流程使用的存储空间
+GENERATION_STORAGE = 'generation'
+
+# 对象存储中对象键前缀与存储空间名称不同的存储空间
+# 生图图片沿用原来的对象键（如model_images/xxx.png），不加前缀
+STORAGE_OBJECT_PREFIXES = {
+    GENERATION_STORAGE: ''
+}
+
+# put_many默认同时写入的对象数
+PUT_MANY_MAX_WORKERS = tos_config.BATCH_UPLOAD_MAX_WORKERS
+
+# 流式写入时每次读取的字节数
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    对象存储接口，对象键使用/分隔的相对路径
+    """
+
+    def new_key(self, prefix: str, suffix: str) -> str:
+        """
+        生成新对象的对象键
+
+        Args:
+            prefix: 对象键前缀（如backgrounds），为空时不加前缀
+            suffix: 文件名后缀，通常为扩展名（如.jpg）
+
+        Returns:
+            str: 随机文件名的对象键
+        """
+        name = f"{uuid.uuid4().hex}{suffix}"
+        return f"{prefix}/{name}" if prefix else name
+
+    @abstractmethod
+    def put(self, key: str, content: Union[bytes, IO], content_type: Optional[str] = None) -> str:
+        """
+        写入对象，已存在时覆盖
+
+        Args:
+            key: 对象键
+            content: 对象内容，或已定位到开头的文件对象（按块读取）
+            content_type: 对象MIME类型
+
+        Returns:
+            str: 对象的访问URL
+        """
+
+    @abstractmethod
+    def put_file(self, file_path: str, key: str, content_type: Optional[str] = None) -> str:
+        """
+        从本地文件写入对象
+
+        Args:
+            file_path: 本地文件路径
+            key: 对象键
+            content_type: 对象MIME类型
+
+        Returns:
+            str: 对象的访问URL
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """
+        读取对象内容
+
+        Raises:
+            FileNotFoundError: 对象不存在（本地存储）
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """删除对象，对象不存在时不报错"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """判断对象是否存在"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """获取对象的访问URL"""
+
+    def key_from_url(self, url: Optional[str]) -> Optional[str]:
+        """
+        从访问URL反推对象键
+
+        Args:
+            url: url()返回的访问URL
+
+        Returns:
+            str or None: 对象键，URL不属于当前存储时返回None
+        """
+        base = self.url('')
+        if not url or not url.startswith(base) or len(url) == len(base):
+            return None
+        return url[len(base):]
+
+    def delete_url(self, url: Optional[str]) -> bool:
+        """
+        删除访问URL对应的对象，失败时只记录日志
+
+        Args:
+            url: url()返回的访问URL
+
+        Returns:
+            bool: 是否删除成功（URL不属于当前存储或删除失败时返回False）
+        """
+        key = self.key_from_url(url)
+        if key is None:
+            return False
+        try:
+            self.delete(key)
+            return True
+        except Exception as e:
+            logger.warning(f"[Storage] 删除对象失败: {key}, error: {e}")
+            return False
+
+    def response(self, key: str) -> Response:
+        """
+        构造返回对象内容的HTTP响应，默认重定向到对象的访问URL
+
+        Args:
+            key: 对象键
+
+        Returns:
+            Response: HTTP响应
+        """
+        return RedirectResponse(self.url(key))
+
+    async def get_async(self, key: str) -> bytes:
+        """在线程池中读取对象内容，不阻塞事件循环，参见get"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, key)
+
+    async def put_many(self,
+                       items: List[Tuple[str, Union[bytes, IO]]],
+                       max_workers: int = PUT_MANY_MAX_WORKERS) -> List[Dict[str, Any]]:
+        """
+        并发写入多个对象，不阻塞事件循环，单个对象失败不影响其他对象
+
+        默认实现在线程池中逐个调用put，同时写入的对象数不超过max_workers。
+
+        Args:
+            items: (对象键, 对象内容或文件对象)列表
+            max_workers: 同时写入的对象数
+
+        Returns:
+            List[Dict]: 与items顺序一致的结果，格式与TOSClient.put_objects相同：
+                成功时 {'success': True, 'object_key', 'object_url'}，
+                失败时 {'success': False, 'object_key', 'error'}
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def put(key: str, content: Union[bytes, IO]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    url = await loop.run_in_executor(None, self.put, key, content)
+                    return {'success': True, 'object_key': key, 'object_url': url}
+                except Exception as e:
+                    return {'success': False, 'object_key': key, 'error': str(e) or type(e).__name__}
+
+        return list(await asyncio.gather(*(put(key, content) for key, content in items)))
+
+
+class LocalStorage(StorageBackend):
+    """
+    本地文件系统存储
+    """
+
+    def __init__(self,
+                 root: str,
+                 url_prefix: str,
+                 shard_depth: int = 2,
+                 accel_redirect_prefix: Optional[str] = None,
+                 chunk_size: int = WRITE_CHUNK_SIZE):
+        """
+        初始化本地存储
+
+        Args:
+            root: 存储根目录，不存在时自动创建
+            url_prefix: 访问URL前缀，URL为 前缀/对象键
+            shard_depth: 新对象键的分片目录层数，每层两个十六进制字符
+            accel_redirect_prefix: nginx内部location前缀，设置后response()返回X-Accel-Redirect
+            chunk_size: 流式写入时每次读取的字节数
+        """
+        self.root = os.path.abspath(root)
+        self.url_prefix = url_prefix.rstrip('/')
+        self.shard_depth = shard_depth
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip('/') if accel_redirect_prefix else None
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """
+        获取对象键对应的本地文件路径
+
+        Args:
+            key: 对象键
+
+        Returns:
+            str: 本地文件路径
+
+        Raises:
+            ValueError: 对象键为空、是绝对路径或包含..
+        """
+        parts = key.split('/') if isinstance(key, str) else []
+        if not key or key.startswith('/') or any(part in ('', '.', '..') for part in parts) or '\\' in key:
+            raise ValueError(f"无效的对象键: {key}")
+        return os.path.join(self.root, *parts)
+
+    def new_key(self, prefix: str, suffix: str) -> str:
+        """生成新对象的对象键，文件名前几位作为分片目录"""
+        name = uuid.uuid4().hex
+        shards = [name[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        return '/'.join([part for part in (prefix, *shards) if part] + [f"{name}{suffix}"])
+
+    def _write(self, key: str, write) -> str:
+        """
+        写入同目录的临时文件后原子改名
+
+        Args:
+            key: 对象键
+            write: 把内容写入已打开文件的函数
+
+        Returns:
+            str: 对象的访问URL
+        """
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.url(key)
+
+    def put(self, key: str, content: Union[bytes, IO], content_type: Optional[str] = None) -> str:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return self._write(key, lambda f: f.write(content))
+        return self._write(key, lambda f: shutil.copyfileobj(content, f, self.chunk_size))
+
+    def put_file(self, file_path: str, key: str, content_type: Optional[str] = None) -> str:
+        def write(target: IO) -> None:
+            with open(file_path, 'rb') as source:
+                # Linux下copyfileobj对普通文件使用sendfile，不经过用户态缓冲
+                shutil.copyfileobj(source, target, self.chunk_size)
+        return self._write(key, write)
+
+    def get(self, key: str) -> bytes:
+        with open(self.path(key), 'rb') as f:
+            return f.read()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def response(self, key: str) -> Response:
+        """
+        返回文件内容
+
+        配置了accel_redirect_prefix时只返回X-Accel-Redirect头，由nginx发送文件；
+        否则返回FileResponse，服务器支持pathsend扩展时由服务器直接发送文件。
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 对象键无效
+        """
+        path = self.path(key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"文件不存在: {key}")
+        if self.accel_redirect_prefix:
+            media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            return Response(
+                headers={'X-Accel-Redirect': f"{self.accel_redirect_prefix}/{quote(key)}"},
+                media_type=media_type
+            )
+        return FileResponse(path)
+
+
+class TOSStorage(StorageBackend):
+    """
+    火山引擎TOS存储
+    """
+
+    def __init__(self, client, prefix: str = ''):
+        """
+        Args:
+            client: TOSClient实例
+            prefix: 对象键前缀，对象在TOS中的键为 前缀/对象键
+        """
+        self.client = client
+        self.prefix = prefix.strip('/')
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, content: Union[bytes, IO], content_type: Optional[str] = None) -> str:
+        # SDK按对象键的扩展名设置Content-Type
+        return self.client.put_object(self._object_key(key), content)['object_url']
+
+    def put_file(self, file_path: str, key: str, content_type: Optional[str] = None) -> str:
+        return self.client.put_object_from_file(file_path, self._object_key(key))['object_url']
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(self._object_key(key))['content']
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(self._object_key(key))
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(self._object_key(key))
+            return True
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 404:
+                return False
+            raise
+
+    def url(self, key: str) -> str:
+        return self.client.get_object_url(self._object_key(key))
+
+    async def get_async(self, key: str) -> bytes:
+        """通过TOS线程池读取对象内容，参见AsyncTOSClient.get_object"""
+        return (await self.client.aio.get_object(self._object_key(key)))['content']
+
+    async def put_many(self,
+                       items: List[Tuple[str, Union[bytes, IO]]],
+                       max_workers: int = PUT_MANY_MAX_WORKERS) -> List[Dict[str, Any]]:
+        """并发写入多个对象，每个对象提交到TOS线程池，参见AsyncTOSClient.put_objects"""
+        results = await self.client.aio.put_objects(
+            [(self._object_key(key), content) for key, content in items], max_workers=max_workers
+        )
+        # 结果中的对象键还原为不带前缀的对象键
+        return [dict(result, object_key=key) for (key, _), result in zip(items, results)]
+
+
+class OSSStorage(StorageBackend):
+    """
+    阿里云OSS存储
+    """
+
+    def __init__(self, uploader, prefix: str = ''):
+        """
+        Args:
+            uploader: AliyunOSSUploader实例
+            prefix: 对象键前缀，对象在OSS中的键为 前缀/对象键
+        """
+        self.uploader = uploader
+        self.prefix = prefix.strip('/')
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, content: Union[bytes, IO], content_type: Optional[str] = None) -> str:
+        if isinstance(content, (bytes, bytearray)):
+            return self.uploader.upload_bytes(bytes(content), self._object_key(key))
+        return self.uploader.upload_fileobj(content, self._object_key(key))
+
+    def put_file(self, file_path: str, key: str, content_type: Optional[str] = None) -> str:
+        return self.uploader.upload_file(file_path, self._object_key(key))
+
+    def get(self, key: str) -> bytes:
+        return self.uploader.get_bytes(self._object_key(key))
+
+    def delete(self, key: str) -> None:
+        self.uploader.delete_object(self._object_key(key))
+
+    def exists(self, key: str) -> bool:
+        return self.uploader.object_exists(self._object_key(key))
+
+    def url(self, key: str) -> str:
+        return self.uploader.get_file_url(self._object_key(key))
+
+
+class LocalFallbackStorage(StorageBackend):
+    """
+    对象存储 + 本地存储兜底
+
+    新对象写入对象存储；读取、下载和删除时对象键在本地存储中存在则使用本地文件，
+    切换存储后端之前保存的本地URL不需要迁移即可继续访问和删除。
+    """
+
+    def __init__(self, primary: StorageBackend, local: LocalStorage):
+        """
+        初始化兜底存储
+
+        Args:
+            primary: 新对象写入的对象存储
+            local: 切换前使用的本地存储
+        """
+        self.primary = primary
+        self.local = local
+
+    def new_key(self, prefix: str, suffix: str) -> str:
+        return self.primary.new_key(prefix, suffix)
+
+    def put(self, key: str, content: Union[bytes, IO], content_type: Optional[str] = None) -> str:
+        return self.primary.put(key, content, content_type=content_type)
+
+    def put_file(self, file_path: str, key: str, content_type: Optional[str] = None) -> str:
+        return self.primary.put_file(file_path, key, content_type=content_type)
+
+    def _is_local(self, key: str) -> bool:
+        try:
+            return self.local.exists(key)
+        except ValueError:
+            return False
+
+    def get(self, key: str) -> bytes:
+        if self._is_local(key):
+            return self.local.get(key)
+        return self.primary.get(key)
+
+    def delete(self, key: str) -> None:
+        if self._is_local(key):
+            self.local.delete(key)
+        else:
+            self.primary.delete(key)
+
+    def exists(self, key: str) -> bool:
+        return self._is_local(key) or self.primary.exists(key)
+
+    def url(self, key: str) -> str:
+        return self.primary.url(key)
+
+    def key_from_url(self, url: Optional[str]) -> Optional[str]:
+        """对象存储的URL和本地存储的URL都能反推出对象键"""
+        key = self.primary.key_from_url(url)
+        return key if key is not None else self.local.key_from_url(url)
+
+    def delete_url(self, url: Optional[str]) -> bool:
+        """本地URL只删除本地文件，不访问对象存储"""
+        key = self.local.key_from_url(url)
+        if key is None:
+            return self.primary.delete_url(url)
+        return self.local.delete_url(url)
+
+    def response(self, key: str) -> Response:
+        if self._is_local(key):
+            return self.local.response(key)
+        return self.primary.response(key)
+
+    async def get_async(self, key: str) -> bytes:
+        if self._is_local(key):
+            return await self.local.get_async(key)
+        return await self.primary.get_async(key)
+
+    async def put_many(self,
+                       items: List[Tuple[str, Union[bytes, IO]]],
+                       max_workers: int = PUT_MANY_MAX_WORKERS) -> List[Dict[str, Any]]:
+        return await self.primary.put_many(items, max_workers=max_workers)
+
+
+def save_upload(storage: StorageBackend, file: Any, prefix: str, suffix: str = '') -> str:
+    """
+    保存上传的文件（FastAPI UploadFile），按块从临时文件写入存储
+
+    Args:
+        storage: 存储
+        file: 上传的文件，使用filename、file和content_type属性
+        prefix: 对象键前缀
+        suffix: 扩展名前的文件名后缀（如_skeleton）
+
+    Returns:
+        str: 文件的访问URL
+    """
+    extension = os.path.splitext(file.filename or '')[1] or '.jpg'
+    key = storage.new_key(prefix, f"{suffix}{extension}")
+    file.file.seek(0)
+    return storage.put(key, file.file, content_type=getattr(file, 'content_type', None))
+
+
+def storage_backend_name(namespace: str) -> str:
+    """
+    获取存储空间使用的存储后端
+
+    Args:
+        namespace: 存储空间名称
+
+    Returns:
+        str: 存储后端（local、tos、oss）
+    """
+    if namespace == GENERATION_STORAGE:
+        return storage_config.GENERATION_BACKEND
+    return storage_config.BACKEND
+
+
+def create_storage(namespace: str, backend: Optional[str] = None) -> StorageBackend:
+    """
+    创建存储空间对应的存储
+
+    Args:
+        namespace: 存储空间名称，见STORAGE_NAMESPACES
+        backend: 存储后端，默认使用storage_backend_name(namespace)
+
+    Returns:
+        StorageBackend: 存储实例，对象存储后端在本地存储目录存在时用LocalFallbackStorage包装
+
+    Raises:
+        ValueError: 存储空间或存储后端不支持
+        RuntimeError: TOS未配置
+    """
+    if namespace not in STORAGE_NAMESPACES:
+        raise ValueError(f"未知的存储空间: {namespace}")
+    backend = backend or storage_backend_name(namespace)
+    storage = _create_backend(namespace, backend)
+
+    if backend != 'local' and os.path.isdir(os.path.join(storage_config.LOCAL_ROOT, namespace)):
+        logger.info(f"[Storage] {namespace} 使用{backend}存储，历史本地文件从本地目录读取")
+        return LocalFallbackStorage(storage, _create_backend(namespace, 'local'))
+    return storage
+
+
+def _create_backend(namespace: str, backend: str) -> StorageBackend:
+    """创建单个存储后端，参见create_storage"""
+    object_prefix = STORAGE_OBJECT_PREFIXES.get(namespace, namespace)
+
+    if backend == 'local':
+        return LocalStorage(
+            root=os.path.join(storage_config.LOCAL_ROOT, namespace),
+            url_prefix=STORAGE_NAMESPACES[namespace],
+            shard_depth=storage_config.LOCAL_SHARD_DEPTH,
+            accel_redirect_prefix=(
+                f"{storage_config.LOCAL_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{namespace}"
+                if storage_config.LOCAL_ACCEL_REDIRECT_PREFIX else None
+            )
+        )
+    if backend == 'tos':
+        from .. import get_tos_uploader
+        client = get_tos_uploader()
+        if client is None:
+            raise RuntimeError("TOS未配置，无法使用tos存储")
+        return TOSStorage(client, prefix=object_prefix)
+    if backend == 'oss':
+        from .aliyun_oss_uploader import AliyunOSSUploader
+        uploader = AliyunOSSUploader(bucket_name=storage_config.OSS_BUCKET, region=storage_config.OSS_REGION)
+        return OSSStorage(uploader, prefix=object_prefix)
+    raise ValueError(f"不支持的存储后端: {backend}")
+
+
+_storages: Dict[str, StorageBackend] = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(namespace: str) -> StorageBackend:
+    """获取存储空间对应的共享存储实例"""
+    storage = _storages.get(namespace)
+    if storage is None:
+        with _storages_lock:
+            storage = _storages.get(namespace)
+            if storage is None:
+                storage = _storages[namespace] = create_storage(namespace)
+    return storage
+
+
+def storage_for_url(url: Optional[str]) -> Optional[Tuple[StorageBackend, str]]:
+    """
+    根据访问URL找到所属的存储和对象键
+
+    按STORAGE_NAMESPACES的顺序匹配，对象键不加前缀的generation存储放在最后，
+    避免同一存储桶中其他存储空间的URL被它匹配。不可用的存储后端跳过。
+
+    Args:
+        url: 访问URL
+
+    Returns:
+        (StorageBackend, str) or None: 存储和对象键，URL不属于任何存储时返回None
+    """
+    for namespace in STORAGE_NAMESPACES:
+        try:
+            storage = get_storage(namespace)
+        except (RuntimeError, ValueError):
+            continue
+        key = storage.key_from_url(url)
+        if key is not None:
+            return storage, key
+    return None
+
+
+def get_generation_storage() -> Optional[StorageBackend]:
+    """
+    获取生图流程使用的共享存储实例
+
+    Returns:
+        StorageBackend or None: 存储实例，存储后端不可用（如TOS未配置）时返回None
+    """
+    try:
+        return get_storage(GENERATION_STORAGE)
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"[Storage] 生图存储不可用: {e}")
+        return None
@@ -73,13 +73,20 @@ result = tos_client.copy_object(
     dest_key='backup/photo.jpg'
 )
 
-# 10. 批量删除对象
+# 10. 批量并发上传
+results = tos_client.put_objects(
+    items=[('tiles/0.png', tile0_bytes), ('tiles/1.png', tile1_bytes)],
+    max_workers=8
+)
+print(f"上传成功数量: {sum(1 for r in results if r['success'])}")
+
+# 11. 批量删除对象
 result = tos_client.delete_objects(
     object_keys=['images/photo1.jpg', 'images/photo2.jpg']
 )
 print(f"删除成功数量: {len(result['deleted'])}, 失败数量: {len(result['errors'])}")
 
-# 11. 删除单个对象
+# 12. 删除单个对象
 result = tos_client.delete_object(object_key='hello.txt')
 
 异常处理:
@@ -96,8 +103,17 @@ except Exception as e:
 """
 
 import os
+import io
 import csv
-from typing import Dict, Any, Optional, Tuple, Union, IO, List
+import hashlib
+import json
+import math
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, Tuple, Union, IO, List, Callable, Iterator, Iterable
 import logging
 
 # 尝试从volcengine包中导入tos模块
@@ -144,6 +160,131 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 分片上传默认配置：超过阈值的对象自动使用分片上传
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+MULTIPART_MAX_PARTS = 10000
+MULTIPART_MAX_WORKERS = 4
+MULTIPART_PART_RETRIES = 3
+MULTIPART_CHECKPOINT_DIR = os.path.join(tempfile.gettempdir(), 'tos_checkpoints')
+
+# 下载默认配置：流式读取的分块大小，以及并发分段下载的分段大小和并发数
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+DOWNLOAD_MAX_WORKERS = 4
+
+# 批量操作默认配置：单次批量删除最多1000个对象
+BULK_BATCH_SIZE = 1000
+BULK_MAX_WORKERS = 4
+
+
+def _parse_content_range_total(content_range: Any) -> Optional[int]:
+    """
+    从Content-Range响应头（bytes start-end/total）中解析对象总大小
+    
+    Args:
+        content_range: Content-Range响应头
+        
+    Returns:
+        Optional[int]: 对象总大小，响应头不存在或格式不正确时返回None
+    """
+    if not isinstance(content_range, str) or '/' not in content_range:
+        return None
+    total = content_range.rsplit('/', 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+class _RateLimiter:
+    """
+    多线程共享的请求速率上限，按固定间隔发放请求配额
+    """
+    
+    def __init__(self, max_per_second: Optional[float]):
+        """
+        Args:
+            max_per_second: 每秒最多请求数，None或0表示不限速
+        """
+        self.interval = 1.0 / max_per_second if max_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_at = time.monotonic()
+    
+    def acquire(self) -> None:
+        """等待到可以发出下一个请求"""
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_at - now
+            self.next_at = max(self.next_at, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    把可迭代对象按固定大小分批，不预先读取全部元素
+    
+    Args:
+        items: 可迭代对象，可以是生成器
+        size: 每批数量
+        
+    Returns:
+        Iterator[List[Any]]: 分批迭代器
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bounded_map(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int) -> Iterator[Any]:
+    """
+    并发执行func，在途任务数不超过max_workers的两倍，按完成顺序返回结果
+    
+    items按需读取，配合生成器使用时内存占用与总数量无关。
+    
+    Args:
+        func: 对每个元素执行的函数，不应抛出异常
+        items: 可迭代对象
+        max_workers: 并发数
+        
+    Returns:
+        Iterator[Any]: func的返回值
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tos-bulk") as pool:
+        pending = set()
+        for item in items:
+            pending.add(pool.submit(func, item))
+            if len(pending) >= max_workers * 2:
+                done = next(as_completed(pending))
+                pending.discard(done)
+                yield done.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def _is_client_error(error: Exception) -> bool:
+    """
+    判断是否为重试也无法成功的请求错误（4xx，超时和限流除外）
+    
+    Args:
+        error: 捕获的异常
+        
+    Returns:
+        bool: 是否为不可重试的错误
+    """
+    if isinstance(error, (ValueError, FileNotFoundError)):
+        return True
+    if isinstance(error, tos.exceptions.TosServerError):
+        status_code = getattr(error, 'status_code', None) or 0
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+    return False
+
 
 class TOSClient:
     """
@@ -275,7 +416,11 @@ class TOSClient:
                  endpoint: Optional[str] = None, 
                  region: Optional[str] = None,
                  bucket_name: Optional[str] = None,
-                 config_csv_path: Optional[str] = None):
+                 config_csv_path: Optional[str] = None,
+                 client_options: Optional[Dict[str, Any]] = None,
+                 multipart_options: Optional[Dict[str, Any]] = None,
+                 download_options: Optional[Dict[str, Any]] = None,
+                 cache: Optional['DiskObjectCache'] = None):
         """
         初始化TOS客户端
         
@@ -286,6 +431,11 @@ class TOSClient:
             region: TOS区域，如cn-beijing、cn-guangzhou等
             bucket_name: 默认存储桶名称，用于简化操作调用，默认从环境变量TOS_BUCKET获取
             config_csv_path: 配置CSV文件路径，可从CSV文件读取配置
+            client_options: 传给底层SDK客户端的连接池和超时参数，如max_connections、socket_timeout
+            multipart_options: 分片上传配置，可包含threshold、part_size、max_workers、
+                part_retries、checkpoint_dir，未提供的使用模块默认值
+            download_options: 下载配置，可包含chunk_size、part_size、max_workers，未提供的使用模块默认值
+            cache: 本地磁盘缓存，不指定字节范围的get_object和get_object_to_file优先从缓存读取
             
         Raises:
             ValueError: 缺少必要的配置参数（ak、sk、endpoint、region）
@@ -313,6 +463,23 @@ class TOSClient:
         self.region = region or csv_region or os.getenv('TOS_REGION')
         self.bucket_name = bucket_name or csv_bucket or os.getenv('TOS_BUCKET')
         
+        # 分片上传配置
+        multipart_options = multipart_options or {}
+        self.multipart_threshold = multipart_options.get('threshold', MULTIPART_THRESHOLD)
+        self.multipart_part_size = multipart_options.get('part_size', MULTIPART_PART_SIZE)
+        self.multipart_max_workers = multipart_options.get('max_workers', MULTIPART_MAX_WORKERS)
+        self.multipart_part_retries = multipart_options.get('part_retries', MULTIPART_PART_RETRIES)
+        self.multipart_checkpoint_dir = multipart_options.get('checkpoint_dir', MULTIPART_CHECKPOINT_DIR)
+        
+        # 下载配置
+        download_options = download_options or {}
+        self.download_chunk_size = download_options.get('chunk_size', DOWNLOAD_CHUNK_SIZE)
+        self.download_part_size = download_options.get('part_size', DOWNLOAD_PART_SIZE)
+        self.download_max_workers = download_options.get('max_workers', DOWNLOAD_MAX_WORKERS)
+        
+        # 本地磁盘缓存
+        self.cache = cache
+        
         # 验证必要参数
         if not all([self.ak, self.sk, self.endpoint, self.region]):
             raise ValueError("缺少必要的TOS配置参数，请提供ak、sk、endpoint和region")
@@ -323,7 +490,8 @@ class TOSClient:
                 ak=self.ak, 
                 sk=self.sk, 
                 endpoint=self.endpoint, 
-                region=self.region
+                region=self.region,
+                **(client_options or {})
             )
             logger.info("TOS客户端初始化成功")
         except tos.exceptions.TosClientError as e:
@@ -333,6 +501,20 @@ class TOSClient:
             logger.error(f"TOS客户端初始化失败: {str(e)}")
             raise
     
+    @property
+    def aio(self) -> 'AsyncTOSClient':
+        """
+        asyncio接口，与当前客户端共享底层SDK客户端和连接池
+        
+        Returns:
+            AsyncTOSClient: 方法与本类同名，在TOS专用线程池中执行
+        """
+        aio = getattr(self, '_aio', None)
+        if aio is None:
+            from .async_tos import AsyncTOSClient
+            aio = self._aio = AsyncTOSClient(self)
+        return aio
+    
     def put_object_from_file(self, 
                            file_path: str, 
                            object_key: str, 
@@ -340,7 +522,8 @@ class TOSClient:
                            headers: Optional[Dict[str, str]] = None,
                            acl: Optional[str] = None,
                            storage_class: Optional[str] = None,
-                           meta: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                           meta: Optional[Dict[str, str]] = None,
+                           multipart: bool = True) -> Dict[str, Any]:
         """
         从本地文件上传对象到TOS
         
@@ -352,6 +535,7 @@ class TOSClient:
             acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
             storage_class: 存储类型，如'standard'、'ia'、'archive'
             meta: 自定义元数据，用于对象自定义管理
+            multipart: 超过分片上传阈值时是否使用分片并发上传，False时始终单次上传
             
         Returns:
             Dict[str, Any]: 包含上传结果的字典，包含以下字段：
@@ -427,12 +611,17 @@ class TOSClient:
         if meta:
             request_params['meta'] = meta
         
+        # 大文件使用分片上传，支持并发和断点续传
+        file_size = os.path.getsize(file_path)
+        if multipart and file_size >= self.multipart_threshold:
+            return self.put_object_from_file_multipart(
+                file_path, object_key, bucket_name=bucket, acl=acl, storage_class=storage_class, meta=meta
+            )
+        
         try:
-            # 获取文件大小
-            file_size = os.path.getsize(file_path)
-            
             # 上传文件
             resp = self.client.put_object_from_file(**request_params)
+            self._invalidate_cache(bucket, object_key)
             
             # 记录上传日志
             logger.info(
@@ -474,7 +663,8 @@ class TOSClient:
                    bucket_name: Optional[str] = None,
                    acl: Optional[str] = None,
                    storage_class: Optional[str] = None,
-                   meta: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                   meta: Optional[Dict[str, str]] = None,
+                   multipart: bool = True) -> Dict[str, Any]:
         """
         普通上传 - 支持上传字符串、字节流、网络流到TOS
         
@@ -490,6 +680,7 @@ class TOSClient:
             acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
             storage_class: 存储类型，如'standard'、'ia'、'archive'
             meta: 自定义元数据，用于对象自定义管理
+            multipart: 超过分片上传阈值时是否使用分片并发上传，False时始终单次上传
             
         Returns:
             Dict[str, Any]: 包含上传结果的字典，包含以下字段：
@@ -563,9 +754,17 @@ class TOSClient:
         if meta:
             request_params['meta'] = meta
         
+        # 大对象使用分片并发上传
+        content_size = self._content_size(content)
+        if multipart and content_size is not None and content_size >= self.multipart_threshold:
+            return self.put_object_multipart(
+                object_key, content, bucket_name=bucket, acl=acl, storage_class=storage_class, meta=meta
+            )
+        
         try:
             # 执行上传操作
             resp = self.client.put_object(**request_params)
+            self._invalidate_cache(bucket, object_key)
             
             # 获取内容大小用于日志记录
             content_size = len(content) if isinstance(content, (bytes, str)) else 'unknown'
@@ -595,6 +794,512 @@ class TOSClient:
             error_info = f"对象键: {object_key}"
             self._handle_tos_exception("上传对象", bucket, e, error_info)
     
+    def put_objects(self,
+                    items: List[Tuple[str, Union[bytes, str, IO]]],
+                    bucket_name: Optional[str] = None,
+                    max_workers: int = 8,
+                    acl: Optional[str] = None,
+                    storage_class: Optional[str] = None,
+                    meta: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        批量并发上传 - 同时上传多个对象，单个对象失败不影响其他对象
+        
+        使用自带的线程池，供同步代码（如迁移脚本）调用；async代码应使用aio.put_objects，
+        每个对象单独占用TOS线程池的槽位，不要把本方法提交到TOS线程池中执行。
+        
+        Args:
+            items: (object_key, content)元组列表，content的类型与put_object相同
+            bucket_name: 存储桶名称，默认使用初始化时的桶名
+            max_workers: 最大并发上传数，默认8
+            acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
+            storage_class: 存储类型，如'standard'、'ia'、'archive'
+            meta: 自定义元数据，应用到所有对象
+            
+        Returns:
+            List[Dict[str, Any]]: 与items顺序一致的结果列表。
+                上传成功的元素与put_object的返回值相同；
+                上传失败的元素包含以下字段：
+                - success: False
+                - object_key: 对象键
+                - bucket: 使用的存储桶名称
+                - error: 错误信息
+            
+        Raises:
+            ValueError: 参数错误，如items为空或max_workers小于1
+        """
+        # 参数验证
+        if not items:
+            raise ValueError("上传列表不能为空")
+        
+        if max_workers < 1:
+            raise ValueError("max_workers必须大于0")
+        
+        bucket = bucket_name or self.bucket_name
+        
+        def upload(item: Tuple[str, Union[bytes, str, IO]]) -> Dict[str, Any]:
+            object_key, content = item
+            try:
+                return self.put_object(
+                    object_key=object_key,
+                    content=content,
+                    bucket_name=bucket_name,
+                    acl=acl,
+                    storage_class=storage_class,
+                    meta=meta
+                )
+            except Exception as e:
+                return {
+                    'success': False,
+                    'object_key': object_key,
+                    'bucket': bucket,
+                    'error': str(e)
+                }
+        
+        workers = min(max_workers, len(items))
+        if workers == 1:
+            results = [upload(item) for item in items]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tos-put") as pool:
+                results = list(pool.map(upload, items))
+        
+        failed = sum(1 for result in results if not result['success'])
+        logger.info(
+            f"批量上传完成 - 存储桶: {bucket} | "
+            f"总数量: {len(items)} | "
+            f"成功: {len(items) - failed} | "
+            f"失败: {failed}"
+        )
+        
+        return results
+    
+    @staticmethod
+    def _content_size(content: Union[bytes, str, IO]) -> Optional[int]:
+        """
+        获取可以分片上传的内容大小
+        
+        Args:
+            content: 上传内容
+            
+        Returns:
+            Optional[int]: 字节或字符串的长度、BytesIO或本地文件从当前位置起的剩余大小；
+                其他流无法确定大小或无法按偏移读取，返回None
+        """
+        if isinstance(content, (bytes, bytearray)):
+            return len(content)
+        if isinstance(content, str):
+            return len(content.encode('utf-8'))
+        if isinstance(content, io.BytesIO):
+            with content.getbuffer() as view:
+                return view.nbytes - content.tell()
+        if isinstance(content, (io.BufferedReader, io.FileIO)) and content.seekable():
+            return os.fstat(content.fileno()).st_size - content.tell()
+        return None
+    
+    def _upload_options(self,
+                        acl: Optional[str] = None,
+                        storage_class: Optional[str] = None,
+                        meta: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        构造创建分片上传任务的可选参数
+        
+        Args:
+            acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
+            storage_class: 存储类型，如'standard'、'ia'、'archive'
+            meta: 自定义元数据
+            
+        Returns:
+            Dict[str, Any]: create_multipart_upload的可选参数
+            
+        Raises:
+            ValueError: 不支持的ACL或存储类型
+        """
+        options = {}
+        if acl:
+            acl_map = {
+                'private': tos.ACLType.ACL_Private,
+                'public-read': tos.ACLType.ACL_PublicRead,
+                'public-read-write': tos.ACLType.ACL_PublicReadWrite
+            }
+            if acl not in acl_map:
+                raise ValueError(f"不支持的ACL类型: {acl}")
+            options['acl'] = acl_map[acl]
+        if storage_class:
+            storage_map = {
+                'standard': 'STANDARD',
+                'ia': 'IA',
+                'archive': 'ARCHIVE'
+            }
+            if storage_class not in storage_map:
+                raise ValueError(f"不支持的存储类型: {storage_class}")
+            options['storage_class'] = storage_map[storage_class]
+        if meta:
+            options['meta'] = meta
+        return options
+    
+    def _part_size(self, size: int, part_size: Optional[int] = None) -> int:
+        """
+        计算分片大小，不小于最小分片大小，且分片数不超过上限
+        
+        Args:
+            size: 对象大小
+            part_size: 期望的分片大小，默认使用初始化时的配置
+            
+        Returns:
+            int: 实际使用的分片大小
+        """
+        part_size = max(part_size or self.multipart_part_size, MULTIPART_MIN_PART_SIZE)
+        return max(part_size, math.ceil(size / MULTIPART_MAX_PARTS))
+    
+    def _load_checkpoint(self, checkpoint_file: str, expected: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        读取断点续传记录，文件或参数发生变化时中止旧的上传任务并丢弃记录
+        
+        Args:
+            checkpoint_file: 断点续传记录文件
+            expected: 本次上传的bucket、object_key、file_path、size、mtime、part_size
+            
+        Returns:
+            Optional[Dict[str, Any]]: 可以继续使用的记录，没有则返回None
+        """
+        if not os.path.exists(checkpoint_file):
+            return None
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"断点续传记录读取失败，重新上传: {checkpoint_file}, {str(e)}")
+            os.remove(checkpoint_file)
+            return None
+        
+        if any(checkpoint.get(name) != value for name, value in expected.items()):
+            logger.info(f"源文件或分片参数已变化，放弃断点续传记录: {checkpoint_file}")
+            self._abort_multipart(checkpoint['bucket'], checkpoint['object_key'], checkpoint['upload_id'])
+            os.remove(checkpoint_file)
+            return None
+        
+        try:
+            # 确认上传任务仍然存在（可能已过期或被中止）
+            self.client.list_parts(bucket=checkpoint['bucket'], key=checkpoint['object_key'],
+                                   upload_id=checkpoint['upload_id'], max_parts=1)
+        except Exception as e:
+            logger.info(f"断点续传的上传任务已失效，重新上传: {checkpoint['upload_id']}, {str(e)}")
+            os.remove(checkpoint_file)
+            return None
+        return checkpoint
+    
+    @staticmethod
+    def _save_checkpoint(checkpoint_file: str, checkpoint: Dict[str, Any]) -> None:
+        """
+        写入断点续传记录，先写临时文件再原子替换，进程中断时不会留下不完整的记录
+        
+        Args:
+            checkpoint_file: 断点续传记录文件
+            checkpoint: 记录内容
+        """
+        os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+        tmp_file = f"{checkpoint_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, checkpoint_file)
+    
+    def _abort_multipart(self, bucket: str, object_key: str, upload_id: str) -> None:
+        """
+        中止分片上传任务，释放已上传的分片，失败时只记录日志
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            upload_id: 分片上传任务ID
+        """
+        try:
+            self.client.abort_multipart_upload(bucket=bucket, key=object_key, upload_id=upload_id)
+            logger.info(f"分片上传已中止 - 存储桶: {bucket} | 对象键: {object_key} | 上传ID: {upload_id}")
+        except Exception as e:
+            logger.warning(f"中止分片上传失败 - 存储桶: {bucket} | 对象键: {object_key} | 上传ID: {upload_id} | 错误: {str(e)}")
+    
+    def _upload_part(self, bucket: str, object_key: str, upload_id: str, part_number: int,
+                     read_part: Callable[[int], bytes], retries: int) -> str:
+        """
+        上传单个分片，网络错误和服务端5xx错误按指数退避重试
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            upload_id: 分片上传任务ID
+            part_number: 分片序号，从1开始
+            read_part: 按分片序号读取分片内容的函数
+            retries: 最大重试次数
+            
+        Returns:
+            str: 分片的ETag
+        """
+        data = read_part(part_number)
+        for attempt in range(retries + 1):
+            try:
+                resp = self.client.upload_part(bucket=bucket, key=object_key, upload_id=upload_id,
+                                               part_number=part_number, content=data)
+                return resp.etag
+            except Exception as e:
+                if attempt >= retries or _is_client_error(e):
+                    raise
+                delay = min(0.5 * 2 ** attempt, 8)
+                logger.warning(f"分片上传失败，{delay}秒后重试 - 对象键: {object_key} | 分片: {part_number} | 错误: {str(e)}")
+                time.sleep(delay)
+    
+    def _multipart_upload(self,
+                          bucket: str,
+                          object_key: str,
+                          size: int,
+                          read_part: Callable[[int], bytes],
+                          part_size: int,
+                          max_workers: int,
+                          options: Dict[str, Any],
+                          checkpoint_file: Optional[str] = None,
+                          checkpoint_source: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        执行分片上传：创建（或恢复）上传任务、并发上传分片、合并分片
+        
+        失败时，可以断点续传的错误（网络错误、服务端5xx）保留上传任务和记录文件，
+        下次上传同一文件时只上传缺少的分片；其他情况中止上传任务，不留下未合并的分片。
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            size: 对象大小
+            read_part: 按分片序号读取分片内容的函数，会在多个线程中调用
+            part_size: 分片大小
+            max_workers: 分片并发上传数
+            options: 创建上传任务的可选参数
+            checkpoint_file: 断点续传记录文件，None表示不记录
+            checkpoint_source: 写入记录的源文件信息，用于校验记录是否仍然有效
+            
+        Returns:
+            Dict[str, Any]: 上传结果
+        """
+        part_count = max(1, math.ceil(size / part_size))
+        checkpoint = None
+        if checkpoint_file:
+            expected = dict(checkpoint_source or {}, bucket=bucket, object_key=object_key, size=size, part_size=part_size)
+            checkpoint = self._load_checkpoint(checkpoint_file, expected)
+        
+        upload_id = None
+        try:
+            if checkpoint:
+                upload_id = checkpoint['upload_id']
+                logger.info(f"继续分片上传 - 对象键: {object_key} | 上传ID: {upload_id} | 已完成分片: {len(checkpoint['parts'])}/{part_count}")
+            else:
+                resp = self.client.create_multipart_upload(bucket=bucket, key=object_key, **options)
+                upload_id = resp.upload_id
+                checkpoint = dict(checkpoint_source or {}, bucket=bucket, object_key=object_key, size=size,
+                                  part_size=part_size, upload_id=upload_id, parts={})
+                if checkpoint_file:
+                    self._save_checkpoint(checkpoint_file, checkpoint)
+            
+            parts = {int(number): etag for number, etag in checkpoint['parts'].items()}
+            resumed_parts = len(parts)
+            pending = [number for number in range(1, part_count + 1) if number not in parts]
+            lock = threading.Lock()
+            
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending) or 1)),
+                                    thread_name_prefix="tos-part") as pool:
+                futures = {
+                    pool.submit(self._upload_part, bucket, object_key, upload_id, number, read_part,
+                                self.multipart_part_retries): number
+                    for number in pending
+                }
+                try:
+                    for future in as_completed(futures):
+                        etag = future.result()
+                        with lock:
+                            parts[futures[future]] = etag
+                            if checkpoint_file:
+                                checkpoint['parts'] = {str(number): value for number, value in parts.items()}
+                                self._save_checkpoint(checkpoint_file, checkpoint)
+                except Exception:
+                    # 一个分片失败后不再启动剩余分片
+                    for future in futures:
+                        future.cancel()
+                    raise
+            
+            uploaded_parts = [tos.models2.UploadedPart(number, parts[number]) for number in sorted(parts)]
+            resp = self.client.complete_multipart_upload(bucket=bucket, key=object_key, upload_id=upload_id,
+                                                         parts=uploaded_parts)
+        except Exception as e:
+            resumable = checkpoint_file is not None and upload_id is not None and not _is_client_error(e)
+            if not resumable:
+                if upload_id:
+                    self._abort_multipart(bucket, object_key, upload_id)
+                if checkpoint_file and os.path.exists(checkpoint_file):
+                    os.remove(checkpoint_file)
+            self._handle_tos_exception("分片上传", bucket, e, f"对象键: {object_key}, 上传ID: {upload_id}")
+        
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        self._invalidate_cache(bucket, object_key)
+        
+        logger.info(
+            f"分片上传成功 - 存储桶: {bucket} | "
+            f"对象键: {object_key} | "
+            f"大小: {size} bytes | "
+            f"分片: {part_count} × {part_size} bytes | "
+            f"续传分片: {resumed_parts} | "
+            f"请求ID: {resp.request_id}"
+        )
+        return {
+            'success': True,
+            'status_code': getattr(resp, 'status_code', 200),
+            'request_id': resp.request_id,
+            'hash_crc64_ecma': getattr(resp, 'hash_crc64_ecma', None),
+            'etag': getattr(resp, 'etag', None),
+            'object_key': object_key,
+            'bucket': bucket,
+            'size': size,
+            'upload_id': upload_id,
+            'part_count': part_count,
+            'resumed_parts': resumed_parts,
+            'object_url': f"https://{bucket}.{self.endpoint}/{object_key}"
+        }
+    
+    def put_object_multipart(self,
+                             object_key: str,
+                             content: Union[bytes, str, IO],
+                             bucket_name: Optional[str] = None,
+                             part_size: Optional[int] = None,
+                             max_workers: Optional[int] = None,
+                             acl: Optional[str] = None,
+                             storage_class: Optional[str] = None,
+                             meta: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        分片并发上传内存中的内容或本地文件对象
+        
+        内存中的内容没有断点续传记录，任何失败都会中止上传任务。
+        超过分片上传阈值时put_object会自动调用本方法。
+        
+        Args:
+            object_key: TOS中存储的对象键
+            content: 字节、字符串、BytesIO或本地文件对象（从当前位置读到末尾）
+            bucket_name: 存储桶名称，默认使用初始化时的桶名
+            part_size: 分片大小，默认使用初始化时的配置
+            max_workers: 分片并发上传数，默认使用初始化时的配置
+            acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
+            storage_class: 存储类型，如'standard'、'ia'、'archive'
+            meta: 自定义元数据
+            
+        Returns:
+            Dict[str, Any]: 与put_object相同的字段，另外包含size、upload_id、part_count、resumed_parts
+            
+        Raises:
+            ValueError: 参数错误，或content是无法确定大小的流
+            tos.exceptions.TosClientError: 客户端错误，通常是非法请求参数或网络异常
+            tos.exceptions.TosServerError: 服务端错误，可从返回信息中获取详细错误信息
+        """
+        if not object_key or not isinstance(object_key, str):
+            raise ValueError("必须指定有效的object_key字符串")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        size = self._content_size(content)
+        if size is None:
+            raise ValueError("分片上传需要字节内容、BytesIO或本地文件对象")
+        part_size = self._part_size(size, part_size)
+        
+        if isinstance(content, (bytes, bytearray)):
+            def read_part(part_number: int) -> bytes:
+                offset = (part_number - 1) * part_size
+                return bytes(content[offset:offset + part_size])
+        else:
+            start = content.tell()
+            file_lock = threading.Lock()
+            
+            def read_part(part_number: int) -> bytes:
+                with file_lock:
+                    content.seek(start + (part_number - 1) * part_size)
+                    return content.read(min(part_size, size - (part_number - 1) * part_size))
+        
+        return self._multipart_upload(
+            bucket, object_key, size, read_part, part_size,
+            max_workers or self.multipart_max_workers,
+            self._upload_options(acl, storage_class, meta)
+        )
+    
+    def put_object_from_file_multipart(self,
+                                       file_path: str,
+                                       object_key: str,
+                                       bucket_name: Optional[str] = None,
+                                       part_size: Optional[int] = None,
+                                       max_workers: Optional[int] = None,
+                                       checkpoint_file: Optional[str] = None,
+                                       enable_checkpoint: bool = True,
+                                       acl: Optional[str] = None,
+                                       storage_class: Optional[str] = None,
+                                       meta: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        分片并发上传本地文件，支持断点续传
+        
+        每个分片上传成功后写入断点续传记录；上传因网络或服务端错误失败时保留上传任务，
+        再次上传同一文件（大小和修改时间不变）时只上传缺少的分片。
+        超过分片上传阈值时put_object_from_file会自动调用本方法。
+        
+        Args:
+            file_path: 本地文件路径
+            object_key: TOS中存储的对象键
+            bucket_name: 存储桶名称，默认使用初始化时的桶名
+            part_size: 分片大小，默认使用初始化时的配置
+            max_workers: 分片并发上传数，默认使用初始化时的配置
+            checkpoint_file: 断点续传记录文件，默认根据桶名、对象键和文件路径生成在记录目录中
+            enable_checkpoint: 是否启用断点续传
+            acl: 访问控制权限，可选值：'private'、'public-read'、'public-read-write'
+            storage_class: 存储类型，如'standard'、'ia'、'archive'
+            meta: 自定义元数据
+            
+        Returns:
+            Dict[str, Any]: 与put_object_from_file相同的字段，另外包含upload_id、part_count、resumed_parts
+            
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 参数错误
+            tos.exceptions.TosClientError: 客户端错误，通常是非法请求参数或网络异常
+            tos.exceptions.TosServerError: 服务端错误，可从返回信息中获取详细错误信息
+        """
+        if not object_key:
+            raise ValueError("必须指定object_key")
+        if not file_path:
+            raise ValueError("必须指定file_path")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        size = stat.st_size
+        part_size = self._part_size(size, part_size)
+        
+        if enable_checkpoint and not checkpoint_file:
+            name = hashlib.sha1(f"{bucket}\n{object_key}\n{file_path}".encode('utf-8')).hexdigest()
+            checkpoint_file = os.path.join(self.multipart_checkpoint_dir, f"{name}.json")
+        
+        def read_part(part_number: int) -> bytes:
+            with open(file_path, 'rb') as f:
+                f.seek((part_number - 1) * part_size)
+                return f.read(part_size)
+        
+        result = self._multipart_upload(
+            bucket, object_key, size, read_part, part_size,
+            max_workers or self.multipart_max_workers,
+            self._upload_options(acl, storage_class, meta),
+            checkpoint_file=checkpoint_file if enable_checkpoint else None,
+            checkpoint_source={'file_path': file_path, 'mtime': stat.st_mtime}
+        )
+        result['file_path'] = file_path
+        return result
+    
     def create_bucket(self, bucket_name: str, acl: Optional[str] = 'private') -> Dict[str, Any]:
         """
         创建新的存储桶
@@ -684,6 +1389,7 @@ class TOSClient:
                 - headers: Dict[str, str], 对象的响应头
                 - object_key: 获取的对象键
                 - bucket: 使用的存储桶名称
+                - cached: 布尔值，是否从本地磁盘缓存读取
                 
         Raises:
             ValueError: 参数错误
@@ -699,23 +1405,36 @@ class TOSClient:
         if not bucket:
             raise ValueError("未指定存储桶名称")
         
-        # 参数验证 - byte_range
-        if byte_range:
-            if not isinstance(byte_range, tuple) or len(byte_range) != 2:
-                raise ValueError("byte_range必须是长度为2的元组")
-            start, end = byte_range
-            if not isinstance(start, int) or not isinstance(end, int) or start < 0 or end < start:
-                raise ValueError("byte_range必须包含两个非负整数，且start <= end")
+        self._validate_byte_range(byte_range)
+        
+        entry = None if byte_range else self._cache_lookup(bucket, object_key)
+        if entry is not None:
+            try:
+                with open(entry['path'], 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                # 缓存文件刚被其他进程淘汰
+                self.cache.record_miss()
+            else:
+                self.cache.record_hit(len(content))
+                logger.info(
+                    f"对象缓存命中 - 存储桶: {bucket} | "
+                    f"对象键: {object_key} | "
+                    f"大小: {len(content)} bytes"
+                )
+                return {
+                    'success': True,
+                    'request_id': None,
+                    'content': content,
+                    'headers': {'etag': entry['etag'] or '', 'content-type': entry['content_type'] or ''},
+                    'object_key': object_key,
+                    'bucket': bucket,
+                    'cached': True
+                }
         
         try:
-            # 构建请求参数
-            params = {}
-            if byte_range:
-                start, end = byte_range
-                params['Range'] = f'bytes={start}-{end}'
-            
             # 获取对象
-            resp = self.client.get_object(bucket, object_key, **params)
+            resp = self.client.get_object(bucket, object_key, **self._range_params(byte_range))
             
             # 读取内容
             content = resp.read()
@@ -727,13 +1446,19 @@ class TOSClient:
                 f"大小: {len(content)} bytes"
             )
             
+            if self.cache is not None and not byte_range:
+                self.cache.put_bytes(bucket, object_key, content,
+                                     etag=getattr(resp, 'etag', None),
+                                     content_type=getattr(resp, 'content_type', None))
+            
             return {
                 'success': True,
                 'request_id': resp.request_id,
                 'content': content,
                 'headers': resp.headers,
                 'object_key': object_key,
-                'bucket': bucket
+                'bucket': bucket,
+                'cached': False
             }
             
         except Exception as e:
@@ -741,31 +1466,329 @@ class TOSClient:
             error_info = f"对象键: {object_key}"
             self._handle_tos_exception("获取对象", bucket, e, error_info)
     
-    def get_object_to_file(self, 
-                           object_key: str, 
-                           file_path: str, 
-                           bucket_name: Optional[str] = None,
-                           byte_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    def _cache_lookup(self, bucket: str, object_key: str) -> Optional[Dict[str, Any]]:
         """
-        将对象下载到文件
+        查询本地磁盘缓存，条目到期时先用head_object比对ETag
         
         Args:
-            object_key: str, TOS中的对象键
-            file_path: str, 本地文件保存路径
-            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
-            byte_range: Optional[Tuple[int, int]], 字节范围，格式为(start, end)，用于部分下载
+            bucket: 存储桶名称
+            object_key: 对象键
             
         Returns:
-            Dict[str, Any]: 包含下载结果的字典，包含以下字段：
-                - success: 布尔值，表示下载是否成功
-                - request_id: 请求ID，用于定位问题
-                - object_key: 获取的对象键
-                - bucket: 使用的存储桶名称
-                - file_path: 本地文件保存路径
-                - file_size: int, 下载的文件大小（字节）
-                
-        Raises:
-            ValueError: 参数错误
+            Optional[Dict[str, Any]]: 可以直接使用的缓存条目，未启用缓存、未命中或ETag已变化时返回None
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.get(bucket, object_key)
+        if entry is None:
+            self.cache.record_miss()
+            return None
+        if entry['needs_revalidation']:
+            try:
+                etag = getattr(self.client.head_object(bucket, object_key), 'etag', None)
+            except Exception as e:
+                # 校验失败时按未命中处理，由后续的下载请求返回真实错误
+                logger.warning(f"缓存校验失败 - 存储桶: {bucket} | 对象键: {object_key} | 错误: {str(e)}")
+                self.cache.record_miss()
+                return None
+            if not etag or etag != entry['etag']:
+                self.cache.invalidate(bucket, object_key)
+                self.cache.record_miss(stale=True)
+                return None
+            self.cache.mark_validated(bucket, object_key)
+        return entry
+    
+    def _invalidate_cache(self, bucket: str, object_key: str) -> None:
+        """
+        对象被覆盖或删除后丢弃本地磁盘缓存
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+        """
+        if self.cache is not None:
+            self.cache.invalidate(bucket, object_key)
+    
+    @staticmethod
+    def _range_params(byte_range: Optional[Tuple[int, int]]) -> Dict[str, int]:
+        """
+        构造分段下载的请求参数
+        
+        Args:
+            byte_range: 字节范围(start, end)，包含end
+            
+        Returns:
+            Dict[str, int]: SDK get_object的range_start、range_end参数，没有范围时为空
+        """
+        if not byte_range:
+            return {}
+        start, end = byte_range
+        return {'range_start': start, 'range_end': end}
+    
+    @staticmethod
+    def _validate_byte_range(byte_range: Optional[Tuple[int, int]]) -> None:
+        """
+        校验字节范围参数
+        
+        Args:
+            byte_range: 字节范围(start, end)
+            
+        Raises:
+            ValueError: 字节范围格式不正确
+        """
+        if byte_range:
+            if not isinstance(byte_range, tuple) or len(byte_range) != 2:
+                raise ValueError("byte_range必须是长度为2的元组")
+            start, end = byte_range
+            if not isinstance(start, int) or not isinstance(end, int) or start < 0 or end < start:
+                raise ValueError("byte_range必须包含两个非负整数，且start <= end")
+    
+    @staticmethod
+    def _close_response(resp: Any) -> None:
+        """
+        关闭响应，释放连接（提前结束读取时连接不会被复用）
+        
+        Args:
+            resp: SDK get_object的返回值
+        """
+        for target in (resp, getattr(resp, 'content', None)):
+            close = getattr(target, 'close', None)
+            if callable(close):
+                close()
+                return
+    
+    def get_object_stream(self,
+                          object_key: str,
+                          bucket_name: Optional[str] = None,
+                          byte_range: Optional[Tuple[int, int]] = None,
+                          chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        流式获取对象内容，内容按块读取，不在内存中缓存整个对象
+        
+        请求在调用时立即发出，对象不存在等错误在返回前抛出；内容通过body迭代器按需读取，
+        调用方读取慢时不会继续从网络接收数据。body可以直接交给FastAPI的StreamingResponse。
+        
+        使用示例:
+            result = tos_client.get_object_stream('export.zip')
+            return StreamingResponse(result['body'], media_type=result['content_type'],
+                                     headers={'Content-Length': str(result['content_length'])})
+        
+        Args:
+            object_key: str, TOS中的对象键
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            byte_range: Optional[Tuple[int, int]], 字节范围，格式为(start, end)，用于部分下载
+            chunk_size: Optional[int], 每次读取的字节数，默认使用初始化时的配置
+            
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - success: 布尔值，表示请求是否成功
+                - request_id: 请求ID，用于定位问题
+                - body: Iterator[bytes], 对象内容的分块迭代器，读完或关闭后释放连接
+                - content_length: int, 本次返回的内容长度
+                - content_type: str, 对象的Content-Type
+                - etag: 对象的ETag值
+                - headers: Dict[str, str], 对象的响应头
+                - object_key: 获取的对象键
+                - bucket: 使用的存储桶名称
+                
+        Raises:
+            ValueError: 参数错误
+            tos.exceptions.TosClientError: 客户端错误，如非法请求参数或网络异常
+            tos.exceptions.TosServerError: 服务端错误，如对象不存在或权限不足
+        """
+        if not object_key or not isinstance(object_key, str):
+            raise ValueError("必须指定有效的object_key字符串")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        self._validate_byte_range(byte_range)
+        chunk_size = chunk_size or self.download_chunk_size
+        
+        try:
+            resp = self.client.get_object(bucket, object_key, **self._range_params(byte_range))
+        except Exception as e:
+            self._handle_tos_exception("流式获取对象", bucket, e, f"对象键: {object_key}")
+        
+        def body() -> Iterator[bytes]:
+            try:
+                while True:
+                    chunk = resp.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                self._close_response(resp)
+        
+        return {
+            'success': True,
+            'request_id': resp.request_id,
+            'body': body(),
+            'content_length': getattr(resp, 'content_length', None),
+            'content_type': getattr(resp, 'content_type', None),
+            'etag': getattr(resp, 'etag', None),
+            'headers': getattr(resp, 'headers', None),
+            'object_key': object_key,
+            'bucket': bucket
+        }
+    
+    @staticmethod
+    def _pwrite_response(fd: int, resp: Any, offset: int) -> int:
+        """
+        把响应内容按块写入文件的指定偏移，多个线程可以同时写同一个文件的不同区域
+        
+        Args:
+            fd: 文件描述符
+            resp: SDK get_object的返回值
+            offset: 写入的起始偏移
+            
+        Returns:
+            int: 写入的字节数
+        """
+        written = 0
+        for chunk in resp:
+            view = memoryview(chunk)
+            while view:
+                count = os.pwrite(fd, view, offset + written)
+                written += count
+                view = view[count:]
+        return written
+    
+    def _download_single(self, bucket: str, object_key: str, file_path: str,
+                         byte_range: Optional[Tuple[int, int]] = None) -> Tuple[str, Optional[str]]:
+        """
+        单连接下载对象到文件，内容按块写入
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            file_path: 本地文件保存路径
+            byte_range: 字节范围(start, end)
+            
+        Returns:
+            Tuple[str, Optional[str]]: (请求ID, 对象ETag)
+        """
+        resp = self.client.get_object(bucket, object_key, **self._range_params(byte_range))
+        with open(file_path, 'wb') as f:
+            for chunk in resp:
+                f.write(chunk)
+        return resp.request_id, getattr(resp, 'etag', None)
+    
+    def _download_ranges(self, bucket: str, object_key: str, file_path: str,
+                         part_size: int, max_workers: int) -> Tuple[str, int, Optional[str]]:
+        """
+        并发分段下载对象到文件
+        
+        第一段请求同时用于获取对象大小（Content-Range），对象不超过一个分段时只发一次请求；
+        其余分段带If-Match并发下载，保证各分段来自同一个对象版本，直接写入预先分配好大小的文件。
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            file_path: 本地文件保存路径
+            part_size: 分段大小
+            max_workers: 分段并发下载数
+            
+        Returns:
+            Tuple[str, int, Optional[str]]: (第一段请求的请求ID, 分段数, 对象ETag)
+        """
+        first = self.client.get_object(bucket, object_key, range_start=0, range_end=part_size - 1)
+        total = _parse_content_range_total(getattr(first, 'content_range', None))
+        etag = getattr(first, 'etag', None)
+        
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if total and total > part_size:
+                os.ftruncate(fd, total)
+            self._pwrite_response(fd, first, 0)
+            if not total or total <= part_size:
+                # 对象只有一个分段，或服务端忽略了Range直接返回了整个对象
+                return first.request_id, 1, etag
+            
+            ranges = [(start, min(start + part_size, total) - 1) for start in range(part_size, total, part_size)]
+            
+            def fetch(byte_range: Tuple[int, int]) -> None:
+                start, end = byte_range
+                params = {'if_match': etag} if etag else {}
+                resp = self.client.get_object(bucket, object_key, range_start=start, range_end=end, **params)
+                written = self._pwrite_response(fd, resp, start)
+                if written != end - start + 1:
+                    raise IOError(f"分段下载不完整: bytes={start}-{end}, 实际 {written} bytes")
+            
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(ranges)), thread_name_prefix="tos-range") as pool:
+                futures = [pool.submit(fetch, byte_range) for byte_range in ranges]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            return first.request_id, len(ranges) + 1, etag
+        finally:
+            os.close(fd)
+    
+    def _copy_from_cache(self, bucket: str, object_key: str, file_path: str) -> bool:
+        """
+        从本地磁盘缓存复制对象到文件
+        
+        Args:
+            bucket: 存储桶名称
+            object_key: 对象键
+            file_path: 本地文件保存路径
+            
+        Returns:
+            bool: 是否命中并复制成功
+        """
+        entry = self._cache_lookup(bucket, object_key)
+        if entry is None:
+            return False
+        try:
+            shutil.copyfile(entry['path'], file_path)
+        except FileNotFoundError:
+            if not os.path.exists(entry['path']):
+                # 缓存文件刚被其他进程淘汰
+                self.cache.record_miss()
+                return False
+            raise
+        self.cache.record_hit(entry['size'])
+        return True
+    
+    def get_object_to_file(self, 
+                           object_key: str, 
+                           file_path: str, 
+                           bucket_name: Optional[str] = None,
+                           byte_range: Optional[Tuple[int, int]] = None,
+                           part_size: Optional[int] = None,
+                           max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        将对象下载到文件
+        
+        内容按块写入文件，不在内存中缓存整个对象。未指定byte_range且max_workers大于1时，
+        超过一个分段的对象按分段并发下载，各分段通过os.pwrite写入预先分配好大小的文件。
+        启用本地磁盘缓存时，未指定byte_range的下载优先从缓存复制，下载完成后写入缓存。
+        
+        Args:
+            object_key: str, TOS中的对象键
+            file_path: str, 本地文件保存路径
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            byte_range: Optional[Tuple[int, int]], 字节范围，格式为(start, end)，用于部分下载
+            part_size: Optional[int], 并发下载的分段大小，默认使用初始化时的配置
+            max_workers: Optional[int], 分段并发下载数，默认使用初始化时的配置，1表示单连接下载
+            
+        Returns:
+            Dict[str, Any]: 包含下载结果的字典，包含以下字段：
+                - success: 布尔值，表示下载是否成功
+                - request_id: 请求ID，用于定位问题
+                - object_key: 获取的对象键
+                - bucket: 使用的存储桶名称
+                - file_path: 本地文件保存路径
+                - file_size: int, 下载的文件大小（字节）
+                - parts: int, 下载使用的请求数，从缓存复制时为0
+                - cached: 布尔值，是否从本地磁盘缓存复制
+                
+        Raises:
+            ValueError: 参数错误
             FileNotFoundError: 文件保存目录不存在
             PermissionError: 没有写入权限
             Exception: TOS相关错误
@@ -782,13 +1805,9 @@ class TOSClient:
         if not bucket:
             raise ValueError("未指定存储桶名称")
         
-        # 参数验证 - byte_range
-        if byte_range:
-            if not isinstance(byte_range, tuple) or len(byte_range) != 2:
-                raise ValueError("byte_range必须是长度为2的元组")
-            start, end = byte_range
-            if not isinstance(start, int) or not isinstance(end, int) or start < 0 or end < start:
-                raise ValueError("byte_range必须包含两个非负整数，且start <= end")
+        self._validate_byte_range(byte_range)
+        part_size = part_size or self.download_part_size
+        max_workers = self.download_max_workers if max_workers is None else max_workers
         
         try:
             # 检查目录是否存在
@@ -796,36 +1815,62 @@ class TOSClient:
             if directory and not os.path.exists(directory):
                 raise FileNotFoundError(f"保存目录不存在: {directory}")
             
-            # 构建请求参数
-            params = {}
-            if byte_range:
-                start, end = byte_range
-                params['Range'] = f'bytes={start}-{end}'
-            
-            # 获取对象
-            resp = self.client.get_object(bucket, object_key, **params)
-            
-            # 写入文件
-            with open(file_path, 'wb') as f:
-                f.write(resp.read())
+            if not byte_range and self._copy_from_cache(bucket, object_key, file_path):
+                file_size = os.path.getsize(file_path)
+                logger.info(
+                    f"对象缓存命中 - 存储桶: {bucket} | "
+                    f"对象键: {object_key} | "
+                    f"保存至: {file_path} | "
+                    f"大小: {file_size} bytes"
+                )
+                return {
+                    'success': True,
+                    'request_id': None,
+                    'file_path': file_path,
+                    'file_size': file_size,
+                    'parts': 0,
+                    'object_key': object_key,
+                    'bucket': bucket,
+                    'cached': True
+                }
+            
+            etag = None
+            if byte_range or max_workers <= 1 or not hasattr(os, 'pwrite'):
+                (request_id, etag), parts = self._download_single(bucket, object_key, file_path, byte_range), 1
+            else:
+                try:
+                    request_id, parts, etag = self._download_ranges(bucket, object_key, file_path, part_size, max_workers)
+                except Exception as e:
+                    # 下载失败时不留下不完整的文件
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    if not (isinstance(e, tos.exceptions.TosServerError) and getattr(e, 'status_code', None) == 416):
+                        raise
+                    # 空对象不支持Range请求，改为普通下载
+                    (request_id, etag), parts = self._download_single(bucket, object_key, file_path), 1
             
             file_size = os.path.getsize(file_path)
+            if self.cache is not None and not byte_range:
+                self.cache.put_file(bucket, object_key, file_path, etag=etag)
             
             # 优化日志格式
             logger.info(
                 f"对象下载成功 - 存储桶: {bucket} | "
                 f"对象键: {object_key} | "
                 f"保存至: {file_path} | "
-                f"大小: {file_size} bytes"
+                f"大小: {file_size} bytes | "
+                f"分段: {parts}"
             )
             
             return {
                 'success': True,
-                'request_id': resp.request_id,
+                'request_id': request_id,
                 'file_path': file_path,
                 'file_size': file_size,
+                'parts': parts,
                 'object_key': object_key,
-                'bucket': bucket
+                'bucket': bucket,
+                'cached': False
             }
             
         except (FileNotFoundError, PermissionError, ValueError) as e:
@@ -868,6 +1913,7 @@ class TOSClient:
         try:
             # 删除对象
             resp = self.client.delete_object(bucket, object_key)
+            self._invalidate_cache(bucket, object_key)
             
             # 优化日志格式
             logger.info(
@@ -950,6 +1996,162 @@ class TOSClient:
             error_info = f"对象键: {object_key}"
             self._handle_tos_exception("获取对象元信息", bucket, e, error_info)
     
+    def get_object_url(self, object_key: str, bucket_name: Optional[str] = None) -> str:
+        """
+        获取对象的访问URL（与上传接口返回的object_url格式相同）
+        
+        Args:
+            object_key: str, 对象键
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            
+        Returns:
+            str: 对象的访问URL
+        """
+        return f"https://{bucket_name or self.bucket_name}.{self.endpoint}/{object_key}"
+    
+    def presign_put_object(self,
+                           object_key: str,
+                           expires: int = 600,
+                           content_type: Optional[str] = None,
+                           content_length: Optional[int] = None,
+                           bucket_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        生成上传对象的预签名PUT URL，供浏览器直接上传到TOS
+        
+        content_type和content_length会加入签名，上传时请求头必须与返回的headers完全一致，
+        否则TOS拒绝请求，以此限制上传内容的类型和大小。签名在本地计算，不发出网络请求。
+        
+        Args:
+            object_key: str, 上传的对象键，由服务端决定
+            expires: int, URL有效期（秒）
+            content_type: Optional[str], 要求的Content-Type
+            content_length: Optional[int], 要求的内容字节数
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - success: 布尔值，表示签名是否成功
+                - method: 'PUT'
+                - url: 预签名URL
+                - headers: Dict[str, str], 上传时必须携带的请求头（浏览器自动设置的Host除外）
+                - expires: URL有效期（秒）
+                - object_key: 上传的对象键
+                - bucket: 使用的存储桶名称
+                
+        Raises:
+            ValueError: 参数错误
+            tos.exceptions.TosClientError: 签名参数不合法
+        """
+        if not object_key or not isinstance(object_key, str):
+            raise ValueError("必须指定有效的object_key字符串")
+        if expires <= 0:
+            raise ValueError("expires必须大于0")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        header = {}
+        if content_type:
+            header['Content-Type'] = content_type
+        if content_length is not None:
+            header['Content-Length'] = str(content_length)
+        
+        try:
+            resp = self.client.pre_signed_url(
+                tos.HttpMethodType.Http_Method_Put, bucket, object_key,
+                expires=expires, header=header, is_signed_all_headers=True
+            )
+        except Exception as e:
+            self._handle_tos_exception("生成预签名上传URL", bucket, e, f"对象键: {object_key}")
+        
+        return {
+            'success': True,
+            'method': 'PUT',
+            'url': resp.signed_url,
+            'headers': {key: value for key, value in resp.signed_header.items() if key.lower() != 'host'},
+            'expires': expires,
+            'object_key': object_key,
+            'bucket': bucket
+        }
+    
+    def presign_post_object(self,
+                            object_key: str,
+                            expires: int = 600,
+                            content_type: Optional[str] = None,
+                            min_size: int = 1,
+                            max_size: Optional[int] = None,
+                            bucket_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        生成浏览器表单上传（PostObject）的签名策略
+        
+        与预签名PUT URL相比，策略中的content-length-range允许一个大小范围，
+        适合上传前不知道准确大小的场景（如前端压缩后再上传）。签名在本地计算，不发出网络请求。
+        
+        Args:
+            object_key: str, 上传的对象键，由服务端决定
+            expires: int, 策略有效期（秒）
+            content_type: Optional[str], 要求的Content-Type，表单中必须携带相同的Content-Type字段
+            min_size: int, 允许的最小字节数
+            max_size: Optional[int], 允许的最大字节数
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            
+        Returns:
+            Dict[str, Any]: 包含以下字段：
+                - success: 布尔值，表示签名是否成功
+                - method: 'POST'
+                - url: 表单提交地址
+                - fields: Dict[str, str], 需要放在文件字段之前的表单字段
+                - expires: 策略有效期（秒）
+                - object_key: 上传的对象键
+                - bucket: 使用的存储桶名称
+                
+        Raises:
+            ValueError: 参数错误
+            tos.exceptions.TosClientError: 签名参数不合法
+        """
+        if not object_key or not isinstance(object_key, str):
+            raise ValueError("必须指定有效的object_key字符串")
+        if expires <= 0:
+            raise ValueError("expires必须大于0")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        conditions = []
+        if content_type:
+            conditions.append(tos.models2.PostSignatureCondition('Content-Type', content_type))
+        content_length_range = tos.models2.ContentLengthRange(min_size, max_size) if max_size else None
+        
+        try:
+            resp = self.client.pre_signed_post_signature(
+                conditions, bucket, object_key, expires, content_length_range
+            )
+        except Exception as e:
+            self._handle_tos_exception("生成表单上传策略", bucket, e, f"对象键: {object_key}")
+        
+        fields = {
+            'key': object_key,
+            'policy': resp.policy,
+            'x-tos-algorithm': resp.algorithm,
+            'x-tos-credential': resp.credential,
+            'x-tos-date': resp.date,
+            'x-tos-signature': resp.signature
+        }
+        if content_type:
+            fields['Content-Type'] = content_type
+        
+        return {
+            'success': True,
+            'method': 'POST',
+            'url': f"https://{bucket}.{self.endpoint}",
+            'fields': fields,
+            'expires': expires,
+            'object_key': object_key,
+            'bucket': bucket
+        }
+    
     def list_objects(self, 
                      prefix: Optional[str] = None,
                      marker: Optional[str] = None,
@@ -1043,11 +2245,251 @@ class TOSClient:
             error_info = f"前缀: {prefix}, 最大键数: {max_keys}"
             self._handle_tos_exception("列举对象", bucket, e, error_info)
     
+    def iter_objects(self,
+                     prefix: Optional[str] = None,
+                     bucket_name: Optional[str] = None,
+                     page_size: int = 1000,
+                     start_after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐个返回前缀下的所有对象，按需通过continuation token翻页
+        
+        只有迭代到当前页末尾时才请求下一页，提前结束迭代不会再发请求。
+        
+        使用示例:
+            for obj in tos_client.iter_objects(prefix='model_images/'):
+                print(obj['key'], obj['size'])
+        
+        Args:
+            prefix: Optional[str], 列出以指定前缀开头的对象
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            page_size: int, 每页对象数量，默认1000，最大支持1000
+            start_after: Optional[str], 从指定对象键之后开始列举
+            
+        Returns:
+            Iterator[Dict[str, Any]]: 对象迭代器，每个对象包含key、size、etag、last_modified
+            
+        Raises:
+            ValueError: 参数错误
+            Exception: TOS相关错误
+        """
+        if page_size <= 0 or page_size > 1000:
+            raise ValueError("page_size必须在1-1000之间")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        continuation_token = None
+        pages = 0
+        while True:
+            params = {'max_keys': page_size, 'list_only_once': True}
+            if prefix is not None:
+                params['prefix'] = prefix
+            if continuation_token:
+                params['continuation_token'] = continuation_token
+            elif start_after:
+                params['start_after'] = start_after
+            
+            try:
+                resp = self.client.list_objects_type2(bucket, **params)
+            except Exception as e:
+                self._handle_tos_exception("分页列举对象", bucket, e, f"前缀: {prefix}, 已列举页数: {pages}")
+            pages += 1
+            
+            for obj in resp.contents:
+                yield {
+                    'key': obj.key,
+                    'size': obj.size,
+                    'etag': obj.etag,
+                    'last_modified': obj.last_modified
+                }
+            
+            continuation_token = getattr(resp, 'next_continuation_token', None)
+            if not resp.is_truncated or not continuation_token:
+                break
+    
+    def bulk_delete(self,
+                    object_keys: Iterable[str],
+                    bucket_name: Optional[str] = None,
+                    batch_size: int = BULK_BATCH_SIZE,
+                    max_workers: int = BULK_MAX_WORKERS,
+                    max_requests_per_second: Optional[float] = None) -> Dict[str, Any]:
+        """
+        批量删除任意数量的对象
+        
+        对象键按batch_size分批，每批一次批量删除请求，多个批次并发执行；
+        object_keys可以是生成器（例如iter_objects的结果），不会一次性读入内存。
+        单个批次失败不影响其他批次，失败的对象记录在errors中。
+        
+        使用示例:
+            keys = (obj['key'] for obj in tos_client.iter_objects(prefix='tmp/'))
+            result = tos_client.bulk_delete(keys, max_requests_per_second=20)
+        
+        Args:
+            object_keys: Iterable[str], 对象键
+            bucket_name: Optional[str], 存储桶名称，默认使用初始化时的桶名
+            batch_size: int, 每批对象数量，默认1000，最大支持1000
+            max_workers: int, 并发执行的批次数
+            max_requests_per_second: Optional[float], 每秒最多发出的请求数，None表示不限速
+            
+        Returns:
+            Dict[str, Any]: 汇总结果，包含以下字段：
+                - success: 布尔值，所有对象都删除成功时为True
+                - bucket: 使用的存储桶名称
+                - total: 提交删除的对象数量
+                - deleted: 删除成功的对象数量
+                - errors: List[Dict], 删除失败的对象，每项包含key、code、message
+                - batches: 批次数量
+                - elapsed: 耗时（秒）
+                
+        Raises:
+            ValueError: 参数错误
+        """
+        if batch_size <= 0 or batch_size > BULK_BATCH_SIZE:
+            raise ValueError(f"batch_size必须在1-{BULK_BATCH_SIZE}之间")
+        if max_workers < 1:
+            raise ValueError("max_workers必须大于0")
+        
+        bucket = bucket_name or self.bucket_name
+        if not bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        limiter = _RateLimiter(max_requests_per_second)
+        
+        def delete_batch(keys: List[str]) -> Tuple[int, int, List[Dict[str, Any]]]:
+            limiter.acquire()
+            try:
+                result = self.delete_objects(keys, bucket_name=bucket)
+                return len(keys), len(result['deleted']), result['errors']
+            except Exception as e:
+                return len(keys), 0, [{'key': key, 'code': type(e).__name__, 'message': str(e)} for key in keys]
+        
+        started = time.perf_counter()
+        total = deleted = batches = 0
+        errors = []
+        for count, deleted_count, batch_errors in _bounded_map(delete_batch, _chunked(object_keys, batch_size), max_workers):
+            total += count
+            deleted += deleted_count
+            errors.extend(batch_errors)
+            batches += 1
+        elapsed = time.perf_counter() - started
+        
+        logger.info(
+            f"批量删除完成 - 存储桶: {bucket} | "
+            f"总数量: {total} | "
+            f"成功: {deleted} | "
+            f"失败: {len(errors)} | "
+            f"批次: {batches} | "
+            f"耗时: {elapsed:.2f}s"
+        )
+        return {
+            'success': not errors,
+            'bucket': bucket,
+            'total': total,
+            'deleted': deleted,
+            'errors': errors,
+            'batches': batches,
+            'elapsed': elapsed
+        }
+    
+    def bulk_copy(self,
+                  key_pairs: Iterable[Tuple[str, str]],
+                  source_bucket_name: Optional[str] = None,
+                  dest_bucket_name: Optional[str] = None,
+                  batch_size: int = BULK_BATCH_SIZE,
+                  max_workers: int = BULK_MAX_WORKERS,
+                  max_requests_per_second: Optional[float] = None) -> Dict[str, Any]:
+        """
+        批量复制任意数量的对象
+        
+        TOS没有批量复制接口，每个对象一次复制请求：(源对象键, 目标对象键)按batch_size分批，
+        每个批次内的对象依次复制，多个批次并发执行，所有请求共享同一个速率上限。
+        key_pairs可以是生成器，不会一次性读入内存。单个对象失败不影响其他对象。
+        
+        使用示例:
+            pairs = ((obj['key'], 'archive/' + obj['key']) for obj in tos_client.iter_objects(prefix='model_images/'))
+            result = tos_client.bulk_copy(pairs, max_workers=8, max_requests_per_second=100)
+        
+        Args:
+            key_pairs: Iterable[Tuple[str, str]], (源对象键, 目标对象键)
+            source_bucket_name: Optional[str], 源存储桶名称，默认使用初始化时的桶名
+            dest_bucket_name: Optional[str], 目标存储桶名称，默认使用初始化时的桶名
+            batch_size: int, 每批对象数量
+            max_workers: int, 并发执行的批次数
+            max_requests_per_second: Optional[float], 每秒最多发出的请求数，None表示不限速
+            
+        Returns:
+            Dict[str, Any]: 汇总结果，包含以下字段：
+                - success: 布尔值，所有对象都复制成功时为True
+                - source_bucket: 源存储桶名称
+                - dest_bucket: 目标存储桶名称
+                - total: 提交复制的对象数量
+                - copied: 复制成功的对象数量
+                - errors: List[Dict], 复制失败的对象，每项包含source_key、dest_key、message
+                - batches: 批次数量
+                - elapsed: 耗时（秒）
+                
+        Raises:
+            ValueError: 参数错误
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size必须大于0")
+        if max_workers < 1:
+            raise ValueError("max_workers必须大于0")
+        
+        source_bucket = source_bucket_name or self.bucket_name
+        dest_bucket = dest_bucket_name or self.bucket_name
+        if not source_bucket or not dest_bucket:
+            raise ValueError("未指定存储桶名称")
+        
+        limiter = _RateLimiter(max_requests_per_second)
+        
+        def copy_batch(pairs: List[Tuple[str, str]]) -> Tuple[int, int, List[Dict[str, Any]]]:
+            copied = 0
+            batch_errors = []
+            for source_key, dest_key in pairs:
+                limiter.acquire()
+                try:
+                    self.copy_object(source_key, dest_key, source_bucket_name=source_bucket, dest_bucket_name=dest_bucket)
+                    copied += 1
+                except Exception as e:
+                    batch_errors.append({'source_key': source_key, 'dest_key': dest_key, 'message': str(e)})
+            return len(pairs), copied, batch_errors
+        
+        started = time.perf_counter()
+        total = copied = batches = 0
+        errors = []
+        for count, copied_count, batch_errors in _bounded_map(copy_batch, _chunked(key_pairs, batch_size), max_workers):
+            total += count
+            copied += copied_count
+            errors.extend(batch_errors)
+            batches += 1
+        elapsed = time.perf_counter() - started
+        
+        logger.info(
+            f"批量复制完成 - 源存储桶: {source_bucket} | "
+            f"目标存储桶: {dest_bucket} | "
+            f"总数量: {total} | "
+            f"成功: {copied} | "
+            f"失败: {len(errors)} | "
+            f"耗时: {elapsed:.2f}s"
+        )
+        return {
+            'success': not errors,
+            'source_bucket': source_bucket,
+            'dest_bucket': dest_bucket,
+            'total': total,
+            'copied': copied,
+            'errors': errors,
+            'batches': batches,
+            'elapsed': elapsed
+        }
+    
     def delete_objects(self, 
                       object_keys: List[str], 
                       bucket_name: Optional[str] = None) -> Dict[str, Any]:
         """
-        批量删除对象
+        批量删除对象（单次请求，最多1000个）
         
         Args:
             object_keys: List[str], 对象键列表
@@ -1073,6 +2515,9 @@ class TOSClient:
         if len(object_keys) == 0:
             raise ValueError("对象键列表不能为空")
         
+        if len(object_keys) > BULK_BATCH_SIZE:
+            raise ValueError(f"单次最多删除{BULK_BATCH_SIZE}个对象，更多对象请使用bulk_delete")
+        
         # 验证每个object_key
         for key in object_keys:
             if not key or not isinstance(key, str):
@@ -1085,13 +2530,15 @@ class TOSClient:
         
         try:
             # 批量删除对象
-            resp = self.client.delete_objects(bucket, object_keys)
+            resp = self.client.delete_multi_objects(
+                bucket, [tos.models2.ObjectTobeDeleted(key=key) for key in object_keys]
+            )
             
             # 获取删除结果
             deleted_keys = [obj.key for obj in resp.deleted]
-            errors = []
-            if hasattr(resp, 'errors'):
-                errors = [{'key': err.key, 'code': err.code, 'message': err.message} for err in resp.errors]
+            for key in deleted_keys:
+                self._invalidate_cache(bucket, key)
+            errors = [{'key': err.key, 'code': err.code, 'message': err.message} for err in getattr(resp, 'error', None) or []]
             
             # 优化日志格式
             logger.info(
@@ -1160,11 +2607,11 @@ class TOSClient:
             raise ValueError("未指定目标存储桶名称")
         
         try:
-            # 构建源对象信息
-            source = {"bucket": source_bucket, "key": source_object_key}
-            
             # 复制对象
-            resp = self.client.copy_object(dest_bucket, dest_object_key, source)
+            resp = self.client.copy_object(
+                bucket=dest_bucket, key=dest_object_key, src_bucket=source_bucket, src_key=source_object_key
+            )
+            self._invalidate_cache(dest_bucket, dest_object_key)
             
             # 优化日志格式
             logger.info(f"对象复制成功: 源[{source_bucket}/{source_object_key}] -> 目标[{dest_bucket}/{dest_object_key}]")
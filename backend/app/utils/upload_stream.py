@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+multipart上传文件的流式处理
+
+Starlette解析multipart请求时，每个文件part写入SpooledTemporaryFile（超过1MB转存到磁盘），
+这里分块读取该文件计算sha256并校验大小，然后把文件对象直接交给TOS SDK分块上传，
+整个过程内存中最多只有一个分块，不会把整张图片读成bytes或base64字符串。
+对象键由内容哈希生成，同一张图片重复上传时对象键相同。
+"""
+
+import hashlib
+from typing import IO, Any, Dict, List, Optional
+
+from fastapi import UploadFile
+
+from .image_compressor import ImageCompressor, ImageTooLargeError, ImageValidationError
+
+# 分块读取的大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 图片格式对应的扩展名
+FORMAT_EXTENSIONS = {
+    'JPEG': '.jpg',
+    'PNG': '.png',
+    'WEBP': '.webp',
+    'BMP': '.bmp'
+}
+
+
+class StreamedUpload:
+    """
+    已校验并计算哈希的上传文件
+    """
+
+    def __init__(self, field: str, fileobj: IO, size: int, sha256: str, image_format: str, object_key: str):
+        """
+        Args:
+            field: 表单字段名
+            fileobj: 已定位到开头的文件对象
+            size: 文件大小（字节）
+            sha256: 文件内容的sha256
+            image_format: 图片格式
+            object_key: TOS对象键
+        """
+        self.field = field
+        self.fileobj = fileobj
+        self.size = size
+        self.sha256 = sha256
+        self.image_format = image_format
+        self.object_key = object_key
+
+
+async def hash_upload(file: UploadFile, max_size: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    分块读取上传文件，计算sha256并校验大小，读取完成后回到文件开头
+
+    Args:
+        file: 上传的文件
+        max_size: 最大允许的字节数
+        chunk_size: 分块大小
+
+    Returns:
+        Dict[str, Any]: {'sha256': 十六进制哈希, 'size': 字节数}
+
+    Raises:
+        ImageTooLargeError: 文件超过大小限制
+        ImageValidationError: 文件为空
+    """
+    declared_size = getattr(file, 'size', None)
+    if declared_size and declared_size > max_size:
+        raise ImageTooLargeError(f"文件 {file.filename} 大小 {declared_size / 1024 / 1024:.2f}MB 超过限制 {max_size / 1024 / 1024:.0f}MB")
+
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise ImageTooLargeError(f"文件 {file.filename} 超过大小限制 {max_size / 1024 / 1024:.0f}MB")
+        digest.update(chunk)
+
+    if size == 0:
+        raise ImageValidationError(f"文件 {file.filename} 为空")
+    await file.seek(0)
+    return {'sha256': digest.hexdigest(), 'size': size}
+
+
+async def prepare_image_uploads(
+    files: Dict[str, Optional[UploadFile]],
+    compressor: ImageCompressor,
+    max_size: int,
+    prefix: str = 'model_images'
+) -> List[StreamedUpload]:
+    """
+    校验多个上传的图片文件，生成按内容寻址的TOS对象键
+
+    Args:
+        files: 表单字段名到上传文件的映射，未上传的字段为None
+        compressor: 用于读取图片头预检的压缩器
+        max_size: 单个文件的最大字节数
+        prefix: 对象键前缀
+
+    Returns:
+        List[StreamedUpload]: 已校验的上传文件，文件对象位于开头
+
+    Raises:
+        ImageValidationError: 文件为空、过大、像素过多或格式不支持
+    """
+    uploads = []
+    for field, file in files.items():
+        if file is None:
+            continue
+        digest = await hash_upload(file, max_size)
+
+        # 只读取图片头预检，然后回到文件开头供上传
+        image_format, _ = compressor.preflight(file.file)
+        await file.seek(0)
+
+        extension = FORMAT_EXTENSIONS.get(image_format, '.png')
+        object_key = f"{prefix}/{digest['sha256'][:32]}{extension}"
+        uploads.append(StreamedUpload(field, file.file, digest['size'], digest['sha256'], image_format, object_key))
+    return uploads
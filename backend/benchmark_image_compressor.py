@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+ImageCompressor 压缩质量查找微基准
+
+对 backend/data 下的示例图片，分别用旧的逐级降低质量（85、80、75……10）和新的
+插值查找压缩到目标大小，比较编码次数、耗时和最终大小。
+示例图片大多小于3MB，默认把目标大小设为每张图片原始编码大小的一部分，以触发查找。
+
+用法:
+    python benchmark_image_compressor.py
+    python benchmark_image_compressor.py --ratio 0.3 --format WEBP
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.image_compressor import ImageCompressor
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SAMPLE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+
+class CountingCompressor(ImageCompressor):
+    """记录编码次数的压缩器"""
+
+    def __init__(self):
+        super().__init__()
+        self.encodes = 0
+
+    def _encode(self, image, format, quality=None):
+        self.encodes += 1
+        return super()._encode(image, format, quality)
+
+    def linear_search(self, image, format, quality):
+        """旧实现：从默认质量开始每次降低5，直到满足大小"""
+        current_quality = quality
+        while True:
+            data = self._encode(image, format, current_quality)
+            if len(data) <= self.max_file_size or current_quality <= self.min_quality:
+                return data
+            current_quality -= 5
+
+
+def find_samples(limit):
+    """查找示例图片"""
+    samples = []
+    for root, _, files in os.walk(DATA_DIR):
+        for name in sorted(files):
+            if name.lower().endswith(SAMPLE_EXTENSIONS):
+                samples.append(os.path.join(root, name))
+    return samples[:limit]
+
+
+def run(compressor, search, image, format, quality):
+    """执行一次查找，返回(编码次数, 耗时毫秒, 结果大小)"""
+    compressor.encodes = 0
+    start = time.perf_counter()
+    data = search(image, format, quality)
+    elapsed = (time.perf_counter() - start) * 1000
+    return compressor.encodes, elapsed, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ImageCompressor 压缩质量查找微基准')
+    parser.add_argument('--ratio', type=float, default=0.4, help='目标大小占默认质量编码大小的比例')
+    parser.add_argument('--format', default='JPEG', choices=['JPEG', 'WEBP'], help='编码格式')
+    parser.add_argument('--limit', type=int, default=20, help='最多测试的图片数量')
+    args = parser.parse_args()
+
+    samples = find_samples(args.limit)
+    if not samples:
+        print(f"未找到示例图片: {DATA_DIR}")
+        return
+
+    compressor = CountingCompressor()
+    totals = {'linear': [0, 0.0], 'search': [0, 0.0]}
+
+    print(f"{'图片':<40} {'目标KB':>8} {'旧:次数':>8} {'旧:ms':>9} {'旧:KB':>8} {'新:次数':>8} {'新:ms':>9} {'新:KB':>8}")
+    for path in samples:
+        with Image.open(path) as img:
+            image = compressor._resize_image(img.convert('RGB'))
+
+        quality = compressor.default_quality
+        compressor.max_file_size = 1 << 62
+        reference = len(compressor._encode(image, args.format, quality))
+        compressor.max_file_size = int(reference * args.ratio)
+
+        linear = run(compressor, compressor.linear_search, image, args.format, quality)
+        search = run(compressor, compressor._search_quality, image, args.format, quality)
+        for key, result in (('linear', linear), ('search', search)):
+            totals[key][0] += result[0]
+            totals[key][1] += result[1]
+
+        print(f"{os.path.basename(path)[:40]:<40} {compressor.max_file_size / 1024:>8.0f} "
+              f"{linear[0]:>8} {linear[1]:>9.1f} {linear[2] / 1024:>8.0f} "
+              f"{search[0]:>8} {search[1]:>9.1f} {search[2] / 1024:>8.0f}")
+
+    count = len(samples)
+    print(f"\n共 {count} 张图片")
+    for key, label in (('linear', '逐级降低质量'), ('search', '插值查找质量')):
+        encodes, elapsed = totals[key]
+        print(f"{label}: 平均编码 {encodes / count:.2f} 次, 平均耗时 {elapsed / count:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+TOSClient 单次上传与分片并发上传对比基准
+
+默认使用进程内的本地对象存储替身：每个请求（连接）限速 --stream-mbps，所有连接共享
+--link-mbps 的总带宽，并有 --latency-ms 的请求延迟，用来模拟单连接吞吐受限的公网上传。
+替身只统计收到的字节数，不落盘。
+指定 --endpoint 时改为上传到真实的TOS兼容端点（凭证从环境变量 TOS_ACCESS_KEY、
+TOS_SECRET_KEY 读取），测试对象在结束后删除。
+
+用法:
+    python benchmark_tos_multipart.py
+    python benchmark_tos_multipart.py --sizes 50,200,500 --part-size 16 --workers 4,8
+    python benchmark_tos_multipart.py --endpoint tos-cn-guangzhou.volces.com --region cn-guangzhou --bucket test
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.tos_utils import TOSClient
+
+MB = 1024 * 1024
+TRANSFER_CHUNK = 256 * 1024
+
+
+class Link:
+    """所有连接共享的总带宽（令牌桶）"""
+
+    def __init__(self, mbps):
+        self.rate = mbps * MB
+        self.lock = threading.Lock()
+        self.available_at = time.perf_counter()
+
+    def reserve(self, nbytes):
+        """预约nbytes的发送时间，返回可以发送完成的时刻"""
+        with self.lock:
+            start = max(self.available_at, time.perf_counter())
+            self.available_at = start + nbytes / self.rate
+            return self.available_at
+
+
+class StandInStore:
+    """
+    本地对象存储替身，实现TOSClient用到的SDK方法
+    """
+
+    def __init__(self, stream_mbps, link_mbps, latency_ms):
+        self.stream_rate = stream_mbps * MB
+        self.link = Link(link_mbps)
+        self.latency = latency_ms / 1000
+        self.uploads = {}
+        self.lock = threading.Lock()
+        self.received = 0
+
+    def _transfer(self, reader):
+        """按单连接限速和共享带宽接收数据"""
+        time.sleep(self.latency)
+        total = 0
+        started = time.perf_counter()
+        while True:
+            chunk = reader(TRANSFER_CHUNK)
+            if not chunk:
+                break
+            total += len(chunk)
+            done_at = max(self.link.reserve(len(chunk)), started + total / self.stream_rate)
+            delay = done_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        with self.lock:
+            self.received += total
+        return total
+
+    def put_object_from_file(self, bucket, key, file_path, **kwargs):
+        with open(file_path, 'rb') as f:
+            self._transfer(f.read)
+        return SimpleNamespace(request_id='standin', etag='etag', status_code=200)
+
+    def create_multipart_upload(self, bucket, key, **kwargs):
+        with self.lock:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+        return SimpleNamespace(upload_id=upload_id)
+
+    def upload_part(self, bucket, key, upload_id, part_number, content):
+        view = memoryview(content)
+        offset = [0]
+
+        def reader(size):
+            chunk = view[offset[0]:offset[0] + size]
+            offset[0] += len(chunk)
+            return chunk
+
+        self.uploads[upload_id][part_number] = self._transfer(reader)
+        return SimpleNamespace(etag=f"etag-{part_number}")
+
+    def list_parts(self, bucket, key, upload_id, max_parts=1000):
+        return SimpleNamespace(parts=[])
+
+    def complete_multipart_upload(self, bucket, key, upload_id, parts):
+        time.sleep(self.latency)
+        self.uploads.pop(upload_id)
+        return SimpleNamespace(request_id='standin', etag='etag', status_code=200)
+
+    def abort_multipart_upload(self, bucket, key, upload_id):
+        self.uploads.pop(upload_id, None)
+
+
+def make_file(directory, size_mb):
+    """生成指定大小的测试文件"""
+    path = os.path.join(directory, f"bench_{size_mb}mb.bin")
+    block = os.urandom(MB)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path
+
+
+def timed(func, *args, **kwargs):
+    """执行一次上传，返回耗时秒数"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    if not result.get('success'):
+        raise RuntimeError(f"上传失败: {result}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TOSClient 单次上传与分片并发上传对比基准')
+    parser.add_argument('--sizes', default='50,200,500', help='测试文件大小（MB），逗号分隔')
+    parser.add_argument('--part-size', type=int, default=16, help='分片大小（MB）')
+    parser.add_argument('--workers', default='4,8', help='分片并发数，逗号分隔')
+    parser.add_argument('--stream-mbps', type=float, default=40, help='替身：单连接带宽（MB/s）')
+    parser.add_argument('--link-mbps', type=float, default=400, help='替身：总带宽（MB/s）')
+    parser.add_argument('--latency-ms', type=float, default=30, help='替身：请求延迟（毫秒）')
+    parser.add_argument('--endpoint', help='上传到真实的TOS兼容端点')
+    parser.add_argument('--region', default=os.getenv('TOS_REGION', 'cn-guangzhou'))
+    parser.add_argument('--bucket', default=os.getenv('TOS_BUCKET'))
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    workers = [int(count) for count in args.workers.split(',')]
+
+    if args.endpoint:
+        client = TOSClient(endpoint=args.endpoint, region=args.region, bucket_name=args.bucket)
+        print(f"上传到 {args.endpoint}/{args.bucket}")
+    else:
+        client = TOSClient(ak='standin', sk='standin', endpoint='standin.local', region='local', bucket_name='bench')
+        client.client = StandInStore(args.stream_mbps, args.link_mbps, args.latency_ms)
+        print(f"本地替身: 单连接 {args.stream_mbps} MB/s, 总带宽 {args.link_mbps} MB/s, 延迟 {args.latency_ms} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"\n{'大小MB':>7} {'方式':<16} {'耗时s':>8} {'MB/s':>8} {'加速比':>7}")
+        for size_mb in sizes:
+            path = make_file(tmp_dir, size_mb)
+            key = f"benchmark/{os.path.basename(path)}"
+
+            # 单次上传：直接调用SDK，绕过自动分片
+            start = time.perf_counter()
+            client.client.put_object_from_file(bucket=client.bucket_name, key=key, file_path=path)
+            single = time.perf_counter() - start
+            print(f"{size_mb:>7} {'single-shot':<16} {single:>8.2f} {size_mb / single:>8.1f} {1:>7.2f}")
+
+            for count in workers:
+                elapsed = timed(
+                    client.put_object_from_file_multipart, path, key,
+                    part_size=args.part_size * MB, max_workers=count, enable_checkpoint=False
+                )
+                label = f"multipart x{count}"
+                print(f"{size_mb:>7} {label:<16} {elapsed:>8.2f} {size_mb / elapsed:>8.1f} {single / elapsed:>7.2f}")
+
+            if args.endpoint:
+                client.delete_object(key)
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
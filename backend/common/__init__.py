@@ -3,8 +3,12 @@
 """
 from .distributed_lock import DistributedLock
 from .idempotent import IdempotentChecker
+from .singleflight import SingleFlight, get_singleflight, make_singleflight_key
 
 __all__ = [
     "DistributedLock",
-    "IdempotentChecker"
+    "IdempotentChecker",
+    "SingleFlight",
+    "get_singleflight",
+    "make_singleflight_key"
 ]
@@ -0,0 +1,243 @@
+"""
+请求合并（Singleflight）
+相同参数的昂贵调用同时只执行一次，其他重复调用等待并共享第一次调用的结果
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+from .distributed_lock import DistributedLock
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    基于进程内Future和Redis租约的请求合并器
+
+    1. 进程内：相同键的并发调用共享同一个Future
+    2. 跨进程：通过Redis租约（SET NX）选出一个执行者，其他worker轮询结果键
+    3. 完成后在短时间窗口（linger）内，迟到的重复调用直接返回同一结果
+
+    执行者失败时不缓存结果；等待中的其他worker发现租约已释放且没有结果，会自行重新执行。
+
+    使用示例:
+        singleflight = SingleFlight(redis_client)
+        key = make_singleflight_key(model, prompt, images, size, response_format)
+        result = await singleflight.do(key, lambda: generator.generate_images_async(**kwargs))
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = "singleflight",
+        lease_ttl: int = 180,
+        linger: int = 10,
+        poll_interval: float = 0.5,
+        max_recent: int = 32
+    ):
+        """
+        初始化请求合并器
+
+        Args:
+            redis_client: Redis客户端实例，为None时使用项目共享的Redis连接
+            prefix: 键前缀
+            lease_ttl: 执行者租约的过期时间(秒)，应大于单次调用的最长耗时
+            linger: 完成后结果保留的时间(秒)
+            poll_interval: 等待其他worker结果时的轮询间隔(秒)
+            max_recent: 进程内保留的已完成结果的最大数量
+        """
+        self._redis = redis_client
+        self.prefix = prefix
+        self.lease_ttl = lease_ttl
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self.max_recent = max_recent
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._recent: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # 指标
+        self._executions = 0
+        self._shared = 0
+
+    def _get_result_key(self, key: str) -> str:
+        """生成结果的Redis键"""
+        return f"{self.prefix}:result:{key}"
+
+    async def _get_redis(self):
+        """获取Redis客户端，复用项目中已有的Redis连接"""
+        if self._redis is None:
+            from .idempotent import get_redis_client
+            self._redis = await get_redis_client()
+        return self._redis
+
+    def _get_recent(self, key: str):
+        """读取进程内最近完成的结果，返回(是否命中, 结果)"""
+        now = time.time()
+        while self._recent:
+            oldest_key, (expires_at, _) = next(iter(self._recent.items()))
+            if expires_at > now:
+                break
+            del self._recent[oldest_key]
+        item = self._recent.get(key)
+        return (True, item[1]) if item else (False, None)
+
+    def _set_recent(self, key: str, result: Any) -> None:
+        """保存最近完成的结果"""
+        if self.linger <= 0:
+            return
+        self._recent[key] = (time.time() + self.linger, result)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行调用，相同键的重复调用共享结果
+
+        Args:
+            key: 合并键，通常由make_singleflight_key生成
+            func: 无参数的async函数，返回值必须可以JSON序列化（用于跨进程共享）
+
+        Returns:
+            调用结果
+
+        Raises:
+            func抛出的异常（进程内等待同一调用的请求会收到相同异常；
+            执行者被取消时只有执行者自己收到CancelledError，等待者重新调用）
+        """
+        hit, result = self._get_recent(key)
+        if hit:
+            self._shared += 1
+            logger.debug(f"[SingleFlight] 命中最近结果: {key}")
+            return result
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._shared += 1
+            logger.debug(f"[SingleFlight] 等待进程内相同请求: {key}")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # 执行者被取消（客户端断开或超时）不代表调用失败，等待者重新调用，其中一个成为新的执行者
+            logger.debug(f"[SingleFlight] 执行者已取消，重新调用: {key}")
+            return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._do_distributed(key, func)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免"Future exception was never retrieved"警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._set_recent(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _do_distributed(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """通过Redis租约在多个worker之间合并调用，Redis不可用时直接执行"""
+        result_key = self._get_result_key(key)
+        try:
+            redis = await self._get_redis()
+        except Exception as e:
+            logger.error(f"[SingleFlight] 获取Redis连接异常，直接执行: {key}, error: {e}")
+            return await self._execute(func)
+
+        deadline = time.monotonic() + self.lease_ttl
+        while True:
+            try:
+                value = await redis.get(result_key)
+                if value:
+                    self._shared += 1
+                    logger.info(f"[SingleFlight] 共享其他worker的结果: {key}")
+                    return json.loads(value)
+
+                lease = DistributedLock(
+                    redis, f"{self.prefix}:{key}", expire=self.lease_ttl, retry_times=1
+                )
+                acquired = await lease.acquire()
+            except Exception as e:
+                logger.error(f"[SingleFlight] Redis操作异常，直接执行: {key}, error: {e}")
+                return await self._execute(func)
+
+            if acquired:
+                try:
+                    result = await self._execute(func)
+                    try:
+                        await redis.set(result_key, json.dumps(result, ensure_ascii=False), ex=max(1, self.linger))
+                    except Exception as e:
+                        logger.error(f"[SingleFlight] 写入结果异常: {key}, error: {e}")
+                    return result
+                finally:
+                    await lease.release()
+
+            # 其他worker正在执行，轮询结果；租约释放但没有结果说明执行者失败，重新竞争租约
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                try:
+                    if await redis.exists(result_key) or not await redis.exists(lease.key):
+                        break
+                except Exception as e:
+                    logger.error(f"[SingleFlight] 轮询结果异常，直接执行: {key}, error: {e}")
+                    return await self._execute(func)
+            else:
+                logger.warning(f"[SingleFlight] 等待其他worker超时，直接执行: {key}")
+                return await self._execute(func)
+
+    async def _execute(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """执行实际调用"""
+        self._executions += 1
+        return await func()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取请求合并指标
+
+        Returns:
+            Dict[str, Any]: 包含实际执行次数、共享次数和在途数量的字典
+        """
+        return {
+            'executions': self._executions,
+            'shared': self._shared,
+            'inflight': len(self._inflight),
+            'recent': len(self._recent)
+        }
+
+
+def make_singleflight_key(*parts) -> str:
+    """
+    根据参数生成请求合并键
+
+    Args:
+        *parts: 参与合并判断的参数，必须可以JSON序列化
+
+    Returns:
+        str: SHA-256哈希值
+    """
+    content = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+_singleflight: Optional[SingleFlight] = None
+
+
+def get_singleflight() -> SingleFlight:
+    """获取共享的请求合并器实例"""
+    global _singleflight
+    if _singleflight is None:
+        _singleflight = SingleFlight()
+    return _singleflight
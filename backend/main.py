@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import sys
@@ -32,6 +32,12 @@ from backend.yilaitumodel.api.model import router as yilaitumodel_router
 from backend.original_image_record.api.original_image_record import router as original_image_record_router
 from backend.feedback.api.feedback import router as feedback_router
 from backend.sys_images.api import router as sys_images_router
+from backend.app.api.storage_files import router as storage_files_router
+from backend.app.utils.provider_executor import get_executor_stats, shutdown_provider_executors
+from backend.app.utils.image_analysis_cache import get_image_analysis_cache
+from backend.app.utils.object_cache import get_object_cache
+from backend.app.utils.http_fetcher import get_http_fetcher
+from backend.app.utils.metrics import render_metrics, CONTENT_TYPE_LATEST
 from fastapi.staticfiles import StaticFiles
 import os
 import asyncio
@@ -103,21 +109,15 @@ app.include_router(original_image_record_router, prefix=f"{settings.API_V1_STR}"
 app.include_router(feedback_router, prefix=f"{settings.API_V1_STR}", tags=["Feedback"])
 app.include_router(sys_images_router, prefix=f"{settings.API_V1_STR}/sys-images", tags=["Sys Images"])
 
-# Static files for YiLaiTu Model images
-_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "yilaitumodel")
-if os.path.exists(_DATA_DIR):
-    app.mount(f"{settings.API_V1_STR}/yilaitumodel/files", StaticFiles(directory=_DATA_DIR), name="yilaitumodel-files")
+# Files for YiLaiTu Model images, reference images, Sys Images and generation images
+# (local storage is sent with sendfile or nginx X-Accel-Redirect, object storage redirects to object URLs)
+app.include_router(storage_files_router, tags=["Storage Files"])
 
 # Static files for Pose Split images
 _POSE_SPLIT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pose-split-images")
 if os.path.exists(_POSE_SPLIT_DIR):
     app.mount(f"{settings.API_V1_STR}/pose-split/files", StaticFiles(directory=_POSE_SPLIT_DIR), name="pose-split-files")
 
-# Static files for Sys Images
-_SYS_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sys-images")
-if os.path.exists(_SYS_IMAGES_DIR):
-    app.mount(f"{settings.API_V1_STR}/sys-images/files", StaticFiles(directory=_SYS_IMAGES_DIR), name="sys-images-files")
-
 # Startup Event Handler: Start Redis subscription for WebSocket notifications
 @app.on_event("startup")
 async def startup_event():
@@ -143,6 +143,14 @@ async def shutdown_event():
     shutdown_scheduler()
     print("Subscription scheduler has stopped")
 
+    # Stop external provider executors
+    shutdown_provider_executors(wait=False)
+    print("Provider executors have stopped")
+
+    # Close pooled HTTP connections
+    await get_http_fetcher().aclose()
+    print("HTTP fetcher connections have been closed")
+
 # Exception Handlers
 @app.exception_handler(CustomException)
 async def custom_exception_handler(request: Request, exc: CustomException):
@@ -170,6 +178,26 @@ async def root():
 async def health_check():
     return {"status": "ok", "app_name": settings.PROJECT_NAME}
 
+@app.get('/health/executors')
+async def executor_health():
+    # Queue wait time and saturation of the per-provider thread pools
+    return {"status": "ok", "executors": get_executor_stats()}
+
+@app.get('/health/cache')
+async def cache_health():
+    # Hit/miss counters of the segmentation/classification result cache and the local TOS object cache
+    object_cache = get_object_cache()
+    return {
+        "status": "ok",
+        "image_analysis": get_image_analysis_cache().stats(),
+        "tos_objects": object_cache.stats() if object_cache else None
+    }
+
+@app.get('/metrics')
+async def metrics():
+    # Per-stage latency/bytes histograms, provider error counters and in-flight gauges (Prometheus text format)
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     # Run server
     uvicorn.run(app, host="127.0.0.1", port=8001)
@@ -0,0 +1,146 @@
+"""
+清理original_image_record.params中的base64图片数据
+
+历史记录的params中保存了完整的base64 data URL（单条记录可达数MB），导致行过大、
+缓冲池压力大、列表查询出现"Out of sort memory"。本脚本按主键分批流式处理：
+1. 每批只按主键查询包含data URL的记录ID，不读取大字段排序
+2. 逐条读取params，把data URL上传到TOS并替换为URL；上传失败时替换为占位符
+3. 每批提交一次事务
+
+用法:
+    python migrate_strip_image_params.py --dry-run
+    python migrate_strip_image_params.py --batch-size 50
+    python migrate_strip_image_params.py --no-upload   # 不上传，直接替换为占位符
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from backend.passport.app.db.session import engine
+from backend.app import get_tos_uploader
+from backend.app.config import tos_config
+from backend.app.utils.image_params import PLACEHOLDER_FAILED, decode_base64_image, is_data_url
+
+# 只按主键顺序扫描，包含data URL的记录通过JSON_SEARCH过滤
+SELECT_IDS_SQL = text("""
+    SELECT id FROM original_image_record
+    WHERE id > :last_id AND JSON_SEARCH(params, 'one', 'data:%') IS NOT NULL
+    ORDER BY id
+    LIMIT :batch_size
+""")
+SELECT_PARAMS_SQL = text("SELECT params FROM original_image_record WHERE id = :id")
+UPDATE_PARAMS_SQL = text("UPDATE original_image_record SET params = :params WHERE id = :id")
+
+
+def offload_params(params, tos_uploader, dry_run=False):
+    """
+    把params中的data URL上传到TOS并替换为URL
+
+    Args:
+        params: 记录的params字典
+        tos_uploader: TOS客户端，为None时直接替换为占位符
+        dry_run: 只统计不上传，可以解析的data URL按上传成功计数，替换为上传后的URL
+
+    Returns:
+        (新的params, 上传成功数, 替换为占位符数)
+    """
+    fields = []
+    items = []
+    for key, value in params.items():
+        if not is_data_url(value):
+            continue
+        decoded = decode_base64_image(value) if tos_uploader else None
+        if decoded:
+            fields.append(key)
+            items.append(decoded)
+        else:
+            params[key] = PLACEHOLDER_FAILED
+
+    uploaded = 0
+    if items and dry_run:
+        for key, (object_key, _) in zip(fields, items):
+            params[key] = tos_uploader.get_object_url(object_key)
+        uploaded = len(items)
+    elif items:
+        results = tos_uploader.put_objects(items, max_workers=tos_config.BATCH_UPLOAD_MAX_WORKERS)
+        for key, result in zip(fields, results):
+            if result['success']:
+                params[key] = result['object_url']
+                uploaded += 1
+            else:
+                print(f"  字段 {key} 上传失败: {result['error']}")
+                params[key] = PLACEHOLDER_FAILED
+
+    placeholders = sum(1 for value in params.values() if value == PLACEHOLDER_FAILED)
+    return params, uploaded, placeholders
+
+
+def migrate(batch_size=50, dry_run=False, upload=True):
+    tos_uploader = get_tos_uploader() if upload else None
+    if upload and tos_uploader is None:
+        print("TOS上传器初始化失败，请检查配置，或使用 --no-upload 直接替换为占位符")
+        return
+
+    last_id = 0
+    total_rows = 0
+    total_uploaded = 0
+    bytes_before = 0
+    bytes_after = 0
+    start = time.time()
+    upload_label = '可上传' if dry_run else '上传'
+
+    print(f"开始清理original_image_record.params中的base64图片数据（批大小: {batch_size}，{'试运行' if dry_run else '正式执行'}）")
+
+    while True:
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(SELECT_IDS_SQL, {"last_id": last_id, "batch_size": batch_size})]
+            if not ids:
+                break
+
+            for record_id in ids:
+                raw = conn.execute(SELECT_PARAMS_SQL, {"id": record_id}).scalar()
+                params = json.loads(raw) if isinstance(raw, str) else raw
+                if not isinstance(params, dict):
+                    continue
+
+                size_before = len(json.dumps(params, ensure_ascii=False))
+                params, uploaded, placeholders = offload_params(params, tos_uploader, dry_run=dry_run)
+                new_raw = json.dumps(params, ensure_ascii=False)
+
+                bytes_before += size_before
+                bytes_after += len(new_raw)
+                total_uploaded += uploaded
+                total_rows += 1
+                print(f"  记录 {record_id}: {size_before / 1024:.1f}KB -> {len(new_raw) / 1024:.1f}KB，"
+                      f"{upload_label} {uploaded} 张，占位符 {placeholders} 个")
+
+                if not dry_run:
+                    conn.execute(UPDATE_PARAMS_SQL, {"params": new_raw, "id": record_id})
+
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+
+        last_id = ids[-1]
+        print(f"已处理到记录ID {last_id}，累计 {total_rows} 条")
+
+    print(f"\n清理完成！共处理 {total_rows} 条记录，{upload_label} {total_uploaded} 张图片，耗时 {time.time() - start:.1f} 秒")
+    print(f"params总大小: {bytes_before / 1024 / 1024:.2f}MB -> {bytes_after / 1024 / 1024:.2f}MB")
+    if not dry_run and total_rows:
+        print("建议执行 OPTIMIZE TABLE original_image_record 回收空间")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="清理original_image_record.params中的base64图片数据")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批处理的记录数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不上传也不修改数据库")
+    parser.add_argument("--no-upload", action="store_true", help="不上传图片，直接替换为占位符")
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size, dry_run=args.dry_run, upload=not args.no_upload)
@@ -18,6 +18,7 @@ class OriginalImageRecord(Base):
     cost_integral = Column(DECIMAL(10, 2), default=0, nullable=False, comment="消耗积分数量")
     points_transactions_id = Column(BigInteger, ForeignKey("points_transactions.id"), nullable=True, comment="对应积分明细表主键id")
     feedback_id = Column(BigInteger, ForeignKey("feedback.id"), nullable=True, comment="关联的反馈记录ID")
+    batch_id = Column(BigInteger, ForeignKey("generation_batch.id"), nullable=True, index=True, comment="所属批量生图任务ID")
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -25,3 +26,17 @@ class OriginalImageRecord(Base):
     __table_args__ = (
         Index('idx_user_id_create_time', 'user_id', 'create_time'),
     )
+
+
+class GenerationBatch(Base):
+    """批量生图任务：一次提交多个生图请求，积分一次性扣除，每个请求对应一条生图记录"""
+    __tablename__ = "generation_batch"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, index=True, nullable=False, comment="用户ID")
+    model_id = Column(BigInteger, nullable=True, comment="模型ID")
+    model_name = Column(String(255), nullable=True, comment="模型名称")
+    total = Column(Integer, nullable=False, comment="生图记录数量")
+    cost_integral = Column(DECIMAL(10, 2), default=0, nullable=False, comment="消耗积分总数")
+    points_transactions_id = Column(BigInteger, ForeignKey("points_transactions.id"), nullable=True, comment="对应积分明细表主键id")
+    create_time = Column(DateTime, default=func.now(), nullable=False, comment="创建时间")
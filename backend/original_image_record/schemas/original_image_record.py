@@ -61,6 +61,29 @@ class OriginalImageRecordResponse(BaseModel):
         from_attributes = True
 
 
+def to_thumbnail_images(images: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    列表中的图片只返回序号和各尺寸URL，缺少缩略图的旧记录使用原图URL
+
+    Args:
+        images: 生图记录中的图片列表
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: 包含index、url、thumbnail、preview的图片列表
+    """
+    if not images:
+        return images
+    return [
+        {
+            "index": image.get("index"),
+            "url": image.get("url"),
+            "thumbnail": image.get("thumbnail") or image.get("url"),
+            "preview": image.get("preview") or image.get("url"),
+        }
+        for image in images
+    ]
+
+
 class OriginalImageRecordListResponse(BaseModel):
     id: int
     create_time: datetime
@@ -77,3 +100,8 @@ class OriginalImageRecordListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+    @field_validator("images")
+    @classmethod
+    def use_thumbnails(cls, images):
+        return to_thumbnail_images(images)
@@ -1,8 +1,11 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from decimal import Decimal
 from datetime import datetime
-from backend.original_image_record.models.original_image_record import OriginalImageRecord
+from collections import Counter
+from backend.original_image_record.models.original_image_record import OriginalImageRecord, GenerationBatch
+from backend.points.models.points import PointsAccount
 from backend.original_image_record.schemas.original_image_record import OriginalImageRecordCreate, OriginalImageRecordUpdate
 from backend.points.services.points_service import PointsService
 
@@ -67,6 +70,152 @@ class OriginalImageRecordService:
         
         return record
     
+    @staticmethod
+    def create_batch(
+        db: Session,
+        user_id: int,
+        params_list: List[Dict[str, Any]],
+        model_id: Optional[int] = None,
+        model_name: Optional[str] = None,
+        costs: Optional[List[Decimal]] = None
+    ) -> Tuple[GenerationBatch, List[int]]:
+        """
+        批量创建生图记录，在同一事务中扣除全部积分、创建批量任务并批量插入生图记录
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            params_list: 每条生图记录的生成参数
+            model_id: 模型ID
+            model_name: 模型名称
+            costs: 与params_list一一对应的每条记录消耗的积分，为None时不扣积分
+            
+        Returns:
+            (GenerationBatch, List[int]): 批量任务和按参数顺序排列的生图记录ID
+            
+        Raises:
+            ValueError: 积分不足或costs与params_list数量不一致时抛出异常，不会创建任何记录
+        """
+        costs = list(costs) if costs is not None else [Decimal("0")] * len(params_list)
+        if len(costs) != len(params_list):
+            raise ValueError(f"积分列表数量 {len(costs)} 与生图参数数量 {len(params_list)} 不一致")
+        total_cost = sum(costs, Decimal("0"))
+        try:
+            points_transactions_id = None
+            if total_cost > 0:
+                # 锁定积分账户，避免并发请求同时通过余额检查
+                db.query(PointsAccount).filter(PointsAccount.user_id == user_id).with_for_update().first()
+                account, transaction = PointsService.deduct_points(
+                    db=db,
+                    user_id=user_id,
+                    amount=total_cost,
+                    source_type=str(model_id),
+                    remark=f"批量生图消耗积分（{len(params_list)}条）",
+                    commit=False
+                )
+                points_transactions_id = transaction.id
+            
+            now = datetime.now()
+            batch = GenerationBatch(
+                user_id=user_id,
+                model_id=model_id,
+                model_name=model_name,
+                total=len(params_list),
+                cost_integral=total_cost,
+                points_transactions_id=points_transactions_id,
+                create_time=now
+            )
+            db.add(batch)
+            db.flush()
+            
+            db.execute(insert(OriginalImageRecord), [
+                {
+                    "user_id": user_id,
+                    "model_id": model_id,
+                    "model_name": model_name,
+                    "params": params,
+                    "status": "pending",
+                    "cost_integral": cost,
+                    "points_transactions_id": points_transactions_id,
+                    "batch_id": batch.id,
+                    "create_time": now
+                }
+                for params, cost in zip(params_list, costs)
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        record_ids = [
+            record_id for (record_id,) in db.query(OriginalImageRecord.id)
+            .filter(OriginalImageRecord.batch_id == batch.id)
+            .order_by(OriginalImageRecord.id)
+        ]
+        return batch, record_ids
+    
+    @staticmethod
+    def get_batch(db: Session, batch_id: int) -> Optional[GenerationBatch]:
+        """
+        根据ID获取批量生图任务
+        
+        Args:
+            db: 数据库会话
+            batch_id: 批量任务ID
+            
+        Returns:
+            GenerationBatch: 批量任务，不存在则返回None
+        """
+        return db.query(GenerationBatch).filter(GenerationBatch.id == batch_id).first()
+    
+    @staticmethod
+    def get_batch_progress(db: Session, batch: GenerationBatch) -> Dict[str, Any]:
+        """
+        汇总批量生图任务的进度
+        
+        只查询各记录的ID、状态和图片，不读取params
+        
+        Args:
+            db: 数据库会话
+            batch: 批量任务
+            
+        Returns:
+            Dict[str, Any]: {"summary": 汇总进度, "items": 每条记录的状态}
+        """
+        rows = db.query(
+            OriginalImageRecord.id,
+            OriginalImageRecord.status,
+            OriginalImageRecord.images
+        ).filter(OriginalImageRecord.batch_id == batch.id).order_by(OriginalImageRecord.id).all()
+        
+        counts = Counter(status for _, status, _ in rows)
+        finished = counts["completed"] + counts["failed"]
+        if finished < len(rows):
+            status = "processing" if finished or counts["processing"] else "pending"
+        elif counts["failed"] == 0:
+            status = "completed"
+        elif counts["completed"] == 0:
+            status = "failed"
+        else:
+            status = "partially_completed"
+        
+        return {
+            "summary": {
+                "batch_id": batch.id,
+                "status": status,
+                "total": batch.total,
+                "pending": counts["pending"] + counts["processing"],
+                "completed": counts["completed"],
+                "failed": counts["failed"],
+                "cost_integral": float(batch.cost_integral),
+                "create_time": batch.create_time
+            },
+            "items": [
+                {"record_id": record_id, "status": record_status, "images": images}
+                for record_id, record_status, images in rows
+            ]
+        }
+    
     @staticmethod
     def get_record_by_id(db: Session, record_id: int) -> Optional[OriginalImageRecord]:
         """
@@ -40,7 +40,8 @@ class PointsService:
         amount: Decimal,
         source_type: str,
         source_id: Optional[str] = None,
-        remark: Optional[str] = None
+        remark: Optional[str] = None,
+        commit: bool = True
     ) -> tuple[PointsAccount, PointsTransaction]:
         """
         扣除用户积分
@@ -52,6 +53,7 @@ class PointsService:
             source_type: 来源类型（如：image_generation, purchase等）
             source_id: 来源ID
             remark: 备注
+            commit: 是否立即提交事务；为False时只flush，由调用方在同一事务中提交
             
         Returns:
             (PointsAccount, PointsTransaction): 更新后的积分账户和交易记录
@@ -64,13 +66,7 @@ class PointsService:
         
         account = db.query(PointsAccount).filter(PointsAccount.user_id == user_id).first()
         
-        if not account:
-            raise ValueError(f"用户 {user_id} 的积分账户不存在")
-        
-        total_balance = account.balance_permanent + account.balance_limited
-        
-        if total_balance < amount:
-            raise ValueError(f"积分不足，当前余额：{total_balance}，需要扣除：{amount}")
+        PointsService._check_account_balance(account, user_id, amount)
         
         # 优先扣除限时积分
         if account.balance_limited >= amount:
@@ -93,12 +89,51 @@ class PointsService:
         )
         
         db.add(transaction)
+        if not commit:
+            db.flush()
+            return account, transaction
         db.commit()
         db.refresh(account)
         db.refresh(transaction)
         
         return account, transaction
     
+    @staticmethod
+    def _check_account_balance(account: Optional[PointsAccount], user_id: int, amount: Decimal) -> None:
+        """
+        检查积分账户余额是否足够扣除
+
+        Raises:
+            ValueError: 账户不存在或积分不足时抛出异常
+        """
+        if not account:
+            raise ValueError(f"用户 {user_id} 的积分账户不存在")
+        
+        total_balance = account.balance_permanent + account.balance_limited
+        
+        if total_balance < amount:
+            raise ValueError(f"积分不足，当前余额：{total_balance}，需要扣除：{amount}")
+    
+    @staticmethod
+    def check_balance(db: Session, user_id: int, amount: Decimal) -> None:
+        """
+        检查用户积分是否足够扣除，不修改余额
+        
+        用于在上传图片等耗时操作前提前拒绝积分不足的请求，实际扣除仍以deduct_points为准。
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            amount: 需要扣除的积分数量
+            
+        Raises:
+            ValueError: 账户不存在或积分不足时抛出异常
+        """
+        if amount <= 0:
+            return
+        account = PointsService.get_user_points(db, user_id)
+        PointsService._check_account_balance(account, user_id, amount)
+    
     @staticmethod
     def get_user_points(db: Session, user_id: int) -> Optional[PointsAccount]:
         """
@@ -1,5 +1,6 @@
 import uvicorn
 import os
+import subprocess
 import sys
 # 添加当前目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -23,5 +24,19 @@ if __name__ == "__main__":
     # 执行模块
     spec.loader.exec_module(main_module)
     
+    # 模特图生成和异步图片处理由独立的worker进程执行，没有worker时任务会一直留在队列中
+    from backend.app.config import worker_config
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "backend.worker"], cwd=project_root)
+        for _ in range(worker_config.START_WITH_SERVER)
+    ]
+    
     # 运行FastAPI应用
-    uvicorn.run(main_module.app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    try:
+        uvicorn.run(main_module.app, host="0.0.0.0", port=8001)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait(timeout=30)
\ No newline at end of file
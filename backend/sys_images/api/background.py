@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File,
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
 from typing import Optional, List
-import os
-import uuid
 
+from backend.app.utils.storage import get_storage, save_upload
 from backend.passport.app.api.deps import get_db, get_current_user
 from backend.passport.app.models.user import User
 from backend.passport.app.schemas.common import Response
@@ -15,9 +14,8 @@ from backend.sys_images.schemas.background import (
 
 router = APIRouter()
 
-# 图片存储目录
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "sys-images", "backgrounds")
-os.makedirs(DATA_DIR, exist_ok=True)
+# 图片保存在sys-images存储空间的backgrounds前缀下
+IMAGE_PREFIX = "backgrounds"
 
 
 @router.get("/admin/backgrounds", response_model=BackgroundListResponse)
@@ -65,12 +63,7 @@ def create_background(
     image_url = None
     
     if file and file.filename:
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        image_url = f"/api/v1/sys-images/files/backgrounds/{fname}"
+        image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     
     background = SysBackground(
         name=name,
@@ -117,18 +110,9 @@ def update_background(
     
     if file and file.filename:
         if background.image_url:
-            try:
-                old_basename = os.path.basename(background.image_url)
-                os.remove(os.path.join(DATA_DIR, old_basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(background.image_url)
         
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        background.image_url = f"/api/v1/sys-images/files/backgrounds/{fname}"
+        background.image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
 
     db.commit()
     db.refresh(background)
@@ -148,11 +132,7 @@ def delete_background(
 
     # 删除图片文件
     if background.image_url:
-        try:
-            basename = os.path.basename(background.image_url)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(background.image_url)
 
     db.delete(background)
     db.commit()
@@ -170,11 +150,7 @@ def batch_delete_backgrounds(
 
     for bg in backgrounds:
         if bg.image_url:
-            try:
-                basename = os.path.basename(bg.image_url)
-                os.remove(os.path.join(DATA_DIR, basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(bg.image_url)
         db.delete(bg)
 
     db.commit()
@@ -227,20 +203,10 @@ def upload_background_image(
 
     # 删除旧图片
     if background.image_url:
-        try:
-            old_basename = os.path.basename(background.image_url)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(background.image_url)
 
     # 保存新图片
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-
-    file_url = f"/api/v1/sys-images/files/backgrounds/{fname}"
+    file_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     background.image_url = file_url
 
     db.commit()
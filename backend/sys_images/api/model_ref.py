@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File,
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, asc
 from typing import Optional, List
-import os
-import uuid
 
+from backend.app.utils.storage import get_storage, save_upload
 from backend.passport.app.api.deps import get_db, get_current_user
 from backend.passport.app.models.user import User
 from backend.passport.app.schemas.common import Response
@@ -15,9 +14,8 @@ from backend.sys_images.schemas.model_ref import (
 
 router = APIRouter()
 
-# 图片存储目录
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "sys-images", "model-refs")
-os.makedirs(DATA_DIR, exist_ok=True)
+# 图片保存在sys-images存储空间的model-refs前缀下
+IMAGE_PREFIX = "model-refs"
 
 
 @router.get("/admin/model-refs", response_model=Response[ModelRefListResponse])
@@ -80,12 +78,7 @@ def create_model_ref(
     
     # 如果有上传文件，先保存图片
     if file and file.filename:
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        image_url = f"/api/v1/sys-images/files/model-refs/{fname}"
+        image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     
     # 解析类目ID列表
     category_id_list = []
@@ -153,18 +146,9 @@ def update_model_ref(
 
     if file and file.filename:
         if model_ref.image_url:
-            try:
-                old_basename = os.path.basename(model_ref.image_url)
-                os.remove(os.path.join(DATA_DIR, old_basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(model_ref.image_url)
         
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        model_ref.image_url = f"/api/v1/sys-images/files/model-refs/{fname}"
+        model_ref.image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
 
     if category_ids is not None:
         category_id_list = [int(id) for id in category_ids.split(",") if id.strip()]
@@ -189,11 +173,7 @@ def delete_model_ref(
 
     # 删除图片文件
     if model_ref.image_url:
-        try:
-            basename = os.path.basename(model_ref.image_url)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(model_ref.image_url)
 
     db.delete(model_ref)
     db.commit()
@@ -211,11 +191,7 @@ def batch_delete_model_refs(
 
     for model_ref in model_refs:
         if model_ref.image_url:
-            try:
-                basename = os.path.basename(model_ref.image_url)
-                os.remove(os.path.join(DATA_DIR, basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(model_ref.image_url)
         db.delete(model_ref)
 
     db.commit()
@@ -270,20 +246,10 @@ def upload_model_ref_image(
 
     # 删除旧图片
     if model_ref.image_url:
-        try:
-            old_basename = os.path.basename(model_ref.image_url)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(model_ref.image_url)
 
     # 保存新图片
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-
-    file_url = f"/api/v1/sys-images/files/model-refs/{fname}"
+    file_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     model_ref.image_url = file_url
 
     db.commit()
@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File,
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
 from typing import Optional, List
-import os
-import uuid
 
+from backend.app.utils.storage import get_storage, save_upload
 from backend.passport.app.api.deps import get_db, get_current_user
 from backend.passport.app.models.user import User
 from backend.passport.app.schemas.common import Response
@@ -15,9 +14,8 @@ from backend.sys_images.schemas.pose import (
 
 router = APIRouter()
 
-# 图片存储目录
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "sys-images", "poses")
-os.makedirs(DATA_DIR, exist_ok=True)
+# 图片保存在sys-images存储空间的poses前缀下
+IMAGE_PREFIX = "poses"
 
 
 @router.get("/admin/poses", response_model=Response[PoseListResponse])
@@ -71,20 +69,10 @@ def create_pose(
     skeleton_url = None
 
     if image_file and image_file.filename:
-        ext = os.path.splitext(image_file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(image_file.file.read())
-        image_url = f"/api/v1/sys-images/files/poses/{fname}"
+        image_url = save_upload(get_storage("sys-images"), image_file, IMAGE_PREFIX)
 
     if skeleton_file and skeleton_file.filename:
-        ext = os.path.splitext(skeleton_file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}_skeleton{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(skeleton_file.file.read())
-        skeleton_url = f"/api/v1/sys-images/files/poses/{fname}"
+        skeleton_url = save_upload(get_storage("sys-images"), skeleton_file, IMAGE_PREFIX, suffix="_skeleton")
 
     pose = SysPose(
         name=name,
@@ -137,33 +125,15 @@ def update_pose(
     
     if image_file and image_file.filename:
         if pose.image_url:
-            try:
-                old_basename = os.path.basename(pose.image_url)
-                os.remove(os.path.join(DATA_DIR, old_basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(pose.image_url)
         
-        ext = os.path.splitext(image_file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(image_file.file.read())
-        pose.image_url = f"/api/v1/sys-images/files/poses/{fname}"
+        pose.image_url = save_upload(get_storage("sys-images"), image_file, IMAGE_PREFIX)
     
     if skeleton_file and skeleton_file.filename:
         if pose.skeleton_url:
-            try:
-                old_basename = os.path.basename(pose.skeleton_url)
-                os.remove(os.path.join(DATA_DIR, old_basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(pose.skeleton_url)
         
-        ext = os.path.splitext(skeleton_file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}_skeleton{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(skeleton_file.file.read())
-        pose.skeleton_url = f"/api/v1/sys-images/files/poses/{fname}"
+        pose.skeleton_url = save_upload(get_storage("sys-images"), skeleton_file, IMAGE_PREFIX, suffix="_skeleton")
 
     db.commit()
     db.refresh(pose)
@@ -183,17 +153,9 @@ def delete_pose(
 
     # 删除图片文件
     if pose.image_url:
-        try:
-            basename = os.path.basename(pose.image_url)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(pose.image_url)
     if pose.skeleton_url:
-        try:
-            basename = os.path.basename(pose.skeleton_url)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(pose.skeleton_url)
 
     db.delete(pose)
     db.commit()
@@ -211,17 +173,9 @@ def batch_delete_poses(
 
     for pose in poses:
         if pose.image_url:
-            try:
-                basename = os.path.basename(pose.image_url)
-                os.remove(os.path.join(DATA_DIR, basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(pose.image_url)
         if pose.skeleton_url:
-            try:
-                basename = os.path.basename(pose.skeleton_url)
-                os.remove(os.path.join(DATA_DIR, basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(pose.skeleton_url)
         db.delete(pose)
 
     db.commit()
@@ -274,20 +228,10 @@ def upload_pose_image(
 
     # 删除旧图片
     if pose.image_url:
-        try:
-            old_basename = os.path.basename(pose.image_url)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(pose.image_url)
 
     # 保存新图片
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-
-    file_url = f"/api/v1/sys-images/files/poses/{fname}"
+    file_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     pose.image_url = file_url
 
     db.commit()
@@ -309,20 +253,10 @@ def upload_pose_skeleton(
 
     # 删除旧骨架图
     if pose.skeleton_url:
-        try:
-            old_basename = os.path.basename(pose.skeleton_url)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(pose.skeleton_url)
 
     # 保存新骨架图
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}_skeleton{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-
-    file_url = f"/api/v1/sys-images/files/poses/{fname}"
+    file_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX, suffix="_skeleton")
     pose.skeleton_url = file_url
 
     db.commit()
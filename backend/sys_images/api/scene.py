@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File,
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
 from typing import Optional, List
-import os
-import uuid
 
+from backend.app.utils.storage import get_storage, save_upload
 from backend.passport.app.api.deps import get_db, get_current_user
 from backend.passport.app.models.user import User
 from backend.passport.app.schemas.common import Response
@@ -15,9 +14,8 @@ from backend.sys_images.schemas.scene import (
 
 router = APIRouter()
 
-# 图片存储目录
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "sys-images", "scenes")
-os.makedirs(DATA_DIR, exist_ok=True)
+# 图片保存在sys-images存储空间的scenes前缀下
+IMAGE_PREFIX = "scenes"
 
 
 @router.get("/admin/scenes", response_model=Response[SceneListResponse])
@@ -69,12 +67,7 @@ def create_scene(
     image_url = None
     
     if file and file.filename:
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        image_url = f"/api/v1/sys-images/files/scenes/{fname}"
+        image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     
     scene = SysScene(
         name=name,
@@ -125,18 +118,9 @@ def update_scene(
     
     if file and file.filename:
         if scene.image_url:
-            try:
-                old_basename = os.path.basename(scene.image_url)
-                os.remove(os.path.join(DATA_DIR, old_basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(scene.image_url)
         
-        ext = os.path.splitext(file.filename)[1] or ".jpg"
-        fname = f"{uuid.uuid4().hex}{ext}"
-        fs_path = os.path.join(DATA_DIR, fname)
-        with open(fs_path, "wb") as f:
-            f.write(file.file.read())
-        scene.image_url = f"/api/v1/sys-images/files/scenes/{fname}"
+        scene.image_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
 
     db.commit()
     db.refresh(scene)
@@ -156,11 +140,7 @@ def delete_scene(
 
     # 删除图片文件
     if scene.image_url:
-        try:
-            basename = os.path.basename(scene.image_url)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(scene.image_url)
 
     db.delete(scene)
     db.commit()
@@ -178,11 +158,7 @@ def batch_delete_scenes(
 
     for scene in scenes:
         if scene.image_url:
-            try:
-                basename = os.path.basename(scene.image_url)
-                os.remove(os.path.join(DATA_DIR, basename))
-            except Exception:
-                pass
+            get_storage("sys-images").delete_url(scene.image_url)
         db.delete(scene)
 
     db.commit()
@@ -235,20 +211,10 @@ def upload_scene_image(
 
     # 删除旧图片
     if scene.image_url:
-        try:
-            old_basename = os.path.basename(scene.image_url)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage("sys-images").delete_url(scene.image_url)
 
     # 保存新图片
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-
-    file_url = f"/api/v1/sys-images/files/scenes/{fname}"
+    file_url = save_upload(get_storage("sys-images"), file, IMAGE_PREFIX)
     scene.image_url = file_url
 
     db.commit()
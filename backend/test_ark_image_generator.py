@@ -213,5 +213,38 @@ class TestArkImageGenerator(unittest.TestCase):
         self.assertEqual(result["created"], 1234567890)
         self.assertEqual(len(result["data"]), 1)
 
+    @patch('app.utils.ark_image_generator.Ark')
+    def test_generate_images_async_coalesce_key(self, mock_ark_class):
+        """测试指定coalesce_key时提示词不同的并发请求被合并，不同的coalesce_key不合并"""
+        import asyncio
+        import time
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from backend.common import singleflight as singleflight_module
+        from backend.common.singleflight import SingleFlight
+        from test_singleflight import FakeRedis
+
+        generator = ArkImageGenerator()
+        calls = []
+
+        def generate_images(**kwargs):
+            calls.append(kwargs['prompt'])
+            time.sleep(0.1)
+            return {"data": [{"url": f"https://example.com/{kwargs['prompt']}.png"}]}
+
+        generator.generate_images = generate_images
+
+        async def scenario():
+            return await asyncio.gather(
+                generator.generate_images_async(coalesce_key='a', prompt="分镜1", images=["u"]),
+                generator.generate_images_async(coalesce_key='a', prompt="分镜2", images=["u"]),
+                generator.generate_images_async(coalesce_key='b', prompt="分镜3", images=["u"])
+            )
+
+        with patch.object(singleflight_module, 'get_singleflight', return_value=SingleFlight(redis_client=FakeRedis())):
+            first, second, other = asyncio.run(scenario())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
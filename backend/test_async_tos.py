@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import unittest
+
+from app.utils.async_tos import AsyncTOSClient
+from app.utils.provider_executor import ProviderExecutor
+
+
+class SlowClient:
+    """
+    只实现测试用到方法的TOSClient替身，head_object会阻塞到release被设置
+    """
+    bucket_name = 'test-bucket'
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def put_object(self, object_key, content, bucket_name=None, acl=None, storage_class=None, meta=None,
+                   multipart=True):
+        self.calls.append(('put_object', object_key, bucket_name, multipart))
+        return {'success': True, 'object_key': object_key}
+
+    def get_object_to_file(self, object_key, file_path, bucket_name=None, byte_range=None, part_size=None,
+                           max_workers=None):
+        self.calls.append(('get_object_to_file', object_key, max_workers))
+        return {'success': True, 'object_key': object_key}
+
+    def get_object_stream(self, object_key, bucket_name=None, byte_range=None, chunk_size=None):
+        self.calls.append(('get_object_stream', object_key, bucket_name))
+        return {'success': True, 'content_length': 6, 'body': iter([b'abc', b'def'])}
+
+    def head_object(self, object_key, bucket_name=None):
+        self.calls.append(('head_object', object_key, bucket_name))
+        self.release.wait(5)
+        return {'success': True, 'object_key': object_key}
+
+
+class TestAsyncTOSClient(unittest.TestCase):
+    """
+    测试TOSClient的asyncio接口
+    """
+
+    def test_delegates_to_sync_client(self):
+        """
+        测试方法参数原样传给同步客户端
+        """
+        client = SlowClient()
+        executor = ProviderExecutor('test-tos', max_workers=2, max_queue=2)
+        aio = AsyncTOSClient(client, executor=executor, timeout=1)
+
+        result = asyncio.run(aio.put_object('a.png', b'data', bucket_name='other'))
+        self.assertEqual(result, {'success': True, 'object_key': 'a.png'})
+        self.assertEqual(client.calls, [('put_object', 'a.png', 'other', False)])
+        self.assertEqual(aio.bucket_name, 'test-bucket')
+        self.assertEqual(executor.stats()['completed'], 1)
+        executor.shutdown()
+        print("✓ 调用转发到同步客户端")
+
+    def test_single_connection_per_call(self):
+        """
+        测试上传不自动分片、下载文件单连接，每次调用只占用一个线程池槽位
+        """
+        client = SlowClient()
+        executor = ProviderExecutor('test-tos', max_workers=2, max_queue=2)
+        aio = AsyncTOSClient(client, executor=executor, timeout=1)
+
+        asyncio.run(aio.get_object_to_file('a.png', '/tmp/a.png'))
+        self.assertEqual(client.calls, [('get_object_to_file', 'a.png', 1)])
+        executor.shutdown()
+        print("✓ 单次调用只使用一个连接")
+
+    def test_put_objects_share_provider_limit(self):
+        """
+        测试批量上传的每个对象都提交到TOS线程池，实际并发不超过线程池上限，单个失败不影响其他对象
+        """
+        import time
+
+        class CountingClient(SlowClient):
+            def __init__(self):
+                super().__init__()
+                self.lock = threading.Lock()
+                self.running = 0
+                self.peak = 0
+
+            def put_object(self, object_key, content, bucket_name=None, acl=None, storage_class=None, meta=None,
+                           multipart=True):
+                with self.lock:
+                    self.running += 1
+                    self.peak = max(self.peak, self.running)
+                time.sleep(0.02)
+                with self.lock:
+                    self.running -= 1
+                if object_key == 'bad.png':
+                    raise RuntimeError("upload failed")
+                return super().put_object(object_key, content, bucket_name, acl, storage_class, meta, multipart)
+
+        client = CountingClient()
+        executor = ProviderExecutor('test-tos', max_workers=2, max_queue=8)
+        aio = AsyncTOSClient(client, executor=executor, timeout=1)
+        keys = ['a.png', 'b.png', 'bad.png', 'c.png', 'd.png', 'e.png']
+
+        results = asyncio.run(aio.put_objects([(key, b'data') for key in keys], max_workers=8))
+        self.assertEqual([result['object_key'] for result in results], keys)
+        self.assertEqual([result['success'] for result in results], [True, True, False, True, True, True])
+        self.assertEqual(results[2]['bucket'], 'test-bucket')
+        self.assertEqual(client.peak, 2)
+        executor.shutdown()
+        print("✓ 批量上传受TOS线程池并发上限约束")
+
+    def test_get_object_stream(self):
+        """
+        测试流式读取的body是异步迭代器，每块在线程池中读取
+        """
+        client = SlowClient()
+        executor = ProviderExecutor('test-tos', max_workers=2, max_queue=2)
+        aio = AsyncTOSClient(client, executor=executor, timeout=1)
+
+        async def main():
+            result = await aio.get_object_stream('big.bin')
+            return [chunk async for chunk in result['body']]
+
+        self.assertEqual(asyncio.run(main()), [b'abc', b'def'])
+        executor.shutdown()
+        print("✓ 异步流式读取")
+
+    def test_timeout_cancels_queued_call(self):
+        """
+        测试超时后抛出TimeoutError，排队中的请求被移除且不再执行
+        """
+        client = SlowClient()
+        executor = ProviderExecutor('test-tos', max_workers=1, max_queue=4)
+        aio = AsyncTOSClient(client, executor=executor, timeout=0.1)
+
+        async def main():
+            running = asyncio.ensure_future(aio.head_object('running.png', timeout=5))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(asyncio.TimeoutError):
+                await aio.head_object('queued.png')
+            stats = executor.stats()
+            self.assertEqual(stats['cancelled'], 1)
+            self.assertEqual(stats['queued'], 0)
+            client.release.set()
+            return await running
+
+        self.assertEqual(asyncio.run(main())['object_key'], 'running.png')
+        self.assertEqual([call[1] for call in client.calls], ['running.png'])
+        executor.shutdown()
+        print("✓ 超时取消排队中的请求")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+import asyncio
+import io
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from app.utils.direct_upload import (
+    UploadNotFoundError, build_upload_key, create_upload_ticket, is_user_upload_key, verify_uploaded_object
+)
+from app.utils.image_compressor import ImageValidationError
+from app.utils.tos_utils import TOSClient
+
+MAX_SIZE = 10 * 1024 * 1024
+
+
+def image_bytes(image_format, size=(64, 64)):
+    """生成指定格式的测试图片"""
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 100, 50)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class FakeAsyncTOS:
+    """只实现head_object、get_object和get_object_url的AsyncTOSClient替身"""
+
+    def __init__(self, objects):
+        # 对象键 -> (大小, Content-Type, 内容)
+        self.objects = objects
+        self.ranges = []
+
+    async def head_object(self, object_key, bucket_name=None, timeout=None):
+        if object_key not in self.objects:
+            error = Exception("NoSuchKey")
+            error.status_code = 404
+            raise error
+        size, content_type, _ = self.objects[object_key]
+        return {'content_length': size, 'content_type': content_type, 'etag': '"etag"'}
+
+    async def get_object(self, object_key, bucket_name=None, byte_range=None, timeout=None):
+        content = self.objects[object_key][2]
+        self.ranges.append(byte_range)
+        if byte_range:
+            content = content[byte_range[0]:byte_range[1] + 1]
+        return {'content': content}
+
+    def get_object_url(self, object_key, bucket_name=None):
+        return f"https://test-bucket.tos.example.com/{object_key}"
+
+
+class TestDirectUpload(unittest.TestCase):
+    """
+    测试浏览器直传TOS的凭证生成和上传确认
+    """
+
+    def setUp(self):
+        self.tos_client = TOSClient(
+            ak="test_ak",
+            sk="test_sk",
+            endpoint="tos-cn-guangzhou.volces.com",
+            region="cn-guangzhou",
+            bucket_name="test-bucket"
+        )
+
+    def test_upload_key_belongs_to_user(self):
+        """
+        测试对象键由服务端生成，只能被同一用户使用
+        """
+        key = build_upload_key('uploads', 12, 'image/png')
+        self.assertTrue(key.startswith('uploads/12/'))
+        self.assertTrue(key.endswith('.png'))
+        self.assertTrue(is_user_upload_key(key, 'uploads', 12))
+        self.assertFalse(is_user_upload_key(key, 'uploads', 13))
+        self.assertFalse(is_user_upload_key('uploads/12/../13/a.png', 'uploads', 12))
+        self.assertFalse(is_user_upload_key('model_images/a.png', 'uploads', 12))
+        # 前缀可以包含"/"
+        nested = build_upload_key('tenant/uploads', 12, 'image/png')
+        self.assertTrue(is_user_upload_key(nested, 'tenant/uploads', 12))
+        self.assertFalse(is_user_upload_key(nested, 'tenant/uploads', 1))
+        self.assertFalse(is_user_upload_key(nested, 'uploads', 12))
+        with self.assertRaises(ImageValidationError):
+            build_upload_key('uploads', 12, 'text/html')
+        print("✓ 对象键按用户隔离")
+
+    def test_put_ticket_signs_type_and_size(self):
+        """
+        测试预签名PUT URL把Content-Type和Content-Length加入签名
+        """
+        key = build_upload_key('uploads', 12, 'image/jpeg')
+        ticket = create_upload_ticket(self.tos_client, key, 'image/jpeg', 2048, MAX_SIZE, method='put', expires=300)
+
+        self.assertEqual(ticket['method'], 'PUT')
+        self.assertEqual(ticket['headers'], {'Content-Type': 'image/jpeg', 'Content-Length': '2048'})
+        query = parse_qs(urlparse(ticket['url']).query)
+        self.assertEqual(query['X-Tos-SignedHeaders'], ['content-length;content-type;host'])
+        self.assertEqual(query['X-Tos-Expires'], ['300'])
+        self.assertTrue(urlparse(ticket['url']).path.endswith(key))
+
+        with self.assertRaises(ImageValidationError):
+            create_upload_ticket(self.tos_client, key, 'image/jpeg', MAX_SIZE + 1, MAX_SIZE)
+        with self.assertRaises(ImageValidationError):
+            create_upload_ticket(self.tos_client, key, 'image/jpeg', None, MAX_SIZE, method='put')
+        print("✓ 预签名PUT URL限制类型和大小")
+
+    def test_post_ticket_policy(self):
+        """
+        测试表单上传策略限制对象键、类型和大小范围
+        """
+        import base64
+        import json
+        key = build_upload_key('uploads', 12, 'image/webp')
+        ticket = create_upload_ticket(self.tos_client, key, 'image/webp', None, MAX_SIZE, method='post')
+
+        self.assertEqual(ticket['method'], 'POST')
+        self.assertEqual(ticket['url'], 'https://test-bucket.tos-cn-guangzhou.volces.com')
+        self.assertEqual(ticket['fields']['key'], key)
+        conditions = json.loads(base64.b64decode(ticket['fields']['policy']))['conditions']
+        self.assertIn({'key': key}, conditions)
+        self.assertIn({'Content-Type': 'image/webp'}, conditions)
+        self.assertIn(['content-length-range', 1, MAX_SIZE], conditions)
+        print("✓ 表单上传策略")
+
+    def test_verify_uploaded_object(self):
+        """
+        测试确认上传时检查对象存在、归属、类型和大小
+        """
+        good = build_upload_key('uploads', 12, 'image/png')
+        wrong_type = build_upload_key('uploads', 12, 'image/png')
+        too_big = build_upload_key('uploads', 12, 'image/png')
+        not_image = build_upload_key('uploads', 12, 'image/png')
+        mismatched = build_upload_key('uploads', 12, 'image/png')
+        png = image_bytes('PNG')
+        aio = FakeAsyncTOS({
+            good: (len(png), 'image/png', png),
+            wrong_type: (len(png), 'application/octet-stream', png),
+            too_big: (MAX_SIZE + 1, 'image/png', png),
+            not_image: (13, 'image/png', b'<html></html>'),
+            mismatched: (len(png), 'image/png', image_bytes('JPEG'))
+        })
+
+        def verify(key, user_id=12):
+            return asyncio.run(verify_uploaded_object(aio, key, 'uploads', user_id, MAX_SIZE))
+
+        info = verify(good)
+        self.assertEqual(info['object_url'], f"https://test-bucket.tos.example.com/{good}")
+        self.assertEqual(info['size'], len(png))
+        self.assertEqual(aio.ranges, [(0, len(png) - 1)])
+        with self.assertRaises(ImageValidationError):
+            verify(good, user_id=13)
+        with self.assertRaises(ImageValidationError):
+            verify(wrong_type)
+        with self.assertRaises(ImageValidationError):
+            verify(too_big)
+        with self.assertRaises(ImageValidationError):
+            verify(not_image)
+        with self.assertRaises(ImageValidationError):
+            verify(mismatched)
+        with self.assertRaises(UploadNotFoundError):
+            verify(build_upload_key('uploads', 12, 'image/png'))
+        print("✓ 确认直传对象")
+
+    def test_verify_reads_head_only(self):
+        """
+        测试确认上传只用Range请求读取文件头，文件头中无法识别时才读取整个对象
+        """
+        from app.utils import direct_upload
+
+        jpeg = image_bytes('JPEG', size=(400, 400))
+        key = build_upload_key('uploads', 12, 'image/jpeg')
+        aio = FakeAsyncTOS({key: (len(jpeg), 'image/jpeg', jpeg)})
+        original = direct_upload.PREFLIGHT_HEAD_BYTES
+        try:
+            direct_upload.PREFLIGHT_HEAD_BYTES = 1024
+            asyncio.run(verify_uploaded_object(aio, key, 'uploads', 12, MAX_SIZE))
+            self.assertEqual(aio.ranges, [(0, 1023)])
+
+            # 文件头超出读取范围时读取整个对象
+            direct_upload.PREFLIGHT_HEAD_BYTES = 16
+            aio.ranges.clear()
+            asyncio.run(verify_uploaded_object(aio, key, 'uploads', 12, MAX_SIZE))
+            self.assertEqual(aio.ranges, [(0, 15), None])
+        finally:
+            direct_upload.PREFLIGHT_HEAD_BYTES = original
+        print("✓ 只读取文件头")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
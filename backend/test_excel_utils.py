@@ -12,7 +12,8 @@ class TestExcelUtils(unittest.TestCase):
         """
         测试前的准备工作
         """
-        # 创建ExcelUtils实例
+        # 创建ExcelUtils实例，清空共享索引避免测试之间互相影响
+        ExcelUtils.clear_cache()
         self.excel_utils = ExcelUtils()
     
     @patch('pandas.read_excel')
@@ -43,6 +44,7 @@ class TestExcelUtils(unittest.TestCase):
         # 修改mock返回空数据
         empty_df = pd.DataFrame(columns=pose_data.keys())
         mock_read_excel.return_value = empty_df
+        ExcelUtils.clear_cache()
         result = self.excel_utils.randomStoryboard('男', '不存在的风格', '上衣', '正面')
         self.assertEqual(result, "", f"预期返回空字符串，实际返回{result}")
         print("randomStoryboardh函数返回结果"+result)
@@ -76,6 +78,7 @@ class TestExcelUtils(unittest.TestCase):
         # 修改mock返回空数据
         empty_df = pd.DataFrame(columns=category_data.keys())
         mock_read_excel.return_value = empty_df
+        ExcelUtils.clear_cache()
         result = self.excel_utils.getClothingCategory(9999)
         self.assertEqual(result, "", f"预期返回空字符串，实际返回{result}")
         print("✓ 测试2通过：没有匹配数据的情况")
@@ -83,6 +86,7 @@ class TestExcelUtils(unittest.TestCase):
         # 测试3: 不同类目ID
         # 恢复mock数据
         mock_read_excel.return_value = category_df
+        ExcelUtils.clear_cache()
         result = self.excel_utils.getClothingCategory(1003)
         self.assertEqual(result, '鞋子', f"预期返回'鞋子'，实际返回{result}")
         print("✓ 测试3通过：不同类目ID")
@@ -113,6 +117,7 @@ class TestExcelUtils(unittest.TestCase):
         # 修改mock返回空数据
         empty_df = pd.DataFrame(columns=pixel_data.keys())
         mock_read_excel.return_value = empty_df
+        ExcelUtils.clear_cache()
         result = self.excel_utils.getAspectRatioPixel('不存在的比例', 1)
         self.assertEqual(result, "", f"预期返回空字符串，实际返回{result}")
         print("getAspectRatioPixel函数返回结果"+result)
@@ -121,57 +126,127 @@ class TestExcelUtils(unittest.TestCase):
         # 测试3: 不同比例
         # 恢复mock数据
         mock_read_excel.return_value = pixel_df
+        ExcelUtils.clear_cache()
         result = self.excel_utils.getAspectRatioPixel('3:4', 1)
         self.assertEqual(result, '1000x1333', f"预期返回'1000x1333'，实际返回{result}")
         print("getAspectRatioPixel函数返回结果"+result)
         print("✓ 测试3通过：不同比例")
 
 
-    @patch('app.utils.excel_utils.ExcelUtils.randomStoryboard')
-    def test_generateImagePrompt(self, mock_randomStoryboard):
+    @patch('app.utils.excel_utils.ExcelUtils.getPoseDescriptions')
+    def test_generateImagePrompt(self, mock_getPoseDescriptions):
         """
         测试generateImagePrompt方法
         """
         print("\n测试generateImagePrompt方法...")
         
-        # 设置mock返回值
-        mock_randomStoryboard.return_value = "站立正面"
+        # 设置mock返回值：姿势库中只有一个姿势，不足的分镜按顺序补齐
+        mock_getPoseDescriptions.return_value = ("站立正面",)
         
         # 测试1: num=1的情况
-        result = self.excel_utils.generateImagePrompt('1:1', 1, '街头', '亚洲人', '男', '上衣', '日常生活风', '正面')
+        result = self.excel_utils.generateImagePrompt(1, '街头', '亚洲人', '男', '上衣', '日常生活风', '正面')
         expected = "1*1网格分镜拼接，1个连贯分镜，统一场景为街头，明亮灯光；模特为亚洲人男；穿参考图中的上衣，自然素颜淡妆。IPHONE手机拍照风格，生活化场景细节丰富。;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试1通过：num=1的情况")
         
         # 测试2: num=2的情况
-        result = self.excel_utils.generateImagePrompt('1:1', 2, '咖啡馆', '欧洲人', '女', '裙子', '时尚杂志风', '正面')
+        result = self.excel_utils.generateImagePrompt(2, '咖啡馆', '欧洲人', '女', '裙子', '时尚杂志风', '正面')
         expected = "1*2网格分镜拼接，2个连贯分镜，统一场景为咖啡馆，明亮灯光；模特为欧洲人女；穿参考图中的裙子，自然素颜淡妆。高清胶片拍照风格，生活化场景细节丰富。分镜1:站立正面，分镜2:站立正面;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试2通过：num=2的情况")
         
         # 测试3: num=4的情况
-        result = self.excel_utils.generateImagePrompt('1:1', 4, '公园', '非洲人', '男', '裤子', '运动活力风', '正面')
+        result = self.excel_utils.generateImagePrompt(4, '公园', '非洲人', '男', '裤子', '运动活力风', '正面')
         expected = "2*2网格分镜拼接，4个连贯分镜，统一场景为公园，明亮灯光；模特为非洲人男；穿参考图中的裤子，自然素颜淡妆。专业相机拍照风格，生活化场景细节丰富。分镜1:站立正面，分镜2:站立正面，分镜3:站立正面，分镜4:站立正面;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试3通过：num=4的情况")
         
         # 测试4: num=6的情况
-        result = self.excel_utils.generateImagePrompt('1:1', 6, '海滩', '亚洲人', '女', '泳衣', '时尚杂志风', '正面')
+        result = self.excel_utils.generateImagePrompt(6, '海滩', '亚洲人', '女', '泳衣', '时尚杂志风', '正面')
         expected = "2*3网格分镜拼接，6个连贯分镜，统一场景为海滩，明亮灯光；模特为亚洲人女；穿参考图中的泳衣，自然素颜淡妆。高清胶片拍照风格，生活化场景细节丰富。分镜1:站立正面，分镜2:站立正面，分镜3:站立正面，分镜4:站立正面，分镜5:站立正面，分镜6:站立正面;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试4通过：num=6的情况")
         
         # 测试5: num=9的情况
-        result = self.excel_utils.generateImagePrompt('1:1', 9, '健身房', '欧洲人', '男', '运动服', '运动活力风', '正面')
+        result = self.excel_utils.generateImagePrompt(9, '健身房', '欧洲人', '男', '运动服', '运动活力风', '正面')
         expected = "3×3网格分镜拼接，9个连贯分镜，统一场景为健身房，明亮灯光；模特为欧洲人男；穿参考图中的运动服，自然素颜淡妆。专业相机拍照风格，生活化场景细节丰富。分镜1:站立正面，分镜2:站立正面，分镜3:站立正面，分镜4:站立正面，分镜5:站立正面，分镜6:站立正面，分镜7:站立正面，分镜8:站立正面，分镜9:站立正面;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试5通过：num=9的情况")
         
         # 测试6: 测试不同的拍照风格
-        result = self.excel_utils.generateImagePrompt('1:1', 1, '家庭', '亚洲人', '女', '连衣裙', '时尚杂志风', '正面')
+        result = self.excel_utils.generateImagePrompt(1, '家庭', '亚洲人', '女', '连衣裙', '时尚杂志风', '正面')
         expected = "1*1网格分镜拼接，1个连贯分镜，统一场景为家庭，明亮灯光；模特为亚洲人女；穿参考图中的连衣裙，自然素颜淡妆。高清胶片拍照风格，生活化场景细节丰富。;"
         self.assertEqual(result, expected, f"预期返回{expected}，实际返回{result}")
         print("✓ 测试6通过：不同的拍照风格")
+    
+    @patch('app.utils.excel_utils.ExcelUtils.getPoseDescriptions')
+    def test_sampleStoryboard(self, mock_getPoseDescriptions):
+        """
+        测试sampleStoryboard和批量生成提示词
+        """
+        print("\n测试sampleStoryboard方法...")
+        import random
+        
+        poses = tuple(f"姿势{i}" for i in range(6))
+        mock_getPoseDescriptions.return_value = poses
+        
+        # 测试1: 数量足够时不重复
+        result = self.excel_utils.sampleStoryboard('女', '日常生活风', '上装', '正面', 4, random.Random(1))
+        self.assertEqual(len(result), 4)
+        self.assertEqual(len(set(result)), 4)
+        print("✓ 测试1通过：抽取结果不重复")
+        
+        # 测试2: 数量不足时先用完所有姿势，再按顺序补齐
+        result = self.excel_utils.sampleStoryboard('女', '日常生活风', '上装', '正面', 9, random.Random(1))
+        self.assertEqual(set(result[:6]), set(poses))
+        self.assertEqual(result[6:], result[:3])
+        print("✓ 测试2通过：数量不足时补齐")
+        
+        # 测试3: 相同种子结果可复现
+        first = self.excel_utils.generateImagePrompt(4, '公园', '亚洲人', '女', '连衣裙', '日常生活风', '正面', seed=42)
+        second = self.excel_utils.generateImagePrompt(4, '公园', '亚洲人', '女', '连衣裙', '日常生活风', '正面', seed=42)
+        self.assertEqual(first, second)
+        self.assertEqual(mock_getPoseDescriptions.call_args[0][2], '裙装')
+        print("✓ 测试3通过：相同种子结果可复现")
+        
+        # 测试4: 批量生成
+        prompt_requests = [
+            {'num': n, 'selectedScene': '公园', 'race': '亚洲人', 'sex': '女',
+             'categoryName': '上衣', 'styleType': '日常生活风', 'towards': '正面'}
+            for n in (1, 2, 4, 9)
+        ]
+        prompts = self.excel_utils.generateImagePrompts(prompt_requests, seed=7)
+        self.assertEqual(len(prompts), 4)
+        self.assertEqual(prompts, self.excel_utils.generateImagePrompts(prompt_requests, seed=7))
+        self.assertIn("分镜9:", prompts[3])
+        print("✓ 测试4通过：批量生成提示词")
+    
+    def test_lookup_tables_loaded_once_and_reloaded_on_change(self):
+        """
+        测试Excel只解析一次，文件修改后自动重新加载
+        """
+        print("\n测试Excel索引缓存...")
+        import os
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as data_dir:
+            self.excel_utils.data_dir = data_dir
+            file_path = os.path.join(data_dir, '图片像素大小.xlsx')
+            pd.DataFrame({'图片比例': ['1:1'], '图片数量': [4], '图片像素': ['2048x2048']}).to_excel(file_path, index=False)
+            
+            with patch('pandas.read_excel', wraps=pd.read_excel) as spy_read_excel:
+                for _ in range(5):
+                    self.assertEqual(self.excel_utils.getAspectRatioPixel('1:1', 4), '2048x2048')
+                self.assertEqual(self.excel_utils.getAspectRatioPixel('1:1', 9), '')
+                self.assertEqual(spy_read_excel.call_count, 1, "Excel文件应当只解析一次")
+                
+                # 修改文件后重新加载
+                pd.DataFrame({'图片比例': ['1:1'], '图片数量': [4], '图片像素': ['4096x4096']}).to_excel(file_path, index=False)
+                stat = os.stat(file_path)
+                os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                self.assertEqual(self.excel_utils.getAspectRatioPixel('1:1', 4), '4096x4096')
+                self.assertEqual(spy_read_excel.call_count, 2)
+        print("✓ 测试通过：Excel只解析一次，修改后重新加载")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+import sys
+import unittest
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.original_image_record.services.original_image_record_service import OriginalImageRecordService
+
+# 与模特图生成接口一致，每张图片5积分
+BASE_POINTS = 5
+
+
+class TestCreateBatch(unittest.TestCase):
+    """
+    测试批量创建生图记录的积分计算
+    """
+
+    def test_mixed_quantities(self):
+        """
+        测试每条记录按各自的图片数量计费，批量任务积分为各记录积分之和
+        """
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value = [(1,), (2,), (3,)]
+        costs = [Decimal(str(quantity * BASE_POINTS)) for quantity in (1, 4, 2)]
+
+        with patch(
+            'backend.original_image_record.services.original_image_record_service.PointsService.deduct_points',
+            return_value=(MagicMock(), MagicMock(id=7))
+        ) as deduct_points:
+            batch, record_ids = OriginalImageRecordService.create_batch(
+                db=db,
+                user_id=1,
+                params_list=[{'prompt': 'a'}, {'prompt': 'b'}, {'prompt': 'c'}],
+                model_id=1,
+                model_name='模特图生成',
+                costs=costs
+            )
+
+        total = Decimal(str(7 * BASE_POINTS))
+        self.assertEqual(deduct_points.call_args.kwargs['amount'], total)
+        self.assertIs(db.add.call_args.args[0], batch)
+        self.assertEqual(batch.cost_integral, total)
+        self.assertEqual(batch.points_transactions_id, 7)
+        rows = db.execute.call_args.args[1]
+        self.assertEqual([row['cost_integral'] for row in rows], costs)
+        self.assertEqual(record_ids, [1, 2, 3])
+        db.commit.assert_called_once()
+        print("✓ 批量任务按每条记录的图片数量计费")
+
+    def test_costs_length_mismatch(self):
+        """
+        测试积分列表与参数数量不一致时不创建任何记录
+        """
+        db = MagicMock()
+        with self.assertRaises(ValueError):
+            OriginalImageRecordService.create_batch(db=db, user_id=1, params_list=[{}, {}], costs=[Decimal("1")])
+        db.add.assert_not_called()
+        print("✓ 积分列表数量不一致时拒绝创建")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
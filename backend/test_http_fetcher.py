@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.http_fetcher import HttpFetcher, HttpFetchError, ResponseTooLargeError
+
+PAYLOAD = bytes(range(256)) * 4096  # 1MB
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    """返回固定内容的本地HTTP服务"""
+
+    def do_GET(self):
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path != '/chunked':
+            self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpFetcher(unittest.TestCase):
+    """
+    测试共享连接池的HTTP下载器
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), PayloadHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_fetch_sync_and_async(self):
+        """
+        测试同步和异步下载，多次下载复用同一个客户端
+        """
+        fetcher = HttpFetcher(connect_timeout=2, read_timeout=5)
+
+        data = fetcher.fetch_sync(f"{self.base_url}/image.png")
+        self.assertIsInstance(data, bytearray)
+        self.assertEqual(data, PAYLOAD)
+        client = fetcher._client
+        fetcher.fetch_sync(f"{self.base_url}/image.png")
+        self.assertIs(fetcher._client, client)
+        stream = fetcher.fetch_sync_stream(f"{self.base_url}/image.png")
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(stream.read(), PAYLOAD)
+
+        async def scenario():
+            results = await asyncio.gather(*[fetcher.fetch(f"{self.base_url}/image.png") for _ in range(3)])
+            await fetcher.aclose()
+            return results
+
+        for data in asyncio.run(scenario()):
+            self.assertEqual(data, PAYLOAD)
+        print("✓ 同步和异步下载")
+
+    def test_max_bytes_and_errors(self):
+        """
+        测试超过最大字节数和错误状态码
+        """
+        fetcher = HttpFetcher(max_bytes=1024)
+
+        # Content-Length超出时在读取响应体之前拒绝，分块响应在读取过程中中断
+        for path in ('/image.png', '/chunked'):
+            with self.assertRaises(ResponseTooLargeError):
+                fetcher.fetch_sync(f"{self.base_url}{path}")
+        with self.assertRaises(HttpFetchError):
+            fetcher.fetch_sync(f"{self.base_url}/missing")
+        with self.assertRaises(ResponseTooLargeError):
+            fetcher.fetch_sync_stream(f"{self.base_url}/chunked")
+        self.assertEqual(len(fetcher.fetch_sync(f"{self.base_url}/image.png", max_bytes=len(PAYLOAD))), len(PAYLOAD))
+        print("✓ 大小限制和错误状态码")
+
+    def test_client_per_event_loop(self):
+        """
+        测试每个事件循环使用自己的客户端，aclose()在各自的事件循环上关闭所有客户端
+        """
+        fetcher = HttpFetcher(connect_timeout=2, read_timeout=5)
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+
+        async def scenario():
+            await fetcher.fetch(f"{self.base_url}/image.png")
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+                fetcher.fetch(f"{self.base_url}/image.png"), other_loop
+            ))
+            clients = list(fetcher._async_clients.values())
+            self.assertEqual(len(clients), 2)
+            await fetcher.aclose()
+            return clients
+
+        try:
+            clients = asyncio.run(scenario())
+            self.assertTrue(all(client.is_closed for client in clients))
+            self.assertEqual(fetcher._async_clients, {})
+
+            # 前一个事件循环已关闭，它的客户端在下次创建客户端时被丢弃
+            asyncio.run(fetcher.fetch(f"{self.base_url}/image.png"))
+            asyncio.run(fetcher.fetch(f"{self.base_url}/image.png"))
+            self.assertEqual(len(fetcher._async_clients), 1)
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join(5)
+            other_loop.close()
+        print("✓ 每个事件循环一个客户端")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+
+from app.utils.image_analysis_cache import ImageAnalysisCache
+
+
+class FakeRedis:
+    """模拟Redis客户端"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        item = self.data.get(key)
+        if item and item[1] > time.time():
+            return item[0]
+        return None
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, time.time() + (ex or 3600))
+
+    async def ttl(self, key):
+        item = self.data.get(key)
+        return int(item[1] - time.time()) if item else -2
+
+
+class BrokenRedis:
+    """模拟不可用的Redis"""
+
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+
+class TestImageAnalysisCache(unittest.TestCase):
+    """
+    测试商品图分析结果缓存
+    """
+
+    def test_memory_and_redis_tiers(self):
+        """
+        测试进程内缓存和Redis缓存的读写
+        """
+        redis = FakeRedis()
+        cache = ImageAnalysisCache(max_entries=2, ttl=60, redis_client=redis)
+        digest = ImageAnalysisCache.content_key(b'image-bytes')
+        entry = {'segment_url': 'https://example.com/seg.png', 'category_id': 1, 'category_name': '上衣'}
+
+        async def scenario():
+            self.assertIsNone(await cache.get(digest))
+            await cache.set(digest, entry)
+            self.assertEqual(await cache.get(digest), entry)
+
+            # 另一个进程只能通过Redis命中
+            other = ImageAnalysisCache(max_entries=2, ttl=60, redis_client=redis)
+            self.assertEqual(await other.get(digest), entry)
+            self.assertEqual(await other.get(digest), entry)
+            return other.stats()
+
+        other_stats = asyncio.run(scenario())
+        stats = cache.stats()
+        self.assertEqual((stats['memory_hits'], stats['misses'], stats['stores']), (1, 1, 1))
+        self.assertEqual((other_stats['redis_hits'], other_stats['memory_hits']), (1, 1))
+        print("✓ 两级缓存读写")
+
+    def test_lru_eviction_and_expiry(self):
+        """
+        测试按条目数淘汰和过期
+        """
+        cache = ImageAnalysisCache(max_entries=2, ttl=60, redis_client=BrokenRedis())
+
+        async def scenario():
+            for name in ('a', 'b'):
+                await cache.set(name, {'segment_url': name})
+            await cache.get('a')
+            await cache.set('c', {'segment_url': 'c'})
+            # b最久未使用，被淘汰
+            self.assertIsNone(await cache.get('b'))
+            self.assertIsNotNone(await cache.get('a'))
+
+            cache.ttl = -1
+            await cache.set('d', {'segment_url': 'd'})
+            self.assertIsNone(await cache.get('d'))
+
+        asyncio.run(scenario())
+        self.assertEqual(cache.stats()['entries'], 1)
+        print("✓ LRU淘汰和过期")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
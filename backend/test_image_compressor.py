@@ -5,8 +5,12 @@
 
 import os
 import io
+import tempfile
 from PIL import Image
-from app.utils.image_compressor import ImageCompressor
+from app.utils.image_compressor import ImageCompressor, ImageValidationError
+
+# 测试图片和压缩结果写入临时目录，不在仓库中留下文件
+TEST_IMAGE_DIR = tempfile.mkdtemp(prefix='test_images_')
 
 def create_test_image(width=1000, height=1000, format='JPEG'):
     """
@@ -24,11 +28,7 @@ def create_test_image(width=1000, height=1000, format='JPEG'):
     image = Image.new('RGB', (width, height), color='red')
     
     # 保存图片
-    test_dir = 'test_images'
-    if not os.path.exists(test_dir):
-        os.makedirs(test_dir)
-    
-    file_path = os.path.join(test_dir, f'test_{width}x{height}.{format.lower()}')
+    file_path = os.path.join(TEST_IMAGE_DIR, f'test_{width}x{height}.{format.lower()}')
     image.save(file_path, format=format)
     
     return file_path
@@ -160,5 +160,78 @@ def test_image_compressor():
     
     print("\n所有测试完成！")
 
+def test_target_size_search():
+    """
+    测试按目标大小查找压缩质量
+    """
+    print("开始测试按目标大小查找压缩质量...")
+    
+    # 创建带渐变和噪点的图片，使编码大小随质量明显变化
+    size = (800, 800)
+    image = Image.merge('RGB', [
+        Image.linear_gradient('L').resize(size),
+        Image.effect_noise(size, 16),
+        Image.radial_gradient('L').resize(size)
+    ])
+    
+    for fmt in ['JPEG', 'WEBP']:
+        compressor = ImageCompressor()
+        encodes = []
+        original_encode = compressor._encode
+        compressor._encode = lambda img, f, q=None: encodes.append(q) or original_encode(img, f, q)
+        
+        full_size = len(original_encode(image, fmt, compressor.default_quality))
+        compressor.max_file_size = full_size // 3
+        
+        compressed, size = compressor._compress_image(image, fmt)
+        assert size <= compressor.max_file_size, f"{fmt} 压缩后大小超出目标"
+        assert len(encodes) <= 6, f"{fmt} 编码次数过多: {encodes}"
+        assert len(compressed.getvalue()) == size
+        print(f"✓ 格式 {fmt}: {len(encodes)} 次编码收敛，质量序列: {encodes}")
+    
+    # PNG超出大小时量化或缩小分辨率，而不是直接返回超大的文件
+    compressor = ImageCompressor()
+    full_size = len(compressor._encode(image, 'PNG'))
+    compressor.max_file_size = full_size // 4
+    _, size = compressor._compress_image(image, 'PNG')
+    assert size <= compressor.max_file_size, "PNG压缩后大小超出目标"
+    print(f"✓ 格式 PNG: 从 {full_size / 1024:.2f} KB 压缩到 {size / 1024:.2f} KB")
+
+def test_preflight_and_reduced_decode():
+    """
+    测试图片头预检和缩小解码
+    """
+    print("开始测试图片头预检和缩小解码...")
+    
+    compressor = ImageCompressor()
+    buffer = io.BytesIO()
+    Image.new('RGB', (4000, 3000), color='blue').save(buffer, format='JPEG')
+    image_bytes = buffer.getvalue()
+    
+    # 预检只读取图片头
+    assert compressor.preflight(image_bytes) == ('JPEG', (4000, 3000))
+    print("✓ 预检返回实际格式和尺寸")
+    
+    # 无法识别、像素过多、文件过大的图片在解码前被拒绝
+    rejected = ImageCompressor()
+    # 文件过大对应413，无法识别对应415，像素过多对应400
+    for data, limit, status_code in [(b'not an image', None, 415), (image_bytes, 'pixels', 400), (image_bytes, 'size', 413)]:
+        rejected.max_input_pixels = 1000 if limit == 'pixels' else compressor.max_input_pixels
+        rejected.max_input_size = 1000 if limit == 'size' else compressor.max_input_size
+        try:
+            rejected.compress_from_bytes(data, 'jpg')
+            assert False, "预期抛出ImageValidationError但没有"
+        except ImageValidationError as e:
+            assert e.status_code == status_code, f"状态码不正确: {e.status_code}"
+            print(f"✓ 成功拒绝图片: {e}")
+    
+    # JPEG缩小解码后仍缩放到目标尺寸
+    compressed, _ = compressor.compress_from_bytes(image_bytes, 'jpg')
+    with Image.open(compressed) as image:
+        assert image.size == (2000, 1500), f"压缩后尺寸不正确: {image.size}"
+    print("✓ JPEG缩小解码后尺寸正确")
+
 if __name__ == "__main__":
-    test_image_compressor()
\ No newline at end of file
+    test_image_compressor()
+    test_target_size_search()
+    test_preflight_and_reduced_decode()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import io
+import unittest
+
+from PIL import Image
+
+from app.utils.image_derivatives import build_image_entry, build_upload_items, derivative_key, make_derivatives
+
+
+class TestImageDerivatives(unittest.TestCase):
+    """
+    测试生成图片的缩略图和预览图
+    """
+
+    def test_make_derivatives(self):
+        """
+        测试生成256px缩略图和768px预览图，保持宽高比，体积远小于原图
+        """
+        original = Image.linear_gradient('L').resize((2048, 1536)).convert('RGB')
+        noise = Image.effect_noise((2048, 1536), 32).convert('RGB')
+        buffer = io.BytesIO()
+        Image.blend(original, noise, 0.3).save(buffer, 'PNG')
+        image_bytes = buffer.getvalue()
+
+        derivatives = make_derivatives(image_bytes)
+        self.assertEqual(set(derivatives), {'thumbnail', 'preview'})
+        sizes = {}
+        for name, content in derivatives.items():
+            with Image.open(io.BytesIO(content)) as image:
+                self.assertEqual(image.format, 'WEBP')
+                sizes[name] = image.size
+        self.assertEqual(sizes, {'preview': (768, 576), 'thumbnail': (256, 192)})
+        self.assertLess(len(derivatives['thumbnail']) * 10, len(image_bytes))
+        print(f"✓ 派生图: 原图 {len(image_bytes) // 1024}KB, "
+              f"预览图 {len(derivatives['preview']) // 1024}KB, 缩略图 {len(derivatives['thumbnail']) // 1024}KB")
+
+        # 小图不放大
+        small = io.BytesIO()
+        Image.new('RGBA', (100, 50), (255, 0, 0, 128)).save(small, 'PNG')
+        for content in make_derivatives(small.getvalue()).values():
+            with Image.open(io.BytesIO(content)) as image:
+                self.assertEqual(image.size, (100, 50))
+                self.assertEqual(image.mode, 'RGBA')
+
+    def test_upload_items_and_entry(self):
+        """
+        测试派生图对象键、上传列表和图片记录项
+        """
+        self.assertEqual(derivative_key('abc_0.png', 'thumbnail'), 'abc_0_thumbnail.webp')
+        items = build_upload_items('abc_0.png', b'original', {'preview': b'p', 'thumbnail': b't'})
+        self.assertEqual(items, [('abc_0.png', b'original'), ('abc_0_preview.webp', b'p'), ('abc_0_thumbnail.webp', b't')])
+
+        entry = build_image_entry(1, 'https://x/abc_0.png', {'thumbnail': 'https://x/abc_0_thumbnail.webp'})
+        self.assertEqual(entry, {
+            'url': 'https://x/abc_0.png',
+            'index': 1,
+            'preview': 'https://x/abc_0.png',
+            'thumbnail': 'https://x/abc_0_thumbnail.webp'
+        })
+        print("✓ 上传列表和图片记录项")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,53 @@
+import base64
+import hashlib
+import unittest
+
+from app.utils.image_params import (
+    PLACEHOLDER_FAILED, PLACEHOLDER_PENDING, decode_base64_image, is_data_url, strip_image_payloads
+)
+
+
+class TestImageParams(unittest.TestCase):
+    """
+    测试生图参数中的图片字段处理
+    """
+
+    def test_strip_image_payloads(self):
+        """
+        测试data URL被替换为占位符，其他参数和原字典保持不变
+        """
+        data_url = 'data:image/png;base64,' + base64.b64encode(b'\x89PNG' * 1000).decode()
+        params = {
+            'single_outfit_image': data_url,
+            'top_outfit_image': 'https://example.com/top.png',
+            'model_id': 3,
+            'custom_prompt': None,
+        }
+
+        stripped = strip_image_payloads(params)
+        self.assertEqual(stripped['single_outfit_image'], PLACEHOLDER_PENDING)
+        self.assertEqual(stripped['top_outfit_image'], 'https://example.com/top.png')
+        self.assertEqual(stripped['model_id'], 3)
+        self.assertIsNone(stripped['custom_prompt'])
+        self.assertEqual(params['single_outfit_image'], data_url)
+        self.assertEqual(strip_image_payloads(params, PLACEHOLDER_FAILED)['single_outfit_image'], PLACEHOLDER_FAILED)
+        print("✓ 去掉base64图片数据")
+
+    def test_decode_base64_image(self):
+        """
+        测试解析data URL并由图片内容生成对象键
+        """
+        object_key, image_bytes = decode_base64_image('data:image/jpeg;base64,' + base64.b64encode(b'abc').decode())
+        self.assertEqual(object_key, f"model_images/{hashlib.sha256(b'abc').hexdigest()[:32]}.jpg")
+        self.assertEqual(image_bytes, b'abc')
+        # 对象键由图片内容决定，重复提交同一张图片得到相同的对象键
+        self.assertEqual(decode_base64_image('data:image/jpeg;base64,' + base64.b64encode(b'abc').decode())[0], object_key)
+        self.assertIsNone(decode_base64_image('https://example.com/a.png'))
+        self.assertIsNone(decode_base64_image(''))
+        self.assertTrue(is_data_url('data:image/png;base64,AAAA'))
+        self.assertFalse(is_data_url(None))
+        print("✓ 解析base64图片")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
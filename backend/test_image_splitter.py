@@ -93,6 +93,20 @@ def test_image_splitter():
         assert all(isinstance(item, bytes) for item in result), "预期返回字节流列表"
         print(f"✓ 成功返回字节流，每张大小: {len(result[0])}, {len(result[1])} 字节")
         
+        # 测试9.1: 并行编码结果与逐张编码一致
+        print("\n测试9.1: 并行编码结果与逐张编码一致")
+        serial = ImageSplitter(max_workers=1).split_image(test_image_path, 9, return_bytes=True)
+        parallel = ImageSplitter(max_workers=4).split_image(test_image_path, 9, return_bytes=True)
+        assert serial == parallel, "并行编码结果应与逐张编码一致"
+        print(f"✓ 并行编码9张子图片结果一致")
+        
+        # 测试9.2: 生成器模式按完成顺序返回，序号与列表模式一致
+        print("\n测试9.2: 生成器模式")
+        streamed = dict(splitter.iter_split_bytes(test_image_path, 9))
+        assert sorted(streamed) == list(range(9)), f"预期返回序号0-8，实际得到{sorted(streamed)}"
+        assert [streamed[i] for i in range(9)] == serial, "生成器返回的子图片应与列表模式一致"
+        print(f"✓ 生成器模式返回9张子图片")
+        
         # 测试10: 保存到文件
         print("\n测试10: 保存分割后的图片到文件")
         output_dir = tempfile.mkdtemp()
@@ -0,0 +1,238 @@
+import asyncio
+import time
+import unittest
+
+from worker.job_queue import JobQueue, PUSH_SCRIPT, RESERVE_SCRIPT, REQUEUE_SCRIPT, STATUS_FAILED, STATUS_RETRYING, STATUS_SUCCEEDED
+from worker.runner import Worker
+
+
+class FakeRedis:
+    """模拟Redis客户端，支持任务队列需要的命令，Lua脚本用等价的Python实现"""
+
+    def __init__(self):
+        self.data = {}
+        self.zsets = {}
+        self.lists = {}
+        self.sets = {}
+        self.hashes = {}
+
+    async def get(self, key):
+        item = self.data.get(key)
+        if item and item[1] > time.time():
+            return item[0]
+        return None
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and await self.get(key) is not None:
+            return None
+        self.data[key] = (value, time.time() + ex)
+        return True
+
+    async def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+        return len(mapping)
+
+    async def zrem(self, key, member):
+        return 1 if self.zsets.get(key, {}).pop(member, None) is not None else 0
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def hdel(self, key, field):
+        return 1 if self.hashes.get(key, {}).pop(field, None) is not None else 0
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def _due(self, key, now):
+        zset = self.zsets.get(key, {})
+        return sorted((score, member) for member, score in zset.items() if score <= now)
+
+    def _add_lane(self, lanes_key, lane_set_key, lane):
+        lane_set = self.sets.setdefault(lane_set_key, set())
+        if lane not in lane_set:
+            lane_set.add(lane)
+            self.lists.setdefault(lanes_key, []).insert(0, lane)
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == PUSH_SCRIPT:
+            lanes_key, lane_set_key, lane_of_key = keys
+            prefix, lane, job_id, score = argv
+            self.zsets.setdefault(prefix + lane, {})[job_id] = float(score)
+            self.hashes.setdefault(lane_of_key, {})[job_id] = lane
+            self._add_lane(lanes_key, lane_set_key, lane)
+            return 1
+        if script == RESERVE_SCRIPT:
+            lanes_key, lane_set_key, processing_key = keys
+            prefix, now, deadline = argv
+            lanes = self.lists.setdefault(lanes_key, [])
+            for _ in range(len(lanes)):
+                lane = lanes.pop()
+                lanes.insert(0, lane)
+                due = self._due(prefix + lane, float(now))
+                if due:
+                    del self.zsets[prefix + lane][due[0][1]]
+                if not self.zsets.get(prefix + lane):
+                    lanes.remove(lane)
+                    self.sets[lane_set_key].discard(lane)
+                if due:
+                    self.zsets.setdefault(processing_key, {})[due[0][1]] = float(deadline)
+                    return due[0][1]
+            return None
+        if script == REQUEUE_SCRIPT:
+            lanes_key, lane_set_key, lane_of_key, processing_key = keys
+            prefix, now, default_lane = argv
+            due = self._due(processing_key, now)
+            for _, job_id in due:
+                lane = self.hashes.get(lane_of_key, {}).get(job_id, default_lane)
+                del self.zsets[processing_key][job_id]
+                self.zsets.setdefault(prefix + lane, {})[job_id] = now
+                self._add_lane(lanes_key, lane_set_key, lane)
+            return len(due)
+        raise AssertionError("unknown script")
+
+
+class TestJobQueue(unittest.TestCase):
+    """
+    测试Redis任务队列和worker
+    """
+
+    def test_retry_and_expired_lease(self):
+        """
+        测试失败后指数退避重试、超过最大次数标记失败、租约过期后重新入队
+        """
+        redis = FakeRedis()
+        queue = JobQueue(redis_client=redis, visibility_timeout=60, max_attempts=2, retry_backoff=0.05)
+
+        async def scenario():
+            job_id = await queue.enqueue("demo", {"n": 1})
+            self.assertEqual(await queue.enqueue("demo", {"n": 1}, job_id=job_id), job_id)
+            self.assertEqual(await queue.stats(), {"lanes": 1, "ready": 1, "processing": 0})
+
+            job = await queue.reserve()
+            self.assertEqual(job["attempts"], 1)
+            self.assertIsNone(await queue.reserve())
+
+            self.assertTrue(await queue.fail(job, "boom"))
+            self.assertEqual((await queue.get(job_id))["status"], STATUS_RETRYING)
+            # 退避期间不能领取
+            self.assertIsNone(await queue.reserve())
+            await asyncio.sleep(0.06)
+
+            job = await queue.reserve()
+            self.assertEqual(job["attempts"], 2)
+            self.assertFalse(await queue.fail(job, "boom again"))
+            failed = await queue.get(job_id)
+            self.assertEqual(failed["status"], STATUS_FAILED)
+            self.assertIsNone(failed["payload"])
+
+            # worker崩溃：租约过期后任务重新入队
+            crashed_id = await queue.enqueue("demo", {"n": 2})
+            await queue.reserve()
+            redis.zsets[queue.processing_key][crashed_id] = time.time() - 1
+            self.assertEqual(await queue.requeue_expired(), 1)
+            job = await queue.reserve()
+            self.assertEqual((job["id"], job["attempts"]), (crashed_id, 2))
+            await queue.complete(job, {"ok": True})
+            self.assertEqual((await queue.get(crashed_id))["result"], {"ok": True})
+
+        asyncio.run(scenario())
+        # 所有键共用同一个hash tag，Lua脚本在Redis Cluster中只访问一个slot
+        keys = set(redis.data) | set(redis.zsets) | set(redis.sets) | set(redis.lists) | set(redis.hashes)
+        self.assertTrue(keys)
+        self.assertTrue(all(key.startswith("{jobs}:") for key in keys))
+        self.assertEqual(queue.backoff(1), 0.05)
+        self.assertEqual(queue.backoff(3), 0.2)
+        print("✓ 重试、退避和租约过期")
+
+    def test_fair_lanes(self):
+        """
+        测试通道之间轮转：大批量任务不会阻塞其他用户后提交的任务
+        """
+        queue = JobQueue(redis_client=FakeRedis())
+
+        async def scenario():
+            for n in range(20):
+                await queue.enqueue("demo", {"n": n}, lane="user:1:batch")
+            await queue.enqueue("demo", {"n": "single"}, lane="user:2")
+            await queue.enqueue("demo", {"n": "own"}, lane="user:1")
+            self.assertEqual(await queue.stats(), {"lanes": 3, "ready": 22, "processing": 0})
+
+            order = []
+            while True:
+                job = await queue.reserve()
+                if job is None:
+                    break
+                order.append(job["payload"]["n"])
+                await queue.complete(job)
+            return order
+
+        order = asyncio.run(scenario())
+        self.assertEqual(len(order), 22)
+        self.assertLess(order.index("single"), 3)
+        self.assertLess(order.index("own"), 3)
+        self.assertEqual([n for n in order if isinstance(n, int)], list(range(20)))
+        print(f"✓ 公平调度: {order[:5]}")
+
+    def test_worker_runs_jobs_concurrently(self):
+        """
+        测试worker并发执行任务、最终失败时调用失败回调
+        """
+        redis = FakeRedis()
+        queue = JobQueue(redis_client=redis, max_attempts=1)
+        worker = Worker(queue, concurrency=4, poll_interval=0.01)
+        running = []
+        peak = []
+        failures = []
+
+        async def handle(payload):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.pop()
+            if payload["n"] == 0:
+                raise RuntimeError("bad input")
+            return payload["n"] * 2
+
+        async def on_failure(payload, error):
+            failures.append((payload["n"], error))
+
+        started = []
+
+        async def startup(q):
+            started.append(q)
+
+        worker.register("double", handle, on_failure=on_failure)
+        worker.on_startup(startup)
+
+        async def scenario():
+            job_ids = [await queue.enqueue("double", {"n": n}) for n in range(8)]
+            unknown = await queue.enqueue("unknown", {})
+            runner = asyncio.create_task(worker.run())
+            while (await queue.stats())["ready"] or (await queue.stats())["processing"]:
+                await asyncio.sleep(0.01)
+            worker.stop()
+            await runner
+            return [await queue.get(job_id) for job_id in job_ids], await queue.get(unknown)
+
+        start = time.perf_counter()
+        jobs, unknown = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(started, [queue])
+        self.assertEqual([job["result"] for job in jobs[1:]], [n * 2 for n in range(1, 8)])
+        self.assertTrue(all(job["status"] == STATUS_SUCCEEDED for job in jobs[1:]))
+        self.assertEqual(jobs[0]["status"], STATUS_FAILED)
+        self.assertEqual(failures, [(0, "bad input")])
+        self.assertEqual(unknown["status"], STATUS_FAILED)
+        self.assertEqual(max(peak), 4)
+        self.assertLess(elapsed, 0.4)
+        print(f"✓ worker并发执行8个任务，耗时 {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
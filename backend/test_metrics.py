@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from app.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry, render_metrics
+from app.utils.pipeline import Pipeline
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    测试Prometheus文本格式指标
+    """
+
+    def test_render_text_format(self):
+        """
+        测试计数器、仪表和直方图的文本格式输出
+        """
+        registry = MetricsRegistry()
+        calls = Counter('calls_total', '调用次数', ['provider'], registry=registry)
+        inflight = Gauge('inflight', '在途数量', registry=registry)
+        latency = Histogram('latency_seconds', '耗时', ['stage'], buckets=(0.1, 1), registry=registry)
+
+        calls.labels('ark').inc()
+        calls.labels('ark').inc(2)
+        calls.labels('a"b').inc()
+        inflight.inc()
+        inflight.inc()
+        inflight.dec()
+        for value in (0.05, 0.5, 5):
+            latency.labels('split').observe(value)
+
+        text = registry.render()
+        self.assertIn('# TYPE calls_total counter', text)
+        self.assertIn('calls_total{provider="ark"} 3', text)
+        self.assertIn('calls_total{provider="a\\"b"} 1', text)
+        self.assertIn('inflight 1', text)
+        self.assertIn('latency_seconds_bucket{stage="split",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{stage="split",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{stage="split",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_sum{stage="split"} 5.55', text)
+        self.assertIn('latency_seconds_count{stage="split"} 3', text)
+
+        with self.assertRaises(ValueError):
+            calls.labels('ark', 'extra')
+        with self.assertRaises(ValueError):
+            Counter('calls_total', '重复', registry=registry)
+        print("✓ 文本格式输出")
+
+    def test_pipeline_records_stage_metrics(self):
+        """
+        测试流水线自动记录各阶段耗时、字节数和失败次数
+        """
+        def broken(data):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline(name='metrics-test')
+        pipeline.add_stage('double', lambda data: data * 2, inputs=['data'])
+        pipeline.add_stage('broken', broken, inputs=['data'])
+        asyncio.run(pipeline.run({'data': b'12345'}))
+
+        text = render_metrics()
+        self.assertIn('pipeline_stage_duration_seconds_count{pipeline="metrics-test",stage="double"} 1', text)
+        self.assertIn('pipeline_stage_bytes_sum{pipeline="metrics-test",stage="double",direction="in"} 5', text)
+        self.assertIn('pipeline_stage_bytes_sum{pipeline="metrics-test",stage="double",direction="out"} 10', text)
+        self.assertIn('pipeline_stage_errors_total{pipeline="metrics-test",stage="broken"} 1', text)
+        self.assertIn('pipeline_inflight{pipeline="metrics-test"} 0', text)
+        print("✓ 流水线阶段指标")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
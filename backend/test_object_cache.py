@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from app.utils.object_cache import DiskObjectCache
+from app.utils.tos_utils import TOSClient
+
+
+class FakeObjectClient:
+    """按对象键返回内容的SDK替身，记录请求次数"""
+
+    def __init__(self, objects):
+        # 对象键 -> (内容, ETag)
+        self.objects = objects
+        self.gets = []
+        self.heads = []
+
+    def get_object(self, bucket, key, range_start=None, range_end=None, if_match=None):
+        import io
+        self.gets.append(key)
+        data, etag = self.objects[key]
+        body = io.BytesIO(data)
+        resp = MagicMock(request_id="test_request_id", etag=etag, content_type="image/png",
+                         content_range=None, headers={})
+        resp.read = body.read
+        resp.__iter__ = lambda self: iter(lambda: body.read(1000), b"")
+        return resp
+
+    def head_object(self, bucket, key):
+        self.heads.append(key)
+        return MagicMock(etag=self.objects[key][1])
+
+
+class TestDiskObjectCache(unittest.TestCase):
+    """
+    测试TOS对象本地磁盘缓存
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_content_addressed_and_shared(self):
+        """
+        测试内容相同的对象共用一个文件，另一个实例（模拟其他worker）能读到同一份索引
+        """
+        cache = DiskObjectCache(self.directory, max_bytes=1024)
+        self.assertTrue(cache.put_bytes('bucket', 'a.png', b'same', etag='e1'))
+        self.assertTrue(cache.put_bytes('bucket', 'b.png', b'same', etag='e2'))
+
+        other = DiskObjectCache(self.directory, max_bytes=1024)
+        a = other.get('bucket', 'a.png')
+        b = other.get('bucket', 'b.png')
+        self.assertEqual(a['path'], b['path'])
+        self.assertEqual(os.path.basename(a['path']), a['digest'])
+        self.assertEqual(b['etag'], 'e2')
+        self.assertEqual(other.stats()['size_bytes'], 4)
+
+        other.invalidate('bucket', 'a.png')
+        self.assertTrue(os.path.exists(b['path']))
+        other.invalidate('bucket', 'b.png')
+        self.assertFalse(os.path.exists(b['path']))
+        self.assertEqual(cache.stats()['entries'], 0)
+        print("✓ 内容寻址且多实例共享索引")
+
+    def test_evicts_least_recently_used_by_size(self):
+        """
+        测试超过字节上限时按最久未访问淘汰，超过单对象上限的内容不缓存
+        """
+        cache = DiskObjectCache(self.directory, max_bytes=250, max_object_bytes=200)
+        cache.put_bytes('bucket', 'old.png', b'o' * 100)
+        cache.put_bytes('bucket', 'hot.png', b'h' * 100)
+        self.assertIsNotNone(cache.get('bucket', 'old.png'))
+        cache.put_bytes('bucket', 'new.png', b'n' * 100)
+
+        self.assertIsNone(cache.get('bucket', 'hot.png'))
+        self.assertIsNotNone(cache.get('bucket', 'old.png'))
+        self.assertIsNotNone(cache.get('bucket', 'new.png'))
+        self.assertFalse(cache.put_bytes('bucket', 'big.png', b'b' * 201))
+
+        stats = cache.stats()
+        self.assertEqual(stats['size_bytes'], 200)
+        self.assertEqual(stats['evicted_bytes'], 100)
+        print("✓ 按大小淘汰最久未访问的文件")
+
+    def test_tos_client_read_through(self):
+        """
+        测试TOSClient第二次读取命中缓存，对象变化后重新下载，写入后缓存失效
+        """
+        cache = DiskObjectCache(self.directory, max_bytes=1024, revalidate_after=0)
+        client = TOSClient(ak="test_ak", sk="test_sk", endpoint="tos.example.com", region="cn-test",
+                           bucket_name="test-bucket", cache=cache)
+        client.client = FakeObjectClient({'pose.png': (b'v1' * 10, 'e1')})
+
+        self.assertFalse(client.get_object('pose.png')['cached'])
+        result = client.get_object('pose.png')
+        self.assertTrue(result['cached'])
+        self.assertEqual(result['content'], b'v1' * 10)
+
+        file_path = os.path.join(self.directory, 'out.png')
+        result = client.get_object_to_file('pose.png', file_path)
+        self.assertTrue(result['cached'])
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), b'v1' * 10)
+        self.assertEqual(client.client.gets, ['pose.png'])
+
+        # 其他机器覆盖了对象，ETag校验不一致时重新下载
+        client.client.objects['pose.png'] = (b'v2' * 10, 'e2')
+        result = client.get_object('pose.png')
+        self.assertFalse(result['cached'])
+        self.assertEqual(result['content'], b'v2' * 10)
+
+        client.client.delete_object = MagicMock(return_value=MagicMock(request_id="test_request_id"))
+        client.delete_object('pose.png')
+        self.assertIsNone(cache.get('test-bucket', 'pose.png'))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stale']), (2, 1, 1))
+        self.assertEqual(stats['bytes_saved'], 40)
+        print("✓ TOSClient读穿透缓存")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import unittest
+
+from app.utils.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    测试Pipeline流水线执行器
+    """
+
+    def test_independent_stages_run_concurrently(self):
+        """
+        测试互不依赖的阶段并发执行
+        """
+        def slow_double(x):
+            time.sleep(0.2)
+            return x * 2
+
+        async def slow_add(x):
+            await asyncio.sleep(0.2)
+            return x + 1
+
+        pipeline = Pipeline()
+        pipeline.add_stage('double', slow_double, inputs=['x'])
+        pipeline.add_stage('add', slow_add, inputs=['x'])
+        pipeline.add_stage('sum', lambda a, b: a + b, inputs=['double', 'add'])
+
+        start = time.perf_counter()
+        result = asyncio.run(pipeline.run({'x': 3}))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result.get('sum'), 10)
+        self.assertLess(elapsed, 0.35, f"两个0.2秒的阶段应当重叠执行，实际耗时{elapsed:.2f}秒")
+        self.assertEqual(set(result.timings), {'double', 'add', 'sum'})
+        print("✓ 互不依赖的阶段并发执行")
+
+    def test_failed_stage_uses_default(self):
+        """
+        测试阶段失败时使用默认值并记录错误
+        """
+        def broken(x):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline()
+        pipeline.add_stage('broken', broken, inputs=['x'], default=[])
+        pipeline.add_stage('count', len, inputs=['broken'])
+
+        result = asyncio.run(pipeline.run({'x': 1}))
+
+        self.assertEqual(result.get('broken'), [])
+        self.assertEqual(result.get('count'), 0)
+        self.assertIn('broken', result.errors)
+        self.assertIn('broken', result.timing_report()['errors'])
+        print("✓ 阶段失败时使用默认值")
+
+    def test_invalid_dependencies(self):
+        """
+        测试未知输入和循环依赖
+        """
+        pipeline = Pipeline()
+        pipeline.add_stage('a', lambda x: x, inputs=['missing'])
+        with self.assertRaises(ValueError):
+            asyncio.run(pipeline.run({}))
+
+        pipeline = Pipeline()
+        pipeline.add_stage('a', lambda b: b, inputs=['b'])
+        pipeline.add_stage('b', lambda a: a, inputs=['a'])
+        with self.assertRaises(ValueError):
+            asyncio.run(pipeline.run({}))
+
+        with self.assertRaises(ValueError):
+            pipeline.add_stage('a', lambda: None)
+        print("✓ 依赖校验")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
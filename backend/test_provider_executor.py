@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.utils.provider_executor import ProviderExecutor, ProviderBusyError
+
+
+class TestProviderExecutor(unittest.TestCase):
+    """
+    测试外部服务线程池（隔舱）
+    """
+
+    def test_run_does_not_block_event_loop(self):
+        """
+        测试阻塞调用在线程池中执行，事件循环仍可调度其他协程
+        """
+        executor = ProviderExecutor('test', max_workers=2, max_queue=2)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            return await asyncio.gather(executor.run(time.sleep, 0.2), ticker())
+
+        asyncio.run(main())
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.19, "阻塞调用期间事件循环应当继续运行")
+        executor.shutdown()
+        print("✓ 阻塞调用不阻塞事件循环")
+
+    def test_rejects_when_queue_full(self):
+        """
+        测试在途任务达到上限后拒绝新任务
+        """
+        executor = ProviderExecutor('test', max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        first = executor.submit(release.wait)
+        second = executor.submit(release.wait)
+        with self.assertRaises(ProviderBusyError):
+            executor.submit(release.wait)
+
+        stats = executor.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['running'] + stats['queued'], 2)
+        self.assertEqual(stats['saturation'], 1.0)
+
+        release.set()
+        first.result()
+        second.result()
+        stats = executor.stats()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['running'] + stats['queued'], 0)
+        self.assertGreater(stats['queue_wait_max_ms'], 0)
+        executor.shutdown()
+        print("✓ 排队已满时拒绝")
+
+    def test_failures_are_counted(self):
+        """
+        测试失败任务计数并把异常传递给调用者
+        """
+        executor = ProviderExecutor('test', max_workers=1, max_queue=0)
+
+        def broken():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            executor.call(broken)
+        self.assertEqual(executor.stats()['failed'], 1)
+        executor.shutdown()
+        print("✓ 失败计数")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+import asyncio
+import time
+import unittest
+
+from common.singleflight import SingleFlight, make_singleflight_key
+
+
+class FakeRedis:
+    """模拟Redis客户端，支持租约需要的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item and (item[1] is None or item[1] > time.time()):
+            return item[0]
+        self.data.pop(key, None)
+        return None
+
+    async def get(self, key):
+        return self._alive(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key) is not None:
+            return None
+        self.data[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    async def exists(self, key):
+        return 1 if self._alive(key) is not None else 0
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if self._alive(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    测试请求合并
+    """
+
+    def test_concurrent_duplicates_share_one_call(self):
+        """
+        测试进程内并发的重复调用只执行一次，完成后短时间内的重复调用直接返回结果
+        """
+        singleflight = SingleFlight(redis_client=FakeRedis(), linger=5)
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {'data': [{'url': 'https://example.com/a.png'}]}
+
+        async def scenario():
+            key = make_singleflight_key('model', 'prompt', [], '2K', 'url')
+            results = await asyncio.gather(*[singleflight.do(key, generate) for _ in range(5)])
+            late = await singleflight.do(key, generate)
+            other = await singleflight.do(make_singleflight_key('model', 'other', [], '2K', 'url'), generate)
+            return results, late, other
+
+        results, late, other = asyncio.run(scenario())
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(late, results[0])
+        self.assertEqual(singleflight.stats()['shared'], 5)
+        print("✓ 进程内请求合并")
+
+    def test_cross_worker_lease(self):
+        """
+        测试多个worker通过Redis租约合并调用，执行者失败时等待者重新执行
+        """
+        redis = FakeRedis()
+        workers = [SingleFlight(redis_client=redis, poll_interval=0.02) for _ in range(3)]
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {'created': len(calls)}
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise RuntimeError("boom")
+
+        async def scenario():
+            results = await asyncio.gather(*[worker.do('same', generate) for worker in workers])
+
+            # 第一个worker失败后，第二个worker发现租约已释放且没有结果，自行执行
+            async def second():
+                await asyncio.sleep(0.01)
+                return await workers[1].do('retry', generate)
+
+            failed, retried = await asyncio.gather(workers[0].do('retry', failing), second(), return_exceptions=True)
+            return results, failed, retried
+
+        results, failed, retried = asyncio.run(scenario())
+        self.assertEqual(results, [{'created': 1}] * 3)
+        self.assertIsInstance(failed, RuntimeError)
+        self.assertEqual(retried, {'created': 3})
+        print("✓ 跨worker请求合并")
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """
+        测试执行者被取消时，等待者不会收到CancelledError，而是重新调用并由其中一个执行
+        """
+        singleflight = SingleFlight(redis_client=FakeRedis(), linger=5)
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {'created': len(calls)}
+
+        async def scenario():
+            leader = asyncio.ensure_future(singleflight.do('same', generate))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.ensure_future(singleflight.do('same', generate)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*followers)
+            self.assertTrue(leader.cancelled())
+            return results
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, [{'created': 2}] * 3)
+        self.assertEqual(len(calls), 2)
+        print("✓ 执行者取消后等待者重新执行")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,222 @@
+import asyncio
+import io
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from starlette.responses import FileResponse, RedirectResponse
+
+from app.utils.storage import LocalFallbackStorage, LocalStorage, TOSStorage, save_upload
+
+
+class TestLocalStorage(unittest.TestCase):
+    """
+    测试本地文件系统存储
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.tmp_dir.name, '/api/v1/sys-images/files', chunk_size=4)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sharded_streaming_put(self):
+        """
+        测试新对象键带分片目录，文件对象按块写入且不留临时文件
+        """
+        upload = SimpleNamespace(filename='pose.png', file=io.BytesIO(b'0123456789'), content_type='image/png')
+        url = save_upload(self.storage, upload, 'poses', suffix='_skeleton')
+
+        key = self.storage.key_from_url(url)
+        prefix, shard1, shard2, name = key.split('/')
+        self.assertEqual(prefix, 'poses')
+        self.assertEqual(name[:4], shard1 + shard2)
+        self.assertTrue(name.endswith('_skeleton.png'))
+        self.assertEqual(self.storage.get(key), b'0123456789')
+        self.assertEqual(os.listdir(os.path.dirname(self.storage.path(key))), [name])
+        print("✓ 分片目录和流式写入")
+
+    def test_flat_keys_and_delete_url(self):
+        """
+        测试历史上没有分片的URL照常可用，删除只作用于当前存储的URL
+        """
+        url = self.storage.put('poses/old.jpg', b'old')
+        self.assertEqual(url, '/api/v1/sys-images/files/poses/old.jpg')
+        self.assertTrue(self.storage.exists('poses/old.jpg'))
+
+        self.assertFalse(self.storage.delete_url('/api/v1/yilaitumodel/files/old.jpg'))
+        self.assertTrue(self.storage.delete_url(url))
+        self.assertFalse(self.storage.exists('poses/old.jpg'))
+        # 文件已不存在时删除不报错
+        self.assertTrue(self.storage.delete_url(url))
+
+        for key in ('../secret', '/etc/passwd', 'poses/../../x', ''):
+            with self.assertRaises(ValueError):
+                self.storage.path(key)
+        print("✓ 兼容旧URL并拒绝越界对象键")
+
+    def test_response(self):
+        """
+        测试默认返回FileResponse，配置nginx内部前缀后返回X-Accel-Redirect
+        """
+        self.storage.put('scenes/a.png', b'png')
+        self.assertIsInstance(self.storage.response('scenes/a.png'), FileResponse)
+        with self.assertRaises(FileNotFoundError):
+            self.storage.response('scenes/missing.png')
+
+        accel = LocalStorage(self.tmp_dir.name, '/files', accel_redirect_prefix='/internal/sys-images/')
+        response = accel.response('scenes/a.png')
+        self.assertEqual(response.headers['x-accel-redirect'], '/internal/sys-images/scenes/a.png')
+        self.assertEqual(response.headers['content-type'], 'image/png')
+        self.assertEqual(response.body, b'')
+        print("✓ 文件响应")
+
+    def test_put_many(self):
+        """
+        测试批量写入结果与输入顺序一致，单个对象失败不影响其他对象
+        """
+        items = [('model_images/a.png', b'a'), ('../bad.png', b'bad'), ('model_images/b.png', io.BytesIO(b'b'))]
+        results = asyncio.run(self.storage.put_many(items, max_workers=2))
+
+        self.assertEqual([result['success'] for result in results], [True, False, True])
+        self.assertEqual([result['object_key'] for result in results], [key for key, _ in items])
+        self.assertEqual(results[0]['object_url'], '/api/v1/sys-images/files/model_images/a.png')
+        self.assertEqual(self.storage.get('model_images/b.png'), b'b')
+        self.assertIn('无效的对象键', results[1]['error'])
+        print("✓ 批量写入")
+
+
+class TestTOSStorage(unittest.TestCase):
+    """
+    测试TOS存储对TOSClient的封装
+    """
+
+    def test_prefix_and_exists(self):
+        client = MagicMock()
+        client.put_object.return_value = {'object_url': 'https://bucket.tos.example.com/sys-images/a.png'}
+        client.get_object_url.side_effect = lambda key: f"https://bucket.tos.example.com/{key}"
+        not_found = Exception("NoSuchKey")
+        not_found.status_code = 404
+        client.head_object.side_effect = not_found
+        storage = TOSStorage(client, prefix='sys-images')
+
+        url = storage.put('a.png', b'png')
+        client.put_object.assert_called_once_with('sys-images/a.png', b'png')
+        self.assertEqual(storage.key_from_url(url), 'a.png')
+        self.assertFalse(storage.exists('a.png'))
+        self.assertIsInstance(storage.response('a.png'), RedirectResponse)
+
+        self.assertTrue(storage.delete_url(url))
+        client.delete_object.assert_called_once_with('sys-images/a.png')
+        print("✓ TOS存储")
+
+    def test_put_many_uses_async_client(self):
+        """
+        测试批量写入通过TOS的asyncio接口提交，结果中的对象键不带前缀
+        """
+        client = MagicMock()
+
+        async def put_objects(items, max_workers):
+            return [{'success': True, 'object_key': key, 'object_url': f"https://bucket.tos.example.com/{key}"}
+                    for key, _ in items]
+
+        client.aio.put_objects.side_effect = put_objects
+        storage = TOSStorage(client, prefix='cankaotu')
+
+        results = asyncio.run(storage.put_many([('a.png', b'a')], max_workers=4))
+        client.aio.put_objects.assert_called_once_with([('cankaotu/a.png', b'a')], max_workers=4)
+        self.assertEqual(results, [{'success': True, 'object_key': 'a.png',
+                                    'object_url': 'https://bucket.tos.example.com/cankaotu/a.png'}])
+        print("✓ TOS批量写入")
+
+    def test_local_fallback(self):
+        """
+        测试切换到对象存储后，历史本地URL继续从本地目录读取和删除，新文件写入对象存储
+        """
+        client = MagicMock()
+        client.put_object.return_value = {'object_url': 'https://bucket.tos.example.com/sys-images/new.png'}
+        client.get_object_url.side_effect = lambda key: f"https://bucket.tos.example.com/{key}"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local = LocalStorage(tmp_dir, '/api/v1/sys-images/files')
+            legacy_url = local.put('poses/old.jpg', b'old')
+            storage = LocalFallbackStorage(TOSStorage(client, prefix='sys-images'), local)
+
+            self.assertEqual(storage.put('new.png', b'new'), 'https://bucket.tos.example.com/sys-images/new.png')
+            self.assertEqual(storage.key_from_url(legacy_url), 'poses/old.jpg')
+            self.assertEqual(storage.get('poses/old.jpg'), b'old')
+            self.assertIsInstance(storage.response('poses/old.jpg'), FileResponse)
+            self.assertIsInstance(storage.response('new.png'), RedirectResponse)
+
+            self.assertTrue(storage.delete_url(legacy_url))
+            self.assertFalse(local.exists('poses/old.jpg'))
+            client.delete_object.assert_not_called()
+            self.assertTrue(storage.delete_url('https://bucket.tos.example.com/sys-images/new.png'))
+            client.delete_object.assert_called_once_with('sys-images/new.png')
+        print("✓ 历史本地文件兜底")
+
+
+class TestStorageFiles(unittest.TestCase):
+    """
+    测试所有存储空间共用的文件接口
+    """
+
+    def test_all_namespaces_use_storage_response(self):
+        """
+        测试每个存储空间的文件URL都由存储的response()返回，无效或不存在的对象键返回404
+        """
+        import sys
+        from pathlib import Path
+        from unittest.mock import patch
+
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from backend.app.api.storage_files import router
+        from backend.app.utils import storage as storage_module
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storages = {
+                namespace: LocalStorage(os.path.join(tmp_dir, namespace), url_prefix)
+                for namespace, url_prefix in storage_module.STORAGE_NAMESPACES.items()
+            }
+            app = FastAPI()
+            app.include_router(router)
+            client = TestClient(app)
+            with patch.dict(storage_module._storages, storages):
+                for storage in storages.values():
+                    url = storage.put('3f/a2/a.png', b'png')
+                    self.assertEqual(client.get(url).content, b'png')
+                    self.assertEqual(client.get(storage.url('missing.png')).status_code, 404)
+                url = storages['cankaotu'].url('..%2Fsys-images%2F3f%2Fa2%2Fa.png')
+                self.assertEqual(client.get(url).status_code, 404)
+        print("✓ 统一文件接口")
+
+    def test_storage_for_url(self):
+        """
+        测试根据访问URL找到所属的存储和对象键
+        """
+        from unittest.mock import patch
+
+        from app.utils import storage as storage_module
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storages = {
+                namespace: LocalStorage(os.path.join(tmp_dir, namespace), url_prefix)
+                for namespace, url_prefix in storage_module.STORAGE_NAMESPACES.items()
+            }
+            with patch.dict(storage_module._storages, storages):
+                storage, key = storage_module.storage_for_url('/api/v1/yilaitumodel/files/a/b.png')
+                self.assertIs(storage, storages['yilaitumodel'])
+                self.assertEqual(key, 'a/b.png')
+                storage, key = storage_module.storage_for_url('/api/v1/generation/files/c.png')
+                self.assertIs(storage, storages['generation'])
+                self.assertIsNone(storage_module.storage_for_url('https://example.com/c.png'))
+        print("✓ 根据URL查找存储")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -9,6 +9,134 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.utils.tos_utils import TOSClient
 
+
+def make_server_error(status_code):
+    """构造指定HTTP状态码的TOS服务端错误"""
+    import tos
+    resp = MagicMock(request_id="test_request_id", headers={}, status=status_code)
+    return tos.exceptions.TosServerError(resp, "服务端错误", "TestError", "", "")
+
+
+class FakeMultipartClient:
+    """内存中的分片上传SDK替身，可按分片序号注入失败"""
+
+    def __init__(self, failures=None):
+        self.uploads = {}
+        self.objects = {}
+        self.aborted = []
+        self.part_calls = []
+        # 分片序号 -> 依次抛出的异常列表
+        self.failures = failures or {}
+
+    def create_multipart_upload(self, bucket, key, **kwargs):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return MagicMock(upload_id=upload_id)
+
+    def upload_part(self, bucket, key, upload_id, part_number, content):
+        self.part_calls.append(part_number)
+        errors = self.failures.get(part_number)
+        if errors:
+            raise errors.pop(0)
+        self.uploads[upload_id][part_number] = bytes(content)
+        return MagicMock(etag=f"etag-{part_number}")
+
+    def list_parts(self, bucket, key, upload_id, max_parts=1000):
+        if upload_id not in self.uploads:
+            raise make_server_error(404)
+        return MagicMock()
+
+    def complete_multipart_upload(self, bucket, key, upload_id, parts):
+        data = self.uploads.pop(upload_id)
+        self.objects[key] = b"".join(data[part.part_number] for part in parts)
+        return MagicMock(request_id="test_request_id", etag="test_etag", hash_crc64_ecma=None, status_code=200)
+
+    def abort_multipart_upload(self, bucket, key, upload_id):
+        self.uploads.pop(upload_id, None)
+        self.aborted.append(upload_id)
+
+
+class FakeRangeResponse:
+    """SDK get_object返回值的替身，支持按块读取和迭代"""
+
+    def __init__(self, data, content_range=None, etag="etag-1"):
+        import io
+        self.body = io.BytesIO(data)
+        self.content_range = content_range
+        self.content_length = len(data)
+        self.content_type = "application/octet-stream"
+        self.etag = etag
+        self.headers = {}
+        self.request_id = "test_request_id"
+        self.closed = False
+
+    def read(self, amt=None):
+        return self.body.read(amt)
+
+    def __iter__(self):
+        return iter(lambda: self.body.read(1000), b"")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRangeClient:
+    """按Range返回对象内容的SDK替身"""
+
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+
+    def get_object(self, bucket, key, range_start=None, range_end=None, if_match=None):
+        self.requests.append((range_start, range_end, if_match))
+        if range_start is None:
+            return FakeRangeResponse(self.data)
+        end = min(range_end, len(self.data) - 1)
+        return FakeRangeResponse(self.data[range_start:end + 1], f"bytes {range_start}-{end}/{len(self.data)}")
+
+
+class FakeBucketClient:
+    """分页列举、批量删除和复制的SDK替身"""
+
+    def __init__(self, keys, fail_keys=()):
+        self.keys = sorted(keys)
+        self.fail_keys = set(fail_keys)
+        self.list_calls = []
+        self.delete_batches = []
+        self.copies = []
+        self.lock = __import__('threading').Lock()
+
+    def list_objects_type2(self, bucket, max_keys=1000, list_only_once=False, prefix=None,
+                           continuation_token=None, start_after=None):
+        self.list_calls.append(continuation_token)
+        keys = [key for key in self.keys if key.startswith(prefix or "")]
+        start = int(continuation_token) if continuation_token else 0
+        page = keys[start:start + max_keys]
+        truncated = start + max_keys < len(keys)
+        return MagicMock(
+            contents=[MagicMock(key=key, size=1, etag="e", last_modified=None) for key in page],
+            is_truncated=truncated,
+            next_continuation_token=str(start + max_keys) if truncated else None
+        )
+
+    def delete_multi_objects(self, bucket, objects):
+        keys = [obj.key for obj in objects]
+        with self.lock:
+            self.delete_batches.append(keys)
+        return MagicMock(
+            request_id="test_request_id",
+            deleted=[MagicMock(key=key) for key in keys if key not in self.fail_keys],
+            error=[MagicMock(key=key, code="AccessDenied", message="拒绝") for key in keys if key in self.fail_keys]
+        )
+
+    def copy_object(self, bucket, key, src_bucket, src_key):
+        if src_key in self.fail_keys:
+            raise Exception("复制失败")
+        with self.lock:
+            self.copies.append((src_key, key))
+        return MagicMock(request_id="test_request_id")
+
+
 class TestTOSClient(unittest.TestCase):
     
     def setUp(self):
@@ -64,6 +192,39 @@ class TestTOSClient(unittest.TestCase):
         )
         self.assertTrue(result['success'])
     
+    def test_put_objects(self):
+        """测试批量并发上传(put_objects)方法"""
+        mock_response = MagicMock()
+        mock_response.request_id = "test_request_id"
+        mock_response.etag = "test_etag"
+        mock_response.hash_crc64_ecma = "test_crc64"
+        mock_response.status_code = 200
+        
+        # 模拟第二个对象上传失败
+        def put_object(**kwargs):
+            if kwargs['key'] == "tile_1.png":
+                raise Exception("网络错误")
+            return mock_response
+        
+        self.tos_client.client = MagicMock()
+        self.tos_client.client.put_object.side_effect = put_object
+        
+        items = [(f"tile_{i}.png", f"content {i}".encode()) for i in range(4)]
+        results = self.tos_client.put_objects(items, max_workers=3)
+        
+        # 验证结果顺序与输入一致，单个失败不影响其他对象
+        self.assertEqual([r['object_key'] for r in results], [key for key, _ in items])
+        self.assertEqual([r['success'] for r in results], [True, False, True, True])
+        self.assertIn("网络错误", results[1]['error'])
+        self.assertEqual(results[0]['object_url'], "https://test-bucket.tos.example.com/tile_0.png")
+        self.assertEqual(self.tos_client.client.put_object.call_count, 4)
+        
+        # 测试参数校验
+        with self.assertRaises(ValueError):
+            self.tos_client.put_objects([])
+        with self.assertRaises(ValueError):
+            self.tos_client.put_objects(items, max_workers=0)
+    
     @patch('app.utils.tos_utils.tos')
     @patch('os.path.exists')
     @patch('os.path.getsize')
@@ -285,6 +446,173 @@ class TestTOSClient(unittest.TestCase):
         if 'bucket' in result:
             self.assertEqual(result['bucket'], "new-bucket")
     
+    @patch('app.utils.tos_utils.time.sleep')
+    def test_put_object_multipart(self, mock_sleep):
+        """测试超过阈值的对象自动分片并发上传，失败分片重试"""
+        import app.utils.tos_utils as tos_utils
+        part_size = tos_utils.MULTIPART_MIN_PART_SIZE
+        self.tos_client.multipart_threshold = part_size
+        self.tos_client.multipart_part_size = part_size
+        self.tos_client.client = FakeMultipartClient(failures={2: [Exception("连接被重置")]})
+        
+        content = os.urandom(part_size * 2 + 1000)
+        result = self.tos_client.put_object("big.bin", content)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['part_count'], 3)
+        self.assertEqual(self.tos_client.client.objects["big.bin"], content)
+        self.assertEqual(sorted(self.tos_client.client.part_calls), [1, 2, 2, 3])
+        mock_sleep.assert_called_once()
+        
+        # 小对象仍然使用普通上传
+        self.tos_client.client.put_object = MagicMock(return_value=MagicMock(request_id="r"))
+        self.tos_client.put_object("small.bin", b"small")
+        self.tos_client.client.put_object.assert_called_once()
+        
+        # multipart=False时大对象也单次上传
+        self.tos_client.client.put_object.reset_mock()
+        self.tos_client.put_object("big2.bin", content, multipart=False)
+        self.tos_client.client.put_object.assert_called_once()
+        self.assertNotIn("big2.bin", self.tos_client.client.objects)
+    
+    @patch('app.utils.tos_utils.time.sleep')
+    def test_put_object_from_file_multipart_resume(self, mock_sleep):
+        """测试分片上传中断后通过断点续传记录只上传缺少的分片"""
+        import tempfile
+        import app.utils.tos_utils as tos_utils
+        part_size = tos_utils.MULTIPART_MIN_PART_SIZE
+        content = os.urandom(part_size * 3)
+        self.tos_client.multipart_part_size = part_size
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "export.zip")
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            checkpoint_file = os.path.join(tmp_dir, "export.json")
+            
+            # 第3个分片持续返回503，重试用尽后失败，保留上传任务和记录
+            fake = FakeMultipartClient(failures={3: [make_server_error(503) for _ in range(4)]})
+            self.tos_client.client = fake
+            with self.assertRaises(Exception):
+                self.tos_client.put_object_from_file_multipart(
+                    file_path, "export.zip", max_workers=1, checkpoint_file=checkpoint_file)
+            self.assertTrue(os.path.exists(checkpoint_file))
+            self.assertEqual(fake.aborted, [])
+            
+            fake.part_calls.clear()
+            result = self.tos_client.put_object_from_file_multipart(
+                file_path, "export.zip", checkpoint_file=checkpoint_file)
+            self.assertTrue(result['success'])
+            self.assertEqual(result['resumed_parts'], 2)
+            self.assertEqual(fake.part_calls, [3])
+            self.assertEqual(fake.objects["export.zip"], content)
+            self.assertFalse(os.path.exists(checkpoint_file))
+    
+    def test_put_object_multipart_aborts_on_client_error(self):
+        """测试不可重试的错误立即中止分片上传任务"""
+        import app.utils.tos_utils as tos_utils
+        fake = FakeMultipartClient(failures={1: [make_server_error(403)]})
+        self.tos_client.client = fake
+        
+        with self.assertRaises(Exception):
+            self.tos_client.put_object_multipart("big.bin", os.urandom(tos_utils.MULTIPART_MIN_PART_SIZE + 1))
+        self.assertEqual(fake.aborted, ["upload-1"])
+        self.assertEqual(fake.uploads, {})
+        self.assertEqual(fake.part_calls.count(1), 1)
+    
+    def test_get_object_to_file_ranges(self):
+        """测试大对象按分段并发下载并写入同一个文件"""
+        import tempfile
+        data = os.urandom(10000)
+        fake = FakeRangeClient(data)
+        self.tos_client.client = fake
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "big.bin")
+            result = self.tos_client.get_object_to_file("big.bin", file_path, part_size=3000, max_workers=3)
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), data)
+        
+        self.assertEqual(result['parts'], 4)
+        self.assertEqual(result['file_size'], 10000)
+        self.assertEqual(sorted(fake.requests), [
+            (0, 2999, None), (3000, 5999, "etag-1"), (6000, 8999, "etag-1"), (9000, 9999, "etag-1")
+        ])
+        
+        # 小对象只发一次请求
+        fake.requests.clear()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "small.bin")
+            result = self.tos_client.get_object_to_file("small.bin", file_path, part_size=20000, max_workers=3)
+            self.assertEqual(os.path.getsize(file_path), 10000)
+        self.assertEqual(result['parts'], 1)
+        self.assertEqual(len(fake.requests), 1)
+    
+    def test_get_object_stream(self):
+        """测试流式获取对象按块返回内容，读完后关闭响应"""
+        data = os.urandom(2500)
+        fake = FakeRangeClient(data)
+        self.tos_client.client = fake
+        
+        result = self.tos_client.get_object_stream("big.bin", chunk_size=1000)
+        self.assertEqual(result['content_length'], 2500)
+        chunks = list(result['body'])
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        self.assertEqual(b"".join(chunks), data)
+    
+    def test_iter_objects(self):
+        """测试按continuation token逐页列举，提前结束时不再请求下一页"""
+        keys = [f"tmp/{i:04d}.png" for i in range(25)] + ["other/a.png"]
+        fake = FakeBucketClient(keys)
+        self.tos_client.client = fake
+        
+        listed = [obj['key'] for obj in self.tos_client.iter_objects(prefix="tmp/", page_size=10)]
+        self.assertEqual(listed, sorted(keys)[1:])
+        self.assertEqual(fake.list_calls, [None, "10", "20"])
+        
+        fake.list_calls.clear()
+        iterator = self.tos_client.iter_objects(prefix="tmp/", page_size=10)
+        next(iterator)
+        self.assertEqual(fake.list_calls, [None])
+    
+    def test_bulk_delete(self):
+        """测试批量删除按批次并发执行并汇总结果"""
+        keys = [f"tmp/{i:04d}.png" for i in range(2500)]
+        fake = FakeBucketClient(keys, fail_keys={"tmp/0007.png"})
+        self.tos_client.client = fake
+        
+        result = self.tos_client.bulk_delete(
+            (obj['key'] for obj in self.tos_client.iter_objects(prefix="tmp/")), max_workers=3)
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['total'], 2500)
+        self.assertEqual(result['deleted'], 2499)
+        self.assertEqual(result['batches'], 3)
+        self.assertEqual([error['key'] for error in result['errors']], ["tmp/0007.png"])
+        self.assertEqual(sorted(len(batch) for batch in fake.delete_batches), [500, 1000, 1000])
+        
+        with self.assertRaises(ValueError):
+            self.tos_client.delete_objects(keys)
+    
+    def test_bulk_copy_rate_limit(self):
+        """测试批量复制汇总结果，并且不超过速率上限"""
+        import time
+        fake = FakeBucketClient([], fail_keys={"src/3"})
+        self.tos_client.client = fake
+        pairs = [(f"src/{i}", f"dst/{i}") for i in range(10)]
+        
+        started = time.monotonic()
+        result = self.tos_client.bulk_copy(pairs, batch_size=3, max_workers=4, max_requests_per_second=50)
+        elapsed = time.monotonic() - started
+        
+        self.assertEqual(result['total'], 10)
+        self.assertEqual(result['copied'], 9)
+        self.assertEqual(result['batches'], 4)
+        self.assertEqual(result['errors'][0]['source_key'], "src/3")
+        self.assertEqual(sorted(fake.copies), sorted(pair for pair in pairs if pair[0] != "src/3"))
+        # 10个请求按每秒50个发放，至少间隔9个周期
+        self.assertGreaterEqual(elapsed, 9 / 50 - 0.01)
+    
     # 暂时注释掉_handle_tos_exception测试，因为需要更复杂的mock设置
     # def test_handle_tos_exception(self):
     #     """测试异常处理方法_handle_tos_exception"""
@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import io
+import tempfile
+import unittest
+
+from PIL import Image
+from fastapi import UploadFile
+
+from app.utils.image_compressor import ImageCompressor, ImageValidationError
+from app.utils.upload_stream import hash_upload, prepare_image_uploads
+
+
+def make_upload(data: bytes, filename: str = 'outfit.jpg') -> UploadFile:
+    """与Starlette解析multipart时一样，把内容写入SpooledTemporaryFile"""
+    spool = tempfile.SpooledTemporaryFile(max_size=1024)
+    spool.write(data)
+    spool.seek(0)
+    return UploadFile(file=spool, filename=filename)
+
+
+class TestUploadStream(unittest.TestCase):
+    """
+    测试multipart上传文件的分块哈希、大小校验和对象键生成
+    """
+
+    def test_prepare_image_uploads(self):
+        """
+        测试分块计算sha256，生成按内容寻址的对象键，文件对象回到开头
+        """
+        buffer = io.BytesIO()
+        Image.effect_noise((400, 300), 64).convert('RGB').save(buffer, 'JPEG', quality=95)
+        data = buffer.getvalue()
+        expected = hashlib.sha256(data).hexdigest()
+
+        async def scenario():
+            digest = await hash_upload(make_upload(data), max_size=len(data), chunk_size=1000)
+            uploads = await prepare_image_uploads(
+                {'single_outfit_image': make_upload(data), 'single_outfit_back_image': None},
+                ImageCompressor(),
+                max_size=len(data)
+            )
+            return digest, uploads
+
+        digest, uploads = asyncio.run(scenario())
+        self.assertEqual(digest, {'sha256': expected, 'size': len(data)})
+        self.assertEqual(len(uploads), 1)
+        upload = uploads[0]
+        self.assertEqual(upload.field, 'single_outfit_image')
+        self.assertEqual(upload.image_format, 'JPEG')
+        self.assertEqual(upload.object_key, f"model_images/{expected[:32]}.jpg")
+        self.assertEqual(upload.fileobj.read(), data)
+        print(f"✓ 分块哈希和对象键: {upload.object_key}")
+
+    def test_rejects_invalid_parts(self):
+        """
+        测试超过大小限制、空文件和非图片文件被拒绝
+        """
+        async def check(data, max_size, status_code):
+            with self.assertRaises(ImageValidationError) as context:
+                await prepare_image_uploads({'uploaded_image': make_upload(data)}, ImageCompressor(), max_size)
+            self.assertEqual(context.exception.status_code, status_code)
+
+        asyncio.run(check(b'x' * 5000, 4096, 413))
+        asyncio.run(check(b'', 4096, 400))
+        asyncio.run(check(b'not an image', 4096, 415))
+        print("✓ 拒绝过大、空文件和非图片")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,40 @@
+"""
+后台任务模块
+生图等耗时任务通过Redis任务队列提交，由独立的worker进程执行
+
+启动worker:
+    python -m backend.worker --concurrency 4
+"""
+from .job_queue import (
+    JobQueue,
+    get_job_queue,
+    public_job_view,
+    user_lane,
+    DEFAULT_LANE,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    STATUS_RETRYING,
+    STATUS_SUCCEEDED,
+    STATUS_FAILED,
+    ACTIVE_STATUSES
+)
+
+# 任务类型
+JOB_MODEL_IMAGE = "model_image_generation"
+JOB_PROCESS_IMAGE = "process_image"
+
+__all__ = [
+    "JobQueue",
+    "get_job_queue",
+    "public_job_view",
+    "user_lane",
+    "DEFAULT_LANE",
+    "STATUS_QUEUED",
+    "STATUS_RUNNING",
+    "STATUS_RETRYING",
+    "STATUS_SUCCEEDED",
+    "STATUS_FAILED",
+    "ACTIVE_STATUSES",
+    "JOB_MODEL_IMAGE",
+    "JOB_PROCESS_IMAGE"
+]
@@ -0,0 +1,66 @@
+"""
+worker进程入口
+
+用法:
+    python -m backend.worker
+    python -m backend.worker --concurrency 8
+
+可以启动多个worker进程，任务通过Redis租约分配，同一任务同时只由一个worker执行。
+"""
+import argparse
+import asyncio
+import signal
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app.config import worker_config
+from backend.app.utils.provider_executor import shutdown_provider_executors
+from backend.app.utils.http_fetcher import get_http_fetcher
+from backend.app.api.model_image_generation import model_image_job, model_image_job_failed, recover_pending_records
+from backend.app.api.processor import process_image_job
+from backend.worker import get_job_queue, JOB_MODEL_IMAGE, JOB_PROCESS_IMAGE
+from backend.worker.runner import Worker
+
+
+def build_worker(concurrency: int) -> Worker:
+    """
+    创建worker并注册所有任务类型
+
+    Args:
+        concurrency: 并发执行的任务数
+
+    Returns:
+        Worker: worker实例
+    """
+    worker = Worker(get_job_queue(), concurrency=concurrency, poll_interval=worker_config.POLL_INTERVAL)
+    worker.register(JOB_MODEL_IMAGE, model_image_job, on_failure=model_image_job_failed)
+    worker.register(JOB_PROCESS_IMAGE, process_image_job)
+    worker.on_startup(recover_pending_records)
+    return worker
+
+
+async def main(concurrency: int):
+    worker = build_worker(concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows不支持add_signal_handler，使用Ctrl+C中断
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        shutdown_provider_executors(wait=False)
+        await get_http_fetcher().aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生图任务worker")
+    parser.add_argument("--concurrency", type=int, default=worker_config.CONCURRENCY, help="每个进程并发执行的任务数")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,424 @@
+"""
+基于Redis的持久化任务队列
+任务记录保存在Redis中，worker进程崩溃或重启后任务不会丢失
+
+数据结构（键名以 {prefix} 开头，花括号原样保留，作为Redis Cluster的hash tag）:
+    {prefix}:ready:{lane}  ZSET 每个通道待执行的任务ID，分数为最早可执行时间（重试退避通过未来时间实现）
+    {prefix}:lanes         LIST 有待执行任务的通道，领取任务时轮转
+    {prefix}:lane_set      SET  与lanes相同的通道集合，用于判断通道是否已在轮转中
+    {prefix}:lane_of       HASH 任务ID到通道的映射，用于租约过期后放回原通道
+    {prefix}:processing    ZSET 执行中的任务ID，分数为租约到期时间（可见性超时）
+    {prefix}:job:{id}      STRING 任务记录JSON（类型、参数、状态、重试次数、结果、错误）
+
+公平调度：任务按通道（如每个用户一个通道）排队，领取任务时在通道之间轮转，每次从下一个
+有可执行任务的通道取一个任务，一个通道中的大量任务不会让其他通道的任务长时间等待。
+
+领取任务时通过Lua脚本把任务ID从通道原子地移动到processing；执行期间worker定期续约，
+worker崩溃后租约到期，任务由requeue_expired放回原通道，再由其他worker领取。
+
+通道数量不固定，Lua脚本中的通道键由ready前缀和通道名拼接而成，没有全部通过KEYS传入。
+所有键共用 {prefix} hash tag，落在同一个slot，脚本在Redis Cluster中也只访问一个节点；
+按KEYS校验或转发脚本的代理（如twemproxy）不支持这种用法，需要直连Redis或Redis Cluster。
+"""
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_RETRYING = "retrying"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+# 尚未结束的任务状态
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING, STATUS_RETRYING)
+
+# 未指定通道的任务使用的通道
+DEFAULT_LANE = "default"
+
+# 把任务放入通道，通道不在轮转中时加入轮转
+# KEYS: lanes, lane_set, lane_of; ARGV: ready前缀, 通道, 任务ID, 可执行时间
+PUSH_SCRIPT = """
+redis.call("ZADD", ARGV[1] .. ARGV[2], ARGV[4], ARGV[3])
+redis.call("HSET", KEYS[3], ARGV[3], ARGV[2])
+if redis.call("SADD", KEYS[2], ARGV[2]) == 1 then
+    redis.call("LPUSH", KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+# 轮转通道，从第一个有可执行任务的通道领取一个任务，移动到processing；空通道移出轮转
+# KEYS: lanes, lane_set, processing; ARGV: ready前缀, 当前时间, 租约到期时间
+RESERVE_SCRIPT = """
+local n = redis.call("LLEN", KEYS[1])
+for i = 1, n do
+    local lane = redis.call("RPOPLPUSH", KEYS[1], KEYS[1])
+    local zkey = ARGV[1] .. lane
+    local ids = redis.call("ZRANGEBYSCORE", zkey, "-inf", ARGV[2], "LIMIT", 0, 1)
+    if #ids > 0 then
+        redis.call("ZREM", zkey, ids[1])
+    end
+    if redis.call("ZCARD", zkey) == 0 then
+        redis.call("LREM", KEYS[1], 0, lane)
+        redis.call("SREM", KEYS[2], lane)
+    end
+    if #ids > 0 then
+        redis.call("ZADD", KEYS[3], ARGV[3], ids[1])
+        return ids[1]
+    end
+end
+return false
+"""
+
+# 把租约已过期的任务放回原通道
+# KEYS: lanes, lane_set, lane_of, processing; ARGV: ready前缀, 当前时间, 默认通道
+REQUEUE_SCRIPT = """
+local ids = redis.call("ZRANGEBYSCORE", KEYS[4], "-inf", ARGV[2])
+for _, id in ipairs(ids) do
+    local lane = redis.call("HGET", KEYS[3], id) or ARGV[3]
+    redis.call("ZREM", KEYS[4], id)
+    redis.call("ZADD", ARGV[1] .. lane, ARGV[2], id)
+    if redis.call("SADD", KEYS[2], lane) == 1 then
+        redis.call("LPUSH", KEYS[1], lane)
+    end
+end
+return #ids
+"""
+
+
+def user_lane(user_id: int, batch: bool = False) -> str:
+    """
+    生成用户的公平调度通道名
+
+    批量任务和单次任务使用不同的通道，用户自己的大批量任务也不会阻塞其后提交的单次任务。
+
+    Args:
+        user_id: 用户ID
+        batch: 是否为批量任务
+
+    Returns:
+        str: 通道名
+    """
+    return f"user:{user_id}:batch" if batch else f"user:{user_id}"
+
+
+class JobQueue:
+    """
+    Redis任务队列
+
+    使用示例:
+        queue = JobQueue(redis_client)
+        job_id = await queue.enqueue("process_image", {"image": "..."})
+
+        job = await queue.reserve()
+        if job:
+            try:
+                result = await handle(job["payload"])
+                await queue.complete(job, result)
+            except Exception as e:
+                await queue.fail(job, str(e))
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix: str = "jobs",
+        visibility_timeout: int = 300,
+        max_attempts: int = 3,
+        retry_backoff: float = 5,
+        retry_backoff_max: float = 300,
+        job_ttl: int = 86400,
+        result_ttl: int = 3600
+    ):
+        """
+        初始化任务队列
+
+        Args:
+            redis_client: Redis客户端实例，为None时使用项目共享的Redis连接
+            prefix: 键前缀，实际键名为 {prefix}:...，花括号作为Redis Cluster的hash tag
+            visibility_timeout: 任务租约时长(秒)，worker未续约时超过该时长任务重新入队
+            max_attempts: 默认最大执行次数（含首次）
+            retry_backoff: 首次重试的等待时间(秒)，之后每次翻倍
+            retry_backoff_max: 重试等待时间上限(秒)
+            job_ttl: 未结束任务记录的过期时间(秒)
+            result_ttl: 已结束任务记录（含结果）的保留时间(秒)
+        """
+        self._redis = redis_client
+        self.prefix = prefix
+        # 所有键共用同一个hash tag，保证Lua脚本访问的键在Redis Cluster中位于同一个slot
+        self.key_prefix = f"{{{prefix}}}"
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.job_ttl = job_ttl
+        self.result_ttl = result_ttl
+        self.ready_prefix = f"{self.key_prefix}:ready:"
+        self.lanes_key = f"{self.key_prefix}:lanes"
+        self.lane_set_key = f"{self.key_prefix}:lane_set"
+        self.lane_of_key = f"{self.key_prefix}:lane_of"
+        self.processing_key = f"{self.key_prefix}:processing"
+
+    def _job_key(self, job_id: str) -> str:
+        """生成任务记录的Redis键"""
+        return f"{self.key_prefix}:job:{job_id}"
+
+    async def _get_redis(self):
+        """获取Redis客户端，复用项目中已有的Redis连接"""
+        if self._redis is None:
+            from backend.common.idempotent import get_redis_client
+            self._redis = await get_redis_client()
+        return self._redis
+
+    async def _save(self, job: Dict[str, Any], ttl: int) -> None:
+        """保存任务记录"""
+        redis = await self._get_redis()
+        job["updated_at"] = time.time()
+        await redis.set(self._job_key(job["id"]), json.dumps(job, ensure_ascii=False), ex=ttl)
+
+    async def _push(self, job_id: str, lane: str, available_at: float) -> None:
+        """把任务放入通道"""
+        redis = await self._get_redis()
+        await redis.eval(PUSH_SCRIPT, 3, self.lanes_key, self.lane_set_key, self.lane_of_key,
+                         self.ready_prefix, lane, job_id, available_at)
+
+    async def _release(self, job_id: str) -> None:
+        """任务结束或等待重试，移出processing"""
+        redis = await self._get_redis()
+        await redis.zrem(self.processing_key, job_id)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第attempt次失败后的重试等待时间（指数退避）
+
+        Args:
+            attempt: 已执行次数
+
+        Returns:
+            float: 等待时间(秒)
+        """
+        return min(self.retry_backoff * (2 ** max(attempt - 1, 0)), self.retry_backoff_max)
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        job_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        delay: float = 0,
+        lane: Optional[str] = None
+    ) -> str:
+        """
+        提交任务
+
+        指定job_id时按ID去重：同ID的任务尚未结束则不会重复提交。
+
+        Args:
+            job_type: 任务类型，对应worker中注册的处理函数
+            payload: 任务参数，必须可JSON序列化
+            job_id: 任务ID，默认自动生成
+            max_attempts: 最大执行次数，默认使用队列配置
+            delay: 延迟执行的时间(秒)
+            lane: 公平调度的通道（如按用户划分），默认使用公共通道
+
+        Returns:
+            str: 任务ID
+        """
+        redis = await self._get_redis()
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        job = {
+            "id": job_id,
+            "type": job_type,
+            "lane": lane or DEFAULT_LANE,
+            "payload": payload,
+            "status": STATUS_QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "error": None,
+            "result": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        created = await redis.set(self._job_key(job_id), json.dumps(job, ensure_ascii=False), ex=self.job_ttl, nx=True)
+        if not created:
+            existing = await self.get(job_id)
+            if existing and existing["status"] in ACTIVE_STATUSES:
+                logger.info(f"[JobQueue] 任务已存在，跳过提交: {job_id}")
+                return job_id
+            await redis.set(self._job_key(job_id), json.dumps(job, ensure_ascii=False), ex=self.job_ttl)
+
+        await self._push(job_id, job["lane"], now + delay)
+        logger.info(f"[JobQueue] 任务已提交: {job_type} {job_id} (通道: {job['lane']})")
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务记录
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Dict or None: 任务记录，不存在或已过期时返回None
+        """
+        redis = await self._get_redis()
+        raw = await redis.get(self._job_key(job_id))
+        return json.loads(raw) if raw else None
+
+    async def reserve(self) -> Optional[Dict[str, Any]]:
+        """
+        在通道之间轮转，领取一个已到执行时间的任务，并开始租约
+
+        Returns:
+            Dict or None: 任务记录，队列为空时返回None
+        """
+        redis = await self._get_redis()
+        while True:
+            now = time.time()
+            job_id = await redis.eval(RESERVE_SCRIPT, 3, self.lanes_key, self.lane_set_key, self.processing_key,
+                                      self.ready_prefix, now, now + self.visibility_timeout)
+            if not job_id:
+                return None
+
+            job = await self.get(job_id)
+            if job is None:
+                # 任务记录已过期，丢弃该ID
+                await redis.zrem(self.processing_key, job_id)
+                await redis.hdel(self.lane_of_key, job_id)
+                logger.warning(f"[JobQueue] 任务记录不存在，已丢弃: {job_id}")
+                continue
+
+            job["status"] = STATUS_RUNNING
+            job["attempts"] += 1
+            await self._save(job, self.job_ttl)
+            return job
+
+    async def extend(self, job_id: str) -> None:
+        """
+        续约，推迟任务的租约到期时间
+
+        Args:
+            job_id: 任务ID
+        """
+        redis = await self._get_redis()
+        await redis.zadd(self.processing_key, {job_id: time.time() + self.visibility_timeout}, xx=True)
+
+    async def complete(self, job: Dict[str, Any], result: Any = None) -> None:
+        """
+        标记任务成功，任务参数不再保留
+
+        Args:
+            job: reserve返回的任务记录
+            result: 任务结果，必须可JSON序列化
+        """
+        redis = await self._get_redis()
+        await self._release(job["id"])
+        await redis.hdel(self.lane_of_key, job["id"])
+        job.update(status=STATUS_SUCCEEDED, result=result, error=None, payload=None)
+        await self._save(job, self.result_ttl)
+
+    async def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """
+        标记任务执行失败，未达到最大执行次数时按指数退避重新入队
+
+        Args:
+            job: reserve返回的任务记录
+            error: 错误信息
+
+        Returns:
+            bool: 是否已安排重试
+        """
+        redis = await self._get_redis()
+        await self._release(job["id"])
+        job["error"] = error
+
+        if job["attempts"] < job["max_attempts"]:
+            delay = self.backoff(job["attempts"])
+            job["status"] = STATUS_RETRYING
+            await self._save(job, self.job_ttl)
+            await self._push(job["id"], job.get("lane") or DEFAULT_LANE, time.time() + delay)
+            logger.warning(f"[JobQueue] 任务失败，{delay:.0f}秒后第{job['attempts'] + 1}次执行: {job['id']}, error: {error}")
+            return True
+
+        job.update(status=STATUS_FAILED, payload=None)
+        await self._save(job, self.result_ttl)
+        await redis.hdel(self.lane_of_key, job["id"])
+        logger.error(f"[JobQueue] 任务最终失败: {job['id']}, error: {error}")
+        return False
+
+    async def requeue_expired(self) -> int:
+        """
+        把租约已过期（worker崩溃或超时）的任务放回队列
+
+        Returns:
+            int: 重新入队的任务数量
+        """
+        redis = await self._get_redis()
+        count = await redis.eval(REQUEUE_SCRIPT, 4, self.lanes_key, self.lane_set_key, self.lane_of_key,
+                                 self.processing_key, self.ready_prefix, time.time(), DEFAULT_LANE)
+        if count:
+            logger.warning(f"[JobQueue] {count} 个任务租约过期，已重新入队")
+        return int(count or 0)
+
+    async def stats(self) -> Dict[str, int]:
+        """
+        获取队列长度
+
+        Returns:
+            Dict: 有任务的通道数、待执行（含等待重试）和执行中的任务数量
+        """
+        redis = await self._get_redis()
+        lanes = await redis.lrange(self.lanes_key, 0, -1)
+        ready = 0
+        for lane in lanes:
+            ready += await redis.zcard(self.ready_prefix + lane)
+        return {
+            "lanes": len(lanes),
+            "ready": ready,
+            "processing": await redis.zcard(self.processing_key)
+        }
+
+
+def public_job_view(job: Dict[str, Any], fields: List[str] = None) -> Dict[str, Any]:
+    """
+    返回任务记录中可以对外展示的字段（不含任务参数）
+
+    Args:
+        job: 任务记录
+        fields: 需要返回的字段
+
+    Returns:
+        Dict: 任务状态
+    """
+    fields = fields or ["id", "type", "status", "attempts", "max_attempts", "error", "result", "created_at", "updated_at"]
+    return {field: job.get(field) for field in fields}
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    获取全局任务队列实例（使用WorkerConfig配置）
+
+    Returns:
+        JobQueue: 任务队列实例
+    """
+    global _job_queue
+    if _job_queue is None:
+        from backend.app.config import worker_config
+        _job_queue = JobQueue(
+            visibility_timeout=worker_config.VISIBILITY_TIMEOUT,
+            max_attempts=worker_config.MAX_ATTEMPTS,
+            retry_backoff=worker_config.RETRY_BACKOFF,
+            retry_backoff_max=worker_config.RETRY_BACKOFF_MAX,
+            job_ttl=worker_config.JOB_TTL,
+            result_ttl=worker_config.RESULT_TTL
+        )
+    return _job_queue
@@ -0,0 +1,190 @@
+"""
+任务worker
+在一个进程内运行多个协程并发消费任务队列
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# 任务处理函数：接收任务参数，返回可JSON序列化的结果
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+# 任务最终失败（不再重试）时的回调：接收任务参数和错误信息
+FailureHandler = Callable[[Dict[str, Any], str], Awaitable[None]]
+# 启动时执行的回调：接收任务队列
+StartupHook = Callable[[JobQueue], Awaitable[None]]
+
+
+class Worker:
+    """
+    任务worker
+
+    1. 启动时先执行启动回调（如恢复卡住的记录），再把租约过期的任务放回队列
+    2. concurrency个协程并发领取并执行任务，执行期间定期续约
+    3. 后台定期检查租约过期的任务（其他worker崩溃遗留的任务）
+    4. 收到停止信号后不再领取新任务，等待执行中的任务完成
+
+    使用示例:
+        worker = Worker(get_job_queue(), concurrency=4)
+        worker.register("process_image", process_image_job)
+        await worker.run()
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = 4, poll_interval: float = 1.0):
+        """
+        初始化worker
+
+        Args:
+            queue: 任务队列
+            concurrency: 并发执行的任务数
+            poll_interval: 队列为空时的轮询间隔(秒)
+        """
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, Tuple[JobHandler, Optional[FailureHandler]]] = {}
+        self._startup_hooks: List[StartupHook] = []
+        self._stopping = asyncio.Event()
+
+        # 指标
+        self.processed = 0
+        self.failed = 0
+
+    def register(self, job_type: str, handler: JobHandler, on_failure: Optional[FailureHandler] = None) -> None:
+        """
+        注册任务处理函数
+
+        Args:
+            job_type: 任务类型
+            handler: 任务处理函数，抛出异常表示本次执行失败
+            on_failure: 任务最终失败时的回调
+        """
+        self._handlers[job_type] = (handler, on_failure)
+
+    def on_startup(self, hook: StartupHook) -> None:
+        """
+        注册启动回调
+
+        Args:
+            hook: 启动时执行的回调
+        """
+        self._startup_hooks.append(hook)
+
+    def stop(self) -> None:
+        """停止领取新任务"""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """运行worker，直到调用stop"""
+        for hook in self._startup_hooks:
+            try:
+                await hook(self.queue)
+            except Exception as e:
+                logger.error(f"[Worker] 启动回调执行失败: {e}")
+        await self.queue.requeue_expired()
+
+        logger.info(f"[Worker] 启动 {self.concurrency} 个消费协程，任务类型: {list(self._handlers)}")
+        consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        reaper = asyncio.create_task(self._reap())
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            reaper.cancel()
+            logger.info(f"[Worker] 已停止，共执行 {self.processed} 个任务，失败 {self.failed} 次")
+
+    async def _wait(self, seconds: float) -> None:
+        """等待指定时间，收到停止信号时提前返回"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _consume(self) -> None:
+        """循环领取并执行任务"""
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.reserve()
+            except Exception as e:
+                logger.error(f"[Worker] 领取任务失败: {e}")
+                await self._wait(self.poll_interval)
+                continue
+
+            if job is None:
+                await self._wait(self.poll_interval)
+                continue
+            try:
+                await self.process(job)
+            except Exception as e:
+                # 更新任务状态失败时租约会过期，任务由其他worker重新执行
+                logger.error(f"[Worker] 更新任务状态失败: {job['id']}, error: {e}")
+
+    async def _reap(self) -> None:
+        """定期把租约过期的任务放回队列"""
+        interval = max(self.queue.visibility_timeout / 2, self.poll_interval)
+        while not self._stopping.is_set():
+            await self._wait(interval)
+            try:
+                await self.queue.requeue_expired()
+            except Exception as e:
+                logger.error(f"[Worker] 检查过期任务失败: {e}")
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """任务执行期间定期续约"""
+        interval = max(self.queue.visibility_timeout / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.queue.extend(job_id)
+            except Exception as e:
+                logger.warning(f"[Worker] 任务续约失败: {job_id}, error: {e}")
+
+    async def process(self, job: Dict[str, Any]) -> None:
+        """
+        执行一个已领取的任务
+
+        Args:
+            job: reserve返回的任务记录
+        """
+        handler, on_failure = self._handlers.get(job["type"], (None, None))
+        if handler is None:
+            # 没有处理函数的任务不重试
+            job["attempts"] = job["max_attempts"]
+            await self.queue.fail(job, f"未注册的任务类型: {job['type']}")
+            return
+
+        payload = job["payload"]
+        if job["attempts"] > job["max_attempts"]:
+            # worker多次在执行中崩溃，租约过期重新入队导致执行次数超限
+            error = f"超过最大执行次数 {job['max_attempts']}"
+            await self.queue.fail(job, error)
+            await self._notify_failure(on_failure, payload, error)
+            return
+
+        logger.info(f"[Worker] 开始执行任务: {job['type']} {job['id']}（第{job['attempts']}次）")
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await handler(payload)
+        except Exception as e:
+            self.failed += 1
+            error = str(e) or type(e).__name__
+            retried = await self.queue.fail(job, error)
+            if not retried:
+                await self._notify_failure(on_failure, payload, error)
+        else:
+            self.processed += 1
+            await self.queue.complete(job, result)
+            logger.info(f"[Worker] 任务执行成功: {job['type']} {job['id']}")
+        finally:
+            heartbeat.cancel()
+
+    async def _notify_failure(self, on_failure: Optional[FailureHandler], payload: Dict[str, Any], error: str) -> None:
+        """调用任务最终失败的回调"""
+        if on_failure is None:
+            return
+        try:
+            await on_failure(payload, error)
+        except Exception as e:
+            logger.error(f"[Worker] 失败回调执行失败: {e}")
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, Query, HTTPException, Body
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
 from typing import Optional, List
 import os
-import uuid
 import json
 
+from backend.app.utils.storage import get_storage, save_upload
 from backend.passport.app.api.deps import get_db, get_current_user
 from backend.passport.app.models.user import User
 from backend.yilaitumodel.models.model import YiLaiTuModel, YiLaiTuModelImage
@@ -14,8 +13,9 @@ from backend.yilaitumodel.schemas.model import Model as ModelSchema, ModelCreate
 
 router = APIRouter()
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "yilaitumodel")
-os.makedirs(DATA_DIR, exist_ok=True)
+# 模特图保存在yilaitumodel存储空间，参考图保存在cankaotu存储空间
+MODEL_STORAGE = "yilaitumodel"
+CANKAOTU_STORAGE = "cankaotu"
 
 
 def apply_filters(query, gender: Optional[str], age_group: Optional[str], body_type: Optional[str],
@@ -153,13 +153,8 @@ def upload_model_image(
     if not m:
         return None
     
-    # 保存图片到磁盘
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-    file_url = f"/api/v1/yilaitumodel/files/{fname}"
+    # 保存图片
+    file_url = save_upload(get_storage(MODEL_STORAGE), file, "")
     
     # 如果是封面图片且已有图片，更新已有记录
     if is_cover and m.images:
@@ -167,11 +162,7 @@ def upload_model_image(
         cover_image = next((img for img in m.images if img.is_cover), m.images[0])
         
         # 删除旧图片文件
-        try:
-            old_basename = os.path.basename(cover_image.file_path)
-            os.remove(os.path.join(DATA_DIR, old_basename))
-        except Exception:
-            pass
+        get_storage(MODEL_STORAGE).delete_url(cover_image.file_path)
         
         # 更新图片记录
         cover_image.file_path = file_url
@@ -195,11 +186,7 @@ def delete_model_image(model_id: int, image_id: int, db: Session = Depends(get_d
     img = db.query(YiLaiTuModelImage).filter(YiLaiTuModelImage.id == image_id, YiLaiTuModelImage.model_id == model_id).first()
     m = db.query(YiLaiTuModel).filter(YiLaiTuModel.id == model_id).first()
     if img:
-        try:
-            basename = os.path.basename(img.file_path)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage(MODEL_STORAGE).delete_url(img.file_path)
         db.delete(img)
         db.commit()
     if m:
@@ -224,11 +211,7 @@ def clear_all_models_internal(db: Session):
     # 先删除所有图片记录
     images = db.query(YiLaiTuModelImage).all()
     for img in images:
-        try:
-            basename = os.path.basename(img.file_path)
-            os.remove(os.path.join(DATA_DIR, basename))
-        except Exception:
-            pass
+        get_storage(MODEL_STORAGE).delete_url(img.file_path)
     db.query(YiLaiTuModelImage).delete()
     
     # 再删除所有模型记录
@@ -313,12 +296,7 @@ def create_my_model(
     db.refresh(m)
     
     # 2. Upload Image
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(DATA_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-    file_url = f"/api/v1/yilaitumodel/files/{fname}"
+    file_url = save_upload(get_storage(MODEL_STORAGE), file, "")
     
     img = YiLaiTuModelImage(model_id=m.id, file_path=file_url, is_cover=True)
     db.add(img)
@@ -367,12 +345,7 @@ def delete_my_model(
     # Delete images files on disk only if it's NOT a copied system model
     if not is_copied_model:
         for img in m.images:
-            try:
-                if img.file_path.startswith("/api/v1/yilaitumodel/files/"):
-                    fname = img.file_path.split("/")[-1]
-                    os.remove(os.path.join(DATA_DIR, fname))
-            except Exception:
-                pass
+            get_storage(MODEL_STORAGE).delete_url(img.file_path)
             
     # Delete model record from database
     db.delete(m)
@@ -432,11 +405,6 @@ def add_system_model_to_my(
     return {"id": user_model.id, "message": "添加成功"}
 
 
-# 参考图数据目录
-CANKAOTU_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "cankaotu")
-os.makedirs(CANKAOTU_DIR, exist_ok=True)
-
-
 @router.post("/my-models/cankaotu", response_model=ModelSchema)
 def upload_cankaotu(
     file: UploadFile = File(...),
@@ -444,13 +412,9 @@ def upload_cankaotu(
     current_user: User = Depends(get_current_user)
 ):
     """上传参考图"""
-    # 1. 保存图片到磁盘
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fs_path = os.path.join(CANKAOTU_DIR, fname)
-    with open(fs_path, "wb") as f:
-        f.write(file.file.read())
-    file_url = f"/api/v1/yilaitumodel/cankaotu/{fname}"
+    # 1. 保存图片
+    file_url = save_upload(get_storage(CANKAOTU_STORAGE), file, "")
+    fname = file_url.rsplit("/", 1)[-1]
 
     # 2. 创建记录
     model_data = {
@@ -495,22 +459,9 @@ def delete_cankaotu(
 
     # 删除图片文件
     for img in m.images:
-        try:
-            if img.file_path.startswith("/api/v1/yilaitumodel/cankaotu/"):
-                fname = img.file_path.split("/")[-1]
-                os.remove(os.path.join(CANKAOTU_DIR, fname))
-        except Exception:
-            pass
+        get_storage(CANKAOTU_STORAGE).delete_url(img.file_path)
 
     db.delete(m)
     db.commit()
     return {"deleted": 1}
 
-
-@router.get("/cankaotu/{filename}")
-def get_cankaotu_file(filename: str):
-    """获取参考图文件"""
-    file_path = os.path.join(CANKAOTU_DIR, filename)
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    raise HTTPException(status_code=404, detail="File not found")